@@ -12,7 +12,15 @@ class AdsConfig(AppConfig):
         # DISABLED: Auto-seeding removed to prevent unwanted ad creation
         # Seeds should only run manually via admin command or button
         # This prevents the "10 ads created without command" issue
-        pass
+        # Keep ready() cheap: no queries, seeding or heavy imports on the boot path
+
+        # Rebuild in-process reference snapshots when reference data changes
+        from apps.ads.services.reference_snapshot import connect_invalidation_signals
+        connect_invalidation_signals()
+
+        # Change car ad ETags whenever the ad or its related rows change
+        from apps.ads.services.ad_versions import connect_car_ad_version_signals
+        connect_car_ad_version_signals()
 
     def _run_seeds_safely(self):
         """Run seeds safely without blocking app startup."""
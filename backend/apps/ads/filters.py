@@ -3,6 +3,8 @@ Django filters for AutoRia ads application.
 Provides comprehensive filtering capabilities for car advertisements and related models.
 """
 
+import logging
+
 import django_filters
 from django.db import models
 from django.utils.translation import gettext_lazy as _
@@ -14,6 +16,8 @@ from apps.ads.models import (
 from core.enums.cars import SellerType, ExchangeStatus, Currency
 from core.enums.ads import AdStatusEnum
 
+logger = logging.getLogger(__name__)
+
 
 class CarAdFilter(django_filters.FilterSet):
     """
@@ -593,66 +597,39 @@ class CarAdFilter(django_filters.FilterSet):
         )
 
     def filter_region(self, queryset, name, value):
-        """Filter by region - supports both ID and name."""
-        print(f"🌍 [REGION FILTER] Called with value: '{value}', type: {type(value)}")
+        """
+        Filter by region - supports ID, name, transliteration and slug.
+
+        Names resolve through the canonical location directory (one dict hit),
+        duplicate uk/ru rows of the region are included.
+        """
+        from apps.ads.services.location_directory import get_location_directory
 
         if not value:
-            print("🌍 [REGION FILTER] Empty value, returning original queryset")
             return queryset
 
-        # Пробуем как ID (число) - фильтруем напрямую по region_id
-        try:
-            region_id = int(value)
-            print(f"🌍 [REGION FILTER] Filtering by region ID: {region_id}")
-            result = queryset.filter(region_id=region_id)
-            print(f"🌍 [REGION FILTER] Found {result.count()} ads by region ID")
-            return result
-        except (ValueError, TypeError):
-            print(f"🌍 [REGION FILTER] Not a valid ID, trying by name")
-            pass
-
-        # Пробуем как название (строка) - ищем регион по названию и фильтруем по ID
-        try:
-            print(f"🌍 [REGION FILTER] Looking for region with name containing: '{value}'")
-            region = RegionModel.objects.get(name__icontains=value)
-            print(f"🌍 [REGION FILTER] Found region: {region.name} (ID: {region.id})")
-            result = queryset.filter(region_id=region.id)
-            print(f"🌍 [REGION FILTER] Found {result.count()} ads for region '{region.name}'")
-            return result
-        except RegionModel.DoesNotExist:
-            print(f"🌍 [REGION FILTER] No region found with name containing: '{value}'")
+        region_ids = get_location_directory().region_ids(value)
+        logger.debug(f"🌍 [REGION FILTER] '{value}' -> region ids {list(region_ids)}")
+        if not region_ids:
             return queryset.none()
+        return queryset.filter(region_id__in=region_ids)
 
     def filter_city(self, queryset, name, value):
-        """Filter by city - supports both ID and name."""
-        print(f"🏙️ [CITY FILTER] Called with value: '{value}', type: {type(value)}")
+        """
+        Filter by city - supports ID, name, transliteration and slug.
+
+        Ambiguous names ("Миколаївка") are narrowed by the region filter value.
+        """
+        from apps.ads.services.location_directory import get_location_directory
 
         if not value:
-            print("🏙️ [CITY FILTER] Empty value, returning original queryset")
             return queryset
 
-        # Пробуем как ID (число) - фильтруем напрямую по city_id
-        try:
-            city_id = int(value)
-            print(f"🏙️ [CITY FILTER] Filtering by city ID: {city_id}")
-            result = queryset.filter(city_id=city_id)
-            print(f"🏙️ [CITY FILTER] Found {result.count()} ads by city ID")
-            return result
-        except (ValueError, TypeError):
-            print(f"🏙️ [CITY FILTER] Not a valid ID, trying by name")
-            pass
-
-        # Пробуем как название (строка) - ищем город по названию и фильтруем по ID
-        try:
-            print(f"🏙️ [CITY FILTER] Looking for city with name containing: '{value}'")
-            city = CityModel.objects.get(name__icontains=value)
-            print(f"🏙️ [CITY FILTER] Found city: {city.name} (ID: {city.id})")
-            result = queryset.filter(city_id=city.id)
-            print(f"🏙️ [CITY FILTER] Found {result.count()} ads for city '{city.name}'")
-            return result
-        except CityModel.DoesNotExist:
-            print(f"🏙️ [CITY FILTER] No city found with name containing: '{value}'")
+        city_ids = get_location_directory().city_ids(value, region=self.data.get('region'))
+        logger.debug(f"🏙️ [CITY FILTER] '{value}' -> city ids {list(city_ids)}")
+        if not city_ids:
             return queryset.none()
+        return queryset.filter(city_id__in=city_ids)
 
 
 class CarMarkFilter(django_filters.FilterSet):
@@ -0,0 +1,46 @@
+"""
+Management command to materialize canonical region/city aliases.
+
+Usage:
+    python manage.py build_location_aliases
+    python manage.py build_location_aliases --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ads.services.location_directory import CITY, REGION, build_alias_rows, materialize
+from apps.ads.services.reference_snapshot import get_reference_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Group duplicate regions/cities and store every name variant in ads_location_alias'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only print duplicate groups, do not write the table',
+        )
+
+    def handle(self, *args, **options):
+        snapshot = get_reference_snapshot()
+
+        if options['dry_run']:
+            rows = build_alias_rows(snapshot)
+            for kind, by_id in ((REGION, snapshot.regions_by_id), (CITY, snapshot.cities_by_id)):
+                groups = {}
+                for row in rows:
+                    if row.kind == kind:
+                        groups.setdefault(row.canonical_id, set()).add(row.location_id)
+                for canonical_id, members in groups.items():
+                    if len(members) > 1:
+                        names = ', '.join(by_id[pk].name for pk in sorted(members - {canonical_id}))
+                        self.stdout.write(f"  {kind} {by_id[canonical_id].name} <- {names}")
+            self.stdout.write(self.style.WARNING(f"🔍 Dry run: {len(rows)} aliases, nothing written"))
+            return
+
+        stats = materialize(snapshot)
+        self.stdout.write(
+            f"  regions: {stats['regions']} canonical of {stats['region_rows']} rows\n"
+            f"  cities: {stats['cities']} canonical of {stats['city_rows']} rows"
+        )
+        self.stdout.write(self.style.SUCCESS(f"✅ {stats['aliases']} aliases written"))
@@ -0,0 +1,20 @@
+"""
+Management command to send status-change digests by email.
+
+Usage:
+    python manage.py consume_status_digests
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ads.services.digest_consumer import DIGEST_QUEUE, StatusDigestConsumer
+
+
+class Command(BaseCommand):
+    help = 'Consume moderation status digests and send them by email'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'📬 Consuming status digests from {DIGEST_QUEUE}')
+        try:
+            StatusDigestConsumer().start_consuming()
+        except KeyboardInterrupt:
+            self.stdout.write('👋 Status digest consumer stopped')
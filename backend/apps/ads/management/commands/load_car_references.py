@@ -0,0 +1,55 @@
+"""
+Management command to apply the car reference CSV as a diff.
+
+Usage:
+    python manage.py load_car_references
+    python manage.py load_car_references --dry-run
+    python manage.py load_car_references --csv /path/to/cars.csv
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.ads.services.reference_loader import CarReferenceLoader
+
+ACTIONS = (
+    'vehicle_types_inserted',
+    'marks_inserted', 'marks_reactivated', 'marks_deactivated',
+    'models_inserted', 'models_reactivated', 'models_deactivated',
+)
+
+
+class Command(BaseCommand):
+    help = 'Insert, reactivate and deactivate vehicle types, marks and models to match the reference CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--csv',
+            dest='csv_path',
+            default=None,
+            help='CSV file with "vehicle type, mark, model" rows (default: core/data/cars_dict_output.csv)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the diff and roll back',
+        )
+
+    def handle(self, *args, **options):
+        loader = CarReferenceLoader(csv_path=options['csv_path'], dry_run=options['dry_run'])
+        try:
+            report = loader.run()
+        except FileNotFoundError as e:
+            raise CommandError(f'❌ {e}')
+
+        self.stdout.write(f"📁 {loader.csv_path}: {report['rows']} rows staged")
+        for action in ACTIONS:
+            self.stdout.write(f"  {action}: {report[action]}")
+            for name in report['samples'].get(action, []):
+                self.stdout.write(f"    - {name}")
+
+        summary = f"{report['changed']} changes in {report['duration_seconds']}s"
+        if report['dry_run']:
+            self.stdout.write(self.style.WARNING(f'🔍 Dry run: {summary}, nothing written'))
+        elif report['changed']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Applied {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Reference data is up to date ({report["duration_seconds"]}s)'))
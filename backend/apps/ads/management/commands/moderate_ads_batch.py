@@ -0,0 +1,86 @@
+"""
+Management command to re-moderate ads in bulk with staged concurrency.
+
+Usage:
+    python manage.py moderate_ads_batch                          # pending ads
+    python manage.py moderate_ads_batch --status active pending --concurrency 16 --rate-limit 10
+    python manage.py moderate_ads_batch --ids 12 15 17 --dry-run
+    python manage.py moderate_ads_batch --fake-llm 0.2           # local fake LLM with 200 ms latency
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ads.models import CarAd
+from apps.ads.services.batch_moderation import BatchModerationPipeline, FakeLLMModerator
+
+
+class Command(BaseCommand):
+    help = 'Re-moderate ads: local checks for all, LLM for ambiguous ones, bulk status writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=int, nargs='+', help='Moderate only these ad ids')
+        parser.add_argument(
+            '--status',
+            nargs='+',
+            default=['pending'],
+            help='Moderate ads with these statuses (default: pending)',
+        )
+        parser.add_argument('--limit', type=int, default=None, help='Moderate at most N ads')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BatchModerationPipeline.DEFAULT_BATCH_SIZE,
+            help='Ads per chunk (bounds memory and transaction size)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=BatchModerationPipeline.DEFAULT_CONCURRENCY,
+            help='Concurrent LLM requests',
+        )
+        parser.add_argument(
+            '--rate-limit',
+            type=float,
+            default=BatchModerationPipeline.DEFAULT_RATE_LIMIT,
+            help='LLM requests per second, 0 for no limit',
+        )
+        parser.add_argument(
+            '--fake-llm',
+            type=float,
+            default=None,
+            metavar='LATENCY',
+            help='Use the local fake LLM with this latency in seconds instead of the provider',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Moderate without saving statuses')
+
+    def handle(self, *args, **options):
+        if options['ids']:
+            ads = CarAd.objects.filter(id__in=options['ids'])
+        else:
+            ads = CarAd.objects.filter(status__in=options['status'])
+        if options['limit']:
+            ads = CarAd.objects.filter(id__in=list(ads.order_by('id').values_list('id', flat=True)[:options['limit']]))
+
+        llm = FakeLLMModerator(latency=options['fake_llm']) if options['fake_llm'] is not None else None
+        pipeline = BatchModerationPipeline(
+            llm=llm,
+            concurrency=options['concurrency'],
+            rate_limit=options['rate_limit'] or None,
+            batch_size=options['batch_size'],
+        )
+        stats = pipeline.run(ads, dry_run=options['dry_run'])
+
+        seconds = stats['stage_seconds']
+        self.stdout.write(
+            f"📋 Ads: {stats['ads']} (bypassed {stats['bypassed']}, decided locally {stats['local_decided']}, "
+            f"LLM {stats['llm_calls']}, LLM errors {stats['llm_errors']})"
+        )
+        self.stdout.write(
+            f"⏱️ Stages: local {seconds['local']}s, LLM {seconds['llm']}s "
+            f"(rate limit wait {stats['rate_limit_wait_seconds']}s), write {seconds['write']}s"
+        )
+        for status, count in sorted(stats['statuses'].items()):
+            self.stdout.write(f"  {status}: {count}")
+        prefix = '🔍 Dry run' if options['dry_run'] else f"✅ Updated {stats['updated']} ads"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} in {stats['duration_seconds']}s ({stats['ads_per_second']} ads/s)"
+        ))
@@ -14,6 +14,7 @@ from django.conf import settings
 from django.utils.text import slugify
 
 from apps.ads.models.reference import VehicleTypeModel, CarMarkModel, CarModel, CarColorModel
+from apps.ads.services.reference_snapshot import bump_reference_version
 
 
 class Command(BaseCommand):
@@ -82,6 +83,8 @@ class Command(BaseCommand):
             self._close_connections()
             raise CommandError(f'❌ Error processing data: {e}')
         finally:
+            # Bulk inserts bypass signals: make running processes reload reference snapshots
+            bump_reference_version()
             # Ensure connections are closed
             self._close_connections()
             if self.memory_check:
@@ -0,0 +1,63 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchTrendSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "Час"), ("day", "День")], max_length=10
+                    ),
+                ),
+                ("bucket_start", models.DateTimeField()),
+                ("region", models.CharField(default="all", max_length=100)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("query", "Поисковый запрос"),
+                            ("filters", "Комбинация фильтров"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("term", models.TextField()),
+                ("score", models.FloatField(default=0.0)),
+                ("rank", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "ads_search_trend_snapshots",
+                "ordering": ["-bucket_start", "rank"],
+                "indexes": [
+                    models.Index(
+                        fields=["period", "kind", "region", "bucket_start", "rank"],
+                        name="search_trend_lookup_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("period", "bucket_start", "region", "kind", "term"),
+                        name="search_trend_snapshot_unique",
+                    )
+                ],
+            },
+        ),
+    ]
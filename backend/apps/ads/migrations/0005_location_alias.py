@@ -0,0 +1,76 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0004_behavior_summary_batch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LocationAliasModel",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("region", "Region"), ("city", "City")],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "alias",
+                    models.CharField(help_text="Normalized name variant", max_length=150),
+                ),
+                (
+                    "alias_type",
+                    models.CharField(
+                        choices=[
+                            ("name", "Name"),
+                            ("translit", "Transliteration"),
+                            ("slug", "Slug"),
+                            ("short", "Short name"),
+                        ],
+                        default="name",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "location_id",
+                    models.PositiveIntegerField(
+                        help_text="Region or city row the variant was taken from"
+                    ),
+                ),
+                (
+                    "canonical_id",
+                    models.PositiveIntegerField(help_text="Canonical region or city row"),
+                ),
+                (
+                    "canonical_region_id",
+                    models.PositiveIntegerField(
+                        help_text="Canonical region (for cities - region of the city)"
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Location alias",
+                "verbose_name_plural": "Location aliases",
+                "db_table": "ads_location_alias",
+                "indexes": [
+                    models.Index(
+                        fields=["kind", "alias"], name="location_alias_lookup_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ads", "0005_location_alias"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carmarkmodel",
+            name="is_active",
+            field=models.BooleanField(
+                default=True,
+                help_text="Whether this car mark is offered for selection (cleared when it leaves the reference CSV)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="carmodel",
+            name="is_active",
+            field=models.BooleanField(
+                default=True,
+                help_text="Whether this car model is offered for selection (cleared when it leaves the reference CSV)",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.9 on 2026-10-19 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0006_reference_is_active'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(help_text='Moderation service the result belongs to (prompt, llm_chain)', max_length=50)),
+                ('content_hash', models.CharField(help_text='SHA-256 of the normalized moderated content', max_length=64)),
+                ('ruleset_version', models.CharField(help_text='Version of word lists and prompts the result was produced with', max_length=64)),
+                ('result', models.JSONField(help_text='Serialized moderation result')),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_hit_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Moderation result cache entry',
+                'verbose_name_plural': 'Moderation result cache',
+                'db_table': 'ads_moderation_result_cache',
+                'constraints': [models.UniqueConstraint(fields=('scope', 'content_hash', 'ruleset_version'), name='moderation_cache_key_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.9 on 2026-10-19 00:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_initial'),
+        ('ads', '0007_moderation_result_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='carad',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, help_text='Moderator currently working on this ad', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_ads', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='carad',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, help_text='Claim lease end; the ad returns to the queue after it', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='carad',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'needs_review'])), fields=['needs_manual_review', 'created_at'], name='car_ads_moderation_queue_idx'),
+        ),
+    ]
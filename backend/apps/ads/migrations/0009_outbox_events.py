@@ -0,0 +1,39 @@
+# Generated by Django 5.1.9 on 2026-10-19 00:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ads', '0008_moderation_queue_claims'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(help_text='Kind of domain event (moderation.user_notification, email.send, ...)', max_length=100)),
+                ('exchange', models.CharField(blank=True, help_text='Exchange name; empty for the default exchange', max_length=255)),
+                ('exchange_type', models.CharField(blank=True, help_text='Exchange type to declare, if any', max_length=20)),
+                ('routing_key', models.CharField(max_length=255)),
+                ('payload', models.TextField(help_text='Message body (JSON)')),
+                ('headers', models.JSONField(blank=True, null=True)),
+                ('priority', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('mandatory', models.BooleanField(default=False, help_text='Fail the publish if the message is unroutable')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Not published before this time (retry backoff)')),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name': 'Outbox event',
+                'verbose_name_plural': 'Outbox events',
+                'db_table': 'outbox_events',
+                'indexes': [models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['id'], name='outbox_pending_idx'), models.Index(condition=models.Q(('sent_at__isnull', False)), fields=['sent_at'], name='outbox_sent_idx')],
+            },
+        ),
+    ]
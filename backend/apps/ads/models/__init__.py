@@ -11,6 +11,18 @@ from .ad_view_model import AdViewModel
 from .exchange_rates import ExchangeRate
 from .ad_contact_model import AdContact
 from .favorite_ad_model import FavoriteAd
+from .moderation_cache_model import ModerationResultCache
+from .outbox_model import OutboxEvent
+from .analytics_models import (
+    VisitorSession,
+    PageView,
+    AdInteraction,
+    AdViewDetail,
+    SearchQuery,
+    SearchTrendSnapshot,
+    UserBehaviorSummary,
+    AnalyticsBatchWatermark,
+)
 
 
 # Import reference models
@@ -23,6 +35,7 @@ from .reference import (
     CarGenerationModel,
     CarModificationModel,
     VehicleTypeModel,
+    LocationAliasModel,
 )
 
 # Add aliases for compatibility
@@ -43,6 +56,18 @@ __all__ = [
     'ExchangeRate',
     'AdContact',
     'FavoriteAd',
+    'ModerationResultCache',
+    'OutboxEvent',
+
+    # Analytics models
+    'VisitorSession',
+    'PageView',
+    'AdInteraction',
+    'AdViewDetail',
+    'SearchQuery',
+    'SearchTrendSnapshot',
+    'UserBehaviorSummary',
+    'AnalyticsBatchWatermark',
 
     # Reference models
     'CarColorModel',
@@ -53,6 +78,7 @@ __all__ = [
     'CarGenerationModel',
     'CarModificationModel',
     'VehicleTypeModel',
+    'LocationAliasModel',
     # Aliases for compatibility
     'CarMake',
     'CarModelModel',
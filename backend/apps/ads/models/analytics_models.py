@@ -207,6 +207,44 @@ class SearchQuery(models.Model):
         return f"Search: {self.query_text[:50]}"
 
 
+class SearchTrendSnapshot(models.Model):
+    """Снимок топ-K поисковых запросов и комбинаций фильтров за час/день"""
+    period = models.CharField(max_length=10, choices=[
+        ('hour', 'Час'),
+        ('day', 'День'),
+    ])
+    bucket_start = models.DateTimeField()
+    region = models.CharField(max_length=100, default='all')
+    kind = models.CharField(max_length=10, choices=[
+        ('query', 'Поисковый запрос'),
+        ('filters', 'Комбинация фильтров'),
+    ])
+    term = models.TextField()
+    score = models.FloatField(default=0.0)
+    rank = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'ads_search_trend_snapshots'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['period', 'bucket_start', 'region', 'kind', 'term'],
+                name='search_trend_snapshot_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['period', 'kind', 'region', 'bucket_start', 'rank'],
+                name='search_trend_lookup_idx',
+            ),
+        ]
+        ordering = ['-bucket_start', 'rank']
+
+    def __str__(self):
+        return f"{self.kind} #{self.rank} ({self.period} {self.bucket_start:%Y-%m-%d %H:00}): {self.term[:50]}"
+
+
 class UserBehaviorSummary(models.Model):
     """Сводка поведения пользователя (обновляется периодически)"""
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='behavior_summary')
@@ -235,6 +273,9 @@ class UserBehaviorSummary(models.Model):
     phone_reveals_count = models.PositiveIntegerField(default=0)
     favorites_added_count = models.PositiveIntegerField(default=0)
     
+    # Промежуточные счетчики для инкрементального пересчета (часы, дни, марки, цены)
+    aggregation_state = models.JSONField(default=dict, blank=True)
+
     # Обновление
     last_updated = models.DateTimeField(auto_now=True)
     
@@ -243,3 +284,17 @@ class UserBehaviorSummary(models.Model):
 
     def __str__(self):
         return f"Behavior summary for {self.user}"
+
+
+class AnalyticsBatchWatermark(models.Model):
+    """Водяной знак батч-задачи аналитики: до какого события данные уже обработаны"""
+    name = models.CharField(max_length=100, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    last_timestamp = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'ads_analytics_batch_watermarks'
+
+    def __str__(self):
+        return f"{self.name}: id>{self.last_id}"
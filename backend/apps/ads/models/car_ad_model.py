@@ -130,6 +130,22 @@ class CarAd(BaseModel, DynamicFieldsMixin):
         blank=True,
         help_text=_('When manual review was requested')
     )
+
+    # Moderation queue claim (lease expires automatically)
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='claimed_ads',
+        help_text=_('Moderator currently working on this ad')
+    )
+
+    claimed_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('Claim lease end; the ad returns to the queue after it')
+    )
     
     # Core relationships
     account = models.ForeignKey(
@@ -244,6 +260,12 @@ class CarAd(BaseModel, DynamicFieldsMixin):
             models.Index(fields=['mark', 'status']),        # Для поиска по марке
             models.Index(fields=['price', 'currency']),     # Для сортировки по цене
             models.Index(fields=['region', 'city']),        # Для поиска по локации
+            # Очередь модерации: только объявления, ожидающие проверки
+            models.Index(
+                fields=['needs_manual_review', 'created_at'],
+                name='car_ads_moderation_queue_idx',
+                condition=models.Q(status__in=[AdStatusEnum.PENDING, AdStatusEnum.NEEDS_REVIEW]),
+            ),
         ]
         
     def get_full_address(self) -> str:
@@ -0,0 +1,39 @@
+from django.db import models
+
+
+class ModerationResultCache(models.Model):
+    """
+    Durable copy of moderation results keyed by content hash.
+    Redis holds the hot entries; this table survives cache flushes and restarts.
+    """
+
+    scope = models.CharField(
+        max_length=50,
+        help_text="Moderation service the result belongs to (prompt, llm_chain)"
+    )
+    content_hash = models.CharField(
+        max_length=64,
+        help_text="SHA-256 of the normalized moderated content"
+    )
+    ruleset_version = models.CharField(
+        max_length=64,
+        help_text="Version of word lists and prompts the result was produced with"
+    )
+    result = models.JSONField(help_text="Serialized moderation result")
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_hit_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'ads_moderation_result_cache'
+        verbose_name = 'Moderation result cache entry'
+        verbose_name_plural = 'Moderation result cache'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'content_hash', 'ruleset_version'],
+                name='moderation_cache_key_unique'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.content_hash[:12]} ({self.ruleset_version})"
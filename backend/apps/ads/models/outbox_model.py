@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEvent(models.Model):
+    """
+    Message waiting to be published to RabbitMQ.
+    Written in the same transaction as the domain change; the outbox relay
+    publishes pending rows with broker confirms and marks them sent.
+    """
+
+    event_type = models.CharField(
+        max_length=100,
+        help_text="Kind of domain event (moderation.user_notification, email.send, ...)"
+    )
+    exchange = models.CharField(max_length=255, blank=True, help_text="Exchange name; empty for the default exchange")
+    exchange_type = models.CharField(max_length=20, blank=True, help_text="Exchange type to declare, if any")
+    routing_key = models.CharField(max_length=255)
+    payload = models.TextField(help_text="Message body (JSON)")
+    headers = models.JSONField(null=True, blank=True)
+    priority = models.PositiveSmallIntegerField(null=True, blank=True)
+    mandatory = models.BooleanField(default=False, help_text="Fail the publish if the message is unroutable")
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now, help_text="Not published before this time (retry backoff)")
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'outbox_events'
+        verbose_name = 'Outbox event'
+        verbose_name_plural = 'Outbox events'
+        indexes = [
+            # The relay and the lag metrics only look at unsent rows
+            models.Index(fields=['id'], condition=models.Q(sent_at__isnull=True), name='outbox_pending_idx'),
+            models.Index(fields=['sent_at'], condition=models.Q(sent_at__isnull=False), name='outbox_sent_idx'),
+        ]
+
+    def __str__(self):
+        state = 'sent' if self.sent_at else 'pending'
+        return f"{self.event_type} -> {self.exchange or '(default)'}:{self.routing_key} ({state})"
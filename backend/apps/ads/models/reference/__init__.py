@@ -9,6 +9,7 @@ from .vehicle_type_model import VehicleTypeModel
 from .vehicle_type_model import VehicleTypeModel
 from .region_model import RegionModel
 from .city_model import CityModel
+from .location_alias_model import LocationAliasModel
 
 __all__ = [
     'CarMarkModel',
@@ -19,4 +20,5 @@ __all__ = [
     'VehicleTypeModel',
     'RegionModel',
     'CityModel',
+    'LocationAliasModel',
 ]
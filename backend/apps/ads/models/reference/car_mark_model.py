@@ -34,6 +34,11 @@ class CarMarkModel(BaseModel):
         default=False,
         help_text=_('Whether this is a popular car mark')
     )
+
+    is_active = models.BooleanField(
+        default=True,
+        help_text=_('Whether this car mark is offered for selection (cleared when it leaves the reference CSV)')
+    )
     
     class Meta:
         verbose_name = _('Car Mark')
@@ -23,6 +23,11 @@ class CarModel(BaseModel):
         default=False,
         help_text=_('Whether this is a popular car model')
     )
+
+    is_active = models.BooleanField(
+        default=True,
+        help_text=_('Whether this car model is offered for selection (cleared when it leaves the reference CSV)')
+    )
     
     class Meta:
         verbose_name = _('Car Model')
@@ -0,0 +1,56 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class LocationAliasModel(models.Model):
+    """
+    Materialized name variant of a region or city.
+
+    Every spelling of a location (Ukrainian and Russian names, Latin
+    transliterations, slugs) is stored normalized and points to the canonical
+    region/city row. Duplicate rows of one location (e.g. "Київська область"
+    and "Киевская область") share a canonical id. The table is rebuilt by the
+    ``build_location_aliases`` command.
+    """
+
+    KIND_REGION = 'region'
+    KIND_CITY = 'city'
+    KIND_CHOICES = [
+        (KIND_REGION, _('Region')),
+        (KIND_CITY, _('City')),
+    ]
+
+    ALIAS_TYPE_CHOICES = [
+        ('name', _('Name')),
+        ('translit', _('Transliteration')),
+        ('slug', _('Slug')),
+        ('short', _('Short name')),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    alias = models.CharField(
+        max_length=150,
+        help_text=_('Normalized name variant')
+    )
+    alias_type = models.CharField(max_length=10, choices=ALIAS_TYPE_CHOICES, default='name')
+    location_id = models.PositiveIntegerField(
+        help_text=_('Region or city row the variant was taken from')
+    )
+    canonical_id = models.PositiveIntegerField(
+        help_text=_('Canonical region or city row')
+    )
+    canonical_region_id = models.PositiveIntegerField(
+        help_text=_('Canonical region (for cities - region of the city)')
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'ads_location_alias'
+        verbose_name = _('Location alias')
+        verbose_name_plural = _('Location aliases')
+        indexes = [
+            models.Index(fields=['kind', 'alias'], name='location_alias_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.alias} -> {self.canonical_id}"
@@ -3,6 +3,7 @@ Serializer for managing ad status - accessible only to superusers.
 """
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.utils import timezone
 
 from apps.ads.models.car_ad_model import CarAd
@@ -95,13 +96,13 @@ class AdStatusUpdateSerializer(serializers.Serializer):
         """Send notification to user about status change."""
         from apps.ads.tasks.moderation_notifications import notify_ad_status_changed
         
-        # Send async notification
-        notify_ad_status_changed.delay(
+        # Send async notification once the status change is committed
+        transaction.on_commit(lambda: notify_ad_status_changed.delay(
             ad_id=ad.id,
             user_id=ad.account.user.id,
             new_status=new_status,
             reason=ad.moderation_reason
-        )
+        ))
 
 
 class AdStatusDetailSerializer(serializers.ModelSerializer):
@@ -271,11 +272,11 @@ class BulkStatusUpdateSerializer(serializers.Serializer):
         # Send notifications if requested
         if notify_users:
             from apps.ads.tasks.moderation_notifications import notify_bulk_status_changed
-            notify_bulk_status_changed.delay(
+            transaction.on_commit(lambda: notify_bulk_status_changed.delay(
                 ad_ids=ad_ids,
                 new_status=new_status,
                 reason=reason
-            )
+            ))
         
         return {
             'updated_count': updated_count,
@@ -9,6 +9,7 @@ from rest_framework import serializers
 
 from apps.ads.models import AddImageModel
 from apps.ads.models.car_ad_model import CarAd
+from apps.ads.services.reference_snapshot import get_reference_snapshot
 from apps.currency.services import CurrencyService
 from core.serializers.base import BaseModelSerializer
 
@@ -126,18 +127,14 @@ class CarAdSerializer(BaseModelSerializer):
     meta_views_count = serializers.SerializerMethodField()
     meta_phone_views_count = serializers.SerializerMethodField()
 
-    # Display names for foreign keys
-    mark_name = serializers.CharField(source="mark.name", read_only=True)
-    region_name = serializers.CharField(source="region.name", read_only=True)
-    city_name = serializers.CharField(source="city.name", read_only=True)
+    # Display names for foreign keys (resolved from the reference snapshot)
+    mark_name = serializers.SerializerMethodField()
+    region_name = serializers.SerializerMethodField()
+    city_name = serializers.SerializerMethodField()
 
     # Vehicle type from mark - both ID and name
-    vehicle_type = serializers.IntegerField(
-        source="mark.vehicle_type.id", read_only=True
-    )
-    vehicle_type_name = serializers.CharField(
-        source="mark.vehicle_type.name", read_only=True
-    )
+    vehicle_type = serializers.SerializerMethodField()
+    vehicle_type_name = serializers.SerializerMethodField()
 
     # Vehicle specifications
     body_type = serializers.CharField(source="specs.body_type", read_only=True)
@@ -466,6 +463,32 @@ class CarAdSerializer(BaseModelSerializer):
 
         return data
 
+    def _mark(self, obj):
+        return get_reference_snapshot().mark(obj.mark_id) or obj.mark
+
+    def get_mark_name(self, obj):
+        mark = self._mark(obj)
+        return mark.name if mark else None
+
+    def get_region_name(self, obj):
+        region = get_reference_snapshot().region(obj.region_id) or obj.region
+        return region.name if region else None
+
+    def get_city_name(self, obj):
+        city = get_reference_snapshot().city(obj.city_id) or obj.city
+        return city.name if city else None
+
+    def get_vehicle_type(self, obj):
+        mark = self._mark(obj)
+        return mark.vehicle_type_id if mark else None
+
+    def get_vehicle_type_name(self, obj):
+        mark = self._mark(obj)
+        if not mark or not mark.vehicle_type_id:
+            return None
+        vehicle_type = get_reference_snapshot().vehicle_types_by_id.get(mark.vehicle_type_id) or mark.vehicle_type
+        return vehicle_type.name
+
     def get_view_count(self, obj):
         """Подсчет уникальных просмотров по авторизованным пользователям: 1 user = 1. Анонимные просмотры не учитываются."""
         try:
@@ -0,0 +1,58 @@
+"""
+Per-ad version keys for conditional GET on car ad details.
+
+Every save/delete of a CarAd, or of a model pointing to it (images, contacts,
+metadata, specs, favorites, interactions, views, price history), bumps the
+ad's version so that ETags change exactly when the serialized ad may change.
+"""
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.decorators.conditional_get import bump_version
+
+CAR_AD_VERSION_KEY = 'car_ad_version:{pk}'
+
+
+def car_ad_version_key(pk) -> str:
+    return CAR_AD_VERSION_KEY.format(pk=pk)
+
+
+def bump_car_ad_version(pk):
+    """Invalidate ETags of one ad after the current transaction commits"""
+    transaction.on_commit(lambda: bump_version(car_ad_version_key(pk)))
+
+
+def _related_fields(model):
+    """FK/one-to-one fields of ``model`` that point to CarAd"""
+    car_ad = apps.get_model('ads', 'CarAd')
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, models.ForeignKey) and field.related_model is car_ad
+    ]
+
+
+def connect_car_ad_version_signals():
+    """Connect version bumps for CarAd and every ads model referencing it"""
+    car_ad = apps.get_model('ads', 'CarAd')
+
+    def on_car_ad_change(sender, instance, **kwargs):
+        bump_car_ad_version(instance.pk)
+
+    post_save.connect(on_car_ad_change, sender=car_ad, weak=False, dispatch_uid='car_ad_version_save')
+    post_delete.connect(on_car_ad_change, sender=car_ad, weak=False, dispatch_uid='car_ad_version_delete')
+
+    for model in apps.get_app_config('ads').get_models():
+        fields = _related_fields(model)
+        if not fields:
+            continue
+
+        def on_related_change(sender, instance, _fields=fields, **kwargs):
+            for field in _fields:
+                pk = getattr(instance, field.attname)
+                if pk is not None:
+                    bump_car_ad_version(pk)
+
+        uid = f'car_ad_version_{model._meta.label_lower}'
+        post_save.connect(on_related_change, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(on_related_change, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
@@ -1,13 +1,6 @@
 """
 Расширенная аналитика с pandas, matplotlib и plotly
 """
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.utils import PlotlyJSONEncoder
-import numpy as np
 import json
 import base64
 from io import BytesIO
@@ -19,14 +12,26 @@ from django.core.cache import cache
 from apps.ads.models import CarAd, AdView
 from apps.accounts.models import AddsAccount
 from django.contrib.auth import get_user_model
+from core.utils.lazy_import import lazy_module
 
 User = get_user_model()
 
-# Настройка matplotlib для работы без GUI
-plt.switch_backend('Agg')
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 10
+
+def _setup_pyplot(pyplot):
+    """Настройка matplotlib для работы без GUI"""
+    pyplot.switch_backend('Agg')
+    pyplot.rcParams['figure.figsize'] = (12, 8)
+    pyplot.rcParams['font.size'] = 10
+
+
+# Тяжелые библиотеки загружаются при первом построении графика
+pd = lazy_module('pandas')
+np = lazy_module('numpy')
+plt = lazy_module('matplotlib.pyplot', on_load=_setup_pyplot)
+sns = lazy_module('seaborn', on_load=lambda seaborn: seaborn.set_style("whitegrid"))
+px = lazy_module('plotly.express')
+go = lazy_module('plotly.graph_objects')
+plotly_utils = lazy_module('plotly.utils')
 
 
 class AdvancedAnalyticsService:
@@ -126,7 +131,7 @@ class AdvancedAnalyticsService:
             showlegend=False
         )
         
-        return json.dumps(fig, cls=PlotlyJSONEncoder)
+        return json.dumps(fig, cls=plotly_utils.PlotlyJSONEncoder)
     
     def generate_top_brands_chart(self):
         """Генерация графика ТОП марок"""
@@ -151,7 +156,7 @@ class AdvancedAnalyticsService:
             yaxis_title='Марка автомобиля'
         )
         
-        return json.dumps(fig, cls=PlotlyJSONEncoder)
+        return json.dumps(fig, cls=plotly_utils.PlotlyJSONEncoder)
     
     def generate_regional_stats_chart(self):
         """Генерация графика по регионам"""
@@ -169,7 +174,7 @@ class AdvancedAnalyticsService:
             title=self.t('regional_stats')
         )
         
-        return json.dumps(fig, cls=PlotlyJSONEncoder)
+        return json.dumps(fig, cls=plotly_utils.PlotlyJSONEncoder)
     
     def generate_monthly_trends_chart(self):
         """Генерация графика месячных трендов"""
@@ -215,7 +220,7 @@ class AdvancedAnalyticsService:
             legend=dict(x=0.01, y=0.99)
         )
         
-        return json.dumps(fig, cls=PlotlyJSONEncoder)
+        return json.dumps(fig, cls=plotly_utils.PlotlyJSONEncoder)
     
     def generate_seller_types_chart(self):
         """Генерация графика типов продавцов"""
@@ -232,7 +237,7 @@ class AdvancedAnalyticsService:
             title=self.t('seller_types')
         )
         
-        return json.dumps(fig, cls=PlotlyJSONEncoder)
+        return json.dumps(fig, cls=plotly_utils.PlotlyJSONEncoder)
     
     def calculate_advanced_metrics(self):
         """Расчет расширенных метрик"""
@@ -1,12 +1,8 @@
 """
 Сервис аналитики с pandas, графиками и LLM отчетами
 """
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Используем non-GUI backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+from __future__ import annotations
+
 import base64
 import io
 from datetime import datetime, timedelta
@@ -17,13 +13,25 @@ from typing import Dict, List, Any, Optional
 from apps.ads.models import CarAd, AdView, ExchangeRate
 from apps.ads.models.reference import RegionModel, CarMarkModel
 from apps.accounts.models import AddsAccount
+from apps.currency.history import rate_history
+from apps.currency.services import CurrencyService
 from django.contrib.auth import get_user_model
+from core.utils.lazy_import import lazy_module
 
 User = get_user_model()
 
-# Настройка стиля графиков
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+
+def _setup_pyplot(pyplot):
+    """Non-GUI backend и стиль графиков"""
+    pyplot.switch_backend('Agg')
+    pyplot.style.use('seaborn-v0_8')
+
+
+# pandas/matplotlib/seaborn загружаются при первом построении отчета
+pd = lazy_module('pandas')
+np = lazy_module('numpy')
+plt = lazy_module('matplotlib.pyplot', on_load=_setup_pyplot)
+sns = lazy_module('seaborn', on_load=lambda seaborn: seaborn.set_palette("husl"))
 
 class AnalyticsDashboardService:
     """Сервис для создания аналитического dashboard"""
@@ -157,12 +165,10 @@ class AnalyticsDashboardService:
         """Создаем график распределения цен"""
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
         
-        # Конвертируем цены в UAH
-        usd_rate = 41.0  # Можно получить из ExchangeRate
-        ads_df['price_uah'] = ads_df.apply(
-            lambda row: row['price'] * usd_rate if row['currency'] == 'USD' else row['price'],
-            axis=1
-        )
+        # Конвертируем цены в UAH по курсу на дату создания объявления
+        ads_df['price_uah'] = rate_history.convert_frame(ads_df, 'UAH')
+        current_rates = {code: float(rate) for code, rate in CurrencyService.get_rate_snapshot()['rates'].items()}
+        ads_df['price_uah'] = ads_df['price_uah'].fillna(ads_df['price'] * ads_df['currency'].map(current_rates))
         
         # Фильтруем разумные цены (от 1000 до 2000000 UAH)
         price_data = ads_df[(ads_df['price_uah'] > 1000) & (ads_df['price_uah'] < 2000000)]['price_uah']
@@ -0,0 +1,282 @@
+"""
+Staged batch moderation for mass re-moderation and dealer imports.
+
+Ads are processed in id chunks, each chunk in three stages:
+
+1. Local checks: the dictionary matcher and the topic analysis of the prompt
+   moderation service run over every ad in the chunk. Profanity, prohibited
+   goods and ads with explicit transport indicators are decided here.
+2. LLM: only the ambiguous ads go to ``ContentModerator.check_content``
+   through a bounded thread pool, with a shared token-bucket rate limit.
+3. Write: changed ads are saved with one ``bulk_update`` per chunk in a
+   transaction.
+
+``FakeLLMModerator`` is a deterministic stand-in for the LLM with a
+configurable latency, for tests and for measuring pipeline throughput
+without calling the provider.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.enums.ads import AdStatusEnum
+from core.services.llm_moderation import LLMPromptModerationService, llm_moderation_service
+
+from ..models import CarAd
+from .moderation import ContentModerator, ModerationResult
+
+logger = logging.getLogger(__name__)
+
+# Transport ads without explicit indicators (topic confidence 0.9 and lower) go to the LLM
+LOCAL_APPROVE_CONFIDENCE = 0.95
+
+UPDATE_FIELDS = ['status', 'moderation_reason', 'moderated_at', 'needs_manual_review', 'manual_review_requested_at']
+
+LLMModerator = Callable[[str, Optional[str]], Tuple[ModerationResult, Dict]]
+
+
+@dataclass
+class BatchDecision:
+    status: str
+    reason: str
+    stage: str
+    needs_manual_review: bool = False
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the LLM workers.
+
+    Each call reserves the next free slot and sleeps until it, so concurrent
+    workers never exceed ``rate`` calls per second after the initial burst.
+    """
+
+    def __init__(self, rate: Optional[float], burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate or 1))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited += wait
+        if wait:
+            time.sleep(wait)
+
+
+class FakeLLMModerator:
+    """
+    Local stand-in for ``ContentModerator.check_content``.
+
+    Sleeps ``latency`` seconds per call to emulate the provider round trip and
+    decides by keywords: prohibited goods are rejected, non-transport items
+    are sent to review, everything else is approved.
+    """
+
+    REJECT_WORDS = ('наркотики', 'drugs', 'оружие', 'weapon', 'зброя')
+    REVIEW_WORDS = ('телефон', 'phone', 'квартира', 'apartment', 'одяг', 'одежда')
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, title: Optional[str] = None) -> Tuple[ModerationResult, Dict]:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        content = f"{title or ''} {text}".lower()
+        if any(word in content for word in self.REJECT_WORDS):
+            return ModerationResult.REJECTED, {'reason': 'Prohibited goods', 'fake_llm': True}
+        if any(word in content for word in self.REVIEW_WORDS):
+            return ModerationResult.NEEDS_REVIEW, {'reason': 'Not clearly a vehicle ad', 'fake_llm': True}
+        return ModerationResult.APPROVED, {'reason': 'Vehicle ad', 'fake_llm': True}
+
+
+class BatchModerationPipeline:
+    """
+    Moderate many ads with staged concurrency.
+
+    Usage:
+        BatchModerationPipeline(concurrency=8, rate_limit=5).run(CarAd.objects.filter(status='pending'))
+        BatchModerationPipeline(llm=FakeLLMModerator(latency=0.2)).run(ads, dry_run=True)
+    """
+
+    DEFAULT_BATCH_SIZE = 500
+    DEFAULT_CONCURRENCY = 8
+    DEFAULT_RATE_LIMIT = 5.0
+
+    def __init__(
+        self,
+        llm: Optional[LLMModerator] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        local_service: Optional[LLMPromptModerationService] = None,
+    ):
+        self.llm = llm or ContentModerator.check_content
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rate_limit, burst=self.concurrency)
+        self.batch_size = batch_size
+        self.local_service = local_service or llm_moderation_service
+        self._bypass: Dict[int, bool] = {}
+        # New status -> ids of ads whose status changed, for owner notifications
+        self.changed: Dict[str, List[int]] = {}
+
+    def run(self, queryset: Iterable[CarAd], dry_run: bool = False) -> Dict:
+        """Moderate all ads of the queryset; returns per-stage counts and throughput."""
+        stats = {
+            'ads': 0,
+            'bypassed': 0,
+            'local_decided': 0,
+            'llm_calls': 0,
+            'llm_errors': 0,
+            'updated': 0,
+            'statuses': {},
+            'stage_seconds': {'local': 0.0, 'llm': 0.0, 'write': 0.0},
+        }
+        started = time.monotonic()
+
+        ids = list(queryset.order_by('id').values_list('id', flat=True))
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='batch-moderation') as executor:
+            for offset in range(0, len(ids), self.batch_size):
+                ads = list(
+                    CarAd.objects.filter(id__in=ids[offset:offset + self.batch_size])
+                    .select_related('account__user')
+                    .order_by('id')
+                )
+                self._moderate_chunk(ads, executor, stats, dry_run)
+
+        duration = time.monotonic() - started
+        stats['stage_seconds'] = {stage: round(value, 3) for stage, value in stats['stage_seconds'].items()}
+        stats['duration_seconds'] = round(duration, 3)
+        stats['ads_per_second'] = round(stats['ads'] / duration, 1) if duration else 0.0
+        stats['rate_limit_wait_seconds'] = round(self.limiter.waited, 3)
+        logger.info(f"🧮 Batch moderation finished: {stats}")
+        return stats
+
+    def _moderate_chunk(self, ads: List[CarAd], executor: ThreadPoolExecutor, stats: Dict, dry_run: bool) -> None:
+        stats['ads'] += len(ads)
+
+        started = time.monotonic()
+        decisions, ambiguous = self.local_stage(ads)
+        stats['bypassed'] += sum(decision.stage == 'bypass' for decision in decisions.values())
+        stats['local_decided'] += sum(decision.stage == 'local' for decision in decisions.values())
+        stats['stage_seconds']['local'] += time.monotonic() - started
+
+        started = time.monotonic()
+        llm_decisions = self.llm_stage(ambiguous, executor)
+        stats['llm_calls'] += len(llm_decisions)
+        stats['llm_errors'] += sum(decision.stage == 'llm_error' for decision in llm_decisions.values())
+        decisions.update(llm_decisions)
+        stats['stage_seconds']['llm'] += time.monotonic() - started
+
+        for decision in decisions.values():
+            status = str(decision.status)
+            stats['statuses'][status] = stats['statuses'].get(status, 0) + 1
+
+        started = time.monotonic()
+        if not dry_run:
+            stats['updated'] += self.write_stage(ads, decisions)
+        stats['stage_seconds']['write'] += time.monotonic() - started
+
+    def local_stage(self, ads: Sequence[CarAd]) -> Tuple[Dict[int, BatchDecision], List[CarAd]]:
+        """Decide what the local checks can decide; return the rest for the LLM."""
+        decisions = {}
+        ambiguous = []
+        for ad in ads:
+            if self._can_bypass(ad):
+                decisions[ad.id] = BatchDecision(AdStatusEnum.ACTIVE, 'manager_admin_approval', 'bypass')
+                continue
+
+            profanity = self.local_service.simulate_llm_profanity_analysis(f"{ad.title} {ad.description}")
+            topic = self.local_service.simulate_llm_topic_analysis(ad.title, ad.description)
+            if profanity['has_profanity']:
+                # The LLM would not change the outcome
+                reason = f"Обнаружена нецензурная лексика: {', '.join(profanity['found_words'])}"
+                decisions[ad.id] = BatchDecision(AdStatusEnum.NEEDS_REVIEW, reason, 'local', needs_manual_review=True)
+            elif topic['category'] == 'prohibited':
+                decisions[ad.id] = BatchDecision(
+                    AdStatusEnum.NEEDS_REVIEW, topic['reason'], 'local', needs_manual_review=True
+                )
+            elif topic['is_transport_related'] and topic['confidence'] >= LOCAL_APPROVE_CONFIDENCE:
+                decisions[ad.id] = BatchDecision(AdStatusEnum.ACTIVE, topic['reason'], 'local')
+            else:
+                ambiguous.append(ad)
+        return decisions, ambiguous
+
+    def llm_stage(self, ads: Sequence[CarAd], executor: ThreadPoolExecutor) -> Dict[int, BatchDecision]:
+        """Send ambiguous ads to the LLM through the worker pool."""
+        # Workers get plain values only, model instances stay in this thread
+        jobs = [(ad.id, ad.title, ad.description) for ad in ads]
+        return dict(executor.map(self._check_with_llm, jobs))
+
+    def _check_with_llm(self, job: Tuple[int, str, str]) -> Tuple[int, BatchDecision]:
+        ad_id, title, description = job
+        self.limiter.acquire()
+        try:
+            result, details = self.llm(description, title)
+        except Exception as e:
+            logger.warning(f"⚠️ LLM moderation failed for ad {ad_id}: {e}")
+            return ad_id, BatchDecision(AdStatusEnum.NEEDS_REVIEW, 'LLM moderation failed', 'llm_error', True)
+        finally:
+            # The LLM cache may open a DB connection in this worker thread
+            connection.close()
+
+        reason = details.get('reason', '')
+        if details.get('fallback'):
+            # The LLM did not actually look at the ad (unavailable or disabled): a manager decides
+            return ad_id, BatchDecision(AdStatusEnum.NEEDS_REVIEW, reason, 'llm_fallback', needs_manual_review=True)
+        if result == ModerationResult.APPROVED:
+            return ad_id, BatchDecision(AdStatusEnum.ACTIVE, reason, 'llm')
+        return ad_id, BatchDecision(
+            AdStatusEnum.NEEDS_REVIEW, reason, 'llm', needs_manual_review=result == ModerationResult.NEEDS_REVIEW
+        )
+
+    def write_stage(self, ads: Sequence[CarAd], decisions: Dict[int, BatchDecision]) -> int:
+        """Save changed ads with one bulk_update."""
+        now = timezone.now()
+        changed = []
+        for ad in ads:
+            decision = decisions[ad.id]
+            if (ad.status, ad.moderation_reason, ad.needs_manual_review) == (
+                decision.status, decision.reason, decision.needs_manual_review
+            ):
+                continue
+            if ad.status != decision.status:
+                self.changed.setdefault(decision.status, []).append(ad.id)
+            ad.status = decision.status
+            ad.moderation_reason = decision.reason
+            ad.moderated_at = now
+            if decision.needs_manual_review and not ad.needs_manual_review:
+                ad.manual_review_requested_at = now
+            ad.needs_manual_review = decision.needs_manual_review
+            changed.append(ad)
+
+        with transaction.atomic():
+            CarAd.objects.bulk_update(changed, UPDATE_FIELDS)
+        return len(changed)
+
+    def _can_bypass(self, ad: CarAd) -> bool:
+        user = ad.account.user
+        if user.id not in self._bypass:
+            # Same rule as UserRoleManager.can_bypass_moderation
+            self._bypass[user.id] = user.is_superuser or user.has_perm('ads.can_bypass_moderation')
+        return self._bypass[user.id]
@@ -0,0 +1,373 @@
+"""
+Incremental batch computation of ``UserBehaviorSummary``.
+
+Each event stream (new sessions, ended sessions, page views, ad interactions)
+keeps its own watermark in ``AnalyticsBatchWatermark``. A run walks every
+stream forward in fixed-size id chunks, aggregates each chunk per user with
+GROUP BY queries, merges the deltas into the stored summaries and bulk-upserts
+them together with the new watermark in one transaction. Memory is bounded by
+the number of distinct users in a chunk and an interrupted run resumes from
+the last committed chunk.
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import ExtractHour, ExtractWeekDay
+from django.utils import timezone
+
+from ..models.analytics_models import (
+    AdInteraction,
+    AnalyticsBatchWatermark,
+    PageView,
+    UserBehaviorSummary,
+    VisitorSession,
+)
+
+logger = logging.getLogger(__name__)
+
+TOP_PREFERENCES = 5
+
+SUMMARY_COUNTERS = (
+    'total_sessions',
+    'total_page_views',
+    'total_ad_views',
+    'total_interactions',
+    'phone_reveals_count',
+    'favorites_added_count',
+)
+
+SUMMARY_UPDATE_FIELDS = list(SUMMARY_COUNTERS) + [
+    'avg_session_duration',
+    'avg_pages_per_session',
+    'favorite_brands',
+    'favorite_price_range',
+    'favorite_regions',
+    'most_active_hours',
+    'most_active_days',
+    'device_preferences',
+    'aggregation_state',
+    'last_updated',
+]
+
+
+def _empty_delta() -> Dict[str, Any]:
+    return {
+        'counters': Counter(),
+        'hours': Counter(),
+        'days': Counter(),
+        'devices': Counter(),
+        'brands': Counter(),
+        'regions': Counter(),
+        'prices': {},
+        'ended_sessions': 0,
+        'duration_seconds': 0.0,
+    }
+
+
+class UserBehaviorSummaryEngine:
+    """
+    Watermark-driven batch job for user behaviour summaries.
+
+    Usage:
+        UserBehaviorSummaryEngine(chunk_size=50000).run()
+        UserBehaviorSummaryEngine.get_summary(user_id)
+    """
+
+    DEFAULT_CHUNK_SIZE = 50000
+    # Rows younger than this may belong to transactions that have not committed
+    # yet; skipping them keeps the id watermark from jumping over late commits
+    SETTLE_LAG = timedelta(seconds=30)
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    # ------------------------------------------------------------------ run
+
+    def run(self, max_chunks: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Process all events newer than the stored watermarks.
+
+        Args:
+            max_chunks: Stop each stream after this many chunks (None = drain)
+
+        Returns:
+            Per-stream statistics: chunks, events and users processed
+        """
+        started = timezone.now()
+        stats = {}
+        for stream, handler in self._streams():
+            stats[stream] = self._drain(stream, handler, max_chunks)
+        stats['duration_seconds'] = round((timezone.now() - started).total_seconds(), 3)
+        logger.info(f"User behavior summaries updated: {stats}")
+        return stats
+
+    @classmethod
+    def reset(cls) -> None:
+        """Drop all watermarks and summaries so the next run rebuilds from scratch."""
+        with transaction.atomic():
+            AnalyticsBatchWatermark.objects.filter(name__startswith='behavior_summary:').delete()
+            UserBehaviorSummary.objects.all().delete()
+
+    def _streams(self) -> List[Tuple[str, Callable]]:
+        return [
+            ('sessions', self._sessions_chunk),
+            ('ended_sessions', self._ended_sessions_chunk),
+            ('page_views', self._page_views_chunk),
+            ('interactions', self._interactions_chunk),
+        ]
+
+    def _drain(self, stream: str, handler: Callable, max_chunks: Optional[int]) -> Dict[str, int]:
+        stats = {'chunks': 0, 'events': 0, 'users': 0}
+        while max_chunks is None or stats['chunks'] < max_chunks:
+            with transaction.atomic():
+                watermark, _ = AnalyticsBatchWatermark.objects.select_for_update().get_or_create(
+                    name=f'behavior_summary:{stream}'
+                )
+                events, deltas = handler(watermark)
+                if not events:
+                    break
+                self._apply(deltas)
+                watermark.save()
+            stats['chunks'] += 1
+            stats['events'] += events
+            stats['users'] += len(deltas)
+        return stats
+
+    # ------------------------------------------------------- id-keyed chunks
+
+    def _id_window(self, queryset, time_field: str, watermark: AnalyticsBatchWatermark) -> Tuple[int, Optional[int]]:
+        """Number of rows and upper id bound of the next chunk after ``watermark.last_id``."""
+        horizon = timezone.now() - self.SETTLE_LAG
+        ids = list(
+            queryset.filter(id__gt=watermark.last_id, **{f'{time_field}__lte': horizon})
+            .order_by('id')
+            .values_list('id', flat=True)[:self.chunk_size]
+        )
+        return len(ids), (ids[-1] if ids else None)
+
+    def _sessions_chunk(self, watermark):
+        events, upper = self._id_window(VisitorSession.objects.all(), 'started_at', watermark)
+        if not events:
+            return 0, {}
+        chunk = VisitorSession.objects.filter(
+            id__gt=watermark.last_id, id__lte=upper, user__isnull=False
+        )
+        deltas = defaultdict(_empty_delta)
+        for row in chunk.values('user_id', 'device_type').annotate(c=Count('id')):
+            delta = deltas[row['user_id']]
+            delta['counters']['total_sessions'] += row['c']
+            if row['device_type']:
+                delta['devices'][row['device_type']] += row['c']
+        watermark.last_id = upper
+        return events, deltas
+
+    def _page_views_chunk(self, watermark):
+        events, upper = self._id_window(PageView.objects.all(), 'viewed_at', watermark)
+        if not events:
+            return 0, {}
+        chunk = PageView.objects.filter(id__gt=watermark.last_id, id__lte=upper, user__isnull=False)
+        deltas = defaultdict(_empty_delta)
+        for row in chunk.values('user_id').annotate(c=Count('id')):
+            deltas[row['user_id']]['counters']['total_page_views'] += row['c']
+        self._collect_activity(deltas, chunk, 'viewed_at')
+        watermark.last_id = upper
+        return events, deltas
+
+    def _interactions_chunk(self, watermark):
+        events, upper = self._id_window(AdInteraction.objects.all(), 'created_at', watermark)
+        if not events:
+            return 0, {}
+        chunk = AdInteraction.objects.filter(
+            id__gt=watermark.last_id, id__lte=upper, user__isnull=False, owner_action=False
+        )
+        deltas = defaultdict(_empty_delta)
+
+        totals = chunk.values('user_id').annotate(
+            total=Count('id'),
+            views=Count('id', filter=Q(interaction_type='view')),
+            reveals=Count('id', filter=Q(interaction_type='phone_reveal')),
+            favorites=Count('id', filter=Q(interaction_type='favorite_add')),
+        )
+        for row in totals:
+            counters = deltas[row['user_id']]['counters']
+            counters['total_interactions'] += row['total']
+            counters['total_ad_views'] += row['views']
+            counters['phone_reveals_count'] += row['reveals']
+            counters['favorites_added_count'] += row['favorites']
+
+        views = chunk.filter(interaction_type='view')
+        for row in views.values('user_id', 'ad__mark__name').annotate(c=Count('id')):
+            if row['ad__mark__name']:
+                deltas[row['user_id']]['brands'][row['ad__mark__name']] += row['c']
+        for row in views.values('user_id', 'ad__region__name').annotate(c=Count('id')):
+            if row['ad__region__name']:
+                deltas[row['user_id']]['regions'][row['ad__region__name']] += row['c']
+        prices = views.filter(ad__price__isnull=False).values('user_id', 'ad__currency').annotate(
+            total=Sum('ad__price'), c=Count('id'), low=Min('ad__price'), high=Max('ad__price'),
+        )
+        for row in prices:
+            deltas[row['user_id']]['prices'][row['ad__currency'] or 'USD'] = {
+                'sum': float(row['total']),
+                'count': row['c'],
+                'min': float(row['low']),
+                'max': float(row['high']),
+            }
+
+        self._collect_activity(deltas, chunk, 'created_at')
+        watermark.last_id = upper
+        return events, deltas
+
+    @staticmethod
+    def _collect_activity(deltas, chunk, field: str) -> None:
+        """Hour-of-day and day-of-week histograms of a chunk, per user."""
+        for row in chunk.values('user_id', hour=ExtractHour(field)).annotate(c=Count('id')):
+            deltas[row['user_id']]['hours'][str(row['hour'])] += row['c']
+        for row in chunk.values('user_id', day=ExtractWeekDay(field)).annotate(c=Count('id')):
+            deltas[row['user_id']]['days'][str(row['day'])] += row['c']
+
+    # ----------------------------------------------------- ended sessions
+
+    def _ended_sessions_chunk(self, watermark):
+        """
+        Sessions are keyed by (ended_at, id) because ``ended_at`` is filled in
+        long after the row is created.
+        """
+        horizon = timezone.now() - self.SETTLE_LAG
+        queryset = VisitorSession.objects.filter(ended_at__isnull=False, ended_at__lte=horizon)
+        if watermark.last_timestamp:
+            queryset = queryset.filter(
+                Q(ended_at__gt=watermark.last_timestamp)
+                | Q(ended_at=watermark.last_timestamp, id__gt=watermark.last_id)
+            )
+        window = list(
+            queryset.order_by('ended_at', 'id').values_list('id', 'ended_at')[:self.chunk_size]
+        )
+        if not window:
+            return 0, {}
+
+        deltas = defaultdict(_empty_delta)
+        chunk = VisitorSession.objects.filter(
+            id__in=[session_id for session_id, _ in window], user__isnull=False
+        )
+        for row in chunk.values('user_id').annotate(c=Count('id'), duration=Sum('total_duration')):
+            delta = deltas[row['user_id']]
+            delta['ended_sessions'] += row['c']
+            delta['duration_seconds'] += row['duration'].total_seconds() if row['duration'] else 0.0
+
+        watermark.last_id, watermark.last_timestamp = window[-1]
+        return len(window), deltas
+
+    # --------------------------------------------------------------- merge
+
+    def _apply(self, deltas: Dict[int, Dict[str, Any]]) -> None:
+        """Merge per-user deltas into stored summaries and bulk-upsert them."""
+        if not deltas:
+            return
+        existing = UserBehaviorSummary.objects.select_for_update().in_bulk(
+            list(deltas), field_name='user_id'
+        )
+        to_create, to_update = [], []
+        for user_id, delta in deltas.items():
+            summary = existing.get(user_id)
+            if summary is None:
+                summary = UserBehaviorSummary(user_id=user_id)
+                to_create.append(summary)
+            else:
+                to_update.append(summary)
+            self._merge(summary, delta)
+
+        if to_create:
+            UserBehaviorSummary.objects.bulk_create(to_create, batch_size=1000)
+        if to_update:
+            UserBehaviorSummary.objects.bulk_update(to_update, SUMMARY_UPDATE_FIELDS, batch_size=1000)
+
+    @staticmethod
+    def _merge(summary: UserBehaviorSummary, delta: Dict[str, Any]) -> None:
+        for field, value in delta['counters'].items():
+            setattr(summary, field, (getattr(summary, field) or 0) + value)
+
+        state = summary.aggregation_state or {}
+        for key in ('hours', 'days', 'brands', 'regions'):
+            merged = Counter(state.get(key, {}))
+            merged.update(delta[key])
+            state[key] = dict(merged)
+
+        prices = state.get('prices', {})
+        for currency, stats in delta['prices'].items():
+            current = prices.get(currency)
+            if current is None:
+                prices[currency] = stats
+                continue
+            prices[currency] = {
+                'sum': current['sum'] + stats['sum'],
+                'count': current['count'] + stats['count'],
+                'min': min(current['min'], stats['min']),
+                'max': max(current['max'], stats['max']),
+            }
+        state['prices'] = prices
+        state['ended_sessions'] = state.get('ended_sessions', 0) + delta['ended_sessions']
+        state['duration_seconds'] = state.get('duration_seconds', 0.0) + delta['duration_seconds']
+        summary.aggregation_state = state
+
+        devices = Counter(summary.device_preferences or {})
+        devices.update(delta['devices'])
+        summary.device_preferences = dict(devices)
+
+        summary.favorite_brands = [name for name, _ in Counter(state['brands']).most_common(TOP_PREFERENCES)]
+        summary.favorite_regions = [name for name, _ in Counter(state['regions']).most_common(TOP_PREFERENCES)]
+        summary.most_active_hours = [int(h) for h, _ in Counter(state['hours']).most_common(3)]
+        summary.most_active_days = [int(d) for d, _ in Counter(state['days']).most_common(3)]
+
+        if prices:
+            currency, stats = max(prices.items(), key=lambda item: item[1]['count'])
+            summary.favorite_price_range = {
+                'currency': currency,
+                'min': stats['min'],
+                'max': stats['max'],
+                'avg': round(stats['sum'] / stats['count'], 2),
+            }
+        if state['ended_sessions']:
+            summary.avg_session_duration = timedelta(
+                seconds=state['duration_seconds'] / state['ended_sessions']
+            )
+        if summary.total_sessions:
+            summary.avg_pages_per_session = round(summary.total_page_views / summary.total_sessions, 2)
+        summary.last_updated = timezone.now()
+
+    # ---------------------------------------------------------------- read
+
+    @staticmethod
+    def get_summary(user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Read API: precomputed behaviour summary of one user (single indexed lookup).
+
+        Returns:
+            Summary dict or None when the user has no processed events yet
+        """
+        summary = UserBehaviorSummary.objects.filter(user_id=user_id).first()
+        if summary is None:
+            return None
+        return {
+            'user_id': user_id,
+            'total_sessions': summary.total_sessions,
+            'total_page_views': summary.total_page_views,
+            'total_ad_views': summary.total_ad_views,
+            'total_interactions': summary.total_interactions,
+            'phone_reveals_count': summary.phone_reveals_count,
+            'favorites_added_count': summary.favorites_added_count,
+            'avg_session_duration_seconds': (
+                summary.avg_session_duration.total_seconds() if summary.avg_session_duration else None
+            ),
+            'avg_pages_per_session': summary.avg_pages_per_session,
+            'favorite_brands': summary.favorite_brands,
+            'favorite_regions': summary.favorite_regions,
+            'favorite_price_range': summary.favorite_price_range,
+            'most_active_hours': summary.most_active_hours,
+            'most_active_days': summary.most_active_days,
+            'device_preferences': summary.device_preferences,
+            'last_updated': summary.last_updated.isoformat() if summary.last_updated else None,
+        }
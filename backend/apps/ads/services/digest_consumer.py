@@ -0,0 +1,134 @@
+"""
+Consumer of status-change digests.
+
+``NotificationBatcher`` publishes one ``ModerationDigestBatch`` per audience
+and window (``user.digest.*`` on ``user_notifications``, ``manager.digest.*``
+on ``manager_notifications``). This consumer renders every digest with the
+``emails/moderation_status_digest`` templates and queues it for the mailing
+service through ``EmailService``; managers with email turned off
+(``email_enabled=False``) only get the info-table notification. For manager digests the EMAIL
+``NotificationLog`` rows written as PENDING by the batcher are marked SENT in
+the same transaction as the queued emails.
+
+Malformed batches are rejected; a batch that fails to deliver is requeued
+once, then dropped with an error log instead of being redelivered forever.
+"""
+import logging
+from typing import Dict
+
+from django.apps import apps
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from pydantic import ValidationError
+
+from core.schemas.moderation import ModerationDigestBatch, ModerationExchangeConfig
+
+from .notification_batching import DIGEST_TEMPLATE, NotificationBatcher
+
+logger = logging.getLogger(__name__)
+
+DIGEST_QUEUE = 'moderation_status_digests'
+
+
+def deliver_digest_batch(batch: ModerationDigestBatch, email_service=None) -> Dict[str, int]:
+    """Render and queue the emails of one digest batch; returns delivery stats."""
+    if email_service is None:
+        from core.services.send_email import email_service
+
+    sent = failed = skipped = 0
+    sent_notifications = []
+    with transaction.atomic():
+        for digest in batch.digests:
+            if not digest.email_enabled:
+                # Manager with email turned off: the info-table notification is enough
+                skipped += 1
+                continue
+            context = NotificationBatcher.template_context(digest)
+            queued = email_service.send_html_email(
+                to_email=digest.recipient_email,
+                subject=digest.subject,
+                html_content=render_to_string(f'{DIGEST_TEMPLATE}.html', context),
+                text_content=render_to_string(f'{DIGEST_TEMPLATE}.txt', context),
+            )
+            if not queued:
+                failed += 1
+                continue
+            sent += 1
+            if digest.notification_id is not None:
+                sent_notifications.append(digest.notification_id)
+
+        if sent_notifications and apps.is_installed('apps.moderation'):
+            from apps.moderation.models import NotificationLog, NotificationMethod, NotificationStatus
+
+            NotificationLog.objects.filter(
+                notification_id__in=sent_notifications,
+                method=NotificationMethod.EMAIL,
+                status=NotificationStatus.PENDING,
+            ).update(status=NotificationStatus.SENT, delivered_at=timezone.now())
+
+    logger.info(
+        f"📧 Digest batch {batch.notification_type}: {sent} emails queued, {failed} failed, "
+        f"{skipped} skipped (email off)"
+    )
+    return {'sent': sent, 'failed': failed, 'skipped': skipped}
+
+
+class StatusDigestConsumer:
+    """Consume digest batches from RabbitMQ and send them by email."""
+
+    def __init__(self, connection_params=None, email_service=None):
+        self.connection_params = connection_params
+        self.email_service = email_service
+        self.connection = None
+        self.channel = None
+
+    def setup(self):
+        import pika
+
+        from core.services.rabbitmq_publisher import rabbitmq_connection_params
+
+        config = ModerationExchangeConfig()
+        self.connection = pika.BlockingConnection(self.connection_params or rabbitmq_connection_params())
+        self.channel = self.connection.channel()
+        self.channel.queue_declare(queue=DIGEST_QUEUE, durable=True)
+        for exchange, routing_key in (
+            (config.USER_NOTIFICATIONS_EXCHANGE, 'user.digest.*'),
+            (config.MANAGER_NOTIFICATIONS_EXCHANGE, 'manager.digest.*'),
+        ):
+            self.channel.exchange_declare(exchange=exchange, exchange_type='topic', durable=True)
+            self.channel.queue_bind(exchange=exchange, queue=DIGEST_QUEUE, routing_key=routing_key)
+        self.channel.basic_qos(prefetch_count=1)
+
+    def handle(self, channel, method, properties, body):
+        try:
+            batch = ModerationDigestBatch.model_validate_json(body)
+        except ValidationError as e:
+            logger.error(f"❌ Malformed digest batch rejected: {e}")
+            channel.basic_reject(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        try:
+            deliver_digest_batch(batch, self.email_service)
+        except Exception as e:
+            # One redelivery for transient errors (DB restart), then drop instead of looping
+            requeue = not method.redelivered
+            logger.error(f"❌ Digest batch delivery failed ({'requeued' if requeue else 'dropped'}): {e}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=requeue)
+            return
+        channel.basic_ack(delivery_tag=method.delivery_tag)
+
+    def start_consuming(self):
+        """Consume until stopped (runs under ``core.consumers.manager``)."""
+        self.setup()
+        self.channel.basic_consume(queue=DIGEST_QUEUE, on_message_callback=self.handle, auto_ack=False)
+        logger.info(f"🐰 Status digest consumer listening on {DIGEST_QUEUE}")
+        try:
+            self.channel.start_consuming()
+        finally:
+            if self.connection and self.connection.is_open:
+                self.connection.close()
+
+    def stop(self):
+        if self.connection and self.connection.is_open:
+            self.connection.add_callback_threadsafe(self.channel.stop_consuming)
@@ -4,25 +4,23 @@ LLM сервис для генерации аналитических инсай
 """
 import logging
 from datetime import datetime
-from typing import List
+from typing import TYPE_CHECKING, List
 
 from django.core.cache import cache
 from pydantic import BaseModel, Field
 
-try:
-    import g4f
-    from g4f.client import Client
-    from langchain.schema.runnable import RunnableLambda
-    from langchain.prompts import PromptTemplate
+from core.utils.lazy_import import is_available, lazy_module
+
+# g4f и LangChain импортируются при первом обращении к LLM, а не при загрузке URL
+_LLM_AVAILABLE = is_available('g4f') and is_available('langchain')
+g4f = lazy_module('g4f')
+g4f_client = lazy_module('g4f.client')
+langchain_runnable = lazy_module('langchain.schema.runnable')
+langchain_prompts = lazy_module('langchain.prompts')
+langchain_parsers = lazy_module('langchain.output_parsers')
+
+if TYPE_CHECKING:
     from langchain.output_parsers import PydanticOutputParser
-    _LLM_AVAILABLE = True
-except ImportError:
-    _LLM_AVAILABLE = False
-    g4f = None
-    Client = None
-    RunnableLambda = None
-    PromptTemplate = None
-    PydanticOutputParser = None
 
 logger = logging.getLogger(__name__)
 
@@ -48,7 +46,7 @@ class LLMAnalyticsService:
 
     def __init__(self, locale='ru'):
         self.locale = locale
-        self.client = Client()
+        self.client = g4f_client.Client()
         self.model = "gpt-4"
         
         self.prompts = {
@@ -130,7 +128,7 @@ class LLMAnalyticsService:
         """Получить промпт для текущей локали"""
         return self.prompts.get(self.locale, self.prompts['ru']).get(prompt_type, '')
     
-    def create_g4f_chain(self, prompt_template: str, output_parser: PydanticOutputParser):
+    def create_g4f_chain(self, prompt_template: str, output_parser: 'PydanticOutputParser'):
         """Создание LangChain цепочки с g4f"""
 
         def g4f_llm(prompt_value):
@@ -158,12 +156,12 @@ class LLMAnalyticsService:
                 raise
 
         # Создаем промпт
-        prompt = PromptTemplate.from_template(prompt_template)
+        prompt = langchain_prompts.PromptTemplate.from_template(prompt_template)
 
         # Создаем цепочку: prompt -> llm -> parser
         chain = (
             prompt
-            | RunnableLambda(g4f_llm)
+            | langchain_runnable.RunnableLambda(g4f_llm)
             | output_parser
         )
 
@@ -182,7 +180,7 @@ class LLMAnalyticsService:
             data_summary = self._prepare_data_for_llm(analytics_data)
 
             # Создаем парсер для структурированного вывода
-            output_parser = PydanticOutputParser(pydantic_object=MarketAnalysis)
+            output_parser = langchain_parsers.PydanticOutputParser(pydantic_object=MarketAnalysis)
 
             # Создаем промпт
             prompt_template = """
@@ -5,8 +5,12 @@ Uses g4f (GPT4Free) for content generation.
 import json
 import logging
 from typing import Dict, Optional
-import g4f
-from g4f.client import Client
+
+from core.utils.lazy_import import lazy_module
+
+# g4f is imported on the first generation request, not at startup
+g4f = lazy_module('g4f')
+g4f_client = lazy_module('g4f.client')
 
 logger = logging.getLogger(__name__)
 
@@ -38,7 +42,7 @@ class LLMService:
                 try:
                     logger.info(f"Attempting content generation with {provider.__name__} (attempt {attempt + 1})")
                     
-                    client = Client(provider=provider)
+                    client = g4f_client.Client(provider=provider)
                     
                     response = client.chat.completions.create(
                         model="gpt-3.5-turbo",
@@ -273,7 +277,7 @@ class LLMService:
             Generated text or None if failed
         """
         try:
-            client = Client()
+            client = g4f_client.Client()
 
             response = client.chat.completions.create(
                 model="gpt-3.5-turbo",
@@ -0,0 +1,293 @@
+"""
+Canonical regions and cities and name-to-id resolution.
+
+Region and city tables contain several rows for one place ("Київська область"
+and "Киевская область"), and filters receive names as well as ids. The
+``build_location_aliases`` command groups duplicate rows under a canonical
+row and materializes every spelling (names, Latin transliterations, slugs,
+short region names) into ``LocationAliasModel``. Each process loads the table
+once per reference snapshot into dicts, so resolving a name is a dict hit and
+region lists come pre-deduplicated. Until the command has been run the same
+rows are computed in memory from the snapshot.
+"""
+import logging
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from apps.ads.models.reference import LocationAliasModel
+from apps.ads.services.reference_autocomplete import UK_TABLE, normalize, search_forms
+from apps.ads.services.reference_snapshot import (
+    ReferenceSnapshot,
+    bump_reference_version,
+    get_reference_snapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+REGION = LocationAliasModel.KIND_REGION
+CITY = LocationAliasModel.KIND_CITY
+
+REGION_WORDS = re.compile(r'\b(область|обл|oblast|obl|region)\b')
+# Adjective endings: "київська" / "киевская" -> "київс" / "киевс"
+REGION_ADJECTIVE = re.compile(r'ь?ка(я)?\b')
+# Russian spellings whose consonants differ from the Ukrainian ones
+RUSSIAN_STEMS = (
+    ('николаев', 'миколаїв'),
+    ('запорожск', 'запорізьк'),
+)
+UKRAINIAN_LETTERS = re.compile(r'[іїєґ]')
+RUSSIAN_LETTERS = re.compile(r'[ыэъё]')
+
+# One letter per sound so that uk/ru spellings line up before vowels are dropped
+SKELETON_TABLE = str.maketrans({
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'ґ': 'g', 'д': 'd', 'е': 'e', 'є': 'e', 'ё': 'e',
+    'ж': 'ž', 'з': 'z', 'и': 'i', 'і': 'i', 'ї': 'i', 'й': 'i', 'к': 'k', 'л': 'l', 'м': 'm',
+    'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'h',
+    'ц': 'c', 'ч': 'č', 'ш': 'š', 'щ': 'š', 'ь': '', 'ъ': '', 'ы': 'i', 'э': 'e', 'ю': 'u',
+    'я': 'a',
+})
+VOWELS = re.compile(r'(?<=\w)[aeiouy]')
+REPEATS = re.compile(r'(\w)\1+')
+
+
+def short_region_name(name: str) -> str:
+    """Region name without the word "область": "київська область" -> "київська\""""
+    return ' '.join(REGION_WORDS.sub(' ', normalize(name)).split())
+
+
+def location_key(name: str, kind: str) -> str:
+    """
+    Spelling-insensitive key of a place name.
+
+    Ukrainian and Russian names of one place share their consonants
+    (Харків / Харьков, Одеса / Одесса), so the key is the consonant
+    skeleton of the name with repeated letters collapsed.
+    """
+    text = normalize(name)
+    for russian, ukrainian in RUSSIAN_STEMS:
+        text = text.replace(russian, ukrainian)
+    if kind == REGION:
+        text = REGION_ADJECTIVE.sub('', REGION_WORDS.sub(' ', text))
+    text = text.translate(SKELETON_TABLE)
+    return REPEATS.sub(r'\1', VOWELS.sub('', text)).replace(' ', '')
+
+
+def _preference(location) -> tuple:
+    """Canonical row: active, Ukrainian spelling, oldest"""
+    name = location.name.lower()
+    return (
+        not location.is_active,
+        RUSSIAN_LETTERS.search(name) is not None,
+        UKRAINIAN_LETTERS.search(name) is None,
+        location.pk,
+    )
+
+
+def _group(locations: Iterable, key) -> Dict[object, list]:
+    groups: Dict[object, list] = {}
+    for location in locations:
+        groups.setdefault(key(location), []).append(location)
+    for members in groups.values():
+        members.sort(key=_preference)
+    return groups
+
+
+def _aliases(name: str, kind: str) -> List[Tuple[str, str]]:
+    """(alias, alias_type) pairs of one name"""
+    forms = search_forms(name)
+    aliases = [(forms[0], 'name')] + [(form, 'translit') for form in forms[1:]]
+    aliases.append((slugify(normalize(name).translate(UK_TABLE)), 'slug'))
+    if kind == REGION:
+        short = short_region_name(name)
+        if short and short != forms[0]:
+            aliases += [(form, 'short') for form in search_forms(short)]
+    return aliases
+
+
+def build_alias_rows(snapshot: ReferenceSnapshot) -> List[LocationAliasModel]:
+    """Alias rows for every region and city of the snapshot (unsaved)"""
+    rows = []
+    canonical_regions = {}
+    region_groups = _group(snapshot.regions_by_id.values(), lambda region: location_key(region.name, REGION))
+    for members in region_groups.values():
+        canonical = members[0]
+        for region in members:
+            canonical_regions[region.pk] = canonical.pk
+            for alias, alias_type in _aliases(region.name, REGION):
+                rows.append(LocationAliasModel(
+                    kind=REGION, alias=alias, alias_type=alias_type, location_id=region.pk,
+                    canonical_id=canonical.pk, canonical_region_id=canonical.pk,
+                ))
+
+    city_groups = _group(
+        snapshot.cities_by_id.values(),
+        lambda city: (canonical_regions.get(city.region_id, city.region_id), location_key(city.name, CITY)),
+    )
+    for (region_id, _), members in city_groups.items():
+        canonical = members[0]
+        for city in members:
+            for alias, alias_type in _aliases(city.name, CITY):
+                rows.append(LocationAliasModel(
+                    kind=CITY, alias=alias, alias_type=alias_type, location_id=city.pk,
+                    canonical_id=canonical.pk, canonical_region_id=region_id,
+                ))
+
+    unique = {}
+    for row in rows:
+        if row.alias:
+            unique.setdefault((row.kind, row.alias, row.location_id), row)
+    return list(unique.values())
+
+
+def materialize(snapshot: Optional[ReferenceSnapshot] = None) -> Dict[str, int]:
+    """Rebuild the alias table and make every process reload it"""
+    rows = build_alias_rows(snapshot or get_reference_snapshot())
+    with transaction.atomic():
+        LocationAliasModel.objects.all().delete()
+        LocationAliasModel.objects.bulk_create(rows, batch_size=2000)
+        transaction.on_commit(bump_reference_version)
+
+    stats = {
+        'aliases': len(rows),
+        'regions': len({row.canonical_id for row in rows if row.kind == REGION}),
+        'cities': len({row.canonical_id for row in rows if row.kind == CITY}),
+        'region_rows': len({row.location_id for row in rows if row.kind == REGION}),
+        'city_rows': len({row.location_id for row in rows if row.kind == CITY}),
+    }
+    logger.info(f"🗺️ Location aliases materialized: {stats}")
+    return stats
+
+
+class LocationDirectory:
+    """
+    In-memory view of the alias table for one reference snapshot.
+
+    Args:
+        snapshot: Reference snapshot (active flags, ordering, names)
+        rows: (kind, alias, location_id, canonical_id, canonical_region_id)
+            tuples; loaded from the table with one query when omitted
+    """
+
+    def __init__(self, snapshot: ReferenceSnapshot, rows: Optional[Iterable[tuple]] = None):
+        self.snapshot = snapshot
+        if rows is None:
+            rows = self._load(snapshot)
+
+        self.aliases: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+        self.canonical_of: Dict[Tuple[str, int], int] = {}
+        self.region_of: Dict[int, int] = {}
+        members: Dict[Tuple[str, int], set] = {}
+        region_aliases: Dict[int, list] = {}
+        for kind, alias, location_id, canonical_id, canonical_region_id in rows:
+            matches = self.aliases.get((kind, alias), ())
+            if canonical_id not in matches:
+                self.aliases[kind, alias] = matches + (canonical_id,)
+            self.canonical_of[kind, location_id] = canonical_id
+            members.setdefault((kind, canonical_id), set()).add(location_id)
+            if kind == CITY:
+                self.region_of[canonical_id] = canonical_region_id
+            else:
+                region_aliases.setdefault(canonical_id, []).append(alias)
+
+        self.members = {key: tuple(sorted(ids)) for key, ids in members.items()}
+        self.region_aliases = {region_id: tuple(aliases) for region_id, aliases in region_aliases.items()}
+
+    @staticmethod
+    def _load(snapshot: ReferenceSnapshot) -> List[tuple]:
+        rows = list(LocationAliasModel.objects.values_list(
+            'kind', 'alias', 'location_id', 'canonical_id', 'canonical_region_id'
+        ))
+        covered = {(kind, location_id) for kind, _, location_id, _, _ in rows}
+        expected = {(REGION, pk) for pk in snapshot.regions_by_id} | {(CITY, pk) for pk in snapshot.cities_by_id}
+        if expected <= covered:
+            return rows
+
+        # New regions/cities since the last build: derive the rows in memory
+        logger.warning(
+            f"⚠️ Location aliases miss {len(expected - covered)} regions/cities, "
+            f"computing them in memory; run build_location_aliases"
+        )
+        return [
+            (row.kind, row.alias, row.location_id, row.canonical_id, row.canonical_region_id)
+            for row in build_alias_rows(snapshot)
+        ]
+
+    def canonical(self, kind: str, value) -> Tuple[int, ...]:
+        """Canonical ids for an id, name, transliteration or slug"""
+        if value is None or value == '':
+            return ()
+        try:
+            location_id = int(value)
+        except (TypeError, ValueError):
+            pass
+        else:
+            return (self.canonical_of.get((kind, location_id), location_id),)
+
+        text = str(value).strip().lower()
+        return self.aliases.get((kind, normalize(text))) or self.aliases.get((kind, text)) or ()
+
+    def _members(self, kind: str, canonical_ids: Iterable[int]) -> Tuple[int, ...]:
+        ids = []
+        for canonical_id in canonical_ids:
+            ids.extend(self.members.get((kind, canonical_id), (canonical_id,)))
+        return tuple(ids)
+
+    def region_ids(self, value) -> Tuple[int, ...]:
+        """All region row ids (duplicates included) for an id or a name"""
+        return self._members(REGION, self.canonical(REGION, value))
+
+    def city_ids(self, value, region=None) -> Tuple[int, ...]:
+        """City row ids; region (id or name) narrows ambiguous names like "Миколаївка\""""
+        cities = self.canonical(CITY, value)
+        if region not in (None, ''):
+            regions = set(self.canonical(REGION, region))
+            cities = [city_id for city_id in cities if self.region_of.get(city_id) in regions]
+        return self._members(CITY, cities)
+
+    def canonical_regions(self, search: str = '') -> list:
+        """Active canonical regions in snapshot order, optionally matching search"""
+        search = normalize(search)
+        regions = []
+        for region in self.snapshot.regions:
+            if self.canonical_of.get((REGION, region.pk), region.pk) != region.pk:
+                continue
+            aliases = self.region_aliases.get(region.pk, (normalize(region.name),))
+            if search and not any(search in alias for alias in aliases):
+                continue
+            regions.append(region)
+        return regions
+
+
+class LocationDirectoryLoader:
+    """Process-wide directory that follows the reference snapshot"""
+
+    def __init__(self):
+        self._directory: Optional[LocationDirectory] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> LocationDirectory:
+        snapshot = get_reference_snapshot()
+        directory = self._directory
+        if directory is not None and directory.snapshot is snapshot:
+            return directory
+        with self._lock:
+            directory = self._directory
+            if directory is None or directory.snapshot is not snapshot:
+                directory = LocationDirectory(snapshot)
+                self._directory = directory
+            return directory
+
+    def reset(self):
+        self._directory = None
+
+
+_loader = LocationDirectoryLoader()
+
+
+def get_location_directory() -> LocationDirectory:
+    """Location directory of the current reference snapshot"""
+    return _loader.get()
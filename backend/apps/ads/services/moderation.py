@@ -6,6 +6,8 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 import json
 
+from core.services.moderation_cache import ModerationResultStore, exact_content_hash, ruleset_version
+
 # Try to import LLM dependencies with fallback
 try:
     from langchain.chains import LLMChain
@@ -19,6 +21,9 @@ except ImportError as e:
     LLM_AVAILABLE = False
     # Create dummy classes for fallback
     class BaseOutputParser:
+        def __class_getitem__(cls, item):
+            # Allow BaseOutputParser[...] like the generic LangChain class
+            return cls
         def parse(self, text):
             return text
     class LLMChain:
@@ -68,6 +73,18 @@ class ContentModerator:
 
     Returns moderation result and censored text with inappropriate words replaced by asterisks.
     """
+
+    # Bump when the chain or parser changes; prompt texts are fingerprinted automatically
+    RULESET_VERSION = 1
+    _result_store = None
+
+    @classmethod
+    def _get_result_store(cls) -> ModerationResultStore:
+        """Store for LLM results keyed by content hash and prompt version."""
+        if cls._result_store is None:
+            prompts = [cls._get_moderation_prompt(language) for language in ('en', 'ru')]
+            cls._result_store = ModerationResultStore('llm_chain', ruleset_version(cls.RULESET_VERSION, prompts))
+        return cls._result_store
     
     @classmethod
     def _detect_language(cls, text: str) -> str:
@@ -196,6 +213,14 @@ class ContentModerator:
                 'detected_language': 'unknown'
             }
 
+        # Same text was already moderated with the current prompts. The details hold the
+        # LLM's censored title/description, so the key is the exact text, not a normalized one
+        store = cls._get_result_store()
+        digest = exact_content_hash(title or '', text)
+        cached = store.get(digest)
+        if cached is not None:
+            return ModerationResult(cached['result']), {**cached['details'], 'cached': True}
+
         try:
             # Detect the language of the content
             language = cls._detect_language(f"{title or ''} {text}")
@@ -213,6 +238,8 @@ class ContentModerator:
             if isinstance(result, tuple) and len(result) == 2:
                 result_result, details = result
                 details['detected_language'] = language
+                if not details.get('fallback'):
+                    store.set(digest, {'result': result_result.value, 'details': details})
                 return result_result, details
             return result
         except Exception as e:
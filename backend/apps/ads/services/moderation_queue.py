@@ -0,0 +1,177 @@
+"""
+Claim-based moderation work queue.
+
+Moderators (or auto-moderation workers running as a service user) claim the
+next ads with ``SELECT ... FOR UPDATE SKIP LOCKED``: concurrent claims never
+wait on each other and never get the same ad. A claim is a lease stored on
+the ad (``claimed_by``/``claimed_until``). Once the lease expires the ad is
+claimable again, so abandoned claims are released without a cleanup job.
+Deciding on an ad clears its claim.
+
+Queue order: ads with an active promotion, then ads flagged for manual
+review, then oldest first. Queue reads only touch pending/needs_review rows
+through the partial index ``car_ads_moderation_queue_idx``.
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+
+from core.enums.ads import AdStatusEnum
+
+from ..models import AdPromotion, CarAd
+
+logger = logging.getLogger(__name__)
+
+QUEUE_STATUSES = (AdStatusEnum.PENDING, AdStatusEnum.NEEDS_REVIEW)
+DEFAULT_LEASE_SECONDS = 15 * 60
+MIN_LEASE_SECONDS = 60
+MAX_LEASE_SECONDS = 8 * 60 * 60
+MAX_CLAIM = 50
+
+
+class ClaimConflict(Exception):
+    """The ad is claimed by another moderator with a live lease."""
+
+    def __init__(self, ad: CarAd):
+        self.ad = ad
+        super().__init__(f'Ad {ad.id} is claimed by user {ad.claimed_by_id} until {ad.claimed_until}')
+
+
+class ModerationQueue:
+    """
+    Service for claiming, releasing and deciding queued ads.
+
+    Usage:
+        ads = ModerationQueue.claim(request.user, count=10)
+        ModerationQueue.release(request.user, ad_ids=[ads[0].id])
+        ModerationQueue.check_claim(ad, request.user)  # before approve/reject
+    """
+
+    @staticmethod
+    def lease_seconds() -> int:
+        return getattr(settings, 'MODERATION_CLAIM_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)
+
+    @staticmethod
+    def queued() -> QuerySet:
+        """Ads waiting for moderation (matches the partial index condition)."""
+        return CarAd.objects.filter(status__in=QUEUE_STATUSES)
+
+    @classmethod
+    def prioritized(cls, queryset: Optional[QuerySet] = None) -> QuerySet:
+        """Queue order: promoted, flagged for manual review, oldest."""
+        now = timezone.now()
+        promoted = AdPromotion.objects.filter(
+            ad=OuterRef('pk'), is_active=True, starts_at__lte=now, ends_at__gt=now
+        )
+        queryset = cls.queued() if queryset is None else queryset
+        return queryset.annotate(is_promoted=Exists(promoted)).order_by(
+            '-is_promoted', '-needs_manual_review', 'created_at', 'id'
+        )
+
+    @classmethod
+    def claim(cls, user, count: int = 10, lease_seconds: Optional[int] = None) -> List[CarAd]:
+        """
+        Claim up to ``count`` ads for ``user``.
+
+        The user's own live claims are included (and renewed); ads claimed by
+        others are skipped, locked rows of concurrent claims too.
+        """
+        count = max(1, min(count, MAX_CLAIM))
+        lease_seconds = lease_seconds or cls.lease_seconds()
+        if not MIN_LEASE_SECONDS <= lease_seconds <= MAX_LEASE_SECONDS:
+            raise ValueError(f'lease_seconds must be between {MIN_LEASE_SECONDS} and {MAX_LEASE_SECONDS}')
+        now = timezone.now()
+        until = now + timedelta(seconds=lease_seconds)
+
+        available = cls.queued().filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lte=now) | Q(claimed_by=user)
+        )
+        with transaction.atomic():
+            ids = list(
+                cls.prioritized(available)
+                .select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:count]
+            )
+            CarAd.objects.filter(id__in=ids).update(claimed_by=user, claimed_until=until)
+
+        logger.info(f"📥 User {user.id} claimed {len(ids)} ads until {until:%H:%M:%S}")
+        ads = cls.prioritized(CarAd.objects.filter(id__in=ids)).select_related('account__user', 'mark')
+        return list(ads)
+
+    @classmethod
+    def release(cls, user, ad_ids: Optional[Iterable[int]] = None) -> int:
+        """Give back the user's claims (all or the given ads)."""
+        claims = CarAd.objects.filter(claimed_by=user)
+        if ad_ids is not None:
+            claims = claims.filter(id__in=list(ad_ids))
+        return claims.update(claimed_by=None, claimed_until=None)
+
+    @staticmethod
+    def check_claim(ad: CarAd, user) -> None:
+        """Raise ClaimConflict if another moderator holds a live claim on the ad."""
+        if ad.claimed_by_id and ad.claimed_by_id != user.id and ad.claimed_until and ad.claimed_until > timezone.now():
+            raise ClaimConflict(ad)
+
+    @staticmethod
+    def clear_claim(ad: CarAd) -> None:
+        """Drop the claim before saving a moderation decision."""
+        ad.claimed_by = None
+        ad.claimed_until = None
+
+    @classmethod
+    def stats(cls, hours: int = 24) -> Dict:
+        """Queue size and per-moderator throughput over the last ``hours``."""
+        now = timezone.now()
+        since = now - timedelta(hours=hours)
+
+        queue = cls.queued().aggregate(
+            total=Count('id'),
+            flagged=Count('id', filter=Q(needs_manual_review=True)),
+            claimed=Count('id', filter=Q(claimed_until__gt=now)),
+        )
+
+        decisions = (
+            CarAd.objects.filter(moderated_by__isnull=False, moderated_at__gte=since)
+            .values('moderated_by', 'moderated_by__email')
+            .annotate(
+                decided=Count('id'),
+                approved=Count('id', filter=Q(status=AdStatusEnum.ACTIVE)),
+                rejected=Count('id', filter=Q(status__in=[AdStatusEnum.REJECTED, AdStatusEnum.BLOCKED])),
+                needs_review=Count('id', filter=Q(status=AdStatusEnum.NEEDS_REVIEW)),
+            )
+        )
+        holding = dict(
+            cls.queued().filter(claimed_until__gt=now)
+            .values('claimed_by').annotate(count=Count('id')).values_list('claimed_by', 'count')
+        )
+
+        moderators = {}
+        for row in decisions:
+            moderators[row['moderated_by']] = {
+                'user_id': row['moderated_by'],
+                'email': row['moderated_by__email'],
+                'decided': row['decided'],
+                'approved': row['approved'],
+                'rejected': row['rejected'],
+                'needs_review': row['needs_review'],
+                'per_hour': round(row['decided'] / hours, 2),
+                'claimed': holding.get(row['moderated_by'], 0),
+            }
+        idle = [user_id for user_id in holding if user_id not in moderators]
+        for user_id, email in get_user_model().objects.filter(id__in=idle).values_list('id', 'email'):
+            moderators[user_id] = {
+                'user_id': user_id, 'email': email, 'decided': 0, 'approved': 0, 'rejected': 0,
+                'needs_review': 0, 'per_hour': 0.0, 'claimed': holding[user_id],
+            }
+
+        return {
+            'queue': queue,
+            'window_hours': hours,
+            'moderators': sorted(moderators.values(), key=lambda item: -item['decided']),
+        }
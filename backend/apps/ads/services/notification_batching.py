@@ -0,0 +1,356 @@
+"""
+Batched status-change notifications.
+
+Bulk status changes are not published per ad. They are buffered in the cache
+per time window (``MODERATION_DIGEST_WINDOW_SECONDS``). When the window closes,
+``flush_status_digests`` turns the buffer into one digest per recipient:
+
+* ad owners get the changes of their ads (latest status per ad);
+* managers get the ads that now need review; their ``ModerationNotification``
+  and ``NotificationLog`` rows are written with ``bulk_create``.
+
+``StatusDigestConsumer`` (``manage.py consume_status_digests``) renders the
+digests and sends them by email.
+
+Each audience is published as a single ``ModerationDigestBatch`` message, so a
+bulk action over thousands of ads costs two broker messages per window.
+
+Buffer layout: an entry counter (``cache.incr`` is atomic on Redis) and one
+key per entry, so concurrent writers never overwrite each other's changes.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from core.enums.ads import AdStatusEnum
+from core.schemas.moderation import (
+    ModerationDigest,
+    ModerationDigestBatch,
+    ModerationDigestItem,
+    ModerationExchangeConfig,
+)
+
+from ..models import CarAd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 60
+CACHE_PREFIX = 'notification_digest'
+DIGEST_TEMPLATE = 'emails/moderation_status_digest'
+MANAGER_DIGEST_STATUSES = (AdStatusEnum.NEEDS_REVIEW,)
+
+STATUS_TITLES = {
+    AdStatusEnum.ACTIVE: 'схвалено',
+    AdStatusEnum.REJECTED: 'відхилено',
+    AdStatusEnum.NEEDS_REVIEW: 'потребують перевірки',
+    AdStatusEnum.BLOCKED: 'заблоковано',
+    AdStatusEnum.ARCHIVED: 'архівовано',
+    AdStatusEnum.DRAFT: 'переведено в чернетки',
+}
+
+
+class NotificationBatcher:
+    """
+    Buffer status changes and flush them as per-recipient digests.
+
+    Usage:
+        batcher = NotificationBatcher()
+        batcher.add(ad_ids, 'active', reason='...')   # schedules the flush once per window
+        batcher.flush(bucket)                         # from flush_status_digests
+
+    ``window_seconds=0`` flushes immediately (no buffering).
+    """
+
+    def __init__(self, window_seconds: Optional[int] = None, publisher: Optional[Callable[..., bool]] = None):
+        if window_seconds is None:
+            window_seconds = getattr(settings, 'MODERATION_DIGEST_WINDOW_SECONDS', DEFAULT_WINDOW_SECONDS)
+        self.window = max(0, int(window_seconds))
+        self._publisher = publisher
+
+    # Buffer
+
+    def key(self, bucket: int, suffix) -> str:
+        return f'{CACHE_PREFIX}:{self.window}:{bucket}:{suffix}'
+
+    @property
+    def timeout(self) -> int:
+        """Buffered changes survive a few missed flushes, then expire."""
+        return max(self.window, 1) * 10
+
+    def current_bucket(self) -> int:
+        return int(time.time() // self.window) if self.window else 0
+
+    def add(self, ad_ids: Iterable[int], new_status: str, reason: str = '') -> int:
+        """Buffer a status change of ``ad_ids``; returns the window bucket."""
+        entry = {'ad_ids': list(ad_ids), 'status': new_status, 'reason': reason or ''}
+        if not self.window:
+            self.flush(0, entries=[entry])
+            return 0
+
+        bucket = self.current_bucket()
+        seq_key = self.key(bucket, 'seq')
+        cache.add(seq_key, 0, self.timeout)
+        seq = cache.incr(seq_key)
+        cache.set(self.key(bucket, seq), entry, self.timeout)
+
+        if cache.add(self.key(bucket, 'scheduled'), True, self.timeout):
+            self.schedule_flush(bucket)
+        return bucket
+
+    def schedule_flush(self, bucket: int) -> None:
+        """Run the flush right after the window closes."""
+        from ..tasks.moderation_notifications import flush_status_digests
+
+        countdown = max((bucket + 1) * self.window - time.time(), 0) + 1
+        flush_status_digests.apply_async(args=[self.window, bucket], countdown=countdown)
+
+    def entries(self, bucket: int) -> List[Dict]:
+        """Buffered changes of the window in arrival order."""
+        count = cache.get(self.key(bucket, 'seq')) or 0
+        keys = [self.key(bucket, seq) for seq in range(1, count + 1)]
+        buffered = cache.get_many(keys)
+        return [buffered[key] for key in keys if key in buffered]
+
+    def discard(self, bucket: int) -> None:
+        count = cache.get(self.key(bucket, 'seq')) or 0
+        cache.delete_many([self.key(bucket, seq) for seq in range(1, count + 1)] + [self.key(bucket, 'seq')])
+
+    # Flush
+
+    def flush(self, bucket: int, entries: Optional[List[Dict]] = None) -> Dict:
+        """Publish the window's digests and write the manager notification rows."""
+        claimed = entries is None
+        if claimed:
+            if not cache.add(self.key(bucket, 'flushed'), True, self.timeout):
+                logger.info(f"⏭️ Digest window {bucket} already flushed")
+                return {'bucket': bucket, 'skipped': True}
+
+        try:
+            if claimed:
+                entries = self.entries(bucket)
+            if self.window:
+                window_start = datetime.fromtimestamp(bucket * self.window, tz=dt_timezone.utc)
+                window_end = datetime.fromtimestamp((bucket + 1) * self.window, tz=dt_timezone.utc)
+            else:
+                window_start = window_end = datetime.now(tz=dt_timezone.utc)
+
+            changes = self.latest_changes(entries)
+            user_digests = self.build_user_digests(changes)
+            manager_items = [item for item in changes.values() if item['status'] in MANAGER_DIGEST_STATUSES]
+            recipients = self.manager_recipients() if manager_items else []
+            manager_digests = self.build_manager_digests(manager_items, recipients)
+
+            config = ModerationExchangeConfig()
+            published = 0
+            # Notification rows and digest messages commit together: a failed publish leaves neither
+            with transaction.atomic():
+                notifications = self.write_manager_notifications(manager_digests, recipients)
+                for exchange, routing_key, notification_type, digests, priority in (
+                    (config.USER_NOTIFICATIONS_EXCHANGE, config.USER_STATUS_DIGEST,
+                     'user_moderation_digest', user_digests, 5),
+                    (config.MANAGER_NOTIFICATIONS_EXCHANGE, config.MANAGER_STATUS_DIGEST,
+                     'manager_moderation_digest', manager_digests, 8),
+                ):
+                    if not digests:
+                        continue
+                    batch = ModerationDigestBatch(
+                        notification_type=notification_type,
+                        window_start=window_start,
+                        window_end=window_end,
+                        digests=digests,
+                    )
+                    if not self.publisher(exchange=exchange, routing_key=routing_key,
+                                          message=batch.model_dump_json(), priority=priority):
+                        raise RuntimeError(f'Failed to publish digest batch to {exchange}')
+                    published += 1
+        except Exception:
+            # Release the window so the retry flushes it instead of skipping it
+            if claimed:
+                cache.delete(self.key(bucket, 'flushed'))
+            raise
+
+        if claimed:
+            self.discard(bucket)
+
+        stats = {
+            'bucket': bucket,
+            'entries': len(entries),
+            'ads': len(changes),
+            'users': len(user_digests),
+            'managers': len(manager_digests),
+            'published': published,
+            'notifications': notifications,
+        }
+        logger.info(f"📬 Flushed digest window {bucket}: {stats}")
+        return stats
+
+    def publisher(self, **kwargs) -> bool:
+        if self._publisher is None:
+            from ..tasks.moderation_notifications import _publish_to_exchange
+
+            self._publisher = _publish_to_exchange
+        return self._publisher(**kwargs)
+
+    # Digests
+
+    @staticmethod
+    def latest_changes(entries: List[Dict]) -> Dict[int, Dict]:
+        """Latest buffered status per ad, with ad title and owner."""
+        latest = {}
+        for entry in entries:
+            for ad_id in entry['ad_ids']:
+                latest[ad_id] = entry
+        ads = CarAd.objects.filter(id__in=list(latest)).values(
+            'id', 'title', 'account__user_id', 'account__user__email'
+        )
+        return {
+            ad['id']: {
+                'ad_id': ad['id'],
+                'title': ad['title'],
+                'status': latest[ad['id']]['status'],
+                'reason': latest[ad['id']]['reason'] or None,
+                'user_id': ad['account__user_id'],
+                'email': ad['account__user__email'],
+            }
+            for ad in ads.order_by('id')
+        }
+
+    def build_user_digests(self, changes: Dict[int, Dict]) -> List[ModerationDigest]:
+        by_user = defaultdict(list)
+        for item in changes.values():
+            by_user[(item['user_id'], item['email'])].append(item)
+        return [
+            self.digest(user_id, email, items, 'Оновлення статусу ваших оголошень')
+            for (user_id, email), items in by_user.items()
+        ]
+
+    def build_manager_digests(self, items: List[Dict], recipients: List[Dict]) -> List[ModerationDigest]:
+        if not items:
+            return []
+        subject = f'Оголошення потребують перевірки: {len(items)}'
+        return [
+            self.digest(recipient['id'], recipient['email'], items, subject, recipient['email_enabled'])
+            for recipient in recipients
+        ]
+
+    @staticmethod
+    def digest(
+        recipient_id: int, email: str, items: List[Dict], subject: str, email_enabled: bool = True
+    ) -> ModerationDigest:
+        return ModerationDigest(
+            recipient_id=recipient_id,
+            recipient_email=email,
+            subject=subject,
+            email_enabled=email_enabled,
+            template_name=f'{DIGEST_TEMPLATE}.html',
+            status_counts=dict(Counter(item['status'] for item in items)),
+            items=[
+                ModerationDigestItem(ad_id=item['ad_id'], title=item['title'], status=item['status'], reason=item['reason'])
+                for item in items
+            ],
+        )
+
+    # Managers
+
+    @staticmethod
+    def moderation_installed() -> bool:
+        return apps.is_installed('apps.moderation')
+
+    def manager_recipients(self) -> List[Dict]:
+        """
+        Managers to notify about ads needing review.
+
+        With ``apps.moderation`` installed their notification settings decide;
+        otherwise all active staff get the digest by email.
+        """
+        if self.moderation_installed():
+            from apps.moderation.models import ModerationAction
+            from apps.moderation.services.recipient_directory import get_recipient_directory
+
+            return [
+                {
+                    'id': recipient.manager_id,
+                    'email': recipient.email,
+                    'email_enabled': recipient.email_enabled,
+                    'info_table_enabled': recipient.info_table_enabled,
+                }
+                for recipient in get_recipient_directory().recipients(ModerationAction.AD_NEEDS_REVIEW)
+            ]
+
+        staff = get_user_model().objects.filter(is_staff=True, is_active=True).order_by('id')
+        return [
+            {'id': user_id, 'email': email, 'email_enabled': True, 'info_table_enabled': False}
+            for user_id, email in staff.values_list('id', 'email')
+        ]
+
+    def write_manager_notifications(self, digests: List[ModerationDigest], recipients: List[Dict]) -> int:
+        """
+        One ModerationNotification per manager and its logs, two INSERTs in total.
+
+        Email logs stay PENDING until the digest consumer has queued the email;
+        each digest carries its notification id for that.
+        """
+        if not digests or not self.moderation_installed():
+            return 0
+        from apps.moderation.models import (
+            ModerationAction,
+            ModerationNotification,
+            NotificationLog,
+            NotificationMethod,
+            NotificationStatus,
+        )
+
+        recipients = {recipient['id']: recipient for recipient in recipients}
+        with transaction.atomic():
+            notifications = ModerationNotification.objects.bulk_create([
+                ModerationNotification(
+                    manager_id=digest.recipient_id,
+                    action=ModerationAction.AD_NEEDS_REVIEW,
+                    title=digest.subject,
+                    message=render_to_string(f'{DIGEST_TEMPLATE}.txt', self.template_context(digest)),
+                    data=digest.model_dump(mode='json'),
+                    priority=8,
+                    status=NotificationStatus.PENDING,
+                )
+                for digest in digests
+            ])
+
+            logs = []
+            for digest, notification in zip(digests, notifications):
+                digest.notification_id = notification.id
+                recipient = recipients[notification.manager_id]
+                if recipient['info_table_enabled']:
+                    logs.append(NotificationLog(
+                        notification=notification, method=NotificationMethod.INFO_TABLE, status=NotificationStatus.SENT
+                    ))
+                if recipient['email_enabled']:
+                    logs.append(NotificationLog(
+                        notification=notification,
+                        method=NotificationMethod.EMAIL,
+                        recipient=recipient['email'],
+                        status=NotificationStatus.PENDING,
+                    ))
+            NotificationLog.objects.bulk_create(logs)
+        return len(notifications)
+
+    @staticmethod
+    def template_context(digest: ModerationDigest) -> Dict:
+        return {
+            'subject': digest.subject,
+            'items': [item.model_dump() for item in digest.items],
+            'status_counts': [
+                {'status': status, 'title': STATUS_TITLES.get(status, status), 'count': count}
+                for status, count in digest.status_counts.items()
+            ],
+            'site_name': getattr(settings, 'SITE_NAME', 'AutoRia'),
+            'frontend_url': getattr(settings, 'FRONTEND_URL', ''),
+        }
@@ -0,0 +1,299 @@
+"""
+Prefix autocomplete over marks, models and cities.
+
+Names are normalized (case, apostrophes, separators) and indexed together with
+their Ukrainian and Russian Latin transliterations and a loose phonetic form,
+so "київ", "kyiv", "тойота" and "toyota" all find what users mean. Every index
+is a sorted array of keys searched with bisect; ranges that are too wide to
+scan per keystroke (one- and two-letter prefixes) are ranked once and memoized.
+
+Suggestions are ordered by popularity: the number of active ads plus a bonus
+for entries flagged popular (regional centers for cities). Indexes are built
+from the reference snapshot and rebuilt when it changes or when the
+popularity weights get older than ``REFERENCE_AUTOCOMPLETE_WEIGHTS_TTL``.
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+from apps.ads.models import CarAd
+from apps.ads.services.reference_snapshot import ReferenceSnapshot, get_reference_snapshot
+from core.enums.ads import AdStatusEnum
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('mark', 'model', 'city')
+# Snapshot grouping that holds the valid scope ids of each kind
+SCOPE_GROUPS = {'mark': 'marks_by_vehicle_type', 'model': 'models_by_mark', 'city': 'cities_by_region'}
+MAX_LIMIT = 50
+POPULAR_BONUS = 100
+# Ranges wider than this are ranked once and memoized
+SCAN_LIMIT = 256
+
+UK_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'h', 'ґ': 'g', 'д': 'd', 'е': 'e', 'є': 'ie',
+    'ж': 'zh', 'з': 'z', 'и': 'y', 'і': 'i', 'ї': 'i', 'й': 'i', 'к': 'k', 'л': 'l',
+    'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't', 'у': 'u',
+    'ф': 'f', 'х': 'kh', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'shch', 'ь': '', 'ю': 'iu',
+    'я': 'ia', 'ё': 'e', 'ы': 'y', 'э': 'e', 'ъ': '',
+}
+RU_TO_LATIN = {
+    **UK_TO_LATIN,
+    'г': 'g', 'е': 'e', 'и': 'i', 'й': 'y', 'ю': 'yu', 'я': 'ya', 'є': 'ye', 'ї': 'yi',
+}
+UK_TABLE = str.maketrans(UK_TO_LATIN)
+RU_TABLE = str.maketrans(RU_TO_LATIN)
+
+# Spellings that sound alike collapse to one form ("бмв" -> "bmv" == "bmw")
+LOOSE_RULES = (
+    (re.compile(r'shch|sch'), 'sh'),
+    (re.compile(r'ph'), 'f'),
+    (re.compile(r'ck'), 'k'),
+    (re.compile(r'x'), 'ks'),
+    (re.compile(r'q'), 'k'),
+    (re.compile(r'w'), 'v'),
+    (re.compile(r'c(?=[eiy])'), 's'),
+    (re.compile(r'c'), 'k'),
+    (re.compile(r'kh'), 'h'),
+    (re.compile(r'[yj]'), 'i'),
+)
+CYRILLIC = re.compile(r'[а-яёіїєґ]')
+APOSTROPHES = re.compile(r"['’ʼ`\"]")
+SEPARATORS = re.compile(r'[\s\-_/.,()]+')
+
+
+def normalize(text: str) -> str:
+    """Lower-case name with apostrophes dropped and separators collapsed"""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = APOSTROPHES.sub('', text)
+    return SEPARATORS.sub(' ', text).strip()
+
+
+def loose(text: str) -> str:
+    for pattern, replacement in LOOSE_RULES:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def search_forms(text: str) -> Tuple[str, ...]:
+    """All spellings a name is indexed under (or a query is looked up by)"""
+    name = normalize(text)
+    if not name:
+        return ()
+    uk, ru = name.translate(UK_TABLE), name.translate(RU_TABLE)
+    forms = dict.fromkeys((name, uk, ru, loose(uk), loose(ru)))
+    return tuple(forms)
+
+
+class Suggestion(NamedTuple):
+    id: int
+    name: str
+    weight: int
+    extra: dict
+
+    def to_dict(self) -> dict:
+        return {'id': self.id, 'name': self.name, **self.extra}
+
+
+class PrefixIndex:
+    """
+    Sorted array of (key, entry) pairs searched by prefix.
+
+    Each entry is indexed under every search form of its name and of every
+    word of its name ("Land Rover" is found by "rov"); matches on the start of
+    the name rank above matches inside it. Latin spellings of Cyrillic names
+    serve Latin queries only, so "к" does not suggest "Харків" via "kharkiv".
+    """
+
+    def __init__(self, entries: Iterable[Suggestion]):
+        self.entries = tuple(entries)
+        self._ranks = [(-entry.weight, len(entry.name), entry.name.casefold()) for entry in self.entries]
+
+        pairs = set()
+        for position, entry in enumerate(self.entries):
+            forms = search_forms(entry.name)
+            cyrillic = bool(forms and CYRILLIC.search(forms[0]))
+            for number, form in enumerate(forms):
+                latin_only = cyrillic and number > 0
+                words = form.split(' ')
+                for index in range(len(words)):
+                    pairs.add((' '.join(words[index:]), index > 0, latin_only, position))
+
+        pairs = sorted(pairs)
+        self._keys = [key for key, _, _, _ in pairs]
+        self._postings = [(inner, latin_only, position) for _, inner, latin_only, position in pairs]
+        self._memo: Dict[Tuple[str, bool], List[Tuple[tuple, int]]] = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _rank_range(self, lo: int, hi: int, latin_query: bool) -> List[Tuple[tuple, int]]:
+        best: Dict[int, tuple] = {}
+        for inner, latin_only, position in self._postings[lo:hi]:
+            if latin_only and not latin_query:
+                continue
+            rank = (inner, *self._ranks[position])
+            if position not in best or rank < best[position]:
+                best[position] = rank
+        return sorted((rank, position) for position, rank in best.items())[:MAX_LIMIT]
+
+    def ranked(self, prefix: str, latin_query: bool = True) -> List[Tuple[tuple, int]]:
+        """Best (rank, entry position) pairs for keys starting with prefix"""
+        memo = self._memo.get((prefix, latin_query))
+        if memo is not None:
+            return memo
+
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + '\uffff', lo)
+        ranked = self._rank_range(lo, hi, latin_query)
+        if hi - lo > SCAN_LIMIT:
+            self._memo[prefix, latin_query] = ranked
+        return ranked
+
+    def search(self, query: str, limit: int = 10) -> List[Suggestion]:
+        forms = search_forms(query)
+        latin_query = not (forms and CYRILLIC.search(forms[0]))
+        best: Dict[int, tuple] = {}
+        for form in forms:
+            for rank, position in self.ranked(form, latin_query):
+                if position not in best or rank < best[position]:
+                    best[position] = rank
+        top = sorted(best, key=best.__getitem__)[:limit]
+        return [self.entries[position] for position in top]
+
+
+class AutocompleteIndex:
+    """
+    Indexes of one snapshot, built per scope on first use.
+
+    Scopes: all marks or marks of a vehicle type, all models or models of a
+    mark, all active cities or active cities of a region. Scope ids unknown to
+    the snapshot get an empty index that is not cached, so the cache stays
+    bounded by the reference data whatever ids clients send.
+    """
+
+    EMPTY = PrefixIndex(())
+
+    def __init__(self, snapshot: ReferenceSnapshot, weights: Optional[Dict[str, dict]] = None):
+        self.snapshot = snapshot
+        self.weights = weights if weights is not None else load_weights()
+        self.built_at = time.monotonic()
+        self._indexes: Dict[Tuple[str, Optional[int]], PrefixIndex] = {}
+        self._lock = threading.Lock()
+
+    def _mark(self, mark) -> Suggestion:
+        weight = self.weights['mark'].get(mark.id, 0) + (POPULAR_BONUS if mark.is_popular else 0)
+        return Suggestion(mark.id, mark.name, weight, {'vehicle_type_id': mark.vehicle_type_id})
+
+    def _model(self, model) -> Suggestion:
+        weight = self.weights['model'].get((model.mark_id, model.name.lower()), 0)
+        weight += POPULAR_BONUS if model.is_popular else 0
+        return Suggestion(model.id, model.name, weight, {'mark_id': model.mark_id, 'mark_name': model.mark.name})
+
+    def _city(self, city) -> Suggestion:
+        weight = self.weights['city'].get(city.id, 0) + (POPULAR_BONUS if city.is_regional_center else 0)
+        return Suggestion(city.id, city.name, weight, {'region_id': city.region_id, 'region_name': city.region.name})
+
+    def _entries(self, kind: str, scope_id: Optional[int]) -> List[Suggestion]:
+        snapshot = self.snapshot
+        if kind == 'mark':
+            marks = snapshot.marks if scope_id is None else snapshot.marks_of(scope_id)
+            return [self._mark(mark) for mark in marks]
+        if kind == 'model':
+            models = snapshot.models if scope_id is None else snapshot.models_of(scope_id)
+            return [self._model(model) for model in models]
+        cities = snapshot.cities if scope_id is None else snapshot.cities_of(scope_id)
+        return [self._city(city) for city in cities]
+
+    def index(self, kind: str, scope_id: Optional[int] = None) -> PrefixIndex:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown autocomplete type: {kind}")
+        if scope_id is not None and scope_id not in getattr(self.snapshot, SCOPE_GROUPS[kind]):
+            return self.EMPTY
+        key = (kind, scope_id)
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    started = time.perf_counter()
+                    index = PrefixIndex(self._entries(kind, scope_id))
+                    self._indexes[key] = index
+                    logger.info(
+                        f"🔤 Autocomplete index {kind}/{scope_id or 'all'}: {len(index)} entries "
+                        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+                    )
+        return index
+
+    def suggest(self, kind: str, query: str, scope_id: Optional[int] = None, limit: int = 10) -> List[dict]:
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        return [entry.to_dict() for entry in self.index(kind, scope_id).search(query, limit)]
+
+
+def load_weights() -> Dict[str, dict]:
+    """Active ads per mark, per (mark, model name) and per city: three grouped queries"""
+    active = CarAd.objects.filter(status=AdStatusEnum.ACTIVE)
+    return {
+        'mark': dict(
+            active.exclude(mark_id=None).values('mark_id').annotate(n=Count('id')).values_list('mark_id', 'n')
+        ),
+        'model': {
+            (mark_id, name): count
+            for mark_id, name, count in active.exclude(mark_id=None)
+            .values('mark_id', name=Lower('model')).annotate(n=Count('id'))
+            .values_list('mark_id', 'name', 'n')
+        },
+        'city': dict(
+            active.exclude(city_id=None).values('city_id').annotate(n=Count('id')).values_list('city_id', 'n')
+        ),
+    }
+
+
+class AutocompleteLoader:
+    """Process-wide index that follows the reference snapshot"""
+
+    def __init__(self):
+        self._index: Optional[AutocompleteIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def weights_ttl(self) -> float:
+        return getattr(settings, 'REFERENCE_AUTOCOMPLETE_WEIGHTS_TTL', 3600)
+
+    def _fresh(self, index, snapshot) -> bool:
+        return (
+            index is not None
+            and index.snapshot is snapshot
+            and time.monotonic() - index.built_at < self.weights_ttl
+        )
+
+    def get(self) -> AutocompleteIndex:
+        snapshot = get_reference_snapshot()
+        index = self._index
+        if self._fresh(index, snapshot):
+            return index
+        with self._lock:
+            index = self._index
+            if not self._fresh(index, snapshot):
+                index = AutocompleteIndex(snapshot)
+                self._index = index
+            return index
+
+    def reset(self):
+        self._index = None
+
+
+_loader = AutocompleteLoader()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """Autocomplete index of the current reference snapshot"""
+    return _loader.get()
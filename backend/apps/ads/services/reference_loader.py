@@ -0,0 +1,276 @@
+"""
+Diffing loader for car reference data (vehicle types, marks, models).
+
+The reference CSV (vehicle type, mark, model per row) is staged into a
+temporary table - with COPY on PostgreSQL - and compared with the reference
+tables in a handful of set-based statements: missing rows are inserted, rows
+that reappear are reactivated and rows that left the file are deactivated
+(``is_active = false``; ads keep pointing at them). Everything runs in one
+transaction that only touches changed rows, so a rerun over unchanged data is
+a few index lookups and does not bump the reference version.
+"""
+import csv
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from apps.ads.models.reference import CarMarkModel, CarModel, VehicleTypeModel
+from apps.ads.services.reference_snapshot import bump_reference_version
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = 'car_reference_staging'
+SAMPLE_SIZE = 10
+
+VEHICLE_TYPES = {
+    'Легкові': {'slug': 'cars', 'description': 'Легкові автомобілі', 'icon': 'car', 'is_popular': True, 'sort_order': 1},
+    'Мото': {'slug': 'motorcycles', 'description': 'Мотоцикли', 'icon': 'motorcycle', 'is_popular': True, 'sort_order': 2},
+    'Вантажівки': {'slug': 'trucks', 'description': 'Вантажні автомобілі', 'icon': 'truck', 'is_popular': True, 'sort_order': 3},
+    'Причепи': {'slug': 'trailers', 'description': 'Причепи', 'icon': 'trailer', 'is_popular': False, 'sort_order': 4},
+    'Спецтехніка': {'slug': 'special', 'description': 'Спеціальна техніка', 'icon': 'construction', 'is_popular': False, 'sort_order': 5},
+    'Сільгосптехніка': {'slug': 'agricultural', 'description': 'Сільгосптехніка', 'icon': 'tractor', 'is_popular': False, 'sort_order': 6},
+    'Автобуси': {'slug': 'buses', 'description': 'Автобуси', 'icon': 'bus', 'is_popular': False, 'sort_order': 7},
+    'Водний транспорт': {'slug': 'boats', 'description': 'Водний транспорт', 'icon': 'boat', 'is_popular': False, 'sort_order': 8},
+}
+POPULAR_MARKS = (
+    'Toyota', 'BMW', 'Mercedes-Benz', 'Audi', 'Volkswagen', 'Ford',
+    'Honda', 'Nissan', 'Hyundai', 'Kia', 'Mazda', 'Subaru',
+    'Lexus', 'Volvo', 'Peugeot', 'Renault', 'Opel', 'Skoda',
+    'Mitsubishi', 'Suzuki', 'Lada', 'ВАЗ', 'ГАЗ', 'УАЗ',
+)
+POPULAR_MODEL_KEYWORDS = (
+    'Camry', 'Corolla', 'RAV4', 'Prius', 'Golf', 'Passat',
+    'Focus', 'Fiesta', 'Civic', 'Accord', 'CR-V',
+)
+
+
+def default_csv_path() -> str:
+    return os.path.join(settings.BASE_DIR, 'core', 'data', 'cars_dict_output.csv')
+
+
+class CarReferenceLoader:
+    """
+    Apply the reference CSV as a diff.
+
+    Args:
+        csv_path: CSV with rows "vehicle type, mark, model" (default: core/data/cars_dict_output.csv)
+        dry_run: Compute the report and roll the transaction back
+    """
+
+    def __init__(self, csv_path: Optional[str] = None, dry_run: bool = False):
+        self.csv_path = csv_path or default_csv_path()
+        self.dry_run = dry_run
+
+        self.vehicle_types = VehicleTypeModel._meta.db_table
+        self.marks = CarMarkModel._meta.db_table
+        self.models = CarModel._meta.db_table
+        self.mark_fk = CarModel._meta.get_field('mark').column
+        self.mark_type_fk = CarMarkModel._meta.get_field('vehicle_type').column
+
+    # ------------------------------------------------------------------
+    # Staging
+    # ------------------------------------------------------------------
+
+    def _stage(self, cursor):
+        cursor.execute(f'DROP TABLE IF EXISTS {STAGING_TABLE}')
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {STAGING_TABLE} '
+            f'(vehicle_type varchar(100), mark varchar(100), model varchar(100))'
+        )
+
+        with open(self.csv_path, 'r', encoding='utf-8') as csv_file:
+            if connection.vendor == 'postgresql':
+                cursor.copy_expert(
+                    f'COPY {STAGING_TABLE} (vehicle_type, mark, model) FROM STDIN WITH (FORMAT csv)',
+                    csv_file,
+                )
+            else:
+                rows = [row[:3] for row in csv.reader(csv_file) if len(row) >= 3]
+                cursor.executemany(
+                    f'INSERT INTO {STAGING_TABLE} (vehicle_type, mark, model) VALUES (%s, %s, %s)', rows
+                )
+
+        cursor.execute(
+            f'UPDATE {STAGING_TABLE} SET vehicle_type = TRIM(vehicle_type), mark = TRIM(mark), model = TRIM(model)'
+        )
+        cursor.execute(
+            f"DELETE FROM {STAGING_TABLE} WHERE COALESCE(vehicle_type, '') = '' "
+            f"OR COALESCE(mark, '') = '' OR COALESCE(model, '') = ''"
+        )
+        cursor.execute(f'CREATE INDEX {STAGING_TABLE}_idx ON {STAGING_TABLE} (vehicle_type, mark, model)')
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'ANALYZE {STAGING_TABLE}')
+
+        cursor.execute(f'SELECT COUNT(*) FROM {STAGING_TABLE}')
+        return cursor.fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Diff queries. Each returns (SELECT of names for the report, DML)
+    # ------------------------------------------------------------------
+
+    def _marks_in_file(self, mark_alias: str) -> str:
+        """Condition: the mark row is present in the staging table"""
+        return (
+            f'EXISTS (SELECT 1 FROM {STAGING_TABLE} s JOIN {self.vehicle_types} vt ON vt.name = s.vehicle_type '
+            f'WHERE vt.id = {mark_alias}.{self.mark_type_fk} AND s.mark = {mark_alias}.name)'
+        )
+
+    def _models_in_file(self, model_alias: str) -> str:
+        return (
+            f'EXISTS (SELECT 1 FROM {STAGING_TABLE} s JOIN {self.vehicle_types} vt ON vt.name = s.vehicle_type '
+            f'JOIN {self.marks} m ON m.{self.mark_type_fk} = vt.id AND m.name = s.mark '
+            f'WHERE m.id = {model_alias}.{self.mark_fk} AND s.model = {model_alias}.name)'
+        )
+
+    def _types_in_file(self) -> str:
+        """Only vehicle types present in the file are diffed (others are left alone)"""
+        return (
+            f'SELECT vt.id FROM {self.vehicle_types} vt '
+            f'WHERE vt.name IN (SELECT DISTINCT vehicle_type FROM {STAGING_TABLE})'
+        )
+
+    def _statements(self, now) -> Dict[str, tuple]:
+        popular_marks = ', '.join(['%s'] * len(POPULAR_MARKS))
+        popular_models = ' OR '.join(['s.model LIKE %s'] * len(POPULAR_MODEL_KEYWORDS))
+        model_keywords = [f'%{keyword}%' for keyword in POPULAR_MODEL_KEYWORDS]
+
+        new_marks = (
+            f'FROM (SELECT DISTINCT vehicle_type, mark FROM {STAGING_TABLE}) s '
+            f'JOIN {self.vehicle_types} vt ON vt.name = s.vehicle_type '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {self.marks} m '
+            f'WHERE m.{self.mark_type_fk} = vt.id AND m.name = s.mark)'
+        )
+        new_models = (
+            f'FROM (SELECT DISTINCT vehicle_type, mark, model FROM {STAGING_TABLE}) s '
+            f'JOIN {self.vehicle_types} vt ON vt.name = s.vehicle_type '
+            f'JOIN {self.marks} m ON m.{self.mark_type_fk} = vt.id AND m.name = s.mark '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {self.models} c '
+            f'WHERE c.{self.mark_fk} = m.id AND c.name = s.model)'
+        )
+        reactivated_marks = f'FROM {self.marks} m WHERE m.is_active = %s AND {self._marks_in_file("m")}'
+        deactivated_marks = (
+            f'FROM {self.marks} m WHERE m.is_active = %s AND m.{self.mark_type_fk} IN ({self._types_in_file()}) '
+            f'AND NOT {self._marks_in_file("m")}'
+        )
+        reactivated_models = f'FROM {self.models} c WHERE c.is_active = %s AND {self._models_in_file("c")}'
+        deactivated_models = (
+            f'FROM {self.models} c WHERE c.is_active = %s AND c.{self.mark_fk} IN '
+            f'(SELECT m.id FROM {self.marks} m WHERE m.{self.mark_type_fk} IN ({self._types_in_file()})) '
+            f'AND NOT {self._models_in_file("c")}'
+        )
+
+        # Order matters: models are inserted under the marks inserted before them
+        return {
+            'marks_inserted': (
+                f"SELECT s.vehicle_type || ' / ' || s.mark {new_marks}", [],
+                f'INSERT INTO {self.marks} ({self.mark_type_fk}, name, is_popular, is_active, created_at, updated_at) '
+                f'SELECT vt.id, s.mark, CASE WHEN s.mark IN ({popular_marks}) THEN %s ELSE %s END, %s, %s, %s '
+                f'{new_marks}',
+                [*POPULAR_MARKS, True, False, True, now, now],
+            ),
+            'marks_reactivated': (
+                f'SELECT m.name {reactivated_marks}', [False],
+                f'UPDATE {self.marks} SET is_active = %s, updated_at = %s WHERE id IN (SELECT m.id {reactivated_marks})',
+                [True, now, False],
+            ),
+            'marks_deactivated': (
+                f'SELECT m.name {deactivated_marks}', [True],
+                f'UPDATE {self.marks} SET is_active = %s, updated_at = %s WHERE id IN (SELECT m.id {deactivated_marks})',
+                [False, now, True],
+            ),
+            'models_inserted': (
+                f"SELECT s.mark || ' ' || s.model {new_models}", [],
+                f'INSERT INTO {self.models} ({self.mark_fk}, name, is_popular, is_active, created_at, updated_at) '
+                f'SELECT m.id, s.model, CASE WHEN {popular_models} THEN %s ELSE %s END, %s, %s, %s '
+                f'{new_models}',
+                [*model_keywords, True, False, True, now, now],
+            ),
+            'models_reactivated': (
+                f'SELECT c.name {reactivated_models}', [False],
+                f'UPDATE {self.models} SET is_active = %s, updated_at = %s WHERE id IN (SELECT c.id {reactivated_models})',
+                [True, now, False],
+            ),
+            'models_deactivated': (
+                f'SELECT c.name {deactivated_models}', [True],
+                f'UPDATE {self.models} SET is_active = %s, updated_at = %s WHERE id IN (SELECT c.id {deactivated_models})',
+                [False, now, True],
+            ),
+        }
+
+    def _create_vehicle_types(self, cursor) -> List[str]:
+        cursor.execute(
+            f'SELECT DISTINCT vehicle_type FROM {STAGING_TABLE} '
+            f'WHERE vehicle_type NOT IN (SELECT name FROM {self.vehicle_types})'
+        )
+        names = sorted(row[0] for row in cursor.fetchall())
+        taken = set(VehicleTypeModel.objects.values_list('slug', flat=True))
+        vehicle_types = []
+        for name in names:
+            data = dict(VEHICLE_TYPES.get(name) or {
+                'slug': slugify(name, allow_unicode=True), 'description': name, 'icon': 'vehicle',
+                'is_popular': False, 'sort_order': 99,
+            })
+            slug, suffix = data['slug'], 2
+            while data['slug'] in taken:
+                data['slug'] = f"{slug}-{suffix}"
+                suffix += 1
+            taken.add(data['slug'])
+            vehicle_types.append(VehicleTypeModel(name=name, **data))
+        VehicleTypeModel.objects.bulk_create(vehicle_types)
+        return names
+
+    def _sample(self, cursor, sql: str, params: Iterable) -> List[str]:
+        cursor.execute(f'{sql} ORDER BY 1', list(params))
+        return [row[0] for row in cursor.fetchmany(SAMPLE_SIZE)]
+
+    # ------------------------------------------------------------------
+
+    def run(self) -> Dict:
+        """
+        Stage the CSV and apply (or preview) the diff in one transaction
+
+        Returns:
+            Dict: {'rows', 'vehicle_types_inserted', '<table>_<action>': count,
+                   'samples': {key: [names]}, 'changed', 'dry_run', 'duration_seconds'}
+        """
+        if not os.path.exists(self.csv_path):
+            raise FileNotFoundError(f"Reference CSV not found: {self.csv_path}")
+
+        started = time.monotonic()
+        report = {'dry_run': self.dry_run, 'samples': {}}
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                report['rows'] = self._stage(cursor)
+                vehicle_types = self._create_vehicle_types(cursor)
+                report['vehicle_types_inserted'] = len(vehicle_types)
+                if vehicle_types:
+                    report['samples']['vehicle_types_inserted'] = vehicle_types[:SAMPLE_SIZE]
+
+                # Dry runs apply every step too (later steps depend on earlier ones) and roll back
+                for key, (select_sql, select_params, dml_sql, dml_params) in self._statements(timezone.now()).items():
+                    if self.dry_run:
+                        report['samples'][key] = self._sample(cursor, select_sql, select_params)
+                    cursor.execute(dml_sql, dml_params)
+                    report[key] = cursor.rowcount
+
+                cursor.execute(f'DROP TABLE {STAGING_TABLE}')
+
+            report['changed'] = sum(
+                value for key, value in report.items()
+                if key.endswith(('_inserted', '_reactivated', '_deactivated'))
+            )
+            if self.dry_run:
+                transaction.set_rollback(True)
+            elif report['changed']:
+                # Raw SQL bypasses model signals
+                transaction.on_commit(bump_reference_version)
+
+        report['duration_seconds'] = round(time.monotonic() - started, 3)
+        logger.info(f"🚗 Car reference diff{' (dry run)' if self.dry_run else ''}: {report}")
+        return report
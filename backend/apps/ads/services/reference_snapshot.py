@@ -0,0 +1,215 @@
+"""
+In-process snapshot of car and geography reference data.
+
+Marks, models, generations, modifications, colors, vehicle types, regions and
+cities change a few times a year, so each process loads them once into
+read-only tuples and id maps and serves reference endpoints and name lookups
+from memory. The snapshot is rebuilt when the version key in the shared cache
+(Redis) changes; the key is bumped by model signals (admin edits) and by the
+reference seeding commands.
+"""
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from apps.ads.models.reference import (
+    CarColorModel,
+    CarGenerationModel,
+    CarMarkModel,
+    CarModel,
+    CarModificationModel,
+    CityModel,
+    RegionModel,
+    VehicleTypeModel,
+)
+from core.decorators.conditional_get import REFERENCE_DATA_VERSION_KEY, bump_version
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = REFERENCE_DATA_VERSION_KEY
+
+REFERENCE_MODELS = (
+    VehicleTypeModel,
+    CarMarkModel,
+    CarModel,
+    CarGenerationModel,
+    CarModificationModel,
+    CarColorModel,
+    RegionModel,
+    CityModel,
+)
+
+
+def _group(items: Iterable, key) -> MappingProxyType:
+    groups: Dict[int, list] = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return MappingProxyType({group_id: tuple(group) for group_id, group in groups.items()})
+
+
+def _by_id(items: Iterable) -> MappingProxyType:
+    return MappingProxyType({item.pk: item for item in items})
+
+
+class ReferenceSnapshot:
+    """
+    Read-only reference data of one version.
+
+    Lists are tuples ordered like the endpoints order them; ``*_by_id`` maps
+    include inactive marks, models, regions and cities so that ads pointing
+    to them still resolve names. Instances are shared between requests and must not be
+    modified.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.built_at = timezone.now()
+
+        self.vehicle_types = tuple(VehicleTypeModel.objects.order_by('sort_order', 'name'))
+
+        # Models come from the prefetch so that model.mark is set without extra queries
+        all_marks = tuple(
+            CarMarkModel.objects.select_related('vehicle_type')
+            .prefetch_related(Prefetch('models', queryset=CarModel.objects.order_by('name')))
+            .order_by('name')
+        )
+        all_models = tuple(sorted(
+            (model for mark in all_marks for model in mark.models.all()),
+            key=lambda model: (model.mark.name, model.name),
+        ))
+        self.marks = tuple(mark for mark in all_marks if mark.is_active)
+        self.models = tuple(model for model in all_models if model.is_active and model.mark.is_active)
+        self.generations = tuple(
+            CarGenerationModel.objects.select_related('model__mark')
+            .order_by('model__mark__name', 'model__name', '-year_start')
+        )
+        self.modifications = tuple(
+            CarModificationModel.objects.select_related('generation__model__mark')
+            .order_by('generation__model__mark__name', 'generation__model__name', 'generation__name', 'name')
+        )
+        self.colors = tuple(CarColorModel.objects.order_by('name'))
+
+        all_regions = tuple(RegionModel.objects.order_by('name'))
+        all_cities = tuple(CityModel.objects.select_related('region').order_by('name'))
+        self.regions = tuple(region for region in all_regions if region.is_active)
+        self.cities = tuple(city for city in all_cities if city.is_active)
+
+        self.vehicle_types_by_id = _by_id(self.vehicle_types)
+        self.marks_by_id = _by_id(all_marks)
+        self.models_by_id = _by_id(all_models)
+        self.generations_by_id = _by_id(self.generations)
+        self.modifications_by_id = _by_id(self.modifications)
+        self.colors_by_id = _by_id(self.colors)
+        self.regions_by_id = _by_id(all_regions)
+        self.cities_by_id = _by_id(all_cities)
+
+        self.models_by_mark = _group(self.models, lambda model: model.mark_id)
+        self.generations_by_model = _group(self.generations, lambda generation: generation.model_id)
+        self.modifications_by_generation = _group(self.modifications, lambda item: item.generation_id)
+        self.marks_by_vehicle_type = _group(self.marks, lambda mark: mark.vehicle_type_id)
+        self.cities_by_region = _group(all_cities, lambda city: city.region_id)
+
+    def __repr__(self):
+        return (
+            f"<ReferenceSnapshot v{self.version}: {len(self.marks)} marks, {len(self.models)} models, "
+            f"{len(self.regions)} regions, {len(self.cities)} cities>"
+        )
+
+    @staticmethod
+    def _lookup(mapping, pk):
+        try:
+            return mapping.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def mark(self, pk) -> Optional[CarMarkModel]:
+        return self._lookup(self.marks_by_id, pk)
+
+    def region(self, pk) -> Optional[RegionModel]:
+        return self._lookup(self.regions_by_id, pk)
+
+    def city(self, pk) -> Optional[CityModel]:
+        return self._lookup(self.cities_by_id, pk)
+
+    def models_of(self, mark_id) -> Tuple[CarModel, ...]:
+        return self._lookup(self.models_by_mark, mark_id) or ()
+
+    def cities_of(self, region_id, active_only: bool = True) -> Tuple[CityModel, ...]:
+        cities = self._lookup(self.cities_by_region, region_id) or ()
+        if active_only:
+            return tuple(city for city in cities if city.is_active)
+        return cities
+
+    def marks_of(self, vehicle_type_id) -> Tuple[CarMarkModel, ...]:
+        return self._lookup(self.marks_by_vehicle_type, vehicle_type_id) or ()
+
+
+class ReferenceSnapshotLoader:
+    """Process-wide holder that rebuilds the snapshot when the version changes"""
+
+    def __init__(self):
+        self._snapshot: Optional[ReferenceSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def check_interval(self) -> float:
+        return getattr(settings, 'REFERENCE_SNAPSHOT_CHECK_INTERVAL', 10)
+
+    def get(self) -> ReferenceSnapshot:
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now - self._checked_at < self.check_interval:
+                return snapshot
+            version = cache.get(VERSION_CACHE_KEY) or 0
+            if snapshot is None or snapshot.version != version:
+                snapshot = ReferenceSnapshot(version)
+                self._snapshot = snapshot
+                logger.info(f"📚 Reference snapshot loaded: {snapshot!r}")
+            self._checked_at = now
+            return snapshot
+
+    def reset(self):
+        """Drop the snapshot of this process (next access rebuilds it)"""
+        self._snapshot = None
+
+
+_loader = ReferenceSnapshotLoader()
+
+
+def get_reference_snapshot() -> ReferenceSnapshot:
+    """Current reference snapshot of this process"""
+    return _loader.get()
+
+
+def bump_reference_version():
+    """Make every process rebuild its snapshot and invalidate reference ETags"""
+    bump_version(VERSION_CACHE_KEY)
+    _loader.reset()
+
+
+def _on_reference_change(sender, **kwargs):
+    # This process sees its own writes at once, other processes after commit
+    _loader.reset()
+    transaction.on_commit(bump_reference_version)
+
+
+def connect_invalidation_signals():
+    """Bump the snapshot version on every save/delete of a reference model"""
+    for model in REFERENCE_MODELS:
+        post_save.connect(_on_reference_change, sender=model, dispatch_uid=f'reference_snapshot_save_{model.__name__}')
+        post_delete.connect(_on_reference_change, sender=model, dispatch_uid=f'reference_snapshot_delete_{model.__name__}')
@@ -0,0 +1,409 @@
+"""
+Streaming heavy-hitter tracking for search queries and filter combinations.
+
+Every search increments per-bucket counters (hour / day, per region and
+platform-wide) in bounded Redis sorted sets, so "popular" and "trending"
+reads cost O(K) instead of a GROUP BY over ``SearchQuery``. When the cache
+backend is not Redis the tracker falls back to an in-process Space-Saving
+top-K structure with the same interface.
+
+A periodic task persists the current top-K of every bucket into
+``SearchTrendSnapshot`` so dashboards keep history after buckets expire.
+"""
+import hashlib
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+# Query-string parameters that describe paging/presentation, not the search itself
+IGNORED_FILTER_KEYS = frozenset({
+    'page', 'page_size', 'ordering', 'format', 'limit', 'offset',
+    'search', 'q', 'query', 'lang', 'locale', 'invalidate', '_',
+})
+
+ALL_REGIONS = 'all'
+KINDS = ('query', 'filters')
+PERIODS = {
+    # period: (bucket format, bucket length, retention)
+    'hour': ('%Y%m%d%H', timedelta(hours=1), timedelta(hours=48)),
+    'day': ('%Y%m%d', timedelta(days=1), timedelta(days=35)),
+}
+
+# (bucket key, member, retention)
+_Entry = Tuple[str, str, timedelta]
+
+
+def normalize_query(query_text: Optional[str]) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a counter."""
+    if not query_text:
+        return ''
+    return ' '.join(str(query_text).lower().split())[:200]
+
+
+def canonical_filters(filters: Optional[Dict[str, Any]]) -> str:
+    """
+    Build a stable key for a filter combination.
+
+    Empty values and paging/ordering parameters are dropped and keys are
+    sorted, so ``?mark=5&year_from=2015`` and ``?year_from=2015&mark=5``
+    count as the same combination.
+    """
+    if not filters:
+        return ''
+    items = []
+    for key, value in filters.items():
+        if key in IGNORED_FILTER_KEYS or value in (None, '', [], {}):
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ','.join(sorted(str(v) for v in value))
+        items.append((str(key), str(value)))
+    if not items:
+        return ''
+    return json.dumps(sorted(items), ensure_ascii=False, separators=(',', ':'))
+
+
+def extract_region(filters: Optional[Dict[str, Any]]) -> str:
+    """Region dimension of a search: region id/name from filters or ``all``."""
+    if not filters:
+        return ALL_REGIONS
+    region = filters.get('region_id') or filters.get('region')
+    if isinstance(region, (list, tuple)):
+        region = region[0] if region else None
+    return str(region).strip().lower() if region else ALL_REGIONS
+
+
+def bucket_start(period: str, moment: Optional[datetime] = None) -> datetime:
+    """Start of the hour/day bucket that contains ``moment``."""
+    moment = moment or timezone.now()
+    if period == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class _SpaceSavingCounter:
+    """
+    Bounded top-K counter (Space-Saving algorithm).
+
+    Keeps at most ``capacity`` terms; a new term evicts the current minimum and
+    inherits its count, which over-estimates by at most that minimum.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, float] = {}
+
+    def add(self, term: str, amount: float = 1.0) -> None:
+        if term in self.counts or len(self.counts) < self.capacity:
+            self.counts[term] = self.counts.get(term, 0.0) + amount
+            return
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        self.counts[term] = floor + amount
+
+
+class _MemoryTrendStore:
+    """Per-process fallback store used when Redis is not the cache backend."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buckets: Dict[str, _SpaceSavingCounter] = {}
+        self._regions: Dict[str, set] = defaultdict(set)
+        self._expires: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, entries: Iterable[_Entry], regions: Iterable[_Entry] = ()) -> None:
+        now = timezone.now()
+        with self._lock:
+            for key, term, retention in entries:
+                counter = self._buckets.get(key)
+                if counter is None:
+                    counter = self._buckets[key] = _SpaceSavingCounter(self.capacity)
+                counter.add(term)
+                self._expires[key] = now + retention
+            for key, region, retention in regions:
+                self._regions[key].add(region)
+                self._expires[key] = now + retention
+            self._evict_expired(now)
+
+    def members(self, key: str) -> List[str]:
+        with self._lock:
+            return sorted(self._regions.get(key, ()))
+
+    def top(self, keys: List[str], weights: List[float], limit: int) -> List[Tuple[str, float]]:
+        merged: Dict[str, float] = defaultdict(float)
+        with self._lock:
+            for key, weight in zip(keys, weights):
+                counter = self._buckets.get(key)
+                if counter:
+                    for term, count in counter.counts.items():
+                        merged[term] += count * weight
+        return sorted(merged.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def _evict_expired(self, now: datetime) -> None:
+        for key in [k for k, expires in self._expires.items() if expires <= now]:
+            self._buckets.pop(key, None)
+            self._regions.pop(key, None)
+            self._expires.pop(key, None)
+
+
+# Space-Saving step on a sorted set, atomically: a new term in a full bucket
+# replaces the current minimum and inherits its count (as _SpaceSavingCounter)
+SPACE_SAVING_INCREMENT = """
+local capacity = tonumber(ARGV[2])
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) or redis.call('ZCARD', KEYS[1]) < capacity then
+    redis.call('ZINCRBY', KEYS[1], 1, ARGV[1])
+    return 0
+end
+local victim = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+redis.call('ZREM', KEYS[1], victim[1])
+redis.call('ZADD', KEYS[1], tonumber(victim[2]) + 1, ARGV[1])
+return 1
+"""
+
+
+class _RedisTrendStore:
+    """Sorted-set store shared by all web workers."""
+
+    def __init__(self, client, capacity: int):
+        self.client = client
+        self.capacity = capacity
+        self._increment = client.register_script(SPACE_SAVING_INCREMENT)
+
+    def increment(self, entries: Iterable[_Entry], regions: Iterable[_Entry] = ()) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, term, retention in entries:
+            # At most ``capacity`` members, and a new term can still enter a full bucket
+            self._increment(keys=[key], args=[term, self.capacity], client=pipe)
+            pipe.expire(key, int(retention.total_seconds()))
+        for key, region, retention in regions:
+            pipe.sadd(key, region)
+            pipe.expire(key, int(retention.total_seconds()))
+        pipe.execute()
+
+    def members(self, key: str) -> List[str]:
+        return sorted(m.decode() if isinstance(m, bytes) else m for m in self.client.smembers(key))
+
+    def top(self, keys: List[str], weights: List[float], limit: int) -> List[Tuple[str, float]]:
+        if len(keys) == 1:
+            rows = self.client.zrevrange(keys[0], 0, limit - 1, withscores=True)
+        else:
+            digest = hashlib.md5('|'.join(f'{k}*{w}' for k, w in zip(keys, weights)).encode()).hexdigest()[:16]
+            dest = f'search_trends:union:{digest}'
+            pipe = self.client.pipeline(transaction=False)
+            pipe.zunionstore(dest, dict(zip(keys, weights)))
+            pipe.expire(dest, 60)
+            pipe.zrevrange(dest, 0, limit - 1, withscores=True)
+            rows = pipe.execute()[-1]
+        return [(term.decode() if isinstance(term, bytes) else term, score) for term, score in rows]
+
+
+class SearchTrendsTracker:
+    """
+    Heavy-hitter tracker for searches.
+
+    Usage:
+        SearchTrendsTracker.record('bmw x5', {'region': 3, 'year_from': 2018})
+        SearchTrendsTracker.top('query', period='hour', region='3', limit=10)
+        SearchTrendsTracker.trending('filters', period='hour', window=24)
+    """
+
+    KEY_PREFIX = 'search_trends'
+    DEFAULT_LIMIT = 10
+
+    _store = None
+    _store_lock = threading.Lock()
+
+    @classmethod
+    def capacity(cls) -> int:
+        """Number of distinct terms retained per bucket."""
+        return int(getattr(settings, 'SEARCH_TRENDS_CAPACITY', 1000))
+
+    @classmethod
+    def get_store(cls):
+        """Lazily pick the Redis store, falling back to in-process counters."""
+        if cls._store is None:
+            with cls._store_lock:
+                if cls._store is None:
+                    try:
+                        from django_redis import get_redis_connection
+                        client = get_redis_connection('default')
+                        client.ping()
+                        cls._store = _RedisTrendStore(client, cls.capacity())
+                    except Exception as e:
+                        logger.info(f"Search trends use in-process store (Redis unavailable: {e})")
+                        cls._store = _MemoryTrendStore(cls.capacity())
+        return cls._store
+
+    @classmethod
+    def reset_store(cls) -> None:
+        """Forget the cached store (used by tests and after fork)."""
+        cls._store = None
+
+    @classmethod
+    def bucket_key(cls, kind: str, period: str, region: str, start: datetime) -> str:
+        bucket_format = PERIODS[period][0]
+        return f"{cls.KEY_PREFIX}:{kind}:{period}:{start.strftime(bucket_format)}:{region}"
+
+    @classmethod
+    def regions_key(cls, period: str, start: datetime) -> str:
+        bucket_format = PERIODS[period][0]
+        return f"{cls.KEY_PREFIX}:regions:{period}:{start.strftime(bucket_format)}"
+
+    @classmethod
+    def record(
+        cls,
+        query_text: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        region: Optional[str] = None,
+        moment: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Count one search. Never raises: tracking must not break the search itself.
+
+        Args:
+            query_text: Free-text part of the search
+            filters: Applied filters (query params or ``filters_applied`` payload)
+            region: Region dimension; derived from filters when omitted
+            moment: Event time (defaults to now)
+
+        Returns:
+            True if anything was recorded
+        """
+        terms = {'query': normalize_query(query_text), 'filters': canonical_filters(filters)}
+        if not any(terms.values()):
+            return False
+
+        region = str(region).lower() if region else extract_region(filters)
+        regions = {ALL_REGIONS, region}
+        entries, region_marks = [], []
+        for period, (_, _, retention) in PERIODS.items():
+            start = bucket_start(period, moment)
+            region_marks.append((cls.regions_key(period, start), region, retention))
+            for kind, term in terms.items():
+                if not term:
+                    continue
+                for region_key in regions:
+                    entries.append((cls.bucket_key(kind, period, region_key, start), term, retention))
+
+        try:
+            cls.get_store().increment(entries, region_marks)
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to record search trend: {e}")
+            return False
+
+    @classmethod
+    def top(
+        cls,
+        kind: str = 'query',
+        period: str = 'hour',
+        region: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+        moment: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Top-``limit`` terms of a single (current by default) bucket."""
+        return cls.trending(kind, period, region, limit, window=1, decay=1.0, moment=moment)
+
+    @classmethod
+    def trending(
+        cls,
+        kind: str = 'query',
+        period: str = 'hour',
+        region: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT,
+        window: int = 24,
+        decay: float = 0.8,
+        moment: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Exponentially decayed top-``limit`` over the last ``window`` buckets.
+
+        The current bucket has weight 1, the previous one ``decay``, then
+        ``decay ** 2`` and so on, so recent spikes outrank old volume.
+        """
+        if kind not in KINDS or period not in PERIODS:
+            raise ValueError(f"Unsupported trend kind/period: {kind}/{period}")
+
+        region = str(region).lower() if region else ALL_REGIONS
+        step = PERIODS[period][1]
+        start = bucket_start(period, moment)
+        keys, weights = [], []
+        for offset in range(max(1, window)):
+            keys.append(cls.bucket_key(kind, period, region, start - step * offset))
+            weights.append(decay ** offset)
+
+        try:
+            rows = cls.get_store().top(keys, weights, limit)
+        except Exception as e:
+            logger.warning(f"Failed to read search trends: {e}")
+            return []
+        return [cls.format_item(kind, term, score) for term, score in rows]
+
+    @staticmethod
+    def format_item(kind: str, term: str, score: float) -> Dict[str, Any]:
+        item = {'term': term, 'score': round(float(score), 3)}
+        if kind == 'filters':
+            try:
+                item['filters'] = dict(json.loads(term))
+            except (TypeError, ValueError):
+                item['filters'] = {}
+        return item
+
+    @classmethod
+    def active_regions(cls, period: str = 'hour', moment: Optional[datetime] = None) -> List[str]:
+        """Regions that had at least one search in the bucket containing ``moment``."""
+        try:
+            return cls.get_store().members(cls.regions_key(period, bucket_start(period, moment)))
+        except Exception as e:
+            logger.warning(f"Failed to read search trend regions: {e}")
+            return []
+
+    @classmethod
+    def snapshot(
+        cls,
+        period: str = 'hour',
+        limit: int = 50,
+        moment: Optional[datetime] = None,
+    ) -> int:
+        """
+        Persist the top-``limit`` of the bucket containing ``moment`` into
+        ``SearchTrendSnapshot`` (at most K rows per kind and region).
+
+        Returns:
+            Number of snapshot rows written
+        """
+        from ..models.analytics_models import SearchTrendSnapshot
+
+        start = bucket_start(period, moment)
+        rows = []
+        for region in set(cls.active_regions(period, moment)) | {ALL_REGIONS}:
+            for kind in KINDS:
+                for rank, item in enumerate(cls.top(kind, period, region, limit, moment), start=1):
+                    rows.append(SearchTrendSnapshot(
+                        period=period,
+                        bucket_start=start,
+                        region=region,
+                        kind=kind,
+                        term=item['term'],
+                        score=item['score'],
+                        rank=rank,
+                    ))
+        if not rows:
+            return 0
+
+        SearchTrendSnapshot.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['period', 'bucket_start', 'region', 'kind', 'term'],
+            update_fields=['score', 'rank'],
+        )
+        return len(rows)
@@ -57,8 +57,11 @@ def seed_reference_data(sender, **kwargs):
 
 def seed_on_startup():
     """
-    Function to call during app startup for additional seeding if needed.
-    Can be called from apps.py ready() method.
+    Top up reference data when the regions table is short.
+
+    Not part of the boot path: AppConfig.ready() must stay free of database
+    queries and management commands so every web and Celery process starts
+    fast. Run it from a deploy step (``init_project_data``) or a shell.
     """
     try:
         from apps.ads.models.reference import RegionModel, CityModel
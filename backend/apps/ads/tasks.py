@@ -6,10 +6,8 @@ from typing import Optional, Dict, Any
 from celery import shared_task
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from pika import ConnectionParameters, BasicProperties
-from pika.exceptions import AMQPConnectionError, AMQPChannelError
 
-from core.services.pika_helper import ConnectionFactory
+from core.services.outbox import enqueue
 from core.schemas.moderation import (
     ModerationNotificationData,
     UserModerationNotification,
@@ -226,67 +224,34 @@ def _publish_to_exchange(
     priority: int = 5
 ) -> bool:
     """
-    Helper function to publish message to RabbitMQ exchange.
-    
+    Helper function to queue a message for a RabbitMQ exchange.
+
+    The message goes to the transactional outbox and is published by the
+    outbox relay after the current transaction commits.
+
     Args:
         exchange: Exchange name
         routing_key: Routing key
         message: Message body (JSON)
         priority: Message priority (1-10)
-        
+
     Returns:
-        bool: True if published successfully
+        bool: True once the message is queued
     """
-    max_retries = 3
-    connection_params = ConnectionParameters('rabbitmq')
-    
-    for attempt in range(max_retries):
-        try:
-            factory = ConnectionFactory(
-                parameters=connection_params,
-                queue_name="temp_publish"
-            )
-            
-            with factory.get_connection() as connection:
-                channel = connection.channel()
-                
-                # Ensure exchange exists
-                channel.exchange_declare(
-                    exchange=exchange,
-                    exchange_type='topic',
-                    durable=True
-                )
-                
-                # Publish message
-                channel.basic_publish(
-                    exchange=exchange,
-                    routing_key=routing_key,
-                    body=message.encode('utf-8'),
-                    properties=BasicProperties(
-                        delivery_mode=2,  # Persistent
-                        priority=min(max(1, priority), 10),
-                        content_type='application/json',
-                        headers={
-                            'notification_type': 'moderation',
-                            'routing_key': routing_key,
-                            'exchange': exchange
-                        }
-                    )
-                )
-                
-                logger.info(f"Published to {exchange}:{routing_key}")
-                return True
-                
-        except (AMQPConnectionError, AMQPChannelError) as e:
-            logger.warning(f"RabbitMQ error (attempt {attempt + 1}): {e}")
-            if attempt == max_retries - 1:
-                logger.error(f"Failed to publish after {max_retries} attempts")
-                return False
-        except Exception as e:
-            logger.error(f"Unexpected error publishing: {e}")
-            return False
-    
-    return False
+    enqueue(
+        event_type='moderation.notification',
+        exchange=exchange,
+        routing_key=routing_key,
+        body=message,
+        priority=priority,
+        exchange_type='topic',
+        headers={
+            'notification_type': 'moderation',
+            'routing_key': routing_key,
+            'exchange': exchange
+        },
+    )
+    return True
 
 
 # Convenience functions for common notifications
@@ -7,12 +7,20 @@ notification tasks used by the rest of the codebase via::
 
 All analytics-related tasks live in the submodule
 ``apps.ads.tasks.analytics_tasks`` and are referenced there directly
-by Celery beat and statistics views.
+by Celery beat and statistics views. The batch moderation and digest
+flush tasks and the outbox relay tasks are re-exported so that worker
+autodiscovery registers them.
 """
 
-from .moderation_notifications import notify_ad_status_changed, notify_bulk_status_changed
+from .moderation_notifications import flush_status_digests, notify_ad_status_changed, notify_bulk_status_changed
+from .moderation_tasks import moderate_ads_batch
+from .outbox_tasks import cleanup_outbox, relay_outbox
 
 __all__ = [
     "notify_ad_status_changed",
     "notify_bulk_status_changed",
+    "flush_status_digests",
+    "moderate_ads_batch",
+    "relay_outbox",
+    "cleanup_outbox",
 ]
@@ -275,3 +275,57 @@ def generate_daily_report():
             'success': False,
             'error': str(e)
         }
+
+@shared_task
+def snapshot_search_trends(periods=('hour', 'day'), limit=50):
+    """
+    Сохраняет текущий топ-K поисковых запросов и фильтров в SearchTrendSnapshot
+    """
+    try:
+        from apps.ads.services.search_trends import PERIODS, SearchTrendsTracker
+
+        now = timezone.now()
+        written = {}
+        for period in periods:
+            # Предыдущий бакет дописываем финальными значениями после его закрытия
+            previous = now - PERIODS[period][1]
+            written[period] = (
+                SearchTrendsTracker.snapshot(period=period, limit=limit, moment=previous)
+                + SearchTrendsTracker.snapshot(period=period, limit=limit, moment=now)
+            )
+
+        logger.info(f"[Analytics Task] ✅ Search trend snapshots written: {written}")
+
+        return {
+            'success': True,
+            'written': written
+        }
+
+    except Exception as e:
+        logger.error(f"[Analytics Task] ❌ Error snapshotting search trends: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+@shared_task(bind=True, max_retries=3)
+def update_user_behavior_summaries(self, chunk_size=50000, max_chunks=None):
+    """
+    Инкрементально обновляет UserBehaviorSummary по событиям после водяного знака
+    """
+    try:
+        from apps.ads.services.behavior_summary import UserBehaviorSummaryEngine
+
+        stats = UserBehaviorSummaryEngine(chunk_size=chunk_size).run(max_chunks=max_chunks)
+
+        logger.info(f"[Analytics Task] ✅ User behavior summaries updated: {stats}")
+
+        return {
+            'success': True,
+            'stats': stats
+        }
+
+    except Exception as exc:
+        logger.error(f"[Analytics Task] ❌ Error updating behavior summaries: {str(exc)}")
+        # Прогресс сохранен по чанкам, повтор продолжит с последнего водяного знака
+        raise self.retry(exc=exc, countdown=60)
@@ -14,10 +14,8 @@ from typing import Optional, Dict, Any
 from celery import shared_task
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from pika import ConnectionParameters, BasicProperties
-from pika.exceptions import AMQPConnectionError, AMQPChannelError
 
-from core.services.pika_helper import ConnectionFactory
+from core.services.outbox import enqueue
 from core.schemas.moderation import (
     ModerationNotificationData,
     UserModerationNotification,
@@ -221,106 +219,56 @@ def notify_ad_status_changed(ad_id: int, user_id: int, new_status: str, reason:
 
 @shared_task
 def notify_bulk_status_changed(ad_ids: list[int], new_status: str, reason: str = ""):
-    """Notify users about bulk status changes."""
-    from ..models import CarAd  # type: ignore
-
-    # Get all affected ads with their owners
-    ads = CarAd.objects.filter(id__in=ad_ids).select_related("account__user")
-
-    # Group by user to avoid duplicate notifications
-    user_ads: Dict[int, list[int]] = {}
-    for ad in ads:
-        user_id = ad.account.user.id
-        user_ads.setdefault(user_id, []).append(ad.id)
-
-    # Send notifications to each user
-    task_ids = []
-    for user_id, user_ad_ids in user_ads.items():
-        if len(user_ad_ids) == 1:
-            # Single ad notification
-            task = notify_ad_status_changed.delay(
-                ad_id=user_ad_ids[0],
-                user_id=user_id,
-                new_status=new_status,
-                reason=reason,
-            )
-        else:
-            # Multiple ads notification
-            message = f"Статус {len(user_ad_ids)} ваших оголошень змінено на {new_status}"
-            if reason:
-                message += f". Причина: {reason}"
-
-            task = send_user_moderation_notification.delay(
-                ad_id=user_ad_ids[0],  # Use first ad ID as reference
-                action="bulk_status_change",
-                status=new_status,
-                user_id=user_id,
-                reason=message,
-                details={
-                    "bulk_operation": True,
-                    "affected_ads": user_ad_ids,
-                    "new_status": new_status,
-                    "reason": reason,
-                },
-            )
-
-        task_ids.append(task.id)
+    """Notify users and managers about bulk status changes.
+
+    Changes are buffered per time window and sent as one digest per
+    recipient by ``flush_status_digests`` (see
+    ``apps.ads.services.notification_batching``) instead of one message
+    per ad and per manager.
+    """
+    from ..services.notification_batching import NotificationBatcher
+
+    batcher = NotificationBatcher()
+    bucket = batcher.add(ad_ids, new_status, reason)
 
     return {
-        "task_ids": task_ids,
-        "affected_users": len(user_ads),
+        "window_seconds": batcher.window,
+        "bucket": bucket,
         "total_ads": len(ad_ids),
     }
 
 
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def flush_status_digests(self, window_seconds: int, bucket: int):
+    """Publish the buffered status changes of a closed window as digests."""
+    from ..services.notification_batching import NotificationBatcher
+
+    try:
+        return NotificationBatcher(window_seconds=window_seconds).flush(bucket)
+    except Exception as exc:  # pragma: no cover - Celery retry path
+        logger.error("Error flushing status digests for window %s: %s", bucket, exc)
+        raise self.retry(exc=exc)
+
+
 def _publish_to_exchange(
     exchange: str,
     routing_key: str,
     message: str,
     priority: int = 5,
 ) -> bool:
-    """Helper function to publish message to RabbitMQ exchange."""
-    max_retries = 3
-    connection_params = ConnectionParameters("rabbitmq")
-
-    for attempt in range(max_retries):
-        try:
-            factory = ConnectionFactory(
-                parameters=connection_params,
-                queue_name="temp_publish",
-            )
-
-            with factory.get_connection() as connection:
-                channel = connection.channel()
-
-                # Ensure exchange exists
-                channel.exchange_declare(
-                    exchange=exchange,
-                    exchange_type="topic",
-                    durable=True,
-                )
-
-                # Publish message
-                properties = BasicProperties(
-                    content_type="application/json",
-                    delivery_mode=2,  # persistent
-                    priority=priority,
-                )
-
-                channel.basic_publish(
-                    exchange=exchange,
-                    routing_key=routing_key,
-                    body=message.encode("utf-8"),
-                    properties=properties,
-                )
-
-            logger.info(
-                "[ModerationNotifications] Published message to %s with routing_key=%s", exchange, routing_key
-            )
-            return True
-
-        except (AMQPConnectionError, AMQPChannelError) as exc:  # pragma: no cover - network errors
-            logger.error("[ModerationNotifications] Error publishing to exchange (attempt %s/%s): %s", attempt + 1, max_retries, exc)
-
-    logger.error("[ModerationNotifications] Failed to publish message after %s attempts", max_retries)
-    return False
+    """Queue a message for a RabbitMQ topic exchange in the transactional outbox.
+
+    The message is written in the caller's transaction and published with
+    broker confirms by the outbox relay after commit, so a rolled-back change
+    never emits it and a broker outage does not lose it.
+    """
+    enqueue(
+        event_type="moderation.notification",
+        exchange=exchange,
+        routing_key=routing_key,
+        body=message,
+        priority=priority,
+        exchange_type="topic",
+    )
+    logger.info("[ModerationNotifications] Queued message to %s with routing_key=%s", exchange, routing_key)
+    return True
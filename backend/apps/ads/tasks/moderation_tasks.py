@@ -0,0 +1,57 @@
+"""
+Celery задачи пакетной модерации объявлений
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=2)
+def moderate_ads_batch(
+    self,
+    ad_ids=None,
+    statuses=('pending',),
+    concurrency=8,
+    rate_limit=5.0,
+    batch_size=500,
+    fake_llm_latency=None,
+    notify=False,
+):
+    """
+    Повторная модерация объявлений по списку id или по статусам
+
+    Локальные проверки для всех, LLM только для спорных (пул потоков с лимитом
+    запросов), запись статусов пачками. fake_llm_latency включает локальную
+    заглушку LLM вместо провайдера.
+    """
+    try:
+        from apps.ads.models import CarAd
+        from apps.ads.services.batch_moderation import BatchModerationPipeline, FakeLLMModerator
+
+        ads = CarAd.objects.filter(id__in=ad_ids) if ad_ids else CarAd.objects.filter(status__in=statuses)
+        llm = FakeLLMModerator(latency=fake_llm_latency) if fake_llm_latency is not None else None
+
+        pipeline = BatchModerationPipeline(
+            llm=llm, concurrency=concurrency, rate_limit=rate_limit, batch_size=batch_size
+        )
+        stats = pipeline.run(ads)
+
+        if notify:
+            from .moderation_notifications import notify_bulk_status_changed
+
+            for status, changed_ids in pipeline.changed.items():
+                notify_bulk_status_changed.delay(changed_ids, status, reason="Повторна модерація")
+
+        logger.info(f"[Moderation Task] ✅ Batch moderation done: {stats}")
+
+        return {
+            'success': True,
+            'stats': stats
+        }
+
+    except Exception as exc:
+        logger.error(f"[Moderation Task] ❌ Error in batch moderation: {str(exc)}")
+        # Уже записанные пачки не откатываются; повтор пересчитает только изменившиеся
+        raise self.retry(exc=exc, countdown=120)
@@ -0,0 +1,38 @@
+"""
+Celery задачи transactional outbox: отправка событий и очистка
+"""
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def relay_outbox(max_batches=None):
+    """
+    Отправить готовые события outbox в RabbitMQ
+
+    Запускается после коммита, записавшего событие, и по расписанию (если
+    запуск после коммита не удался или событие ждет повтора). Параллельные
+    запуски безопасны: строки выбираются с SKIP LOCKED.
+    """
+    from core.services.outbox import OutboxRelay, lag_is_high, outbox_metrics
+
+    stats = OutboxRelay().drain(max_batches=max_batches)
+    metrics = outbox_metrics()
+    if lag_is_high(metrics):
+        logger.warning(
+            f"[Outbox] ⚠️ Lag {metrics['lag_seconds']}s: {metrics['pending']} pending, "
+            f"{metrics['failing']} failing"
+        )
+    return {**stats, **metrics}
+
+
+@shared_task
+def cleanup_outbox(retention_hours=None):
+    """Удалить отправленные события старше срока хранения"""
+    from core.services.outbox import purge_sent
+
+    deleted = purge_sent(retention_hours)
+    return {'deleted': deleted}
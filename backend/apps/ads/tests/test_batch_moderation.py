@@ -0,0 +1,121 @@
+"""
+Tests for the staged batch moderation pipeline.
+"""
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from apps.accounts.models import AddsAccount
+from apps.ads.models import CarAd
+from apps.ads.models.reference import CarMarkModel, CityModel, RegionModel, VehicleTypeModel
+from apps.ads.services.batch_moderation import BatchModerationPipeline, FakeLLMModerator, RateLimiter
+from apps.ads.services.moderation import ModerationResult
+from core.enums.ads import AccountTypeEnum, AdStatusEnum
+
+User = get_user_model()
+
+
+class BatchModerationPipelineTest(TestCase):
+    """Test stage routing, bulk writes and the fake LLM"""
+
+    def setUp(self):
+        user = User.objects.create_user(email='dealer@test.com', password='testpass123')
+        admin = User.objects.create_superuser(email='admin@test.com', password='testpass123')
+        self.account = AddsAccount.objects.create(
+            user=user, account_type=AccountTypeEnum.PREMIUM, organization_name='Dealer'
+        )
+        self.admin_account = AddsAccount.objects.create(
+            user=admin, account_type=AccountTypeEnum.PREMIUM, organization_name='Admin'
+        )
+        vehicle_type = VehicleTypeModel.objects.create(name='Легковий автомобіль')
+        self.mark = CarMarkModel.objects.create(name='BMW', vehicle_type=vehicle_type)
+        self.region = RegionModel.objects.create(name='Київська область')
+        self.city = CityModel.objects.create(name='Київ', region=self.region)
+
+        self.clean = self.create_ad('BMW X5', 'Продам, дизель, пробег 120000')
+        self.profane = self.create_ad('BMW X5', 'Ну ты и сука')
+        self.phone = self.create_ad('Samsung Galaxy', 'Телефон в гарному стані')
+        self.vague = self.create_ad('Гарний стан', 'Один власник')
+        self.admin_ad = self.create_ad('Тест', 'Ну ты и сука', account=self.admin_account)
+
+    def create_ad(self, title, description, account=None):
+        return CarAd.objects.create(
+            title=title,
+            description=description,
+            price=Decimal('20000'),
+            currency='USD',
+            account=account or self.account,
+            mark=self.mark,
+            model='X5',
+            region=self.region,
+            city=self.city,
+            status=AdStatusEnum.PENDING,
+        )
+
+    def test_only_ambiguous_ads_reach_the_llm(self):
+        """Local checks decide clear cases; the LLM sees the rest; statuses are written"""
+        llm = FakeLLMModerator(latency=0)
+        stats = BatchModerationPipeline(llm=llm, rate_limit=None).run(CarAd.objects.all())
+
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(
+            (stats['ads'], stats['bypassed'], stats['local_decided'], stats['llm_calls'], stats['updated']),
+            (5, 1, 2, 2, 5),
+        )
+        statuses = dict(CarAd.objects.values_list('id', 'status'))
+        self.assertEqual(statuses[self.clean.id], AdStatusEnum.ACTIVE)
+        self.assertEqual(statuses[self.profane.id], AdStatusEnum.NEEDS_REVIEW)
+        self.assertEqual(statuses[self.phone.id], AdStatusEnum.NEEDS_REVIEW)
+        self.assertEqual(statuses[self.vague.id], AdStatusEnum.ACTIVE)
+        self.assertEqual(statuses[self.admin_ad.id], AdStatusEnum.ACTIVE)
+
+        phone = CarAd.objects.get(id=self.phone.id)
+        self.assertTrue(phone.needs_manual_review)
+        self.assertIsNotNone(phone.manual_review_requested_at)
+        self.assertTrue(CarAd.objects.get(id=self.profane.id).needs_manual_review)
+
+    def test_llm_fallback_goes_to_manual_review(self):
+        """An auto-approval from the unavailable-LLM fallback is not trusted"""
+        def unavailable(text, title=None):
+            return ModerationResult.APPROVED, {'reason': 'Auto-approved (LLM disabled or unavailable)', 'fallback': True}
+
+        BatchModerationPipeline(llm=unavailable, rate_limit=None).run(CarAd.objects.filter(id=self.phone.id))
+        phone = CarAd.objects.get(id=self.phone.id)
+        self.assertEqual(phone.status, AdStatusEnum.NEEDS_REVIEW)
+        self.assertTrue(phone.needs_manual_review)
+
+    def test_dry_run_and_unchanged_ads(self):
+        """Dry run writes nothing; a second run skips ads whose decision did not change"""
+        pipeline = BatchModerationPipeline(llm=FakeLLMModerator(latency=0), rate_limit=None, batch_size=2)
+        stats = pipeline.run(CarAd.objects.all(), dry_run=True)
+        self.assertEqual(stats['updated'], 0)
+        self.assertFalse(CarAd.objects.exclude(status=AdStatusEnum.PENDING).exists())
+
+        pipeline.run(CarAd.objects.all())
+        self.assertEqual(set(pipeline.changed), {AdStatusEnum.ACTIVE, AdStatusEnum.NEEDS_REVIEW})
+        stats = BatchModerationPipeline(llm=FakeLLMModerator(latency=0), rate_limit=None).run(CarAd.objects.all())
+        self.assertEqual(stats['updated'], 0)
+
+    def test_llm_calls_run_concurrently(self):
+        """Ambiguous ads are checked in parallel by the worker pool"""
+        for index in range(6):
+            self.create_ad(f'Лот {index}', 'Один власник')
+        llm = FakeLLMModerator(latency=0.1)
+        stats = BatchModerationPipeline(llm=llm, concurrency=8, rate_limit=None).run(CarAd.objects.all())
+        self.assertEqual(llm.calls, 8)
+        self.assertLess(stats['stage_seconds']['llm'], 0.4)
+
+
+class RateLimiterTest(SimpleTestCase):
+    """Test the token bucket"""
+
+    def test_limits_calls_per_second(self):
+        """After the burst, calls are spaced by 1/rate"""
+        limiter = RateLimiter(rate=50, burst=1)
+        started = time.monotonic()
+        for _ in range(6):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
+        self.assertGreater(limiter.waited, 0)
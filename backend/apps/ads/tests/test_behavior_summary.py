@@ -0,0 +1,78 @@
+"""
+Tests for incremental UserBehaviorSummary computation.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.ads.models import AnalyticsBatchWatermark, PageView, UserBehaviorSummary, VisitorSession
+from apps.ads.services.behavior_summary import UserBehaviorSummaryEngine
+
+User = get_user_model()
+
+
+class UserBehaviorSummaryEngineTest(TestCase):
+    """Test watermark-based batch aggregation"""
+
+    def setUp(self):
+        """Create a user with two sessions and some page views in the past"""
+        self.user = User.objects.create_user(email='behavior@test.com', password='testpass123')
+        self.past = timezone.now() - timedelta(hours=1)
+        self.sessions = [
+            self._session(device_type='mobile', duration=timedelta(minutes=4)),
+            self._session(device_type='desktop', duration=timedelta(minutes=2)),
+        ]
+        for session in self.sessions:
+            self._page_views(session, 3)
+
+    def _session(self, device_type, duration):
+        return VisitorSession.objects.create(
+            user=self.user,
+            ip_address='127.0.0.1',
+            user_agent='test',
+            device_type=device_type,
+            started_at=self.past,
+            ended_at=self.past + duration,
+            total_duration=duration,
+        )
+
+    def _page_views(self, session, count):
+        PageView.objects.bulk_create([
+            PageView(session=session, user=self.user, url='http://test/', page_type='search', viewed_at=self.past)
+            for _ in range(count)
+        ])
+
+    def test_full_run_builds_summary(self):
+        """First run aggregates all events per user"""
+        UserBehaviorSummaryEngine(chunk_size=2).run()
+
+        summary = UserBehaviorSummaryEngine.get_summary(self.user.id)
+        self.assertEqual(summary['total_sessions'], 2)
+        self.assertEqual(summary['total_page_views'], 6)
+        self.assertEqual(summary['avg_pages_per_session'], 3.0)
+        self.assertEqual(summary['avg_session_duration_seconds'], 180.0)
+        self.assertEqual(summary['device_preferences'], {'mobile': 1, 'desktop': 1})
+
+    def test_rerun_is_incremental(self):
+        """A second run only processes events after the watermark"""
+        engine = UserBehaviorSummaryEngine(chunk_size=100)
+        engine.run()
+        self.assertEqual(engine.run()['page_views']['events'], 0)
+
+        self._page_views(self.sessions[0], 2)
+        stats = engine.run()
+
+        self.assertEqual(stats['page_views']['events'], 2)
+        self.assertEqual(UserBehaviorSummary.objects.get(user=self.user).total_page_views, 8)
+
+    def test_interrupted_run_resumes(self):
+        """Limiting chunks leaves a watermark that the next run continues from"""
+        engine = UserBehaviorSummaryEngine(chunk_size=4)
+        engine.run(max_chunks=1)
+        self.assertEqual(UserBehaviorSummary.objects.get(user=self.user).total_page_views, 4)
+        self.assertTrue(AnalyticsBatchWatermark.objects.filter(name='behavior_summary:page_views').exists())
+
+        engine.run()
+        self.assertEqual(UserBehaviorSummary.objects.get(user=self.user).total_page_views, 6)
@@ -0,0 +1,47 @@
+"""
+Tests for ETag / 304 handling on reference endpoints.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.ads.models.reference import CarMarkModel, VehicleTypeModel
+from apps.ads.views.reference_views import RegionListView, car_marks_choices
+
+
+class ConditionalGetTest(TestCase):
+    """Test validators derived from the reference data version"""
+
+    def setUp(self):
+        cache.clear()
+        self.vehicle_type = VehicleTypeModel.objects.create(name='Легковые', slug='cars')
+        CarMarkModel.objects.create(name='Audi', vehicle_type=self.vehicle_type)
+        self.factory = APIRequestFactory()
+
+    def test_etag_and_not_modified(self):
+        """A matching If-None-Match gets 304 without touching the database"""
+        response = car_marks_choices(self.factory.get('/marks/choices/'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertTrue(response['Cache-Control'].startswith('public'))
+
+        with self.assertNumQueries(0):
+            response = car_marks_choices(self.factory.get('/marks/choices/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        other = car_marks_choices(self.factory.get('/marks/choices/', {'vehicle_type_id': self.vehicle_type.id}))
+        self.assertNotEqual(other['ETag'], etag)
+
+    def test_reference_change_changes_etag(self):
+        """Saving a reference model invalidates previously issued ETags"""
+        view = RegionListView.as_view()
+        etag = view(self.factory.get('/regions/'))['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CarMarkModel.objects.create(name='BMW', vehicle_type=self.vehicle_type)
+
+        response = view(self.factory.get('/regions/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
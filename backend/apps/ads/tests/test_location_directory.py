@@ -0,0 +1,76 @@
+"""
+Tests for canonical region/city resolution.
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.ads.models.reference import CityModel, LocationAliasModel, RegionModel
+from apps.ads.services import location_directory, reference_snapshot
+from apps.ads.services.location_directory import (
+    CITY,
+    REGION,
+    get_location_directory,
+    location_key,
+)
+from apps.ads.views.reference_views import RegionListView
+
+
+class LocationKeyTest(TestCase):
+    """Ukrainian and Russian spellings of one place share a key"""
+
+    def test_region_and_city_keys(self):
+        pairs = [
+            ('Київська область', 'Киевская область', REGION),
+            ('Одеська область', 'Одесская область', REGION),
+            ('Миколаївська область', 'Николаевская область', REGION),
+            ('Запорізька область', 'Запорожская область', REGION),
+            ('Харків', 'Харьков', CITY),
+            ('Запоріжжя', 'Запорожье', CITY),
+        ]
+        for ukrainian, russian, kind in pairs:
+            self.assertEqual(location_key(ukrainian, kind), location_key(russian, kind), ukrainian)
+        self.assertNotEqual(location_key('Львівська область', REGION), location_key('Луганська область', REGION))
+
+
+class LocationDirectoryTest(TestCase):
+    """Test dedup, name resolution and materialization"""
+
+    def setUp(self):
+        reference_snapshot._loader.reset()
+        location_directory._loader.reset()
+        self.kyiv_region = RegionModel.objects.create(name='Київська область', code='KV')
+        self.kyiv_region_ru = RegionModel.objects.create(name='Киевская область', code='KVR')
+        self.lviv_region = RegionModel.objects.create(name='Львівська область', code='LV')
+        self.kyiv = CityModel.objects.create(name='Київ', region=self.kyiv_region)
+        self.kyiv_ru = CityModel.objects.create(name='Киев', region=self.kyiv_region_ru)
+        self.lviv = CityModel.objects.create(name='Львів', region=self.lviv_region)
+
+    def test_resolution(self):
+        directory = get_location_directory()
+        both_regions = (self.kyiv_region.id, self.kyiv_region_ru.id)
+        for value in ('Київська область', 'киевская область', 'kyivska oblast', 'київська', 'kyivska-oblast',
+                      str(self.kyiv_region_ru.id)):
+            self.assertEqual(directory.region_ids(value), both_regions, value)
+        self.assertEqual(directory.city_ids('kyiv'), (self.kyiv.id, self.kyiv_ru.id))
+        self.assertEqual(directory.city_ids('Львів', region='Київська область'), ())
+        self.assertEqual(directory.city_ids('lviv', region=self.lviv_region.id), (self.lviv.id,))
+        self.assertEqual(directory.region_ids('Атлантида'), ())
+
+    def test_region_list_is_deduplicated(self):
+        view = RegionListView.as_view()
+        response = view(APIRequestFactory().get('/regions/'))
+        self.assertEqual([region['name'] for region in response.data], ['Київська область', 'Львівська область'])
+        response = view(APIRequestFactory().get('/regions/', {'search': 'киев'}))
+        self.assertEqual([region['name'] for region in response.data], ['Київська область'])
+
+    def test_command_materializes_aliases(self):
+        call_command('build_location_aliases', stdout=StringIO())
+        self.assertTrue(LocationAliasModel.objects.filter(kind=REGION, alias='kyivska oblast').exists())
+
+        reference_snapshot._loader.reset()
+        with self.assertNumQueries(1 + 7):  # alias table + reference snapshot
+            directory = get_location_directory()
+        self.assertEqual(directory.canonical(CITY, 'Киев'), (self.kyiv.id,))
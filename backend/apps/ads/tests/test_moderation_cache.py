@@ -0,0 +1,101 @@
+"""
+Tests for the content-hash moderation result cache.
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from apps.ads.models import ModerationResultCache
+from apps.ads.services import moderation
+from apps.ads.services.moderation import ContentModerator, ModerationResult
+from core.services.llm_moderation import LLMPromptModerationService, ModerationStatus, ViolationType
+from core.services.moderation_cache import ModerationResultStore, content_hash, ruleset_version
+
+
+class ModerationResultCacheTest(TestCase):
+    """Test that repeated texts skip analysis and how the cache is invalidated"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = LLMPromptModerationService()
+        analyze = mock.patch.object(
+            self.service, 'simulate_llm_profanity_analysis', wraps=self.service.simulate_llm_profanity_analysis
+        )
+        self.analyze = analyze.start()
+        self.addCleanup(analyze.stop)
+
+    def test_repeated_text_is_analyzed_once(self):
+        """Case and whitespace edits hit the cache with the same result"""
+        first = self.service.moderate_content('Продам BMW  X5', 'Ну ты и сука, отличное состояние')
+        second = self.service.moderate_content('продам bmw x5', 'Ну ты и сука,\nотличное состояние ', price=9000)
+
+        self.assertEqual(self.analyze.call_count, 1)
+        self.assertEqual(second.status, ModerationStatus.REJECTED)
+        self.assertEqual(second.violations, [ViolationType.PROFANITY])
+        self.assertEqual(
+            (second.flagged_text, second.censored_text, second.reason),
+            (first.flagged_text, first.censored_text, first.reason),
+        )
+
+        self.service.moderate_content('Продам BMW X5', 'Ну ты и сука, хорошее состояние')
+        self.assertEqual(self.analyze.call_count, 2)
+
+    def test_database_survives_cache_flush(self):
+        """After a Redis flush the result is read from the table and counted as a hit"""
+        self.service.moderate_content('Продам Audi A4', 'Один владелец, сервисная книжка')
+        cache.clear()
+
+        result = self.service.moderate_content('Продам Audi A4', 'Один владелец, сервисная книжка')
+        self.assertEqual(result.status, ModerationStatus.APPROVED)
+        self.assertEqual(self.analyze.call_count, 1)
+        self.assertEqual(ModerationResultCache.objects.get().hits, 1)
+
+    def test_ruleset_change_invalidates(self):
+        """Bumping the global version or editing word lists moderates the text again"""
+        self.service.moderate_content('Продам Audi A4', 'Один владелец')
+        with override_settings(MODERATION_RULESET_VERSION=2):
+            self.service.moderate_content('Продам Audi A4', 'Один владелец')
+        self.assertEqual(self.analyze.call_count, 2)
+
+        store = self.service.result_store
+        edited = ModerationResultStore(
+            store.scope,
+            ruleset_version(self.service.RULESET_VERSION, {**self.service.profanity_examples, 'english': ['audi']}),
+        )
+        self.assertNotEqual(edited.version, store.version)
+        self.assertIsNone(edited.get(content_hash('Продам Audi A4', 'Один владелец')))
+
+        self.assertEqual(edited.purge_stale(), 2)
+        self.assertFalse(ModerationResultCache.objects.exists())
+
+
+@override_settings(DISABLE_LLM_MODERATION=False)
+class ContentModeratorCacheTest(TestCase):
+    """Cached LLM details carry the submitted text, so only the exact text may hit them"""
+
+    def setUp(self):
+        cache.clear()
+        self.chain = mock.Mock()
+        self.chain.run.side_effect = lambda title, content: (
+            ModerationResult.APPROVED, {'censored_title': title, 'censored_description': content},
+        )
+        for patcher in (
+            mock.patch.object(moderation, 'LLM_AVAILABLE', True),
+            mock.patch.object(ContentModerator, '_get_moderation_chain', return_value=self.chain),
+            mock.patch.object(ContentModerator, '_detect_language', return_value='uk'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_differently_cased_duplicate_gets_its_own_text(self):
+        ContentModerator.check_content('Один власник, сервісна книжка', title='Продам Audi A4')
+        _, cached = ContentModerator.check_content('Один власник, сервісна книжка', title='Продам Audi A4')
+        _, details = ContentModerator.check_content('ОДИН ВЛАСНИК,  сервісна книжка', title='продам audi a4')
+
+        self.assertTrue(cached['cached'])
+        self.assertEqual(self.chain.run.call_count, 2)
+        self.assertEqual(
+            (details['censored_title'], details['censored_description']),
+            ('продам audi a4', 'ОДИН ВЛАСНИК,  сервісна книжка'),
+        )
@@ -0,0 +1,126 @@
+"""
+Tests for the claim-based moderation queue.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.accounts.models import AddsAccount
+from apps.ads.models import AdPromotion, CarAd
+from apps.ads.models.reference import CarMarkModel, CityModel, RegionModel, VehicleTypeModel
+from apps.ads.services.moderation_queue import ModerationQueue
+from apps.ads.views.moderation_queue_views import approve_advertisement, claim_moderation_work
+from apps.currency.models import CurrencyRate
+from core.enums.ads import AccountTypeEnum, AdStatusEnum
+
+User = get_user_model()
+
+
+class ModerationQueueTest(TestCase):
+    """Test claiming order, exclusivity, lease expiry and decisions"""
+
+    def setUp(self):
+        owner = User.objects.create_user(email='owner@test.com', password='testpass123')
+        self.account = AddsAccount.objects.create(
+            user=owner, account_type=AccountTypeEnum.PREMIUM, organization_name='Dealer'
+        )
+        self.first = User.objects.create_user(email='first@test.com', password='testpass123', is_staff=True)
+        self.second = User.objects.create_user(email='second@test.com', password='testpass123', is_staff=True)
+
+        vehicle_type = VehicleTypeModel.objects.create(name='Легковий автомобіль')
+        self.mark = CarMarkModel.objects.create(name='Audi', vehicle_type=vehicle_type)
+        self.region = RegionModel.objects.create(name='Київська область')
+        self.city = CityModel.objects.create(name='Київ', region=self.region)
+
+        now = timezone.now()
+        # Fresh rates: serializing ads must not schedule a rate refresh
+        for currency, rate in (('USD', '41'), ('EUR', '45')):
+            CurrencyRate.objects.create(
+                base_currency='UAH', target_currency=currency, rate=Decimal(rate), source='NBU', fetched_at=now
+            )
+        self.oldest = self.create_ad('Oldest', now - timedelta(days=3))
+        self.flagged = self.create_ad('Flagged', now - timedelta(days=1), needs_manual_review=True)
+        self.promoted = self.create_ad('Promoted', now)
+        self.newest = self.create_ad('Newest', now + timedelta(minutes=1), status=AdStatusEnum.NEEDS_REVIEW)
+        self.create_ad('Active', now - timedelta(days=5), status=AdStatusEnum.ACTIVE)
+        AdPromotion.objects.create(
+            ad=self.promoted, promotion_type='vip', starts_at=now - timedelta(hours=1), ends_at=now + timedelta(days=1)
+        )
+
+    def create_ad(self, title, created_at, status=AdStatusEnum.PENDING, **fields):
+        ad = CarAd.objects.create(
+            title=title,
+            description='Опис',
+            price=Decimal('600000'),
+            currency='UAH',
+            account=self.account,
+            mark=self.mark,
+            model='A4',
+            region=self.region,
+            city=self.city,
+            status=status,
+            **fields,
+        )
+        CarAd.objects.filter(id=ad.id).update(created_at=created_at)
+        return ad
+
+    def test_claims_are_exclusive_and_prioritized(self):
+        """Promoted, then flagged, then oldest; another moderator gets the rest"""
+        first = ModerationQueue.claim(self.first, count=3)
+        self.assertEqual([ad.title for ad in first], ['Promoted', 'Flagged', 'Oldest'])
+        self.assertTrue(all(ad.claimed_by_id == self.first.id for ad in first))
+
+        second = ModerationQueue.claim(self.second, count=3)
+        self.assertEqual([ad.title for ad in second], ['Newest'])
+
+        # Claiming again renews the own claims instead of taking new ones
+        again = ModerationQueue.claim(self.first, count=3)
+        self.assertEqual([ad.id for ad in again], [ad.id for ad in first])
+
+    def test_expired_and_released_claims_return_to_queue(self):
+        ModerationQueue.claim(self.first, count=4)
+        self.assertEqual(ModerationQueue.claim(self.second, count=4), [])
+
+        CarAd.objects.filter(id=self.oldest.id).update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(ModerationQueue.release(self.first, ad_ids=[self.flagged.id]), 1)
+        self.assertEqual(
+            [ad.title for ad in ModerationQueue.claim(self.second, count=4)], ['Flagged', 'Oldest']
+        )
+
+    def test_decisions_respect_claims(self):
+        """Another moderator gets 409; the owner's decision ends the claim and counts in stats"""
+        factory = APIRequestFactory()
+        request = factory.post('/moderation/queue/claim', {'count': 1}, format='json')
+        force_authenticate(request, user=self.first)
+        response = claim_moderation_work(request)
+        self.assertEqual(response.status_code, 200)
+        ad_id = response.data['ads'][0]['id']
+
+        request = factory.post(f'/moderation/{ad_id}/approve', {}, format='json')
+        force_authenticate(request, user=self.second)
+        self.assertEqual(approve_advertisement(request, ad_id=ad_id).status_code, 409)
+
+        request = factory.post(f'/moderation/{ad_id}/approve', {}, format='json')
+        force_authenticate(request, user=self.first)
+        self.assertEqual(approve_advertisement(request, ad_id=ad_id).status_code, 200)
+
+        ad = CarAd.objects.get(id=ad_id)
+        self.assertEqual((ad.status, ad.claimed_by_id, ad.claimed_until), (AdStatusEnum.ACTIVE, None, None))
+
+        stats = ModerationQueue.stats()
+        self.assertEqual(stats['queue']['total'], 3)
+        self.assertEqual(stats['moderators'][0]['email'], 'first@test.com')
+        self.assertEqual(stats['moderators'][0]['approved'], 1)
+
+    def test_claim_rejects_out_of_range_lease(self):
+        """Zero, negative and huge leases are a 400, not an expired lease or a 500"""
+        factory = APIRequestFactory()
+        for lease_seconds in (0, -60, 10 ** 12):
+            request = factory.post('/moderation/queue/claim', {'lease_seconds': lease_seconds}, format='json')
+            force_authenticate(request, user=self.first)
+            self.assertEqual(claim_moderation_work(request).status_code, 400)
+        self.assertFalse(CarAd.objects.filter(claimed_by=self.first).exists())
@@ -0,0 +1,198 @@
+"""
+Tests for batched status-change notifications.
+"""
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import TestCase
+
+from apps.accounts.models import AddsAccount
+from apps.ads.models import CarAd
+from apps.ads.models.reference import CarMarkModel, CityModel, RegionModel, VehicleTypeModel
+from apps.ads.services.digest_consumer import StatusDigestConsumer, deliver_digest_batch
+from apps.ads.services.notification_batching import NotificationBatcher
+from core.enums.ads import AccountTypeEnum, AdStatusEnum
+from core.schemas.moderation import ModerationDigestBatch, ModerationExchangeConfig
+
+User = get_user_model()
+
+
+class RecordingPublisher:
+    """Collects published messages instead of talking to RabbitMQ"""
+
+    def __init__(self, ok=True):
+        self.ok = ok
+        self.messages = []
+
+    def __call__(self, exchange, routing_key, message, priority=5):
+        self.messages.append((exchange, routing_key, json.loads(message)))
+        return self.ok
+
+
+class RecordingEmailService:
+    """Collects queued emails instead of publishing them"""
+
+    def __init__(self):
+        self.emails = []
+
+    def send_html_email(self, to_email, subject, html_content, text_content=None):
+        self.emails.append((to_email, subject, text_content))
+        return True
+
+
+class NotificationBatcherTest(TestCase):
+    """Test windowed buffering, per-recipient digests and single-message publishing"""
+
+    def setUp(self):
+        cache.clear()
+        self.owners = [
+            User.objects.create_user(email=f'owner{index}@test.com', password='testpass123') for index in range(2)
+        ]
+        self.manager = User.objects.create_user(email='manager@test.com', password='testpass123', is_staff=True)
+        vehicle_type = VehicleTypeModel.objects.create(name='Легковий автомобіль')
+        mark = CarMarkModel.objects.create(name='Audi', vehicle_type=vehicle_type)
+        region = RegionModel.objects.create(name='Київська область')
+        city = CityModel.objects.create(name='Київ', region=region)
+
+        self.ads = {}
+        for owner in self.owners:
+            account = AddsAccount.objects.create(
+                user=owner, account_type=AccountTypeEnum.PREMIUM, organization_name=owner.email
+            )
+            self.ads[owner.id] = [
+                CarAd.objects.create(
+                    title=f'Audi {index}',
+                    description='Опис',
+                    price=Decimal('600000'),
+                    currency='UAH',
+                    account=account,
+                    mark=mark,
+                    model='A4',
+                    region=region,
+                    city=city,
+                ).id
+                for index in range(3)
+            ]
+        self.all_ids = [ad_id for ad_ids in self.ads.values() for ad_id in ad_ids]
+
+    def test_window_collapses_bulk_actions_into_two_messages(self):
+        """Many bulk actions in one window: one digest per owner, one per manager, two publishes"""
+        publisher = RecordingPublisher()
+        batcher = NotificationBatcher(window_seconds=60, publisher=publisher)
+        with mock.patch.object(NotificationBatcher, 'schedule_flush') as schedule_flush:
+            bucket = batcher.add(self.all_ids, AdStatusEnum.ACTIVE, reason='Перевірено')
+            for ad_id in self.all_ids:
+                batcher.add([ad_id], AdStatusEnum.ACTIVE)
+            batcher.add([self.all_ids[0]], AdStatusEnum.NEEDS_REVIEW, reason='Скарга')
+        schedule_flush.assert_called_once_with(bucket)
+
+        stats = batcher.flush(bucket)
+        self.assertEqual(
+            (stats['entries'], stats['ads'], stats['users'], stats['managers'], stats['published']),
+            (8, 6, 2, 1, 2),
+        )
+        config = ModerationExchangeConfig()
+        (user_exchange, user_key, users), (manager_exchange, manager_key, managers) = publisher.messages
+        self.assertEqual((user_exchange, user_key), (config.USER_NOTIFICATIONS_EXCHANGE, config.USER_STATUS_DIGEST))
+        self.assertEqual(
+            (manager_exchange, manager_key), (config.MANAGER_NOTIFICATIONS_EXCHANGE, config.MANAGER_STATUS_DIGEST)
+        )
+
+        digests = {digest['recipient_id']: digest for digest in users['digests']}
+        first = digests[self.owners[0].id]
+        self.assertEqual(first['status_counts'], {'needs_review': 1, 'active': 2})
+        self.assertEqual(first['items'][0]['reason'], 'Скарга')
+        self.assertEqual(digests[self.owners[1].id]['status_counts'], {'active': 3})
+
+        self.assertEqual(managers['digests'][0]['recipient_email'], 'manager@test.com')
+        self.assertEqual([item['ad_id'] for item in managers['digests'][0]['items']], [self.all_ids[0]])
+
+        # The window is flushed once and its buffer dropped
+        self.assertTrue(batcher.flush(bucket)['skipped'])
+        self.assertEqual(batcher.entries(bucket), [])
+
+    def test_failed_publish_keeps_buffer_for_retry(self):
+        batcher = NotificationBatcher(window_seconds=60, publisher=RecordingPublisher(ok=False))
+        with mock.patch.object(NotificationBatcher, 'schedule_flush'):
+            bucket = batcher.add(self.all_ids, AdStatusEnum.REJECTED)
+        with self.assertRaises(RuntimeError):
+            batcher.flush(bucket)
+
+        publisher = RecordingPublisher()
+        retry = NotificationBatcher(window_seconds=60, publisher=publisher)
+        self.assertEqual(retry.flush(bucket)['users'], 2)
+        self.assertEqual(len(publisher.messages), 1)
+
+    def test_any_flush_error_releases_the_window(self):
+        batcher = NotificationBatcher(window_seconds=60, publisher=RecordingPublisher())
+        with mock.patch.object(NotificationBatcher, 'schedule_flush'):
+            bucket = batcher.add(self.all_ids, AdStatusEnum.REJECTED)
+        with mock.patch.object(NotificationBatcher, 'latest_changes', side_effect=RuntimeError('db')):
+            with self.assertRaises(RuntimeError):
+                batcher.flush(bucket)
+
+        stats = batcher.flush(bucket)
+        self.assertNotIn('skipped', stats)
+        self.assertEqual(stats['users'], 2)
+
+    def test_zero_window_flushes_immediately(self):
+        publisher = RecordingPublisher()
+        NotificationBatcher(window_seconds=0, publisher=publisher).add(self.ads[self.owners[1].id], AdStatusEnum.ACTIVE)
+        self.assertEqual(len(publisher.messages), 1)
+        self.assertEqual(publisher.messages[0][2]['digests'][0]['recipient_email'], 'owner1@test.com')
+
+    def test_digest_template_renders(self):
+        batcher = NotificationBatcher(window_seconds=0)
+        changes = batcher.latest_changes([{'ad_ids': self.all_ids[:2], 'status': 'rejected', 'reason': 'Фото'}])
+        digest = batcher.build_user_digests(changes)[0]
+        text = render_to_string('emails/moderation_status_digest.txt', batcher.template_context(digest))
+        self.assertIn('відхилено: 2', text)
+        self.assertIn(f'#{self.all_ids[0]} Audi 0', text)
+
+    def test_digest_consumer_sends_one_email_per_recipient(self):
+        publisher = RecordingPublisher()
+        NotificationBatcher(window_seconds=0, publisher=publisher).add(self.all_ids, AdStatusEnum.REJECTED, 'Фото')
+        batch = ModerationDigestBatch.model_validate(publisher.messages[0][2])
+
+        email_service = RecordingEmailService()
+        self.assertEqual(deliver_digest_batch(batch, email_service), {'sent': 2, 'failed': 0, 'skipped': 0})
+        self.assertEqual(sorted(email[0] for email in email_service.emails), ['owner0@test.com', 'owner1@test.com'])
+        self.assertIn('відхилено: 3', email_service.emails[0][2])
+
+    def test_managers_with_email_off_get_no_digest_email(self):
+        batcher = NotificationBatcher(window_seconds=0)
+        changes = batcher.latest_changes([{'ad_ids': self.all_ids[:1], 'status': 'needs_review', 'reason': None}])
+        items = list(changes.values())
+        recipients = [
+            {'id': self.manager.id, 'email': 'manager@test.com', 'email_enabled': False, 'info_table_enabled': True},
+            {'id': self.owners[0].id, 'email': 'owner0@test.com', 'email_enabled': True, 'info_table_enabled': False},
+        ]
+        batch = ModerationDigestBatch(
+            notification_type='manager_moderation_digest',
+            window_start='2026-01-01T00:00:00Z',
+            window_end='2026-01-01T00:01:00Z',
+            digests=batcher.build_manager_digests(items, recipients),
+        )
+
+        email_service = RecordingEmailService()
+        self.assertEqual(deliver_digest_batch(batch, email_service), {'sent': 1, 'failed': 0, 'skipped': 1})
+        self.assertEqual([email[0] for email in email_service.emails], ['owner0@test.com'])
+
+    def test_digest_consumer_rejects_malformed_and_requeues_failures_once(self):
+        consumer = StatusDigestConsumer(email_service=RecordingEmailService())
+        channel = mock.Mock()
+        consumer.handle(channel, mock.Mock(delivery_tag=1), None, b'{"digests": "broken"}')
+        channel.basic_reject.assert_called_once_with(delivery_tag=1, requeue=False)
+
+        body = ModerationDigestBatch(window_start='2026-01-01T00:00:00Z', window_end='2026-01-01T00:01:00Z')
+        with mock.patch('apps.ads.services.digest_consumer.deliver_digest_batch', side_effect=RuntimeError('db')):
+            consumer.handle(channel, mock.Mock(delivery_tag=2, redelivered=False), None, body.model_dump_json())
+            consumer.handle(channel, mock.Mock(delivery_tag=3, redelivered=True), None, body.model_dump_json())
+        self.assertEqual(
+            channel.basic_nack.call_args_list,
+            [mock.call(delivery_tag=2, requeue=True), mock.call(delivery_tag=3, requeue=False)],
+        )
@@ -0,0 +1,74 @@
+"""
+Tests for the pre-generated OpenAPI schema and the schema endpoints.
+"""
+import json
+import shutil
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import include, path
+
+from config.docs import schema
+from config.docs.urls import urlpatterns as docs_urls
+
+urlpatterns = [
+    path('api/public/reference/', include('apps.ads.urls.reference_urls')),
+    *docs_urls,
+]
+
+
+class OpenAPISchemaTest(SimpleTestCase):
+    """Test the generate command, the staleness check and serving stored files"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        overrides = override_settings(ROOT_URLCONF=__name__, OPENAPI_SCHEMA_DIR=self.directory)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        schema._loader.reset()
+
+    def test_serves_stored_schema_with_etag(self):
+        """Stored JSON/YAML are served as written and revalidated with 304"""
+        call_command('generate_openapi_schema', verbosity=0)
+        stored = schema.read_schema()
+
+        response = self.client.get('/api/doc/', {'format': 'openapi'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, stored.content['json'])
+        self.assertIn('/autocomplete/', json.loads(response.content)['paths'])
+        etag = response['ETag']
+
+        response = self.client.get('/api/doc/', {'format': 'openapi'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get('/api/doc.yaml')
+        self.assertEqual(response.content, stored.content['yaml'])
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_check_detects_stale_schema(self):
+        """--check passes right after generation and fails once the stored schema differs"""
+        with self.assertRaises(CommandError):
+            call_command('generate_openapi_schema', '--check', verbosity=0)
+
+        call_command('generate_openapi_schema', verbosity=0)
+        call_command('generate_openapi_schema', '--check', verbosity=0)
+
+        stored = schema.read_schema()
+        content = json.loads(stored.content['json'])
+        del content['paths']['/autocomplete/']
+        schema.write_schema({**stored.content, 'json': json.dumps(content).encode()}, stored.paths - 1)
+        with self.assertRaises(CommandError):
+            call_command('generate_openapi_schema', '--check', verbosity=0)
+
+    def test_missing_schema(self):
+        """Without stored files the schema is generated live only in DEBUG"""
+        with override_settings(DEBUG=False):
+            response = self.client.get('/api/doc.json')
+        self.assertEqual(response.status_code, 503)
+
+        with override_settings(DEBUG=True):
+            response = self.client.get('/api/doc.json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/autocomplete/', json.loads(response.content)['paths'])
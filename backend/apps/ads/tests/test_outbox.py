@@ -0,0 +1,146 @@
+"""
+Tests for the transactional outbox and its relay.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.ads.models import OutboxEvent
+from apps.ads.tests.test_rabbitmq_publisher import FakeBroker, FakeConnection
+from core.services import outbox, rabbitmq_publisher
+from core.services.outbox import OutboxRelay, enqueue, outbox_metrics, purge_sent
+from core.services.rabbitmq_publisher import RabbitMQPublisher
+
+
+@override_settings(OUTBOX_RETRY_DELAY=5, OUTBOX_MAX_RETRY_DELAY=300, OUTBOX_RETENTION_HOURS=72)
+class OutboxTest(TestCase):
+    """Test same-transaction writes, confirmed relaying, retries, retention and lag"""
+
+    def setUp(self):
+        self.broker = FakeBroker()
+        publisher = RabbitMQPublisher(
+            parameters=object(),
+            retries=0,
+            reconnect_backoff=0,
+            connection_factory=lambda parameters: FakeConnection(self.broker, parameters),
+        )
+        self.relay = OutboxRelay(publisher=publisher, batch_size=2)
+        patcher = mock.patch.object(outbox, 'kick_relay')
+        self.kick = patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(rabbitmq_publisher.time, 'sleep')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def enqueue(self, body, **kwargs):
+        return enqueue('test.event', 'user_notifications', 'user.ad.approved', body, exchange_type='topic', **kwargs)
+
+    def test_rolled_back_change_leaves_no_event(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.enqueue('{"ad_id": 1}')
+                raise RuntimeError('domain change failed')
+        self.assertFalse(OutboxEvent.objects.exists())
+        self.assertEqual(callbacks, [])
+        self.kick.assert_not_called()
+
+    def test_commit_kicks_the_relay(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enqueue('{"ad_id": 1}')
+        self.kick.assert_called_once()
+
+    def test_relay_publishes_in_batches_and_marks_sent(self):
+        for index in range(5):
+            self.enqueue(f'{index}', priority=8)
+
+        stats = self.relay.drain()
+
+        self.assertEqual((stats['sent'], stats['failed'], stats['batches']), (5, 0, 3))
+        self.assertEqual([message[2] for message in self.broker.messages], [b'0', b'1', b'2', b'3', b'4'])
+        self.assertEqual(self.broker.messages[0][3], 8)
+        self.assertEqual(self.broker.declared, ['user_notifications'])
+        self.assertFalse(OutboxEvent.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(self.relay.drain()['sent'], 0)
+
+    def test_unconfirmed_event_is_retried_with_backoff(self):
+        event = self.enqueue('lost')
+        self.broker.up = False
+
+        stats = self.relay.drain()
+
+        event.refresh_from_db()
+        self.assertEqual((stats['sent'], stats['failed']), (0, 1))
+        self.assertIsNone(event.sent_at)
+        self.assertEqual(event.attempts, 1)
+        self.assertGreater(event.available_at, timezone.now() + timedelta(seconds=4))
+
+        # Not ready before the backoff ends, published after it
+        self.broker.up = True
+        self.assertEqual(self.relay.drain()['sent'], 0)
+        OutboxEvent.objects.filter(id=event.id).update(available_at=timezone.now())
+        self.assertEqual(self.relay.drain()['sent'], 1)
+        self.assertEqual([message[2] for message in self.broker.messages], [b'lost'])
+
+    def test_rejected_event_does_not_hold_back_the_batch(self):
+        self.relay.batch_size = 3
+        for body in ('first', 'unroutable', 'last'):
+            self.enqueue(body, mandatory=True)
+        self.broker.unroutable.add(b'unroutable')
+
+        stats = self.relay.drain()
+
+        self.assertEqual((stats['sent'], stats['failed']), (2, 1))
+        self.assertEqual([message[2] for message in self.broker.messages], [b'first', b'last'])
+        rejected = OutboxEvent.objects.get(sent_at__isnull=True)
+        self.assertEqual((rejected.payload, rejected.attempts), ('unroutable', 1))
+
+    def test_publisher_backoff_is_not_an_attempt(self):
+        self.relay.publisher.reconnect_backoff = 60
+        failed = self.enqueue('lost')
+        self.broker.up = False
+        self.assertEqual(self.relay.drain()['failed'], 1)
+
+        waiting = self.enqueue('waiting')
+        available_at = waiting.available_at
+        self.assertEqual(self.relay.drain(), {'sent': 0, 'failed': 0, 'batches': 0})
+
+        waiting.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual((waiting.attempts, waiting.available_at), (0, available_at))
+        self.assertEqual(failed.attempts, 1)
+
+    def test_rows_are_claimed_while_publishing(self):
+        self.enqueue('claimed')
+        publish_each = self.relay.publisher.publish_each
+
+        def check_claim(messages, spool):
+            # Another relay would not pick the row up while it is being published
+            self.assertFalse(OutboxEvent.objects.filter(available_at__lte=timezone.now()).exists())
+            return publish_each(messages, spool=spool)
+
+        with mock.patch.object(self.relay.publisher, 'publish_each', side_effect=check_claim):
+            self.assertEqual(self.relay.drain()['sent'], 1)
+
+    def test_metrics_report_pending_failing_and_lag(self):
+        self.assertEqual(outbox_metrics()['lag_seconds'], 0.0)
+        old = self.enqueue('old')
+        self.enqueue('new')
+        OutboxEvent.objects.filter(id=old.id).update(
+            created_at=timezone.now() - timedelta(minutes=5), attempts=2,
+        )
+
+        metrics = outbox_metrics()
+
+        self.assertEqual((metrics['pending'], metrics['failing']), (2, 1))
+        self.assertGreaterEqual(metrics['lag_seconds'], 300)
+
+    def test_purge_keeps_pending_and_recent_events(self):
+        expired, recent, pending = (self.enqueue(body) for body in ('expired', 'recent', 'pending'))
+        OutboxEvent.objects.filter(id=expired.id).update(sent_at=timezone.now() - timedelta(hours=73))
+        OutboxEvent.objects.filter(id=recent.id).update(sent_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(purge_sent(), 1)
+        self.assertEqual(set(OutboxEvent.objects.values_list('id', flat=True)), {recent.id, pending.id})
@@ -0,0 +1,60 @@
+"""
+Tests for the Aho-Corasick profanity matcher used by prompt moderation.
+"""
+from django.test import SimpleTestCase
+
+from core.services.llm_moderation import LLMPromptModerationService
+from core.services.profanity_matcher import AhoCorasick, ProfanityMatcher, normalize
+
+
+class AhoCorasickTest(SimpleTestCase):
+    """Test the automaton on its own"""
+
+    def test_overlapping_matches(self):
+        """All keys are found in one pass, including ones inside other keys"""
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertEqual(
+            sorted(automaton.finditer('ushers')),
+            [(1, 4, 'she'), (2, 4, 'he'), (2, 6, 'hers')],
+        )
+
+    def test_normalize_keeps_offsets(self):
+        """Leet in Latin words, Latin look-alikes in Cyrillic words; numbers untouched"""
+        text, origin = normalize('Bl9t сyка 2010')
+        self.assertEqual(text, 'blyat сука 2010')
+        self.assertEqual(len(origin), len(text))
+        self.assertEqual(origin[text.index('t')], 3)
+
+
+class ProfanityMatcherTest(SimpleTestCase):
+    """Test matching rules and the moderation service output"""
+
+    def setUp(self):
+        self.service = LLMPromptModerationService()
+
+    def test_short_words_need_word_boundaries(self):
+        """Short words only match whole words, stems match inside words"""
+        matcher = ProfanityMatcher({'english': ['ass'], 'russian': ['ебал']})
+        self.assertEqual(matcher.find('Mercedes E-class, passenger seats'), [])
+        self.assertEqual([hit.text for hit in matcher.find('kiss my @ss! заебал')], ['@ss', 'ебал'])
+
+    def test_masked_words(self):
+        """Masked spellings are reported as written, with the evasion language"""
+        result = self.service.simulate_llm_profanity_analysis('Продам авто, ну ты сyка и p1zda')
+        self.assertTrue(result['has_profanity'])
+        self.assertEqual(result['found_words'], ['p1zda', 'сyка'])
+        self.assertEqual(result['censored_words']['сyка'], 'с***')
+        self.assertEqual(result['languages'], ['leet_speak', 'evasion'])
+
+    def test_dictionary_words_keep_languages(self):
+        result = self.service.simulate_llm_profanity_analysis('Такой пиздец, fuck')
+        self.assertEqual(result['found_words'], ['пизде', 'пиздец', 'пизде', 'пиздец', 'fuck'])
+        self.assertEqual(result['languages'], ['ukrainian', 'russian', 'english'])
+        self.assertEqual(result['severity'], 'high')
+
+    def test_clean_ad(self):
+        result = self.service.simulate_llm_profanity_analysis(
+            'Продам Audi A4 2015 1.8 TFSI, S-class салон, пробіг 120 тис. км, розмитнена'
+        )
+        self.assertFalse(result['has_profanity'])
+        self.assertEqual(result['languages'], [])
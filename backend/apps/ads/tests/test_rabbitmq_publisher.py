@@ -0,0 +1,145 @@
+"""
+Tests for the pooled RabbitMQ publisher.
+"""
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase
+from pika.exceptions import AMQPConnectionError, NackError, StreamLostError, UnroutableError
+
+from core.services import rabbitmq_publisher
+from core.services.rabbitmq_publisher import RabbitMQPublisher
+
+
+class FakeBroker:
+    """In-memory broker: records confirmed messages, can be taken down"""
+
+    def __init__(self):
+        self.up = True
+        self.nack = False
+        self.unroutable = set()
+        self.connections = []
+        self.messages = []
+        self.declared = []
+
+
+class FakeChannel:
+    def __init__(self, broker, connection):
+        self.broker = broker
+        self.connection = connection
+        self.confirming = False
+
+    def confirm_delivery(self):
+        self.confirming = True
+
+    def exchange_declare(self, exchange, exchange_type, durable):
+        self.broker.declared.append(exchange)
+
+    def basic_publish(self, exchange, routing_key, body, properties=None, mandatory=False):
+        if not self.broker.up:
+            self.connection.is_open = False
+            raise StreamLostError('connection lost')
+        if self.broker.nack:
+            raise NackError([])
+        if body in self.broker.unroutable:
+            raise UnroutableError([])
+        self.broker.messages.append((exchange, routing_key, body, properties.priority))
+
+
+class FakeConnection:
+    def __init__(self, broker, parameters):
+        if not broker.up:
+            raise AMQPConnectionError('broker down')
+        self.broker = broker
+        self.is_open = True
+        broker.connections.append(self)
+
+    def channel(self):
+        return FakeChannel(self.broker, self)
+
+    def close(self):
+        self.is_open = False
+
+
+class RabbitMQPublisherTest(SimpleTestCase):
+    """Test connection reuse, confirms, spooling and fork safety"""
+
+    def setUp(self):
+        self.broker = FakeBroker()
+        self.publisher = RabbitMQPublisher(
+            parameters=object(),
+            pool_size=2,
+            spool_size=3,
+            retries=1,
+            reconnect_backoff=0,
+            connection_factory=lambda parameters: FakeConnection(self.broker, parameters),
+        )
+        patcher = mock.patch.object(rabbitmq_publisher.time, 'sleep')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_connection_and_exchange_are_reused(self):
+        for index in range(5):
+            self.assertTrue(self.publisher.publish('user_notifications', 'user.ad.approved', f'{index}',
+                                                   priority=15, exchange_type='topic'))
+        self.assertEqual(len(self.broker.connections), 1)
+        self.assertEqual(self.broker.declared, ['user_notifications'])
+        self.assertEqual([message[2] for message in self.broker.messages], [b'0', b'1', b'2', b'3', b'4'])
+        self.assertEqual(self.broker.messages[0][3], 10)
+
+    def test_nack_is_a_failure_and_never_spooled(self):
+        self.broker.nack = True
+        self.assertFalse(self.publisher.publish('x', 'key', '{}'))
+        self.assertEqual(self.publisher.spooled, 0)
+        self.assertEqual(self.publisher.stats['rejected'], 1)
+        self.assertFalse(self.publisher.in_backoff)
+
+    def test_rejected_message_does_not_block_the_batch(self):
+        """An unroutable message fails alone: same connection, no backoff, later messages go out"""
+        self.broker.unroutable.add(b'b')
+        messages = [self.publisher.message('', 'queue', body, mandatory=True) for body in ('a', 'b', 'c')]
+        self.assertEqual(self.publisher.publish_each(messages), [True, False, True])
+        self.assertTrue(self.publisher.publish('', 'queue', 'd'))
+        self.assertEqual([message[2] for message in self.broker.messages], [b'a', b'c', b'd'])
+        self.assertEqual(len(self.broker.connections), 1)
+        self.assertEqual(self.publisher.spooled, 0)
+
+    def test_backoff_skips_connecting_while_broker_is_down(self):
+        self.publisher.reconnect_backoff = 60
+        self.broker.up = False
+        with mock.patch.object(self.publisher, '_connect', wraps=self.publisher._connect) as connect:
+            self.publisher.publish('x', 'key', 'a')
+            self.publisher.publish('x', 'key', 'b')
+        self.assertEqual(connect.call_count, 2)
+        self.assertEqual(self.publisher.spooled, 2)
+
+    def test_outage_spools_and_drains_in_order(self):
+        """Messages published while the broker is down go out first after recovery"""
+        self.publisher.publish('x', 'key', 'before')
+        self.broker.up = False
+        for body in ('a', 'b', 'c', 'd'):
+            self.assertTrue(self.publisher.publish('x', 'key', body))
+        self.assertEqual(self.publisher.spooled, 3)
+        self.assertEqual(self.publisher.stats['dropped'], 1)
+
+        self.broker.up = True
+        self.publisher.publish('x', 'key', 'after')
+        self.assertEqual([message[2] for message in self.broker.messages], [b'before', b'b', b'c', b'd', b'after'])
+        self.assertEqual(self.publisher.spooled, 0)
+        self.assertEqual(len(self.broker.connections), 2)
+
+    def test_batch_uses_one_checkout(self):
+        with mock.patch.object(self.publisher, 'slot', wraps=self.publisher.slot) as slot:
+            with self.publisher.batch() as batch:
+                for index in range(3):
+                    batch.append(self.publisher.message('x', 'key', str(index)))
+        slot.assert_called_once()
+        self.assertEqual(len(self.broker.messages), 3)
+
+    def test_new_publisher_after_fork(self):
+        with mock.patch.object(rabbitmq_publisher, '_publisher', None):
+            first = rabbitmq_publisher.get_publisher()
+            self.assertIs(rabbitmq_publisher.get_publisher(), first)
+            with mock.patch.object(rabbitmq_publisher.os, 'getpid', return_value=os.getpid() + 1):
+                child = rabbitmq_publisher.get_publisher()
+            self.assertIsNot(child, first)
@@ -0,0 +1,84 @@
+"""
+Tests for the reference autocomplete index.
+"""
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.ads.models.reference import CarMarkModel, CarModel, CityModel, RegionModel, VehicleTypeModel
+from apps.ads.services import reference_autocomplete, reference_snapshot
+from apps.ads.services.reference_autocomplete import PrefixIndex, Suggestion, search_forms
+from apps.ads.views.reference_views import reference_autocomplete as autocomplete_view
+
+
+class PrefixIndexTest(TestCase):
+    """Test normalization and ranking without the database"""
+
+    def test_search_forms(self):
+        """Names get Ukrainian, Russian and loose Latin spellings"""
+        self.assertIn('kyiv', search_forms("Київ"))
+        self.assertIn('toyota', search_forms('Тойота'))
+        self.assertEqual(set(search_forms('BMW')) & set(search_forms('бмв')), {'bmv'})
+        self.assertEqual(search_forms("Кам'янське")[0], 'камянське')
+
+    def test_popularity_and_word_matches(self):
+        """Heavier entries come first; name starts rank above inner words"""
+        index = PrefixIndex([
+            Suggestion(1, 'Land Rover', 5, {}),
+            Suggestion(2, 'Lada', 1, {}),
+            Suggestion(3, 'Lamborghini', 3, {}),
+            Suggestion(4, 'Rover', 0, {}),
+        ])
+        self.assertEqual([entry.id for entry in index.search('la')], [1, 3, 2])
+        self.assertEqual([entry.id for entry in index.search('ro')], [4, 1])
+        self.assertEqual([entry.id for entry in index.search('ла', limit=1)], [1])
+        self.assertEqual(index.search('zz'), [])
+
+
+class AutocompleteEndpointTest(TestCase):
+    """Test the endpoint over the reference snapshot"""
+
+    def setUp(self):
+        reference_snapshot._loader.reset()
+        reference_autocomplete._loader.reset()
+        vehicle_type = VehicleTypeModel.objects.create(name='Легковые', slug='cars')
+        self.toyota = CarMarkModel.objects.create(name='Toyota', vehicle_type=vehicle_type, is_popular=True)
+        self.tesla = CarMarkModel.objects.create(name='Tesla', vehicle_type=vehicle_type)
+        CarModel.objects.create(name='Camry', mark=self.toyota)
+        CarModel.objects.create(name='Corolla', mark=self.toyota)
+        CarModel.objects.create(name='Model S', mark=self.tesla)
+        self.kyiv_region = RegionModel.objects.create(name='Київська область', code='KV')
+        self.kharkiv_region = RegionModel.objects.create(name='Харківська область', code='KH')
+        CityModel.objects.create(name='Київ', region=self.kyiv_region, is_regional_center=True)
+        CityModel.objects.create(name='Кагарлик', region=self.kyiv_region)
+        CityModel.objects.create(name='Харків', region=self.kharkiv_region, is_regional_center=True)
+        self.factory = APIRequestFactory()
+
+    def get(self, **params):
+        return autocomplete_view(self.factory.get('/autocomplete/', params))
+
+    def names(self, **params):
+        return [item['name'] for item in self.get(**params).data['results']]
+
+    def test_types_and_scopes(self):
+        self.assertEqual(self.names(type='mark', q='t'), ['Toyota', 'Tesla'])
+        self.assertEqual(self.names(type='mark', q='тойо'), ['Toyota'])
+        self.assertEqual(self.names(type='model', q='c'), ['Camry', 'Corolla'])
+        self.assertEqual(self.names(type='model', q='s', mark_id=self.tesla.id), ['Model S'])
+        self.assertEqual(self.names(type='city', q='k'), ['Київ', 'Харків', 'Кагарлик'])
+        self.assertEqual(self.names(type='city', q='kh'), ['Харків'])
+        self.assertEqual(self.names(type='city', q='к', region_id=self.kharkiv_region.id), [])
+
+    def test_unknown_scopes_are_not_indexed(self):
+        for mark_id in range(10 ** 6, 10 ** 6 + 5):
+            self.assertEqual(self.names(type='model', q='c', mark_id=mark_id), [])
+        self.assertNotIn(('model', 10 ** 6), reference_autocomplete.get_autocomplete_index()._indexes)
+
+    def test_repeated_queries_do_not_hit_database(self):
+        self.get(type='city', q='ки')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(type='city', q='kyi'), ['Київ'])
+
+    def test_validation(self):
+        self.assertEqual(self.get(type='brand', q='a').status_code, 400)
+        self.assertEqual(self.get(type='model', q='a', mark_id='x').status_code, 400)
+        self.assertEqual(self.get(type='mark', q='  ').data['results'], [])
@@ -0,0 +1,69 @@
+"""
+Tests for the diffing car reference loader.
+"""
+import os
+import tempfile
+
+from django.test import TestCase
+
+from apps.ads.models.reference import CarMarkModel, CarModel, VehicleTypeModel
+from apps.ads.services import reference_snapshot
+from apps.ads.services.reference_loader import CarReferenceLoader
+from apps.ads.services.reference_snapshot import get_reference_snapshot
+
+
+class CarReferenceLoaderTest(TestCase):
+    """Test inserts, soft-deletes, reactivation and dry runs"""
+
+    def setUp(self):
+        reference_snapshot._loader.reset()
+        handle, self.csv_path = tempfile.mkstemp(suffix='.csv')
+        os.close(handle)
+        self.addCleanup(os.remove, self.csv_path)
+
+    def load(self, rows, dry_run=False):
+        with open(self.csv_path, 'w', encoding='utf-8') as csv_file:
+            csv_file.write('\n'.join(rows) + '\n')
+        return CarReferenceLoader(csv_path=self.csv_path, dry_run=dry_run).run()
+
+    def test_diff_cycle(self):
+        rows = ['Легкові,Toyota,Camry', 'Легкові,Toyota,Yaris', 'Легкові, Tesla ,Model 3', 'Мото,Honda,CBR']
+        report = self.load(rows)
+        self.assertEqual(report['vehicle_types_inserted'], 2)
+        self.assertEqual((report['marks_inserted'], report['models_inserted']), (3, 4))
+        self.assertTrue(CarMarkModel.objects.get(name='Toyota').is_popular)
+        self.assertTrue(CarModel.objects.get(name='Camry').is_popular)
+        self.assertEqual(VehicleTypeModel.objects.get(name='Легкові').slug, 'cars')
+
+        self.assertEqual(self.load(rows)['changed'], 0)
+
+        # Tesla and Yaris leave the file: soft-deleted and hidden from the snapshot
+        report = self.load(['Легкові,Toyota,Camry', 'Мото,Honda,CBR'])
+        self.assertEqual((report['marks_deactivated'], report['models_deactivated']), (1, 2))
+        self.assertFalse(CarMarkModel.objects.get(name='Tesla').is_active)
+        snapshot = get_reference_snapshot()
+        self.assertEqual([mark.name for mark in snapshot.marks], ['Honda', 'Toyota'])
+        self.assertEqual(snapshot.mark(CarMarkModel.objects.get(name='Tesla').id).name, 'Tesla')
+
+        report = self.load(rows)
+        self.assertEqual((report['marks_reactivated'], report['models_reactivated']), (1, 2))
+        self.assertEqual(CarModel.objects.filter(is_active=True).count(), 4)
+
+    def test_dry_run_rolls_back(self):
+        report = self.load(['Легкові,BMW,X5'], dry_run=True)
+        self.assertEqual(report['models_inserted'], 1)
+        self.assertEqual(report['samples']['models_inserted'], ['BMW X5'])
+        self.assertFalse(CarMarkModel.objects.exists())
+        self.assertFalse(VehicleTypeModel.objects.exists())
+
+    def test_other_vehicle_types_are_left_alone(self):
+        self.load(['Мото,Honda,CBR'])
+        self.load(['Легкові,BMW,X5'])
+        self.assertTrue(CarMarkModel.objects.get(name='Honda').is_active)
+
+    def test_default_csv_is_bundled(self):
+        loader = CarReferenceLoader(dry_run=True)
+        self.assertTrue(os.path.isfile(loader.csv_path))
+        report = loader.run()
+        self.assertGreater(report['models_inserted'], 0)
+        self.assertFalse(CarModel.objects.exists())
@@ -0,0 +1,57 @@
+"""
+Tests for the in-process reference data snapshot.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.ads.models.reference import CarMarkModel, CarModel, CityModel, RegionModel, VehicleTypeModel
+from apps.ads.services import reference_snapshot
+from apps.ads.services.reference_snapshot import get_reference_snapshot
+from apps.ads.views.reference_views import car_models_by_mark, cities_by_region
+
+
+class ReferenceSnapshotTest(TestCase):
+    """Test snapshot contents, invalidation and endpoints served from it"""
+
+    def setUp(self):
+        """Small reference tree: one vehicle type, mark, model, region and two cities"""
+        reference_snapshot._loader.reset()
+        vehicle_type = VehicleTypeModel.objects.create(name='Легковые', slug='cars')
+        self.mark = CarMarkModel.objects.create(name='BMW', vehicle_type=vehicle_type)
+        self.model = CarModel.objects.create(name='X5', mark=self.mark)
+        self.region = RegionModel.objects.create(name='Київська область')
+        CityModel.objects.create(name='Бровари', region=self.region)
+        CityModel.objects.create(name='Ірпінь', region=self.region, is_active=False)
+        self.factory = APIRequestFactory()
+
+    def test_lookups_without_queries(self):
+        """Once built, lookups and endpoints do not hit the database"""
+        snapshot = get_reference_snapshot()
+        with self.assertNumQueries(0):
+            self.assertIs(get_reference_snapshot(), snapshot)
+            self.assertEqual(snapshot.mark(self.mark.id).vehicle_type.slug, 'cars')
+            self.assertEqual([model.name for model in snapshot.models_of(self.mark.id)], ['X5'])
+            self.assertEqual(len(snapshot.cities_of(self.region.id)), 1)
+            self.assertEqual(len(snapshot.cities_of(self.region.id, active_only=False)), 2)
+
+            response = car_models_by_mark(self.factory.get('/', {'mark_id': self.mark.id}))
+            self.assertEqual(response.data['results'][0]['mark_name'], 'BMW')
+
+    def test_save_invalidates_snapshot(self):
+        """Saving a reference model makes the next access rebuild the snapshot"""
+        get_reference_snapshot()
+        CarModel.objects.create(name='X3', mark=self.mark)
+        self.assertEqual([model.name for model in get_reference_snapshot().models_of(self.mark.id)], ['X3', 'X5'])
+
+    def test_cities_by_region(self):
+        """cities_by_region keeps returning inactive cities and 404 for unknown regions"""
+        user = get_user_model().objects.create_user(email='reference@test.com', password='testpass123')
+
+        def get(region_id):
+            request = self.factory.get('/', {'region_id': region_id})
+            force_authenticate(request, user=user)
+            return cities_by_region(request)
+
+        self.assertEqual(get(self.region.id).data['count'], 2)
+        self.assertEqual(get(999999).status_code, 404)
@@ -0,0 +1,74 @@
+"""
+Tests for streaming search trend tracking.
+"""
+from datetime import timedelta
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.ads.services import search_trends
+from apps.ads.services.search_trends import (
+    SearchTrendsTracker,
+    _MemoryTrendStore,
+    _SpaceSavingCounter,
+    canonical_filters,
+    extract_region,
+)
+
+
+class SearchTrendsTrackerTest(SimpleTestCase):
+    """Test heavy-hitter tracking with the in-process store"""
+
+    def setUp(self):
+        """Use a fresh in-process store for every test"""
+        SearchTrendsTracker._store = _MemoryTrendStore(capacity=100)
+        self.now = timezone.now()
+
+    def tearDown(self):
+        SearchTrendsTracker.reset_store()
+
+    def test_canonical_filters_ignores_order_and_paging(self):
+        """Same filters in different order produce the same key"""
+        first = canonical_filters({'mark': 5, 'year_from': 2015, 'page': 2})
+        second = canonical_filters({'year_from': '2015', 'mark': '5', 'ordering': '-price'})
+        self.assertEqual(first, second)
+        self.assertEqual(canonical_filters({'page': 1, 'mark': ''}), '')
+
+    def test_extract_region(self):
+        """Region comes from region_id/region filters, otherwise 'all'"""
+        self.assertEqual(extract_region({'region': 7}), '7')
+        self.assertEqual(extract_region({'mark': 1}), search_trends.ALL_REGIONS)
+
+    def test_top_queries_per_region(self):
+        """Top reads return the heaviest queries globally and per region"""
+        for _ in range(3):
+            SearchTrendsTracker.record('BMW  X5', {'region': 1}, moment=self.now)
+        SearchTrendsTracker.record('audi a6', {'region': 2}, moment=self.now)
+
+        top_all = SearchTrendsTracker.top('query', 'hour', limit=5, moment=self.now)
+        self.assertEqual([item['term'] for item in top_all], ['bmw x5', 'audi a6'])
+        self.assertEqual(top_all[0]['score'], 3.0)
+
+        top_region = SearchTrendsTracker.top('query', 'hour', region='2', moment=self.now)
+        self.assertEqual([item['term'] for item in top_region], ['audi a6'])
+        self.assertEqual(SearchTrendsTracker.active_regions('hour', self.now), ['1', '2'])
+
+    def test_trending_filters_decay_older_buckets(self):
+        """Recent buckets outweigh older ones in trending reads"""
+        earlier = self.now - timedelta(hours=3)
+        for _ in range(4):
+            SearchTrendsTracker.record(filters={'mark': 1}, moment=earlier)
+        for _ in range(2):
+            SearchTrendsTracker.record(filters={'mark': 2}, moment=self.now)
+
+        trending = SearchTrendsTracker.trending('filters', 'hour', window=6, decay=0.5, moment=self.now)
+        self.assertEqual(trending[0]['filters'], {'mark': '2'})
+        self.assertEqual(trending[1]['score'], 0.5)
+
+    def test_space_saving_counter_is_bounded(self):
+        """Counter never keeps more than its capacity"""
+        counter = _SpaceSavingCounter(capacity=2)
+        for term in ['a', 'a', 'b', 'c']:
+            counter.add(term)
+        self.assertEqual(len(counter.counts), 2)
+        self.assertIn('a', counter.counts)
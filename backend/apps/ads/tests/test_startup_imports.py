@@ -0,0 +1,74 @@
+"""
+Tests for the web entrypoint import-time budget.
+"""
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from core.utils.lazy_import import lazy_module
+
+# What a web worker imports before serving its first request
+ENTRYPOINT = ('config.asgi', 'apps.ads.urls', 'apps.currency.urls', 'apps.accounts.urls', 'apps.auth.urls')
+HEAVY_MODULES = ('pandas', 'matplotlib', 'seaborn', 'numpy', 'PIL', 'g4f', 'langchain', 'langgraph')
+
+
+def parse_importtime(stderr: str) -> float:
+    """Total import time in ms: cumulative time of the top-level imports"""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not name[1:].startswith(' '):
+            total += int(cumulative)
+    return total / 1000
+
+
+class StartupImportTest(SimpleTestCase):
+    """Test that the entrypoint stays within budget and leaves heavy libraries unloaded"""
+
+    def run_entrypoint(self):
+        code = (
+            f"import sys\n"
+            f"for name in {ENTRYPOINT!r}:\n"
+            f"    __import__(name)\n"
+            f"print('loaded:' + ','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+        )
+        env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        loaded = [line for line in result.stdout.splitlines() if line.startswith('loaded:')][-1]
+        return loaded[len('loaded:'):], parse_importtime(result.stderr)
+
+    def test_entrypoint_within_budget(self):
+        """Heavy libraries are not imported and total import time fits the budget"""
+        loaded, total_ms = self.run_entrypoint()
+        self.assertEqual(loaded, '', f"Imported at startup: {loaded}")
+
+        budget_ms = getattr(settings, 'STARTUP_IMPORT_BUDGET_MS', 2500)
+        self.assertLess(total_ms, budget_ms, f"Entrypoint imports took {total_ms:.0f} ms (budget {budget_ms} ms)")
+
+    def test_lazy_module_imports_on_first_use(self):
+        """The proxy imports once, on attribute access, and runs on_load once"""
+        calls = []
+        module = lazy_module('json', on_load=calls.append)
+        self.assertFalse(module.loaded)
+        self.assertEqual(module.dumps([1]), '[1]')
+        self.assertEqual(module.loads('2'), 2)
+        self.assertTrue(module.loaded)
+        self.assertEqual(len(calls), 1)
+
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 | _io\n"
+            "import time:        50 |        300 |   encodings.utf_8\n"
+            "import time:       200 |       1500 | django\n"
+        )
+        self.assertEqual(parse_importtime(stderr), 1.6)
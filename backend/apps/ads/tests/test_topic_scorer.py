@@ -0,0 +1,60 @@
+"""
+Tests for the compiled topic scorer used by prompt moderation.
+"""
+import json
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.management.commands.benchmark_topic_scorer import build_corpus, legacy_topic_analysis
+from core.services.llm_moderation import LLMPromptModerationService
+from core.services.topic_scorer import TopicScorer
+
+GOLDEN = Path(__file__).parent / 'fixtures' / 'topic_analysis_golden.json'
+
+
+class TopicScorerTest(SimpleTestCase):
+    """Test matching rules of the scorer on its own"""
+
+    def setUp(self):
+        self.scorer = TopicScorer({
+            'transport': (['авто', 'автобус', 'газ', 'bus'], -0.2),
+            'off_topic': (['одежда женская', 'bus'], 0.3),
+        })
+
+    def test_substring_matches_in_keyword_order(self):
+        """Keywords match inside words; every topic keeps its own list order"""
+        scores = self.scorer.score('Business АВТОБУС, магазин')
+        self.assertEqual(scores.matches['transport'], ('авто', 'автобус', 'газ', 'bus'))
+        self.assertEqual(scores.matches['off_topic'], ('bus',))
+        self.assertEqual(scores.count('transport'), 4)
+        self.assertAlmostEqual(scores.scores['transport'], -0.8)
+
+    def test_phrases_match_across_words(self):
+        self.assertEqual(self.scorer.score('Одежда женская, новая').matches['off_topic'], ('одежда женская',))
+        self.assertEqual(self.scorer.score('Одежда  женская').matches['off_topic'], ())
+
+    def test_fragments_are_cached(self):
+        self.scorer.score('авто авто магазин')
+        self.assertEqual(set(self.scorer.fragments), {'авто', 'магазин'})
+
+
+class TopicAnalysisGoldenTest(SimpleTestCase):
+    """Moderation decisions must stay identical to the substring-check implementation"""
+
+    def setUp(self):
+        self.service = LLMPromptModerationService()
+
+    def test_golden_cases(self):
+        cases = json.loads(GOLDEN.read_text(encoding='utf-8'))
+        for case in cases:
+            with self.subTest(title=case['title']):
+                result = self.service.simulate_llm_topic_analysis(case['title'], case['description'], **case['fields'])
+                self.assertEqual(result, case['expected'])
+
+    def test_random_ads_match_legacy_scan(self):
+        for title, description, fields in build_corpus(300, 30, seed=7):
+            self.assertEqual(
+                self.service.simulate_llm_topic_analysis(title, description, **fields),
+                legacy_topic_analysis(title, description, **fields),
+            )
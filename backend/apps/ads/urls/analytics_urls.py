@@ -7,7 +7,7 @@ from ..views.analytics_tracking_views import (
     TrackSearchQueryAPI, UpdatePageViewMetricsAPI, GetAdAnalyticsAPI,
     GetAdAnalyticsForCardAPI, TrackPhoneViewAPI, ResetAdCountersAPI
 )
-from ..views.search_analytics_view import SearchAnalyticsSeriesAPI
+from ..views.search_analytics_view import SearchAnalyticsSeriesAPI, TrendingSearchesAPI
 from ..views.analytics_api_extras import LLMMarketInsightsAPI, AnalyticsDashboardAPI, ForecastSeriesAPI
 
 
@@ -26,6 +26,7 @@ urlpatterns = [
 
     # Поисковая аналитика (серии для вкладки)
     path('search/series/', SearchAnalyticsSeriesAPI.as_view(), name='search_analytics_series'),
+    path('search/trending/', TrendingSearchesAPI.as_view(), name='search_analytics_trending'),
 
     # Дополнительные API для аналитики и инсайтов
     path('search/insights/', LLMMarketInsightsAPI.as_view(), name='search_analytics_insights'),
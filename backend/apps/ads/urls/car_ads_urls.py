@@ -15,7 +15,8 @@ from ..views.car_ad_views import (
 from ..views.moderation_queue_views import (
     ModerationQueueView, approve_advertisement, reject_advertisement,
     request_review, moderation_statistics, block_advertisement, activate_advertisement,
-    save_moderation_notes
+    save_moderation_notes, claim_moderation_work, release_moderation_claims,
+    moderation_queue_statistics
 )
 
 urlpatterns = [
@@ -42,6 +43,9 @@ urlpatterns = [
 
     # Moderation endpoints (staff/superuser only)
     path('moderation/queue', ModerationQueueView.as_view(), name='moderation_queue'),
+    path('moderation/queue/claim', claim_moderation_work, name='moderation_queue_claim'),
+    path('moderation/queue/release', release_moderation_claims, name='moderation_queue_release'),
+    path('moderation/queue/statistics', moderation_queue_statistics, name='moderation_queue_stats'),
     path('moderation/<int:ad_id>/approve', approve_advertisement, name='approve_ad'),
     path('moderation/<int:ad_id>/reject', reject_advertisement, name='reject_ad'),
     path('moderation/<int:ad_id>/review', request_review, name='request_review'),
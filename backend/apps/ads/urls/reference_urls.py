@@ -25,6 +25,9 @@ from apps.ads.views.reference_views import (
 
     # Vehicle Types
     VehicleTypeListView, VehicleTypeChoicesView,
+
+    # Autocomplete
+    reference_autocomplete,
 )
 
 app_name = 'reference'
@@ -81,6 +84,9 @@ urlpatterns = [
     # Vehicle Types
     path('vehicle-types/', VehicleTypeListView.as_view(), name='vehicle-type-list'),
     path('vehicle-types/choices/', VehicleTypeChoicesView.as_view(), name='vehicle-type-choices'),
+
+    # Autocomplete
+    path('autocomplete/', reference_autocomplete, name='reference-autocomplete'),
 ]
 
 # URL patterns summary:
@@ -110,3 +116,6 @@ urlpatterns = [
 # GET /api/ads/reference/colors/{id}/ - Get specific car color
 # GET /api/ads/reference/colors/popular/ - Get popular car colors
 # GET /api/ads/reference/colors/choices/ - Get color choices for forms
+
+# GET /api/ads/reference/autocomplete/?type=mark|model|city&q={prefix} - Prefix suggestions
+#     (scoped by vehicle_type_id, mark_id or region_id)
@@ -7,7 +7,7 @@ from ..views.statistics_view import (
     AnalyticsTaskStatusView
 )
 from ..views.user_analytics_view import (
-    UserAnalyticsView, UserInsightsView
+    UserAnalyticsView, UserInsightsView, UserBehaviorSummaryView
 )
 
 # Statistics URL patterns
@@ -21,6 +21,7 @@ urlpatterns = [
     # User personal analytics
     path('user/', UserAnalyticsView.as_view(), name='user_analytics'),
     path('user/insights/', UserInsightsView.as_view(), name='user_insights'),
+    path('user/behavior/', UserBehaviorSummaryView.as_view(), name='user_behavior_summary'),
 ]
 
 
@@ -21,6 +21,9 @@ from drf_yasg import openapi
 from apps.ads.models.car_ad_model import CarAd
 from apps.ads.serializers.car_ad_serializer import CarAdSerializer
 from apps.ads.filters import CarAdFilter
+from apps.ads.services.ad_versions import CAR_AD_VERSION_KEY
+from apps.currency.history import VERSION_CACHE_KEY as RATE_HISTORY_VERSION_KEY
+from core.decorators.conditional_get import REFERENCE_DATA_VERSION_KEY, ConditionalGetMixin
 from core.permissions import IsOwnerOrSuperUserWrite
 from rest_framework.pagination import PageNumberPagination
 # from core.services.llm_moderation import llm_moderation_service
@@ -496,6 +499,10 @@ class CarAdListView(generics.ListAPIView):
         tags=['🚗 Advertisements']
     )
     def get(self, request, *args, **kwargs):
+        # Каждый первый запрос страницы поиска — сигнал для топ-K трендов
+        if request.GET.get('page') in (None, '', '1'):
+            from apps.ads.services.search_trends import SearchTrendsTracker
+            SearchTrendsTracker.record(request.GET.get('search'), request.GET.dict())
         return self.list(request, *args, **kwargs)
 
 
@@ -594,11 +601,19 @@ class CarAdCreateView(generics.CreateAPIView):
             logger.info(f"Attached {len(images_data)} images to ad {ad.id}")
 
 
-class CarAdDetailView(generics.RetrieveAPIView):
-    """Detail view for car advertisements (public access)."""
+class CarAdDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """
+    Detail view for car advertisements (public access).
+
+    Responses carry ETags built from the ad, reference data and exchange rate
+    versions; a matching If-None-Match is answered with 304 before any query.
+    Repeat views from the same client are deduplicated by AdViewTracker anyway.
+    """
     queryset = CarAd.objects.all()  # Показываем все объявления
     serializer_class = CarAdSerializer
     permission_classes = []  # Public access
+    conditional_version_keys = (CAR_AD_VERSION_KEY, REFERENCE_DATA_VERSION_KEY, RATE_HISTORY_VERSION_KEY)
+    conditional_private = True
 
     @swagger_auto_schema(
         operation_summary="🔍 View Car Ad Details",
@@ -3,6 +3,7 @@ Views for advertisement moderation system.
 Available only for staff and superuser roles.
 """
 
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
@@ -16,6 +17,12 @@ from apps.ads.filters import CarAdFilter
 from apps.ads.models import CarAd
 from apps.ads.permissions import IsStaffOrSuperUser, IsSuperUser
 from apps.ads.serializers.car_ad_serializer import CarAdSerializer
+from apps.ads.services.moderation_queue import (
+    MAX_LEASE_SECONDS,
+    MIN_LEASE_SECONDS,
+    ClaimConflict,
+    ModerationQueue,
+)
 from core.enums.ads import AdStatusEnum
 
 # Import base views
@@ -84,6 +91,141 @@ class ModerationQueueView(BaseModerationListView):
         return queryset
 
 
+def _claim_conflict(ad, user):
+    """
+    409 response if another moderator holds a live claim on the ad.
+
+    Decision views load the ad with ``select_for_update()`` inside a transaction,
+    so the claim check and the save cannot interleave with another decision.
+    """
+    try:
+        ModerationQueue.check_claim(ad, user)
+    except ClaimConflict:
+        return Response(
+            {
+                "error": "Advertisement is claimed by another moderator",
+                "claimed_until": ad.claimed_until,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+    return None
+
+
+def _record_decision(ad, user):
+    """Common fields of a moderator decision; the decision ends the claim."""
+    from django.utils import timezone
+
+    ad.moderated_by = user
+    ad.moderated_at = timezone.now()
+    ModerationQueue.clear_claim(ad)
+
+
+@swagger_auto_schema(
+    method="post",
+    operation_summary="📥 Claim Moderation Work",
+    operation_description=(
+        "Claim the next advertisements from the moderation queue (staff/superuser only). "
+        "Order: promoted, flagged for manual review, oldest. Claimed ads are hidden from other "
+        "moderators until decided, released or until the lease expires."
+    ),
+    tags=["🛡️ Moderation"],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "count": openapi.Schema(
+                type=openapi.TYPE_INTEGER, description="Number of ads to claim (1-50, default 10)"
+            ),
+            "lease_seconds": openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description=f"Claim lease in seconds ({MIN_LEASE_SECONDS}-{MAX_LEASE_SECONDS}, default 900)",
+            ),
+        },
+    ),
+    responses={
+        200: openapi.Response(description="Claimed advertisements", schema=CarAdSerializer(many=True)),
+        400: openapi.Response(description="Invalid count or lease"),
+        403: openapi.Response(description="Permission denied"),
+    },
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsStaffOrSuperUser])
+def claim_moderation_work(request):
+    """Claim the next ads from the moderation queue."""
+    try:
+        count = int(request.data.get("count", 10))
+        lease_seconds = request.data.get("lease_seconds")
+        lease_seconds = int(lease_seconds) if lease_seconds is not None else None
+    except (TypeError, ValueError):
+        return Response(
+            {"error": "count and lease_seconds must be integers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if lease_seconds is not None and not MIN_LEASE_SECONDS <= lease_seconds <= MAX_LEASE_SECONDS:
+        return Response(
+            {"error": f"lease_seconds must be between {MIN_LEASE_SECONDS} and {MAX_LEASE_SECONDS}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    ads = ModerationQueue.claim(request.user, count=count, lease_seconds=lease_seconds)
+    return Response(
+        {
+            "count": len(ads),
+            "claimed_until": ads[0].claimed_until if ads else None,
+            "ads": CarAdSerializer(ads, many=True).data,
+        }
+    )
+
+
+@swagger_auto_schema(
+    method="post",
+    operation_summary="📤 Release Moderation Claims",
+    operation_description="Return claimed advertisements to the queue (all or the given ids).",
+    tags=["🛡️ Moderation"],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "ad_ids": openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                description="Ads to release (default: all own claims)",
+            )
+        },
+    ),
+    responses={200: openapi.Response(description="Number of released claims")},
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated, IsStaffOrSuperUser])
+def release_moderation_claims(request):
+    """Release the moderator's claims."""
+    released = ModerationQueue.release(request.user, ad_ids=request.data.get("ad_ids"))
+    return Response({"released": released})
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="📈 Moderation Queue Statistics",
+    operation_description="Queue size and per-moderator throughput (staff/superuser only).",
+    tags=["🛡️ Moderation"],
+    manual_parameters=[
+        openapi.Parameter(
+            "hours",
+            openapi.IN_QUERY,
+            description="Throughput window in hours (default 24)",
+            type=openapi.TYPE_INTEGER,
+        ),
+    ],
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated, IsStaffOrSuperUser])
+def moderation_queue_statistics(request):
+    """Queue size and per-moderator throughput."""
+    try:
+        hours = max(1, int(request.GET.get("hours", 24)))
+    except ValueError:
+        return Response({"error": "hours must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(ModerationQueue.stats(hours=hours))
+
+
 @swagger_auto_schema(
     method="post",
     operation_summary="✅ Approve Advertisement",
@@ -107,19 +249,24 @@ class ModerationQueueView(BaseModerationListView):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsStaffOrSuperUser])
+@transaction.atomic
 def approve_advertisement(request, ad_id):
     """Approve an advertisement."""
     try:
-        ad = CarAd.objects.get(id=ad_id)
+        ad = CarAd.objects.select_for_update().get(id=ad_id)
     except CarAd.DoesNotExist:
         return Response(
             {"error": "Advertisement not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
+    conflict = _claim_conflict(ad, request.user)
+    if conflict:
+        return conflict
+
     # Update ad status
     ad.status = AdStatusEnum.ACTIVE
     ad.is_validated = True
-    ad.moderated_by = request.user
+    _record_decision(ad, request.user)
     ad.moderation_reason = request.data.get("reason", "Approved by moderator")
     ad.save()
 
@@ -156,15 +303,20 @@ def approve_advertisement(request, ad_id):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsSuperUser])
+@transaction.atomic
 def block_advertisement(request, ad_id):
     """Block an advertisement (superuser only)."""
     try:
-        ad = CarAd.objects.get(id=ad_id)
+        ad = CarAd.objects.select_for_update().get(id=ad_id)
     except CarAd.DoesNotExist:
         return Response(
             {"error": "Advertisement not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
+    conflict = _claim_conflict(ad, request.user)
+    if conflict:
+        return conflict
+
     reason = request.data.get("reason")
     if not reason:
         return Response(
@@ -175,7 +327,7 @@ def block_advertisement(request, ad_id):
     # Update ad status
     ad.status = AdStatusEnum.BLOCKED
     ad.is_validated = False
-    ad.moderated_by = request.user
+    _record_decision(ad, request.user)
     ad.moderation_reason = reason
     ad.moderator_notes = request.data.get("moderator_notes", "")
     ad.save()
@@ -209,19 +361,24 @@ def block_advertisement(request, ad_id):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsSuperUser])
+@transaction.atomic
 def activate_advertisement(request, ad_id):
     """Activate a blocked advertisement (superuser only)."""
     try:
-        ad = CarAd.objects.get(id=ad_id)
+        ad = CarAd.objects.select_for_update().get(id=ad_id)
     except CarAd.DoesNotExist:
         return Response(
             {"error": "Advertisement not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
+    conflict = _claim_conflict(ad, request.user)
+    if conflict:
+        return conflict
+
     # Update ad status
     ad.status = AdStatusEnum.ACTIVE
     ad.is_validated = True
-    ad.moderated_by = request.user
+    _record_decision(ad, request.user)
     ad.moderation_reason = "Activated by superuser"
     ad.moderator_notes = request.data.get("moderator_notes", "")
     ad.save()
@@ -257,15 +414,20 @@ def activate_advertisement(request, ad_id):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsStaffOrSuperUser])
+@transaction.atomic
 def reject_advertisement(request, ad_id):
     """Reject an advertisement."""
     try:
-        ad = CarAd.objects.get(id=ad_id)
+        ad = CarAd.objects.select_for_update().get(id=ad_id)
     except CarAd.DoesNotExist:
         return Response(
             {"error": "Advertisement not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
+    conflict = _claim_conflict(ad, request.user)
+    if conflict:
+        return conflict
+
     reason = request.data.get("reason")
     if not reason:
         return Response(
@@ -276,7 +438,7 @@ def reject_advertisement(request, ad_id):
     # Update ad status
     ad.status = AdStatusEnum.REJECTED
     ad.is_validated = False
-    ad.moderated_by = request.user
+    _record_decision(ad, request.user)
     ad.moderation_reason = reason
     ad.save()
 
@@ -309,18 +471,23 @@ def reject_advertisement(request, ad_id):
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsStaffOrSuperUser])
+@transaction.atomic
 def request_review(request, ad_id):
     """Mark advertisement as needing review."""
     try:
-        ad = CarAd.objects.get(id=ad_id)
+        ad = CarAd.objects.select_for_update().get(id=ad_id)
     except CarAd.DoesNotExist:
         return Response(
             {"error": "Advertisement not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
+    conflict = _claim_conflict(ad, request.user)
+    if conflict:
+        return conflict
+
     # Update ad status
     ad.status = AdStatusEnum.NEEDS_REVIEW
-    ad.moderated_by = request.user
+    _record_decision(ad, request.user)
     ad.moderation_reason = request.data.get("reason", "Marked for review by moderator")
     ad.save()
 
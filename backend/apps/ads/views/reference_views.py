@@ -52,6 +52,8 @@ from apps.ads.serializers.reference_serializers import (
     CarModificationDetailSerializer,
     CarModificationListSerializer,
 )
+from apps.ads.services.reference_snapshot import get_reference_snapshot
+from core.decorators.conditional_get import REFERENCE_DATA_VERSION_KEY, ConditionalGetMixin, conditional_get
 from core.pagination import ReferenceDataPagination, StandardResultsSetPagination
 from core.permissions import ReadOnlyOrStaffWrite
 
@@ -61,6 +63,9 @@ from core.views import (
     BaseReferenceRetrieveUpdateDestroyView,
 )
 
+# Reference endpoints answer If-None-Match with 304 until reference data changes
+REFERENCE_VERSION_KEYS = (REFERENCE_DATA_VERSION_KEY,)
+
 
 # Car Marks Views
 class CarMarkListCreateView(BaseReferenceListCreateView):
@@ -205,15 +210,12 @@ class CarMarkRetrieveUpdateDestroyView(BaseReferenceRetrieveUpdateDestroyView):
         )
     },
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_marks_popular(request):
     """Get only popular car marks."""
-    queryset = (
-        CarMarkModel.objects.filter(is_popular=True)
-        .order_by("name")
-        .annotate(models_count=Count("models"))
-    )
+    queryset = [mark for mark in get_reference_snapshot().marks if mark.is_popular]
 
     # Apply pagination
     paginator = StandardResultsSetPagination()
@@ -239,19 +241,19 @@ def car_marks_popular(request):
         )
     },
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_marks_choices(request):
     """Get simplified mark choices for forms."""
-    queryset = (
-        CarMarkModel.objects.all().select_related("vehicle_type").order_by("name")
-    )
+    snapshot = get_reference_snapshot()
+    queryset = snapshot.marks
 
     # ✅ КРИТИЧЕСКОЕ ИСПРАВЛЕНИЕ: Фильтрация марок по типу транспорта!
     # Каскадная фильтрация: Тип → Марка → Модель
     vehicle_type_id = request.query_params.get("vehicle_type_id")
     if vehicle_type_id:
-        queryset = queryset.filter(vehicle_type_id=vehicle_type_id)
+        queryset = snapshot.marks_of(vehicle_type_id)
 
     serializer = CarMarkChoiceSerializer(queryset, many=True)
     return Response(serializer.data)
@@ -270,12 +272,12 @@ def car_marks_choices(request):
         404: "Car mark not found",
     },
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 def car_marks_with_models(request, pk):
     """Get mark with all its models."""
-    try:
-        mark = CarMarkModel.objects.prefetch_related("models").get(pk=pk)
-    except CarMarkModel.DoesNotExist:
+    mark = get_reference_snapshot().mark(pk)
+    if mark is None:
         return Response(
             {"error": "Car mark not found"}, status=status.HTTP_404_NOT_FOUND
         )
@@ -435,6 +437,7 @@ class CarModelRetrieveUpdateDestroyView(BaseReferenceRetrieveUpdateDestroyView):
     tags=["🚗 Car Models"],
     responses={200: "Success response with models data", 404: "Car mark not found"},
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_models_by_mark(request):
@@ -446,12 +449,7 @@ def car_models_by_mark(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    queryset = (
-        CarModel.objects.filter(mark_id=mark_id)
-        .select_related("mark")
-        .order_by("name")
-        .annotate(generations_count=Count("generations"))
-    )
+    queryset = get_reference_snapshot().models_of(mark_id)
 
     # Apply pagination
     paginator = StandardResultsSetPagination()
@@ -471,16 +469,12 @@ def car_models_by_mark(request):
     tags=["🚗 Car Models"],
     responses={200: "Success response with popular models data", 404: "Not found"},
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_models_popular(request):
     """Get only popular car models."""
-    queryset = (
-        CarModel.objects.filter(is_popular=True)
-        .select_related("mark")
-        .order_by("mark__name", "name")
-        .annotate(generations_count=Count("generations"))
-    )
+    queryset = [model for model in get_reference_snapshot().models if model.is_popular]
 
     # Apply pagination
     paginator = StandardResultsSetPagination()
@@ -500,18 +494,18 @@ def car_models_popular(request):
     tags=["🚗 Car Models"],
     responses={200: "Success response with models choices data", 404: "Not found"},
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_models_choices(request):
     """Get simplified model choices for forms."""
-    queryset = (
-        CarModel.objects.all().select_related("mark").order_by("mark__name", "name")
-    )
+    snapshot = get_reference_snapshot()
+    queryset = snapshot.models
 
     # Filter by mark if provided
     mark_id = request.query_params.get("mark_id")
     if mark_id:
-        queryset = queryset.filter(mark_id=mark_id)
+        queryset = snapshot.models_of(mark_id)
 
     serializer = CarModelChoiceSerializer(queryset, many=True)
     return Response(serializer.data)
@@ -625,6 +619,7 @@ def locations_random(request):
         404: "Car model not found",
     },
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 def car_models_with_generations(request, pk):
     """Get model with all its generations."""
@@ -768,6 +763,7 @@ class CarColorRetrieveUpdateDestroyView(BaseReferenceRetrieveUpdateDestroyView):
     responses={200: "Success response with popular colors data", 404: "Not found"},
     security=[],
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_colors_popular(request):
@@ -793,6 +789,7 @@ def car_colors_popular(request):
     responses={200: "Success response with colors choices data", 404: "Not found"},
     security=[],
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_colors_choices(request):
@@ -879,6 +876,7 @@ class CarGenerationRetrieveUpdateDestroyView(BaseReferenceRetrieveUpdateDestroyV
     tags=["📅 Car Generations"],
     responses={200: "Success response with data", 404: "Not found"},
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_generations_by_model(request):
@@ -915,6 +913,7 @@ def car_generations_by_model(request):
     tags=["📅 Car Generations"],
     responses={200: "Success response with data", 404: "Not found"},
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 def car_generations_with_modifications(request, pk):
     """Get generation with all its modifications."""
@@ -1021,6 +1020,7 @@ class CarModificationRetrieveUpdateDestroyView(BaseReferenceRetrieveUpdateDestro
     tags=["⚙️ Car Modifications"],
     responses={200: "Success response with data", 404: "Not found"},
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 @permission_classes([])  # Public access
 def car_modifications_by_generation(request):
@@ -1054,7 +1054,7 @@ def car_modifications_by_generation(request):
 # =============================================================================
 
 
-class RegionListView(generics.ListAPIView):
+class RegionListView(ConditionalGetMixin, generics.ListAPIView):
     """
     Список всех регионов Украины.
     Используется для выбора региона при создании объявления.
@@ -1062,74 +1062,26 @@ class RegionListView(generics.ListAPIView):
 
     from apps.ads.models.reference import RegionModel
 
+    conditional_version_keys = REFERENCE_VERSION_KEYS
     permission_classes: list = []  # Публичный доступ
     pagination_class = None  # Без пагинации для справочников
 
     def get_queryset(self):
         """
-        Возвращает уникальные активные регионы, отфильтрованные от дубликатов.
-        Приоритет отдается украинским названиям.
-        Поддерживает поиск по названию.
+        Возвращает уникальные активные регионы без дубликатов (uk/ru).
+        Группы дубликатов и канонический регион (украинское название)
+        берутся из таблицы алиасов (build_location_aliases), без запросов к БД.
+        Поддерживает поиск по названию и транслитерации.
         """
-        from apps.ads.models.reference import RegionModel
-
-        # Получаем параметр поиска
-        search = self.request.query_params.get("search", "").strip()
-        print(f"🌍 RegionListView: search parameter = '{search}'")
+        from apps.ads.services.location_directory import get_location_directory
 
-        # Получаем все активные регионы
-        queryset = RegionModel.objects.filter(is_active=True)
-
-        # Применяем поиск, если есть
-        if search:
-            queryset = queryset.filter(name__icontains=search)
-            print(
-                f"🌍 RegionListView: Applied search filter, found {queryset.count()} regions"
-            )
+        search = self.request.query_params.get("search", "")
+        return get_location_directory().canonical_regions(search)
 
-        all_regions = queryset.order_by("name")
-
-        # Группируем по нормализованным названиям
-        seen_normalized = {}
-        unique_regions = []
-
-        for region in all_regions:
-            # Нормализуем название для поиска дубликатов
-            normalized = region.name.lower()
-            # Убираем различия между украинским и русским
-            normalized = normalized.replace("ська", "ская").replace("цька", "цкая")
-            normalized = normalized.replace("івська", "овская").replace(
-                "ївська", "евская"
-            )
-            normalized = normalized.replace("область", "").replace("обл", "").strip()
-
-            if normalized not in seen_normalized:
-                # Первое вхождение - добавляем
-                seen_normalized[normalized] = region
-                unique_regions.append(region)
-            else:
-                # Дубликат - проверяем приоритет (украинский > русский)
-                existing = seen_normalized[normalized]
-                if (
-                    "ська" in region.name
-                    or "цька" in region.name
-                    or "івська" in region.name
-                ) and (
-                    "ская" in existing.name
-                    or "цкая" in existing.name
-                    or "овская" in existing.name
-                ):
-                    # Заменяем русское на украинское
-                    unique_regions.remove(existing)
-                    unique_regions.append(region)
-                    seen_normalized[normalized] = region
-
-        # Возвращаем queryset с уникальными ID
-        unique_ids = [r.id for r in unique_regions]
-        print(
-            f"🌍 RegionListView: Returning {len(unique_regions)} unique regions (search: '{search}')"
-        )
-        return RegionModel.objects.filter(id__in=unique_ids).order_by("name")
+    def list(self, request, *args, **kwargs):
+        """Список из снимка: фильтры DRF работают только с QuerySet"""
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
 
     def get_serializer_class(self):
         from apps.ads.serializers.cars.region import RegionSerializer
@@ -1146,7 +1098,7 @@ class RegionListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class CityListView(generics.ListAPIView):
+class CityListView(ConditionalGetMixin, generics.ListAPIView):
     """
     Список городов с возможностью фильтрации по региону.
     Поддерживает фильтрацию по параметрам region и region_id.
@@ -1155,6 +1107,7 @@ class CityListView(generics.ListAPIView):
     from apps.ads.models.reference import CityModel
 
     queryset = CityModel.objects.filter(is_active=True).order_by("name")
+    conditional_version_keys = REFERENCE_VERSION_KEYS
     permission_classes: list = []  # Публичный доступ
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_class = CityFilter  # Используем CityFilter для правильной фильтрации
@@ -1192,6 +1145,38 @@ class CityListView(generics.ListAPIView):
         
         return queryset
 
+    # Параметры, которые обслуживаются из справочного снимка без запросов к БД
+    SNAPSHOT_PARAMS = {"region", "region_id", "search", "name", "page", "page_size"}
+
+    def list(self, request, *args, **kwargs):
+        """
+        Отдает города из справочного снимка, если запрошены только регион,
+        поиск и пагинация; остальные фильтры CityFilter идут в БД.
+        """
+        params = request.query_params
+        region_id = params.get("region") or params.get("region_id")
+        if set(params) - self.SNAPSHOT_PARAMS or (region_id and not region_id.isdigit()):
+            return super().list(request, *args, **kwargs)
+
+        snapshot = get_reference_snapshot()
+        cities = snapshot.cities_of(region_id) if region_id else snapshot.cities
+
+        terms = [
+            term.lower()
+            for term in [params.get("name", "")] + params.get("search", "").replace(",", " ").split()
+            if term
+        ]
+        if terms:
+            cities = [city for city in cities if all(term in city.name.lower() for term in terms)]
+
+        page = self.paginate_queryset(list(cities))
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer(cities, many=True)
+        return Response(serializer.data)
+
     def get_serializer_class(self):
         from apps.ads.serializers.cars.region import CitySerializer
 
@@ -1218,6 +1203,7 @@ class CityListView(generics.ListAPIView):
         404: "Region not found",
     },
 )
+@conditional_get(REFERENCE_VERSION_KEYS)
 @api_view(["GET"])
 def cities_by_region(request):
     """
@@ -1227,7 +1213,6 @@ def cities_by_region(request):
     Query params:
     - region_id: ID региона
     """
-    from apps.ads.models.reference import CityModel, RegionModel
     from apps.ads.serializers.cars.region import CitySerializer
 
     region_id = request.GET.get("region_id")
@@ -1237,21 +1222,21 @@ def cities_by_region(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    try:
-        region = RegionModel.objects.get(id=region_id)
-        cities = CityModel.objects.filter(region=region).order_by("name")
-        serializer = CitySerializer(cities, many=True)
+    snapshot = get_reference_snapshot()
+    region = snapshot.region(region_id)
+    if region is None:
+        return Response({"error": "Регион не найден"}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response(
-            {
-                "region": {"id": region.id, "name": region.name},
-                "cities": serializer.data,
-                "count": cities.count(),
-            }
-        )
+    cities = snapshot.cities_of(region.id, active_only=False)
+    serializer = CitySerializer(cities, many=True)
 
-    except RegionModel.DoesNotExist:
-        return Response({"error": "Регион не найден"}, status=status.HTTP_404_NOT_FOUND)
+    return Response(
+        {
+            "region": {"id": region.id, "name": region.name},
+            "cities": serializer.data,
+            "count": len(cities),
+        }
+    )
 
 
 # =============================================================================
@@ -1259,7 +1244,7 @@ def cities_by_region(request):
 # =============================================================================
 
 
-class VehicleTypeListView(generics.ListAPIView):
+class VehicleTypeListView(ConditionalGetMixin, generics.ListAPIView):
     """
     Список всех типов транспортных средств.
     """
@@ -1267,6 +1252,7 @@ class VehicleTypeListView(generics.ListAPIView):
     from apps.ads.models.reference import VehicleTypeModel
 
     queryset = VehicleTypeModel.objects.all().order_by("name")
+    conditional_version_keys = REFERENCE_VERSION_KEYS
     permission_classes: list = []  # Публичный доступ
     pagination_class = None  # Без пагинации для справочников
 
@@ -1285,7 +1271,7 @@ class VehicleTypeListView(generics.ListAPIView):
         return super().get(request, *args, **kwargs)
 
 
-class VehicleTypeChoicesView(generics.ListAPIView):
+class VehicleTypeChoicesView(ConditionalGetMixin, generics.ListAPIView):
     """
     Типы транспортных средств в формате choices для форм.
     """
@@ -1293,6 +1279,7 @@ class VehicleTypeChoicesView(generics.ListAPIView):
     from apps.ads.models.reference import VehicleTypeModel
 
     queryset = VehicleTypeModel.objects.all().order_by("name")
+    conditional_version_keys = REFERENCE_VERSION_KEYS
     permission_classes: list = []  # Публичный доступ
     pagination_class = None
 
@@ -1311,3 +1298,63 @@ class VehicleTypeChoicesView(generics.ListAPIView):
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
+
+
+# =============================================================================
+# АВТОДОПОЛНЕНИЕ
+# =============================================================================
+
+AUTOCOMPLETE_SCOPES = {"mark": "vehicle_type_id", "model": "mark_id", "city": "region_id"}
+
+
+@swagger_auto_schema(
+    method="get",
+    operation_summary="Autocomplete marks, models and cities",
+    operation_description="Prefix suggestions from an in-memory index ordered by popularity. Matches Ukrainian, Russian and Latin spellings (\"київ\", \"kyiv\"; \"тойота\", \"toyota\") and word starts inside names.",
+    tags=["🔎 Autocomplete"],
+    security=[],
+    manual_parameters=[
+        openapi.Parameter("q", openapi.IN_QUERY, description="Typed prefix", type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter("type", openapi.IN_QUERY, description="mark, model or city", type=openapi.TYPE_STRING, required=True),
+        openapi.Parameter("vehicle_type_id", openapi.IN_QUERY, description="Scope marks to a vehicle type", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("mark_id", openapi.IN_QUERY, description="Scope models to a mark", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("region_id", openapi.IN_QUERY, description="Scope cities to a region", type=openapi.TYPE_INTEGER),
+        openapi.Parameter("limit", openapi.IN_QUERY, description="Number of suggestions (default: 10, max: 50)", type=openapi.TYPE_INTEGER),
+    ],
+    responses={200: "Suggestions", 400: "Bad request - unknown type or invalid scope"},
+)
+@api_view(["GET"])
+@permission_classes([])  # Public access
+def reference_autocomplete(request):
+    """
+    Автодополнение марок, моделей и городов по префиксу.
+
+    Query params:
+    - q: введенный префикс
+    - type: mark | model | city
+    - vehicle_type_id / mark_id / region_id: ограничение области поиска
+    - limit: количество подсказок
+    """
+    from apps.ads.services.reference_autocomplete import MAX_LIMIT, get_autocomplete_index
+
+    kind = request.query_params.get("type", "mark")
+    if kind not in AUTOCOMPLETE_SCOPES:
+        return Response(
+            {"error": f"type must be one of: {', '.join(AUTOCOMPLETE_SCOPES)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    scope_param = AUTOCOMPLETE_SCOPES[kind]
+    try:
+        scope_id = request.query_params.get(scope_param)
+        scope_id = int(scope_id) if scope_id else None
+        limit = min(int(request.query_params.get("limit", 10)), MAX_LIMIT)
+    except (TypeError, ValueError):
+        return Response(
+            {"error": f"{scope_param} and limit must be integers"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    query = request.query_params.get("q", "")
+    results = get_autocomplete_index().suggest(kind, query, scope_id=scope_id, limit=limit) if query.strip() else []
+    return Response({"type": kind, "query": query, scope_param: scope_id, "results": results})
@@ -259,3 +259,80 @@ class SearchAnalyticsSeriesAPI(APIView):
         except Exception as e:
             return JsonResponse({"success": False, "error": str(e)}, status=500)
 
+
+
+class TrendingSearchesAPI(APIView):
+    """
+    Trending search queries and filter combinations.
+    Endpoint: /api/ads/analytics/search/trending/
+
+    Served from the streaming heavy-hitter counters (O(K) read); falls back to
+    the latest ``SearchTrendSnapshot`` rows when the live counters are empty.
+    """
+    authentication_classes = []
+    permission_classes = []
+
+    @swagger_auto_schema(
+        operation_id='search_analytics_trending',
+        operation_summary='🔥 Trending Searches',
+        operation_description="""
+        Get trending search queries or filter combinations.
+
+        ### Permissions:
+        - No authentication required (public endpoint)
+
+        ### Response:
+        Top-K terms with decayed scores for the requested period and region.
+        """,
+        manual_parameters=[
+            openapi.Parameter('kind', openapi.IN_QUERY, description="query | filters", type=openapi.TYPE_STRING),
+            openapi.Parameter('period', openapi.IN_QUERY, description="hour | day", type=openapi.TYPE_STRING),
+            openapi.Parameter('region', openapi.IN_QUERY, description="Region ID or name (default: all)", type=openapi.TYPE_STRING),
+            openapi.Parameter('window', openapi.IN_QUERY, description="Number of buckets to combine (default 24)", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('limit', openapi.IN_QUERY, description="Number of items (max 50)", type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: 'Trending searches retrieved successfully',
+            400: 'Invalid parameters'
+        },
+        tags=['📊 Analytics']
+    )
+    def get(self, request, *args, **kwargs):
+        from apps.ads.models.analytics_models import SearchTrendSnapshot
+        from apps.ads.services.search_trends import ALL_REGIONS, KINDS, PERIODS, SearchTrendsTracker
+
+        params = request.query_params
+        kind = params.get("kind", "query")
+        period = params.get("period", "hour")
+        region = (params.get("region") or ALL_REGIONS).strip().lower()
+        if kind not in KINDS or period not in PERIODS:
+            return JsonResponse({"success": False, "error": "Invalid kind or period"}, status=400)
+        try:
+            limit = min(max(int(params.get("limit", 10)), 1), 50)
+            window = min(max(int(params.get("window", 24)), 1), 168)
+        except (TypeError, ValueError):
+            return JsonResponse({"success": False, "error": "limit and window must be integers"}, status=400)
+
+        items = SearchTrendsTracker.trending(kind, period, region, limit=limit, window=window)
+        source = "live"
+        if not items:
+            latest = (
+                SearchTrendSnapshot.objects.filter(period=period, kind=kind, region=region)
+                .order_by("-bucket_start")
+                .values_list("bucket_start", flat=True)
+                .first()
+            )
+            rows = SearchTrendSnapshot.objects.filter(
+                period=period, kind=kind, region=region, bucket_start=latest
+            ).order_by("rank")[:limit] if latest else []
+            items = [SearchTrendsTracker.format_item(kind, row.term, row.score) for row in rows]
+            source = "snapshot"
+
+        return JsonResponse({
+            "success": True,
+            "kind": kind,
+            "period": period,
+            "region": region,
+            "source": source,
+            "items": items,
+        })
@@ -256,3 +256,58 @@ class UserInsightsView(APIView):
                 },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class UserBehaviorSummaryView(APIView):
+    """Предрассчитанная сводка поведения пользователя (батч UserBehaviorSummaryEngine)"""
+
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_summary="🧭 User Behavior Summary",
+        operation_description=(
+            "Get the precomputed behavior summary of the authenticated user. "
+            "Staff users may pass `user_id` to read another user's summary. "
+            "Summaries are maintained incrementally by a batch job, so this is a single lookup."
+        ),
+        tags=["📊 Statistics"],
+        manual_parameters=[
+            openapi.Parameter(
+                "user_id",
+                openapi.IN_QUERY,
+                description="User ID (staff only)",
+                type=openapi.TYPE_INTEGER,
+            )
+        ],
+        responses={
+            200: openapi.Response(description="Behavior summary retrieved successfully"),
+            403: openapi.Response(description="Only staff can read other users' summaries"),
+            404: openapi.Response(description="Summary not computed yet"),
+        },
+    )
+    def get(self, request, *args, **kwargs):
+        from apps.ads.services.behavior_summary import UserBehaviorSummaryEngine
+
+        user_id = request.user.id
+        requested = request.GET.get("user_id")
+        if requested and str(requested) != str(user_id):
+            if not request.user.is_staff:
+                return Response(
+                    {"success": False, "message": "Permission denied"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+            try:
+                user_id = int(requested)
+            except ValueError:
+                return Response(
+                    {"success": False, "message": "user_id must be an integer"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        summary = UserBehaviorSummaryEngine.get_summary(user_id)
+        if summary is None:
+            return Response(
+                {"success": False, "message": "Behavior summary is not computed yet"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({"success": True, "data": summary})
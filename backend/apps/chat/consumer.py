@@ -8,7 +8,7 @@ All AI processing is delegated to the ChatAgent and LangGraph pipeline.
 
 import json
 import logging
-from typing import Dict, Any, Optional, List
+from typing import TYPE_CHECKING, Dict, Any, Optional, List
 from urllib.parse import parse_qs
 from datetime import datetime
 
@@ -16,7 +16,8 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
-from .agent import EnhancedChatAgent
+if TYPE_CHECKING:
+    from .agent import EnhancedChatAgent
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -39,7 +40,7 @@ class EnhancedChatConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.user: Optional[User] = None
-        self.agent: Optional[EnhancedChatAgent] = None
+        self.agent: Optional['EnhancedChatAgent'] = None
         self.session_id: Optional[str] = None
         self.connection_time: Optional[datetime] = None
     
@@ -63,7 +64,8 @@ class EnhancedChatConsumer(AsyncWebsocketConsumer):
             # Generate session ID
             self.session_id = self._generate_session_id()
 
-            # Initialize agent
+            # Initialize agent (LangGraph/LangChain/g4f are loaded on the first connection)
+            from .agent import EnhancedChatAgent
             user_id = str(self.user.id) if self.user and self.user.is_authenticated else None
             self.agent = EnhancedChatAgent(user_id=user_id, session_id=self.session_id)
 
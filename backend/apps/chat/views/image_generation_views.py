@@ -12,13 +12,14 @@ from django.conf import settings
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from core.utils.lazy_import import is_available, lazy_module
+
 logger = logging.getLogger(__name__)
 
-try:
-    from g4f.client import Client
-    G4F_AVAILABLE = True
-except ImportError:
-    G4F_AVAILABLE = False
+# g4f is imported on the first generation request, not when URLs are loaded
+G4F_AVAILABLE = is_available('g4f')
+g4f_client = lazy_module('g4f.client')
+if not G4F_AVAILABLE:
     logger.warning("g4f not available, image generation will use fallbacks")
 
 
@@ -195,7 +196,7 @@ def generate_single_image_view(request):
     
     try:
         # Initialize g4f client
-        client = Client()
+        client = g4f_client.Client()
         
         # Generate image
         response = client.images.generate(
@@ -0,0 +1,210 @@
+"""
+Массовая загрузка курсов из нескольких источников
+
+Все источники опрашиваются параллельно, каждый одним запросом на все валюты.
+Расхождения между источниками согласуются (медиана или приоритет), итоговые
+курсы сохраняются одним bulk_create, а задержка каждого источника пишется в
+отдельную запись CurrencyUpdateLog.
+"""
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from decimal import Decimal, ROUND_HALF_UP
+from statistics import median
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CurrencyRate, CurrencyUpdateLog
+from .providers import RateProvider, get_providers
+
+logger = logging.getLogger(__name__)
+
+RATE_QUANTUM = Decimal('0.000001')
+STRATEGIES = ('median', 'priority')
+
+
+class BulkRateFetcher:
+    """
+    Параллельная загрузка и согласование курсов
+
+    Args:
+        providers: Провайдеры в порядке приоритета (по умолчанию из настроек)
+        timeout: Общий таймаут опроса источников в секундах
+        strategy: 'median' — медиана по источникам, 'priority' — первый ответивший по приоритету
+        max_spread: Относительное расхождение источников, после которого пишется предупреждение
+    """
+
+    def __init__(self, providers: Optional[List[RateProvider]] = None, timeout: Optional[float] = None,
+                 strategy: Optional[str] = None, max_spread: Optional[float] = None):
+        self.providers = providers if providers is not None else get_providers()
+        self.timeout = timeout if timeout is not None else getattr(settings, 'CURRENCY_FETCH_TIMEOUT', 10)
+        self.strategy = strategy or getattr(settings, 'CURRENCY_RECONCILE_STRATEGY', 'median')
+        self.max_spread = Decimal(str(max_spread if max_spread is not None
+                                      else getattr(settings, 'CURRENCY_MAX_SOURCE_SPREAD', 0.05)))
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown reconcile strategy: {self.strategy}")
+
+    @staticmethod
+    def default_currencies() -> List[str]:
+        return [code for code, _ in CurrencyRate.CURRENCY_CHOICES if code != 'UAH']
+
+    def fetch_all(self, currencies: Iterable[str]) -> List[Dict]:
+        """
+        Опросить все источники параллельно
+
+        Returns:
+            List[Dict]: По записи на источник в порядке приоритета:
+                {'provider', 'rates', 'latency', 'error'}
+        """
+        currencies = list(currencies)
+        results = [
+            {'provider': provider, 'rates': {}, 'latency': None, 'error': None}
+            for provider in self.providers
+        ]
+        if not results:
+            return results
+
+        def timed_fetch(provider):
+            started = time.monotonic()
+            try:
+                return provider.fetch(currencies), None, time.monotonic() - started
+            except Exception as e:
+                return {}, str(e), time.monotonic() - started
+
+        # Не используем контекстный менеджер: он ждал бы зависшие источники
+        executor = ThreadPoolExecutor(max_workers=len(results), thread_name_prefix='currency-fetch')
+        futures = [executor.submit(timed_fetch, result['provider']) for result in results]
+        wait(futures, timeout=self.timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for result, future in zip(results, futures):
+            if future.done():
+                result['rates'], result['error'], result['latency'] = future.result()
+            else:
+                result['error'] = f"timeout after {self.timeout}s"
+                result['latency'] = float(self.timeout)
+
+            name = result['provider'].name
+            if result['error']:
+                logger.warning(f"⚠️ {name}: {result['error']}")
+            else:
+                logger.info(f"📡 {name}: {len(result['rates'])} rates in {result['latency'] * 1000:.0f} ms")
+        return results
+
+    def reconcile(self, results: List[Dict], currencies: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Согласовать курсы между источниками
+
+        Returns:
+            Dict[str, Dict]: {currency: {'rate': Decimal, 'source': str, 'quotes': {provider: str}}}
+        """
+        reconciled = {}
+        for currency in currencies:
+            quotes = [
+                (result['provider'], result['rates'][currency])
+                for result in results
+                if currency in result['rates']
+            ]
+            if not quotes:
+                continue
+
+            values = [rate for _, rate in quotes]
+            if self.strategy == 'priority':
+                rate = values[0]
+            else:
+                rate = median(values)
+
+            spread = (max(values) - min(values)) / rate if rate else Decimal(0)
+            if spread > self.max_spread:
+                logger.warning(f"⚠️ {currency}: sources disagree by {spread:.1%} ({', '.join(str(v) for v in values)})")
+
+            # Источник записи — провайдер с курсом, ближайшим к итоговому (при равенстве — по приоритету)
+            source_provider = min(quotes, key=lambda quote: abs(quote[1] - rate))[0]
+            reconciled[currency] = {
+                'rate': rate.quantize(RATE_QUANTUM, rounding=ROUND_HALF_UP),
+                'source': source_provider.source,
+                'quotes': {provider.name: str(value) for provider, value in quotes},
+            }
+        return reconciled
+
+    def run(self, currencies: Optional[Iterable[str]] = None, triggered_by: str = 'bulk_update') -> Dict:
+        """
+        Загрузить, согласовать и сохранить курсы
+
+        Returns:
+            Dict: {'rates': {currency: Decimal}, 'missing': [...], 'sources': {name: {...}}}
+        """
+        currencies = list(currencies or self.default_currencies())
+        started_at = timezone.now()
+        results = self.fetch_all(currencies)
+        reconciled = self.reconcile(results, currencies)
+
+        fetched_at = timezone.now()
+        rows = [
+            CurrencyRate(
+                base_currency='UAH',
+                target_currency=currency,
+                rate=item['rate'],
+                source=item['source'],
+                fetched_at=fetched_at,
+                is_active=True,
+                raw_data={'strategy': self.strategy, 'quotes': item['quotes']},
+            )
+            for currency, item in reconciled.items()
+        ]
+        logs = [self._build_log(result, currencies, started_at, triggered_by) for result in results]
+
+        with transaction.atomic():
+            CurrencyRate.objects.bulk_create(rows)
+            CurrencyUpdateLog.objects.bulk_create(logs)
+
+        missing = [code for code in currencies if code not in reconciled]
+        logger.info(f"✅ Bulk currency update: {len(rows)} rates saved, {len(missing)} missing")
+        return {
+            'rates': {currency: item['rate'] for currency, item in reconciled.items()},
+            'missing': missing,
+            'sources': {
+                result['provider'].name: {
+                    'latency_ms': round(result['latency'] * 1000, 1) if result['latency'] is not None else None,
+                    'count': len(result['rates']),
+                    'error': result['error'],
+                }
+                for result in results
+            },
+        }
+
+    @staticmethod
+    def _build_log(result: Dict, currencies: List[str], started_at, triggered_by: str) -> CurrencyUpdateLog:
+        rates = result['rates']
+        if result['error'] or not rates:
+            status = 'FAILED'
+        elif len(rates) < len(currencies):
+            status = 'PARTIAL'
+        else:
+            status = 'SUCCESS'
+
+        missing = [code for code in currencies if code not in rates]
+        error_details = {}
+        if result['error']:
+            error_details['error'] = result['error']
+        if missing:
+            error_details['missing'] = missing
+
+        return CurrencyUpdateLog(
+            started_at=started_at,
+            completed_at=timezone.now(),
+            status=status,
+            source=result['provider'].source,
+            currencies_updated=len(rates),
+            currencies_failed=len(missing),
+            success_details={
+                'provider': result['provider'].name,
+                'rates': {code: str(rate) for code, rate in rates.items()},
+            },
+            error_details=error_details or None,
+            triggered_by=triggered_by,
+            duration_seconds=result['latency'],
+        )
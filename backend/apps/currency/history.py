@@ -0,0 +1,201 @@
+"""
+Историческое хранилище курсов "на дату"
+
+Компактные отсортированные временные ряды по каждой валюте (UAH за 1 единицу),
+загружаемые из CurrencyRate одним запросом. Курс на момент времени ищется
+бинарным поиском, поэтому графики цен и аналитические выгрузки конвертируются
+по курсу, действовавшему на дату записи, без запросов на каждую строку.
+
+Хранилище живет в процессе и перечитывается, когда CurrencyService сбрасывает
+кэш курсов (версия в общем кэше).
+"""
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import CurrencyRate
+
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'currency_rate_history_version'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _epoch_us(moment: datetime) -> int:
+    """Момент в целых микросекундах — точное сравнение без ошибок float"""
+    return (moment - EPOCH) // MICROSECOND
+
+
+def bump_version():
+    """Пометить ряды устаревшими во всех процессах"""
+    cache.set(VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+class HistoricalRateStore:
+    """
+    Курсы валют на произвольный момент времени
+
+    Args:
+        check_interval: Как часто (секунд) сверять версию с общим кэшем
+    """
+
+    def __init__(self, check_interval: float = 30):
+        self.check_interval = check_interval
+        self._series: Dict[str, tuple] = {}
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Перечитать все ряды одним запросом"""
+        rows = (
+            CurrencyRate.objects
+            .filter(base_currency='UAH', is_active=True)
+            .order_by('target_currency', 'fetched_at')
+            .values_list('target_currency', 'fetched_at', 'rate')
+        )
+        series = {}
+        for currency, fetched_at, rate in rows.iterator():
+            times, rates = series.setdefault(currency, (array('q'), []))
+            moment = _epoch_us(fetched_at)
+            # Несколько записей на один момент: остается последняя
+            if times and times[-1] == moment:
+                rates[-1] = rate
+                continue
+            times.append(moment)
+            rates.append(rate)
+
+        self._series = series
+        logger.info(f"📈 Loaded rate history: {', '.join(f'{code}={len(s[0])}' for code, s in series.items())}")
+
+    def ensure_loaded(self):
+        """Загрузить ряды при первом обращении или после обновления курсов"""
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._version is not None and now - self._checked_at < self.check_interval:
+                return
+            version = cache.get(VERSION_CACHE_KEY) or 0
+            if version != self._version:
+                self.load()
+                self._version = version
+            self._checked_at = now
+
+    def invalidate(self):
+        """Сбросить ряды в этом процессе"""
+        self._version = None
+
+    def rate_at(self, currency: str, moment: datetime, clamp: bool = True) -> Optional[Decimal]:
+        """
+        Курс валюты (UAH за 1 единицу), действовавший на момент moment
+
+        Args:
+            currency: Код валюты
+            moment: Момент времени (aware datetime)
+            clamp: Для моментов раньше первой записи вернуть самый ранний курс
+
+        Returns:
+            Decimal или None, если курсов нет
+        """
+        if currency == 'UAH':
+            return Decimal(1)
+        self.ensure_loaded()
+        series = self._series.get(currency)
+        if not series:
+            return None
+        times, rates = series
+        index = bisect_right(times, _epoch_us(moment)) - 1
+        if index < 0:
+            if not clamp:
+                return None
+            index = 0
+        return rates[index]
+
+    def convert_at(self, amount, from_currency: str, to_currency: str, moment: datetime,
+                   decimal_places: int = 2) -> Optional[Decimal]:
+        """Конвертировать сумму по курсам на момент moment"""
+        from_rate = self.rate_at(from_currency, moment)
+        to_rate = self.rate_at(to_currency, moment)
+        if amount is None or from_rate is None or not to_rate:
+            return None
+        quantum = Decimal(1).scaleb(-decimal_places)
+        return (Decimal(str(amount)) * from_rate / to_rate).quantize(quantum, rounding=ROUND_HALF_UP)
+
+    def convert_rows(self, rows: Iterable[dict], to_currency: str, amount_field: str = 'price',
+                     currency_field: str = 'currency', time_field: str = 'created_at',
+                     decimal_places: int = 2) -> List[Optional[Decimal]]:
+        """
+        Конвертировать результат queryset.values() без дополнительных запросов
+
+        Returns:
+            List: Суммы в to_currency в порядке строк
+        """
+        return [
+            self.convert_at(
+                row[amount_field], row[currency_field] or 'UAH', to_currency, row[time_field],
+                decimal_places
+            )
+            for row in rows
+        ]
+
+    def _rate_array(self, currency: str, epoch_us):
+        """Векторный поиск курсов (float) для массива моментов в микросекундах"""
+        import numpy as np
+
+        if currency == 'UAH':
+            return np.ones(len(epoch_us))
+        self.ensure_loaded()
+        series = self._series.get(currency)
+        if not series:
+            return np.full(len(epoch_us), np.nan)
+        times = np.frombuffer(series[0], dtype=np.int64)
+        rates = np.array([float(rate) for rate in series[1]])
+        positions = np.searchsorted(times, epoch_us, side='right') - 1
+        return rates[np.clip(positions, 0, None)]
+
+    def convert_frame(self, frame, to_currency: str, amount: str = 'price', currency: str = 'currency',
+                      timestamp: str = 'created_at'):
+        """
+        Векторная конвертация колонки pandas DataFrame по курсам на дату строки
+
+        Курсы ищутся через numpy.searchsorted по группам валют; результат —
+        float Series (для графиков и выгрузок), NaN если курса нет.
+
+        Returns:
+            pandas.Series: Суммы в to_currency с индексом frame
+        """
+        import numpy as np
+        import pandas as pd
+
+        if frame.empty:
+            return pd.Series(dtype='float64', index=frame.index)
+
+        moments = pd.to_datetime(frame[timestamp], utc=True)
+        epoch_us = ((moments - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(microseconds=1)).to_numpy(dtype='int64')
+        from_rates = np.full(len(frame), np.nan)
+        codes = frame[currency].fillna('UAH').to_numpy()
+        for code in pd.unique(codes):
+            mask = codes == code
+            from_rates[mask] = self._rate_array(code, epoch_us[mask])
+
+        to_rates = self._rate_array(to_currency, epoch_us)
+        amounts = pd.to_numeric(frame[amount], errors='coerce').to_numpy(dtype='float64')
+        return pd.Series(amounts * from_rates / to_rates, index=frame.index)
+
+
+rate_history = HistoricalRateStore()
+
+
+def rate_at(currency: str, moment: Optional[datetime] = None) -> Optional[Decimal]:
+    """Курс валюты на момент moment (по умолчанию сейчас) из общего хранилища"""
+    return rate_history.rate_at(currency, moment or timezone.now())
@@ -99,62 +99,67 @@ class CurrencyRate(models.Model):
     def get_latest_rate(cls, base_currency='UAH', target_currency='USD', auto_update=True):
         """
         Получить последний актуальный курс для пары валют
-        Если курс не найден или устарел - автоматически обновляет
+        Если курс не найден или устарел - запускает фоновое обновление
+        и сразу возвращает то, что есть в базе (запрос не ждет провайдера)
 
         Args:
             base_currency: Базовая валюта
             target_currency: Целевая валюта
-            auto_update: Автоматически обновлять при отсутствии данных
+            auto_update: Запускать фоновое обновление при отсутствии/устаревании данных
         """
-        try:
-            rate = cls.objects.filter(
-                base_currency=base_currency,
-                target_currency=target_currency,
-                is_active=True
-            ).latest('fetched_at')
+        rate = cls.objects.filter(
+            base_currency=base_currency,
+            target_currency=target_currency,
+            is_active=True
+        ).order_by('-fetched_at').first()
 
-            # Проверяем свежесть курса (не старше 24 часов)
-            if auto_update and not rate.is_fresh():
-                from .services import CurrencyService
-                CurrencyService.update_single_rate(base_currency, target_currency)
-                # Получаем обновленный курс
-                rate = cls.objects.filter(
-                    base_currency=base_currency,
-                    target_currency=target_currency,
-                    is_active=True
-                ).latest('fetched_at')
+        # Проверяем свежесть курса (не старше 24 часов)
+        if auto_update and (rate is None or not rate.is_fresh()):
+            from .services import CurrencyService
+            CurrencyService.schedule_refresh()
 
-            return rate
-
-        except cls.DoesNotExist:
-            if auto_update:
-                # Курс не найден - запускаем обновление
-                from .services import CurrencyService
-                CurrencyService.update_single_rate(base_currency, target_currency)
-
-                # Пытаемся получить курс еще раз
-                try:
-                    return cls.objects.filter(
-                        base_currency=base_currency,
-                        target_currency=target_currency,
-                        is_active=True
-                    ).latest('fetched_at')
-                except cls.DoesNotExist:
-                    return None
-            return None
+        return rate
+    
+    @classmethod
+    def get_all_latest_rates(cls, base_currency='UAH', auto_update=True):
+        """
+        Получить все последние курсы для базовой валюты одним запросом
+        """
+        latest = cls.latest_rate_objects(base_currency, auto_update=auto_update)
+        return {currency: rate.rate for currency, rate in latest.items()}
     
     @classmethod
-    def get_all_latest_rates(cls, base_currency='UAH'):
+    def latest_rate_objects(cls, base_currency='UAH', auto_update=False):
         """
-        Получить все последние курсы для базовой валюты
+        Последняя активная запись для каждой целевой валюты одним запросом
+        
+        Args:
+            base_currency: Базовая валюта
+            auto_update: Запустить фоновое обновление, если курсов не хватает или они устарели
+        
+        Returns:
+            Dict[str, CurrencyRate]: {target_currency: CurrencyRate}
         """
-        rates = {}
-        for currency_code, _ in cls.CURRENCY_CHOICES:
-            if currency_code != base_currency:
-                rate = cls.get_latest_rate(base_currency, currency_code)
-                if rate:
-                    rates[currency_code] = rate.rate
-        return rates
+        latest_ids = cls.objects.filter(
+            base_currency=base_currency,
+            target_currency=models.OuterRef('target_currency'),
+            is_active=True
+        ).order_by('-fetched_at').values('id')[:1]
+        
+        rates = cls.objects.filter(
+            base_currency=base_currency,
+            is_active=True,
+            id=models.Subquery(latest_ids)
+        ).exclude(target_currency=base_currency)
+        latest = {rate.target_currency: rate for rate in rates}
+        
+        if auto_update and (
+            len(latest) < len(cls.CURRENCY_CHOICES) - 1
+            or not all(rate.is_fresh() for rate in latest.values())
+        ):
+            from .services import CurrencyService
+            CurrencyService.schedule_refresh()
+        return latest
     
     def convert_amount(self, amount):
         """
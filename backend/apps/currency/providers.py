@@ -0,0 +1,181 @@
+"""
+Провайдеры курсов валют
+
+Каждый провайдер одним запросом возвращает курсы всех запрошенных валют в
+формате NBU: сколько UAH стоит 1 единица валюты. Провайдер выбирается через
+``settings.CURRENCY_RATE_PROVIDER``, список источников для массовой загрузки —
+через ``settings.CURRENCY_RATE_SOURCES``. ``FIXTURE`` и ``StubRateProvider``
+работают без сети и используются в тестах и при локальной разработке.
+"""
+import json
+import logging
+import time
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Справочные курсы (UAH за 1 единицу) — последний рубеж, когда нет ни кэша, ни БД
+DEFAULT_FIXTURE_RATES = {
+    'USD': '41.50',
+    'EUR': '45.20',
+    'PLN': '10.45',
+    'GBP': '52.80',
+}
+
+
+class RateProvider:
+    """Базовый провайдер: ``fetch`` возвращает {currency: rate UAH за 1 единицу}"""
+
+    name = 'BASE'
+    # Значение CurrencyRate.source для сохраненных курсов
+    source = 'MANUAL'
+    timeout = 10
+
+    def fetch(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        raise NotImplementedError
+
+    def get_json(self, url: str):
+        response = requests.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class NBURateProvider(RateProvider):
+    """Национальный банк Украины — все валюты одним запросом"""
+
+    name = 'NBU'
+    source = 'NBU'
+    url = 'https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange?json'
+
+    def fetch(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        wanted = set(currencies)
+        return {
+            item['cc']: Decimal(str(item['rate']))
+            for item in self.get_json(self.url)
+            if item.get('cc') in wanted and item.get('rate')
+        }
+
+
+class PrivatBankRateProvider(RateProvider):
+    """ПриватБанк — средний курс между покупкой и продажей"""
+
+    name = 'PRIVATBANK'
+    source = 'PRIVATBANK'
+    url = 'https://api.privatbank.ua/p24api/pubinfo?json&exchange&coursid=5'
+
+    def fetch(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        wanted = set(currencies)
+        rates = {}
+        for item in self.get_json(self.url):
+            if item.get('ccy') in wanted and item.get('buy') and item.get('sale'):
+                rates[item['ccy']] = (Decimal(str(item['buy'])) + Decimal(str(item['sale']))) / 2
+        return rates
+
+
+class ExchangeRateAPIRateProvider(RateProvider):
+    """ExchangeRate-API — один запрос от UAH, курсы инвертируются"""
+
+    name = 'EXCHANGERATE_API'
+    source = 'EXCHANGERATE_API'
+    url = 'https://api.exchangerate-api.com/v4/latest/UAH'
+
+    def fetch(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        # API отдает сколько единиц валюты стоит 1 UAH
+        per_uah = self.get_json(self.url).get('rates', {})
+        return {
+            code: (Decimal(1) / Decimal(str(per_uah[code]))).quantize(Decimal('0.000001'), rounding=ROUND_HALF_UP)
+            for code in currencies
+            if per_uah.get(code)
+        }
+
+
+class FixtureRateProvider(RateProvider):
+    """
+    Локальный провайдер без сети
+
+    Курсы берутся из ``settings.CURRENCY_FIXTURE_RATES`` (dict или путь к JSON),
+    иначе из DEFAULT_FIXTURE_RATES.
+    """
+
+    name = 'FIXTURE'
+    source = 'MANUAL'
+
+    def __init__(self, rates: Optional[Dict[str, str]] = None):
+        self._rates = rates
+
+    def load_rates(self) -> Dict[str, str]:
+        if self._rates is not None:
+            return self._rates
+        configured = getattr(settings, 'CURRENCY_FIXTURE_RATES', None)
+        if isinstance(configured, dict):
+            return configured
+        if configured:
+            return json.loads(Path(configured).read_text(encoding='utf-8'))
+        return DEFAULT_FIXTURE_RATES
+
+    def fetch(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        rates = self.load_rates()
+        return {code: Decimal(str(rates[code])) for code in currencies if code in rates}
+
+
+class StubRateProvider(RateProvider):
+    """
+    Провайдер-заглушка с заданными курсами, задержкой и ошибкой
+
+    Используется в тестах массовой загрузки, чтобы проверить согласование
+    источников, таймауты и отказы без сети.
+    """
+
+    def __init__(self, name: str, rates: Dict[str, str], delay: float = 0,
+                 error: Optional[Exception] = None, source: str = 'MANUAL'):
+        self.name = name
+        self.source = source
+        self.rates = rates
+        self.delay = delay
+        self.error = error
+
+    def fetch(self, currencies: Iterable[str]) -> Dict[str, Decimal]:
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {code: Decimal(str(self.rates[code])) for code in currencies if code in self.rates}
+
+
+PROVIDERS = {
+    NBURateProvider.name: NBURateProvider,
+    PrivatBankRateProvider.name: PrivatBankRateProvider,
+    ExchangeRateAPIRateProvider.name: ExchangeRateAPIRateProvider,
+    FixtureRateProvider.name: FixtureRateProvider,
+}
+
+
+def register_provider(provider_class) -> None:
+    """Зарегистрировать провайдер под его ``name``"""
+    PROVIDERS[provider_class.name] = provider_class
+
+
+def get_provider(name: Optional[str] = None) -> RateProvider:
+    """Провайдер по имени или из ``settings.CURRENCY_RATE_PROVIDER`` (по умолчанию NBU)"""
+    name = (name or getattr(settings, 'CURRENCY_RATE_PROVIDER', 'NBU')).upper()
+    try:
+        return PROVIDERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown currency rate provider: {name}")
+
+
+def get_providers(names: Optional[Iterable[str]] = None) -> List[RateProvider]:
+    """
+    Провайдеры для массовой загрузки в порядке приоритета
+
+    По умолчанию ``settings.CURRENCY_RATE_SOURCES``, а если он не задан —
+    единственный ``settings.CURRENCY_RATE_PROVIDER``.
+    """
+    if names is None:
+        names = getattr(settings, 'CURRENCY_RATE_SOURCES', None) or [None]
+    return [get_provider(name) for name in names]
@@ -1,16 +1,20 @@
 """
 Сервис для работы с курсами валют
-Автоматически обновляет курсы при их отсутствии
+Устаревшие курсы обновляются в фоне, запросы пользователей не ждут сеть
 """
 import logging
-import requests
-from decimal import Decimal
+import threading
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 from typing import Optional, Dict, List
 from django.utils import timezone
 from django.core.cache import cache
 from django.conf import settings
 
 from .models import CurrencyRate
+from . import history
+from .bulk_fetcher import BulkRateFetcher
+from .providers import FixtureRateProvider, get_providers
 
 logger = logging.getLogger(__name__)
 
@@ -18,88 +22,227 @@ logger = logging.getLogger(__name__)
 class CurrencyService:
     """
     Сервис для работы с курсами валют
+
+    Чтение курса никогда не ходит в сеть (stale-while-revalidate):
+    кэш -> последняя запись в БД -> производный курс -> справочные курсы.
+    Устаревший курс отдается сразу с флагом ``is_stale``, а обновление
+    запускается в фоне одним воркером под распределенной блокировкой.
     """
     
-    # Кэш на 1 час для избежания частых запросов
-    CACHE_TIMEOUT = 3600
+    # Записи кэша живут неделю, свежесть определяется по fetched_at
+    CACHE_TIMEOUT = 7 * 24 * 3600
+    # Курс старше этого считается устаревшим и запускает фоновое обновление
+    RATE_MAX_AGE_HOURS = 24
+    # Сколько держим блокировку обновления (и не пробуем обновить повторно)
+    REFRESH_LOCK_KEY = 'currency_rates_refresh_lock'
+    REFRESH_LOCK_TIMEOUT = 300
+    # Снимок всех курсов для пакетной конвертации
+    SNAPSHOT_CACHE_KEY = 'currency_rate_snapshot'
+    
+    @classmethod
+    def _cache_key(cls, base_currency, target_currency):
+        return f"currency_rate_info_{base_currency}_{target_currency}"
     
     @classmethod
     def get_rate(cls, base_currency='UAH', target_currency='USD', force_update=False):
         """
-        Получить курс валюты с автоматическим обновлением
+        Получить курс валюты (без сетевых запросов, кроме force_update)
         
         Args:
             base_currency: Базовая валюта
             target_currency: Целевая валюта
-            force_update: Принудительно обновить курс
+            force_update: Синхронно обновить курсы у провайдера перед чтением
             
         Returns:
             Decimal: Курс валюты или None
         """
-        cache_key = f"currency_rate_{base_currency}_{target_currency}"
-        
-        # Проверяем кэш (если не принудительное обновление)
-        if not force_update:
-            cached_rate = cache.get(cache_key)
-            if cached_rate is not None:
-                logger.debug(f"💾 Using cached rate {target_currency}/{base_currency}: {cached_rate}")
-                return Decimal(str(cached_rate))
-        
-        # Получаем курс из базы данных с автообновлением
-        rate_obj = CurrencyRate.get_latest_rate(
-            base_currency=base_currency,
-            target_currency=target_currency,
-            auto_update=True
-        )
-
-        if rate_obj:
-            # Кэшируем результат
-            cache.set(cache_key, str(rate_obj.rate), cls.CACHE_TIMEOUT)
-            logger.info(f"💱 Rate {target_currency}/{base_currency}: {rate_obj.rate}")
-            return rate_obj.rate
-
-        # Пробуем найти обратный курс с ПРАВИЛЬНОЙ интерпретацией NBU
+        info = cls.get_rate_info(base_currency, target_currency, force_update=force_update)
+        return info['rate'] if info else None
+    
+    @classmethod
+    def get_rate_info(cls, base_currency='UAH', target_currency='USD', force_update=False):
+        """
+        Получить курс вместе с метаданными свежести
+        
+        Returns:
+            Dict: {'rate': Decimal, 'source': str, 'fetched_at': datetime|None,
+                   'is_stale': bool, 'is_fallback': bool} или None
+        """
+        cache_key = cls._cache_key(base_currency, target_currency)
+        
+        if force_update:
+            cls.refresh_rates(triggered_by='force_update')
+            info = None
+        else:
+            info = cls._from_cache(cache_key)
+        
+        if info is None:
+            info = cls._from_db(base_currency, target_currency)
+            if info is not None:
+                cache.set(cache_key, cls._to_cache(info), cls.CACHE_TIMEOUT)
+        
+        if info is None:
+            info = cls._from_fixture(base_currency, target_currency)
+            if info is not None:
+                logger.warning(f"⚠️ No stored rate for {target_currency}/{base_currency}, using fallback {info['rate']}")
+        
+        if info is None:
+            logger.warning(f"⚠️ No rate found for {target_currency}/{base_currency}")
+            cls.schedule_refresh()
+            return None
+        
+        info['is_stale'] = cls._is_stale(info['fetched_at'])
+        if info['is_stale']:
+            cls.schedule_refresh()
+        logger.debug(f"💱 Rate {target_currency}/{base_currency}: {info['rate']} (stale={info['is_stale']})")
+        return info
+    
+    @classmethod
+    def _is_stale(cls, fetched_at):
+        if fetched_at is None:
+            return True
+        return (timezone.now() - fetched_at).total_seconds() > cls.RATE_MAX_AGE_HOURS * 3600
+    
+    @staticmethod
+    def _to_cache(info):
+        return {
+            'rate': str(info['rate']),
+            'source': info['source'],
+            'fetched_at': info['fetched_at'].isoformat() if info['fetched_at'] else None,
+        }
+    
+    @classmethod
+    def _from_cache(cls, cache_key):
+        cached = cache.get(cache_key)
+        if not isinstance(cached, dict):
+            return None
+        fetched_at = cached.get('fetched_at')
+        return {
+            'rate': Decimal(cached['rate']),
+            'source': cached.get('source', 'unknown'),
+            'fetched_at': datetime.fromisoformat(fetched_at) if fetched_at else None,
+            'is_fallback': False,
+        }
+    
+    @classmethod
+    def _from_db(cls, base_currency, target_currency):
+        """
+        Последний курс из БД; для пары X/UAH используется запись UAH/X
+        (в базе курсы хранятся в формате NBU: UAH за 1 единицу валюты)
+        """
+        rate_obj = CurrencyRate.get_latest_rate(base_currency, target_currency, auto_update=False)
+        if rate_obj is None and target_currency == 'UAH':
+            rate_obj = CurrencyRate.get_latest_rate('UAH', base_currency, auto_update=False)
+        if rate_obj is None:
+            return None
+        return {
+            'rate': rate_obj.rate,
+            'source': rate_obj.source,
+            'fetched_at': rate_obj.fetched_at,
+            'is_fallback': False,
+        }
+    
+    @classmethod
+    def _from_fixture(cls, base_currency, target_currency):
+        """Справочный курс — последний рубеж, когда в кэше и БД ничего нет"""
+        currency = target_currency if base_currency == 'UAH' else base_currency
+        if 'UAH' not in (base_currency, target_currency):
+            return None
         try:
-            # В базе курсы хранятся в формате NBU: UAH/CURRENCY = количество UAH за 1 единицу валюты
-            # UAH/USD = 41.449 означает: 1 USD = 41.449 UAH
-
-            if target_currency == 'UAH':
-                # Ищем курс из базы в формате UAH/base_currency
-                reverse_rate_obj = CurrencyRate.get_latest_rate(
-                    base_currency='UAH',
-                    target_currency=base_currency,
-                    auto_update=True
-                )
-
-                if reverse_rate_obj:
-                    # UAH/USD = 41.449 означает 1 USD = 41.449 UAH
-                    # Для конвертации USD в UAH используем этот курс напрямую
-                    rate = reverse_rate_obj.rate
-                    cache.set(cache_key, str(rate), cls.CACHE_TIMEOUT)
-                    logger.info(f"💱 Found UAH/{base_currency} = {rate}, using for {base_currency} to UAH conversion")
-                    return rate
-
-            elif base_currency == 'UAH':
-                # Ищем курс из базы в формате UAH/target_currency
-                reverse_rate_obj = CurrencyRate.get_latest_rate(
-                    base_currency='UAH',
-                    target_currency=target_currency,
-                    auto_update=True
-                )
-
-                if reverse_rate_obj:
-                    # UAH/USD = 41.449 означает 1 USD = 41.449 UAH
-                    # Для конвертации UAH в USD: 1 UAH = 1/41.449 USD
-                    reverse_rate = Decimal('1') / reverse_rate_obj.rate
-                    cache.set(cache_key, str(reverse_rate), cls.CACHE_TIMEOUT)
-                    logger.info(f"💱 Found UAH/{target_currency} = {reverse_rate_obj.rate}, calculated UAH to {target_currency} = {reverse_rate}")
-                    return reverse_rate
-
+            rates = FixtureRateProvider().fetch([currency])
         except Exception as e:
-            logger.debug(f"🔍 Could not find reverse rate: {e}")
-
-        logger.warning(f"⚠️ No rate found for {target_currency}/{base_currency}")
-        return None
+            logger.error(f"❌ Fixture rates unavailable: {e}")
+            return None
+        if currency not in rates:
+            return None
+        return {
+            'rate': rates[currency],
+            'source': 'FALLBACK',
+            'fetched_at': None,
+            'is_fallback': True,
+        }
+    
+    @classmethod
+    def schedule_refresh(cls, provider_name=None):
+        """
+        Запустить фоновое обновление курсов, если оно еще не запущено
+        
+        cache.add атомарен (SET NX в Redis), поэтому при одновременном
+        устаревании курса обновление запускает ровно один воркер.
+        
+        Returns:
+            bool: True если обновление запущено этим вызовом
+        """
+        if not cache.add(cls.REFRESH_LOCK_KEY, timezone.now().isoformat(), cls.REFRESH_LOCK_TIMEOUT):
+            return False
+        
+        try:
+            from .tasks import refresh_currency_rates
+            refresh_currency_rates.apply_async(kwargs={'provider_name': provider_name}, retry=False)
+            logger.info("🔄 Background currency refresh queued")
+        except Exception as e:
+            logger.warning(f"⚠️ Celery unavailable ({e}), refreshing currency rates in a thread")
+            threading.Thread(
+                target=cls._refresh_in_thread, args=(provider_name,), daemon=True
+            ).start()
+        return True
+    
+    @classmethod
+    def _refresh_in_thread(cls, provider_name=None):
+        from django.db import connection
+        try:
+            cls.refresh_rates(provider_name, triggered_by='stale_read')
+        finally:
+            cache.delete(cls.REFRESH_LOCK_KEY)
+            connection.close()
+    
+    @classmethod
+    def refresh_rates(cls, provider_name=None, currencies=None, triggered_by='manual_update'):
+        """
+        Загрузить курсы у провайдеров (по одному запросу на источник) и сохранить
+        
+        Args:
+            provider_name: Имя провайдера (по умолчанию все из settings.CURRENCY_RATE_SOURCES)
+            currencies: Список валют (None = все поддерживаемые, кроме UAH)
+            triggered_by: Что запустило обновление (для CurrencyUpdateLog)
+            
+        Returns:
+            Dict[str, Decimal]: Сохраненные курсы
+        """
+        providers = get_providers([provider_name] if provider_name else None)
+        result = BulkRateFetcher(providers).run(currencies, triggered_by=triggered_by)
+        cls.invalidate_cache(result['rates'].keys())
+        return result['rates']
+    
+    @classmethod
+    def invalidate_cache(cls, currencies):
+        """Сбросить кэш пар UAH/X и X/UAH для указанных валют"""
+        keys = [cls.SNAPSHOT_CACHE_KEY]
+        for currency in currencies:
+            keys.append(cls._cache_key('UAH', currency))
+            keys.append(cls._cache_key(currency, 'UAH'))
+        cache.delete_many(keys)
+        history.bump_version()
+    
+    @classmethod
+    def conversion_factor(cls, from_currency='UAH', to_currency='USD'):
+        """
+        Коэффициент пересчета: сумма в to_currency за 1 единицу from_currency
+        
+        Курсы хранятся как UAH за 1 единицу валюты; коэффициент тот же, что в convert_batch.
+        
+        Returns:
+            Decimal: Коэффициент или None, если курса нет
+        """
+        if from_currency == to_currency:
+            return Decimal(1)
+        uah_rates = {
+            currency: Decimal(1) if currency == 'UAH' else cls.get_rate('UAH', currency)
+            for currency in (from_currency, to_currency)
+        }
+        if not all(uah_rates.values()):
+            return None
+        return uah_rates[from_currency] / uah_rates[to_currency]
     
     @classmethod
     def convert_amount(cls, amount, from_currency='UAH', to_currency='USD'):
@@ -114,14 +257,10 @@ class CurrencyService:
         Returns:
             Decimal: Конвертированная сумма или None
         """
-        if from_currency == to_currency:
-            return Decimal(str(amount))
+        factor = cls.conversion_factor(from_currency, to_currency)
         
-        # Получаем курс
-        rate = cls.get_rate(from_currency, to_currency)
-        
-        if rate:
-            converted = Decimal(str(amount)) * rate
+        if factor:
+            converted = Decimal(str(amount)) * factor
             logger.info(f"💰 Converted {amount} {from_currency} = {converted} {to_currency}")
             return converted
         
@@ -129,171 +268,144 @@ class CurrencyService:
         return None
     
     @classmethod
-    def update_single_rate(cls, base_currency='UAH', target_currency='USD', source='NBU'):
+    def get_rate_snapshot(cls):
         """
-        Обновить курс для одной пары валют
+        Снимок всех курсов (UAH за 1 единицу) на один момент времени
         
-        Args:
-            base_currency: Базовая валюта
-            target_currency: Целевая валюта
-            source: Источник курса
-        """
-        logger.info(f"🔄 Updating rate {target_currency}/{base_currency} from {source}")
+        Один запрос к БД, результат кэшируется до следующего обновления курсов.
+        Недостающие валюты дополняются справочными курсами.
         
-        try:
-            if source == 'NBU':
-                success = cls._fetch_from_nbu(target_currency)
-            elif source == 'PRIVATBANK':
-                success = cls._fetch_from_privatbank(target_currency)
-            elif source == 'EXCHANGERATE_API':
-                success = cls._fetch_from_exchangerate_api(target_currency)
-            else:
-                logger.error(f"❌ Unknown source: {source}")
-                return False
-            
-            if success:
-                # Очищаем кэш для этой пары валют
-                cache_key = f"currency_rate_{base_currency}_{target_currency}"
-                cache.delete(cache_key)
-                logger.info(f"✅ Rate {target_currency}/{base_currency} updated successfully")
-                return True
-            else:
-                logger.error(f"❌ Failed to update rate {target_currency}/{base_currency}")
-                return False
-                
-        except Exception as e:
-            logger.error(f"❌ Error updating rate {target_currency}/{base_currency}: {str(e)}")
-            return False
-    
-    @classmethod
-    def _fetch_from_nbu(cls, target_currency):
-        """
-        Получить курс от НБУ для конкретной валюты
+        Returns:
+            Dict: {'rates': {currency: Decimal}, 'fetched_at': datetime|None,
+                   'is_stale': bool, 'fallback': [currency, ...]}
         """
-        try:
-            url = f"https://bank.gov.ua/NBUStatService/v1/statdirectory/exchange?valcode={target_currency}&json"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if not data:
-                logger.warning(f"⚠️ No data from NBU for {target_currency}")
-                return False
-            
-            item = data[0]
-            rate_value = item.get('rate')
-            
-            if rate_value:
-                # Создаем или обновляем курс
-                rate, created = CurrencyRate.objects.update_or_create(
-                    base_currency='UAH',
-                    target_currency=target_currency,
-                    fetched_at__date=timezone.now().date(),
-                    defaults={
-                        'rate': Decimal(str(rate_value)),
-                        'source': 'NBU',
-                        'fetched_at': timezone.now(),
-                        'is_active': True,
-                        'raw_data': item
-                    }
-                )
-                
-                action = "created" if created else "updated"
-                logger.info(f"✅ NBU: {target_currency} = {rate_value} UAH ({action})")
-                return True
+        cached = cache.get(cls.SNAPSHOT_CACHE_KEY)
+        if isinstance(cached, dict):
+            snapshot = {
+                'rates': {code: Decimal(rate) for code, rate in cached['rates'].items()},
+                'fetched_at': datetime.fromisoformat(cached['fetched_at']) if cached['fetched_at'] else None,
+                'fallback': cached['fallback'],
+            }
+        else:
+            latest = CurrencyRate.latest_rate_objects('UAH')
+            rates = {code: rate.rate for code, rate in latest.items()}
+            currencies = [code for code, _ in CurrencyRate.CURRENCY_CHOICES if code != 'UAH']
+            fallback = [code for code in currencies if code not in rates]
+            if fallback:
+                rates.update(FixtureRateProvider().fetch(fallback))
+            rates['UAH'] = Decimal(1)
             
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ NBU fetch error for {target_currency}: {str(e)}")
-            return False
+            # Момент снимка — самый старый из использованных курсов
+            snapshot = {
+                'rates': rates,
+                'fetched_at': min((rate.fetched_at for rate in latest.values()), default=None),
+                'fallback': fallback,
+            }
+            cache.set(cls.SNAPSHOT_CACHE_KEY, {
+                'rates': {code: str(rate) for code, rate in rates.items()},
+                'fetched_at': snapshot['fetched_at'].isoformat() if snapshot['fetched_at'] else None,
+                'fallback': fallback,
+            }, cls.CACHE_TIMEOUT)
+        
+        snapshot['is_stale'] = bool(snapshot['fallback']) or cls._is_stale(snapshot['fetched_at'])
+        if snapshot['is_stale']:
+            cls.schedule_refresh()
+        return snapshot
     
     @classmethod
-    def _fetch_from_privatbank(cls, target_currency):
+    def convert_batch(cls, amounts, from_currencies, to_currencies, decimal_places=2):
         """
-        Получить курс от ПриватБанка для конкретной валюты
-        """
-        try:
-            url = "https://api.privatbank.ua/p24api/pubinfo?json&exchange&coursid=5"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
+        Конвертировать много сумм за один проход по одному снимку курсов
+        
+        Все суммы считаются по одному снимку, поэтому в ответе нет результатов
+        по разным курсам. Коэффициент считается один раз на пару валют,
+        результат округляется ROUND_HALF_UP до decimal_places.
+        
+        Args:
+            amounts: Последовательность сумм
+            from_currencies: Исходные валюты (той же длины)
+            to_currencies: Целевые валюты (той же длины)
+            decimal_places: Знаков после запятой в результате
             
-            # Ищем нужную валюту
-            for item in data:
-                if item.get('ccy') == target_currency:
-                    buy_rate = item.get('buy')
-                    sale_rate = item.get('sale')
-                    
-                    if buy_rate and sale_rate:
-                        # Используем средний курс
-                        avg_rate = (float(buy_rate) + float(sale_rate)) / 2
-                        
-                        rate, created = CurrencyRate.objects.update_or_create(
-                            base_currency='UAH',
-                            target_currency=target_currency,
-                            fetched_at__date=timezone.now().date(),
-                            source='PRIVATBANK',
-                            defaults={
-                                'rate': Decimal(str(avg_rate)),
-                                'fetched_at': timezone.now(),
-                                'is_active': True,
-                                'raw_data': item
-                            }
-                        )
-                        
-                        action = "created" if created else "updated"
-                        logger.info(f"✅ PrivatBank: {target_currency} = {avg_rate} UAH ({action})")
-                        return True
+        Returns:
+            Dict: {'converted': [Decimal|None, ...], 'errors': [{'index', 'error'}],
+                   'rates': {'FROM/TO': Decimal}, 'rates_fetched_at': datetime|None,
+                   'is_stale': bool}
+        """
+        if not len(amounts) == len(from_currencies) == len(to_currencies):
+            raise ValueError("amounts, from_currencies and to_currencies must have the same length")
+        
+        snapshot = cls.get_rate_snapshot()
+        uah_rates = snapshot['rates']
+        quantum = Decimal(1).scaleb(-decimal_places)
+        
+        factors = {}
+        converted = []
+        errors = []
+        for index, (amount, from_currency, to_currency) in enumerate(zip(amounts, from_currencies, to_currencies)):
+            pair = (from_currency, to_currency)
+            factor = factors.get(pair)
+            if factor is None:
+                if from_currency not in uah_rates or to_currency not in uah_rates:
+                    converted.append(None)
+                    errors.append({'index': index, 'error': f'Unsupported currency pair {from_currency}/{to_currency}'})
+                    continue
+                factor = factors[pair] = uah_rates[from_currency] / uah_rates[to_currency]
             
-            logger.warning(f"⚠️ Currency {target_currency} not found in PrivatBank data")
-            return False
+            try:
+                value = Decimal(str(amount))
+            except (InvalidOperation, ValueError, TypeError):
+                value = None
+            if value is None or not value.is_finite():
+                converted.append(None)
+                errors.append({'index': index, 'error': f'Invalid amount: {amount}'})
+                continue
             
-        except Exception as e:
-            logger.error(f"❌ PrivatBank fetch error for {target_currency}: {str(e)}")
-            return False
+            try:
+                converted.append((value * factor).quantize(quantum, rounding=ROUND_HALF_UP))
+            except InvalidOperation:
+                # Результат не помещается в точность Decimal при округлении
+                converted.append(None)
+                errors.append({'index': index, 'error': f'Amount out of range: {amount}'})
+        
+        logger.info(f"💰 Batch converted {len(converted) - len(errors)} amounts over {len(factors)} pairs")
+        return {
+            'converted': converted,
+            'errors': errors,
+            'rates': {
+                f"{from_currency}/{to_currency}": factor.quantize(Decimal('0.00000001'), rounding=ROUND_HALF_UP)
+                for (from_currency, to_currency), factor in factors.items()
+            },
+            'rates_fetched_at': snapshot['fetched_at'],
+            'is_stale': snapshot['is_stale'],
+        }
     
     @classmethod
-    def _fetch_from_exchangerate_api(cls, target_currency):
+    def update_single_rate(cls, base_currency='UAH', target_currency='USD', source='NBU'):
         """
-        Получить курс от ExchangeRate-API для конкретной валюты
+        Обновить курс для одной пары валют
+        
+        Args:
+            base_currency: Базовая валюта
+            target_currency: Целевая валюта
+            source: Источник курса
         """
+        logger.info(f"🔄 Updating rate {target_currency}/{base_currency} from {source}")
+        
         try:
-            url = f"https://api.exchangerate-api.com/v4/latest/{target_currency}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            rates = data.get('rates', {})
-            uah_rate = rates.get('UAH')
-            
-            if uah_rate:
-                # Конвертируем курс (сколько UAH за 1 единицу target_currency)
-                rate_value = float(uah_rate)
-                
-                rate, created = CurrencyRate.objects.update_or_create(
-                    base_currency='UAH',
-                    target_currency=target_currency,
-                    fetched_at__date=timezone.now().date(),
-                    source='EXCHANGERATE_API',
-                    defaults={
-                        'rate': Decimal(str(rate_value)),
-                        'fetched_at': timezone.now(),
-                        'is_active': True,
-                        'raw_data': {'uah_rate': uah_rate}
-                    }
-                )
-                
-                action = "created" if created else "updated"
-                logger.info(f"✅ ExchangeRate-API: {target_currency} = {rate_value} UAH ({action})")
-                return True
-            
+            rates = cls.refresh_rates(source, currencies=[target_currency])
+        except ValueError:
+            logger.error(f"❌ Unknown source: {source}")
             return False
-            
         except Exception as e:
-            logger.error(f"❌ ExchangeRate-API fetch error for {target_currency}: {str(e)}")
+            logger.error(f"❌ Error updating rate {target_currency}/{base_currency}: {str(e)}")
             return False
+        
+        if target_currency in rates:
+            logger.info(f"✅ Rate {target_currency}/{base_currency} updated successfully")
+            return True
+        logger.error(f"❌ Failed to update rate {target_currency}/{base_currency}")
+        return False
     
     @classmethod
     def get_all_rates(cls, base_currency='UAH'):
@@ -58,6 +58,7 @@ def update_currency_rates_daily(self, source='NBU'):
             status = 'FAILED'
         
         update_log.mark_completed(status)
+        _invalidate_rate_cache(result)
         
         logger.info(f"✅ Currency update completed: {result['success_count']} success, {result['failed_count']} failed")
         
@@ -114,6 +115,7 @@ def update_currency_rates_manual(source='NBU', currencies=None):
         
         status = 'SUCCESS' if result['failed_count'] == 0 else 'PARTIAL'
         update_log.mark_completed(status)
+        _invalidate_rate_cache(result)
         
         return result
         
@@ -124,6 +126,65 @@ def update_currency_rates_manual(source='NBU', currencies=None):
         raise exc
 
 
+@shared_task
+def update_currency_rates_bulk(sources=None, strategy=None):
+    """
+    Массовое обновление курсов из всех источников параллельно
+    
+    Args:
+        sources: Список источников в порядке приоритета (None = settings.CURRENCY_RATE_SOURCES)
+        strategy: Согласование расхождений: 'median' или 'priority'
+    """
+    from .bulk_fetcher import BulkRateFetcher
+    from .providers import get_providers
+    from .services import CurrencyService
+    
+    logger.info(f"🔄 Starting bulk currency rates update from {sources or 'configured sources'}")
+    result = BulkRateFetcher(get_providers(sources), strategy=strategy).run(triggered_by='celery_beat_bulk')
+    CurrencyService.invalidate_cache(result['rates'].keys())
+    
+    return {
+        'success': bool(result['rates']),
+        'updated': len(result['rates']),
+        'missing': result['missing'],
+        'sources': result['sources']
+    }
+
+
+@shared_task
+def refresh_currency_rates(provider_name=None):
+    """
+    Фоновое обновление курсов при чтении устаревшего курса
+    
+    Запускается из CurrencyService.schedule_refresh под блокировкой,
+    которую задача снимает по завершении.
+    
+    Args:
+        provider_name: Имя провайдера (None = settings.CURRENCY_RATE_PROVIDER)
+    """
+    from .services import CurrencyService
+    
+    try:
+        rates = CurrencyService.refresh_rates(provider_name, triggered_by='stale_read')
+        return {
+            'success': bool(rates),
+            'updated': len(rates),
+            'rates': {code: str(rate) for code, rate in rates.items()}
+        }
+    finally:
+        from django.core.cache import cache
+        cache.delete(CurrencyService.REFRESH_LOCK_KEY)
+
+
+def _invalidate_rate_cache(result: Dict):
+    """Сбросить кэш сервиса для обновленных валют"""
+    from .services import CurrencyService
+    
+    currencies = [item['currency'] for item in result.get('success_details') or [] if 'currency' in item]
+    if currencies:
+        CurrencyService.invalidate_cache(currencies)
+
+
 def _update_from_nbu(currencies=None) -> Dict:
     """
     Обновление курсов от НБУ
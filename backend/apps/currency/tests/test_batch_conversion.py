@@ -0,0 +1,82 @@
+"""
+Tests for batch currency conversion over a single rate snapshot.
+"""
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.currency.bulk_fetcher import BulkRateFetcher
+from apps.currency.providers import StubRateProvider
+from apps.currency.services import CurrencyService
+from apps.currency.views import convert_currency, convert_currency_batch
+
+
+class ConvertBatchTest(TestCase):
+    """Test vectorised conversion and the batch endpoint"""
+
+    def setUp(self):
+        """Store one snapshot of rates for all supported currencies"""
+        cache.clear()
+        provider = StubRateProvider('A', {'USD': '40', 'EUR': '44', 'PLN': '10', 'GBP': '50'}, source='NBU')
+        BulkRateFetcher([provider]).run()
+
+    def test_cross_rates_and_rounding(self):
+        """Amounts are converted through UAH and rounded half up"""
+        result = CurrencyService.convert_batch(
+            ['1000', 100, '0.125', 7],
+            ['UAH', 'USD', 'UAH', 'EUR'],
+            ['USD', 'EUR', 'UAH', 'PLN'],
+        )
+        self.assertEqual(result['converted'], [Decimal('25.00'), Decimal('90.91'), Decimal('0.13'), Decimal('30.80')])
+        self.assertEqual(result['rates']['USD/EUR'], Decimal('0.90909091'))
+        self.assertFalse(result['is_stale'])
+        self.assertIsNotNone(result['rates_fetched_at'])
+
+    def test_invalid_rows_do_not_fail_batch(self):
+        """Bad amounts and unknown currencies are reported per index"""
+        result = CurrencyService.convert_batch(['abc', 10, 10], ['UAH', 'XXX', 'UAH'], ['USD', 'USD', 'USD'])
+        self.assertEqual(result['converted'], [None, None, Decimal('0.25')])
+        self.assertEqual([error['index'] for error in result['errors']], [0, 1])
+
+    def test_huge_amount_is_a_row_error(self):
+        """Amounts beyond Decimal precision are reported, not raised"""
+        result = CurrencyService.convert_batch(['1e30', 10], ['UAH', 'UAH'], ['USD', 'USD'])
+        self.assertEqual(result['converted'], [None, Decimal('0.25')])
+        self.assertEqual(result['errors'][0]['index'], 0)
+
+    def test_single_conversion_matches_batch(self):
+        """convert_amount uses the same rate direction as the batch"""
+        pairs = [('UAH', 'USD'), ('USD', 'UAH'), ('USD', 'EUR')]
+        batch = CurrencyService.convert_batch([1000] * 3, *zip(*pairs))['converted']
+        single = [
+            CurrencyService.convert_amount(1000, from_currency, to_currency).quantize(Decimal('0.01'))
+            for from_currency, to_currency in pairs
+        ]
+        self.assertEqual(single, batch)
+        self.assertEqual(batch, [Decimal('25.00'), Decimal('40000.00'), Decimal('909.09')])
+
+    def test_columnar_endpoint(self):
+        """Columnar payload accepts scalar and list currency columns"""
+        request = APIRequestFactory().post('/api/currency/convert/batch/', {
+            'amounts': [400, 800],
+            'from_currency': 'UAH',
+            'to_currency': ['USD', 'PLN'],
+        }, format='json')
+        response = convert_currency_batch(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['converted_amounts'], ['10.00', '80.00'])
+        self.assertEqual(set(response.data['rates']), {'UAH/USD', 'UAH/PLN'})
+
+    def test_single_endpoint_reports_the_factor_used(self):
+        """The response rate is the factor applied to the amount"""
+        factory = APIRequestFactory()
+        for from_currency, to_currency in (('UAH', 'USD'), ('USD', 'UAH'), ('USD', 'EUR')):
+            request = factory.post('/api/currency/convert/', {
+                'amount': '1000', 'from_currency': from_currency, 'to_currency': to_currency,
+            }, format='json')
+            data = convert_currency(request).data
+            self.assertEqual(Decimal('1000') * Decimal(data['rate']), Decimal(data['converted_amount']))
+        self.assertEqual(Decimal(data['rate']).quantize(Decimal('0.0001')), Decimal('0.9091'))
@@ -0,0 +1,66 @@
+"""
+Tests for concurrent multi-source currency rate fetching.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+
+from apps.currency.bulk_fetcher import BulkRateFetcher
+from apps.currency.models import CurrencyRate, CurrencyUpdateLog
+from apps.currency.providers import StubRateProvider
+
+
+class BulkRateFetcherTest(TestCase):
+    """Test reconciliation and persistence with stub providers"""
+
+    def setUp(self):
+        """Three sources that disagree slightly on USD and one that is missing EUR"""
+        self.providers = [
+            StubRateProvider('A', {'USD': '41.00', 'EUR': '45.00'}, source='NBU'),
+            StubRateProvider('B', {'USD': '41.60', 'EUR': '45.40'}, source='PRIVATBANK'),
+            StubRateProvider('C', {'USD': '41.20'}, source='EXCHANGERATE_API'),
+        ]
+
+    def test_median_reconciliation(self):
+        """Median is taken per currency and the closest source is recorded"""
+        result = BulkRateFetcher(self.providers).run(['USD', 'EUR'])
+
+        self.assertEqual(result['rates'], {'USD': Decimal('41.200000'), 'EUR': Decimal('45.200000')})
+        usd = CurrencyRate.objects.get(target_currency='USD')
+        self.assertEqual(usd.source, 'EXCHANGERATE_API')
+        self.assertEqual(usd.raw_data['quotes'], {'A': '41.00', 'B': '41.60', 'C': '41.20'})
+
+    def test_priority_reconciliation(self):
+        """Priority strategy keeps the first source that quoted the currency"""
+        result = BulkRateFetcher(self.providers[::-1], strategy='priority').run(['USD', 'EUR'])
+        self.assertEqual(result['rates']['USD'], Decimal('41.200000'))
+        self.assertEqual(result['rates']['EUR'], Decimal('45.400000'))
+
+    def test_failed_and_slow_sources_are_logged(self):
+        """A failing or timed-out source does not block the others and gets its own log row"""
+        providers = [
+            StubRateProvider('DOWN', {}, error=ConnectionError('boom'), source='NBU'),
+            StubRateProvider('SLOW', {'USD': '99'}, delay=1, source='PRIVATBANK'),
+            StubRateProvider('OK', {'USD': '41.10'}, source='EXCHANGERATE_API'),
+        ]
+        result = BulkRateFetcher(providers, timeout=0.2).run(['USD'])
+
+        self.assertEqual(result['rates'], {'USD': Decimal('41.100000')})
+        self.assertEqual(result['sources']['DOWN']['error'], 'boom')
+        self.assertIn('timeout', result['sources']['SLOW']['error'])
+
+        logs = {log.source: log for log in CurrencyUpdateLog.objects.all()}
+        self.assertEqual(logs['NBU'].status, 'FAILED')
+        self.assertEqual(logs['PRIVATBANK'].status, 'FAILED')
+        self.assertEqual(logs['EXCHANGERATE_API'].status, 'SUCCESS')
+        self.assertIsNotNone(logs['EXCHANGERATE_API'].duration_seconds)
+
+    def test_latest_rate_objects_single_query(self):
+        """Latest rate per currency is read in one query"""
+        BulkRateFetcher(self.providers[:1]).run(['USD', 'EUR'])
+        BulkRateFetcher(self.providers[1:2]).run(['USD'])
+
+        with self.assertNumQueries(1):
+            latest = CurrencyRate.latest_rate_objects('UAH')
+        self.assertEqual(latest['USD'].rate, Decimal('41.600000'))
+        self.assertEqual(latest['EUR'].rate, Decimal('45.000000'))
@@ -0,0 +1,51 @@
+"""
+Tests for the as-of historical rate store.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import pandas as pd
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.currency.history import HistoricalRateStore
+from apps.currency.models import CurrencyRate
+
+
+class HistoricalRateStoreTest(TestCase):
+    """Test bisect and vectorised lookups over stored rates"""
+
+    def setUp(self):
+        """USD rates on three consecutive days"""
+        self.day0 = timezone.now() - timedelta(days=3)
+        for offset, rate in enumerate(['40', '41', '42']):
+            CurrencyRate.objects.create(
+                base_currency='UAH', target_currency='USD', rate=Decimal(rate),
+                source='NBU', fetched_at=self.day0 + timedelta(days=offset),
+            )
+        self.store = HistoricalRateStore()
+
+    def test_rate_at_uses_rate_valid_at_the_time(self):
+        """The latest rate not after the moment is returned"""
+        self.assertEqual(self.store.rate_at('USD', self.day0 + timedelta(hours=12)), Decimal('40'))
+        self.assertEqual(self.store.rate_at('USD', self.day0 + timedelta(days=1)), Decimal('41'))
+        self.assertEqual(self.store.rate_at('USD', timezone.now()), Decimal('42'))
+        self.assertEqual(self.store.rate_at('USD', self.day0 - timedelta(days=1)), Decimal('40'))
+        self.assertIsNone(self.store.rate_at('USD', self.day0 - timedelta(days=1), clamp=False))
+        self.assertEqual(self.store.rate_at('UAH', self.day0), Decimal(1))
+
+    def test_loaded_once(self):
+        """Lookups after the first one do not query the database"""
+        self.store.rate_at('USD', self.day0)
+        with self.assertNumQueries(0):
+            self.store.convert_at(100, 'USD', 'UAH', self.day0 + timedelta(days=2))
+
+    def test_convert_frame(self):
+        """A DataFrame column is converted per row at its own timestamp"""
+        frame = pd.DataFrame({
+            'price': [100, 100, 4100],
+            'currency': ['USD', 'USD', 'UAH'],
+            'created_at': [self.day0, self.day0 + timedelta(days=2), self.day0 + timedelta(days=1)],
+        })
+        self.assertEqual(self.store.convert_frame(frame, 'UAH').tolist(), [4000.0, 4200.0, 4100.0])
+        self.assertEqual(self.store.convert_frame(frame, 'USD').tolist(), [100.0, 100.0, 100.0])
@@ -17,6 +17,9 @@ urlpatterns = [
     # Конвертация валют
     path('convert/', views.convert_currency, name='convert'),
     
+    # Пакетная конвертация по одному снимку курсов
+    path('convert/batch/', views.convert_currency_batch, name='convert-batch'),
+    
     # Принудительное обновление курса
     path('update/<str:base_currency>/<str:target_currency>/', 
          views.update_currency_rate, name='update-rate'),
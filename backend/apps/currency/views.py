@@ -7,6 +7,7 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from django.conf import settings
 from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -71,22 +72,11 @@ class CurrencyRateListView(generics.ListAPIView):
         """
         base_currency = self.request.query_params.get('base_currency', 'UAH')
 
-        # Получаем последние курсы для каждой валюты
-        latest_rates = []
-        currencies = [choice[0] for choice in CurrencyRate.CURRENCY_CHOICES]
+        # Получаем последние курсы для каждой валюты одним запросом
+        latest_rates = CurrencyRate.latest_rate_objects(base_currency, auto_update=True)
 
-        for currency in currencies:
-            if currency != base_currency:
-                try:
-                    rate = CurrencyRate.get_latest_rate(base_currency, currency, auto_update=True)
-                    if rate:
-                        latest_rates.append(rate)
-                except Exception as e:
-                    logger.warning(f"⚠️ Could not get rate for {currency}: {e}")
-
-        # Возвращаем QuerySet из найденных объектов
         if latest_rates:
-            rate_ids = [rate.id for rate in latest_rates]
+            rate_ids = [rate.id for rate in latest_rates.values()]
             return CurrencyRate.objects.filter(id__in=rate_ids)
         else:
             return CurrencyRate.objects.none()
@@ -150,24 +140,24 @@ class CurrencyRateListView(generics.ListAPIView):
 def get_currency_rate(request, base_currency='UAH', target_currency='USD'):
     """
     Получить курс для конкретной пары валют
-    Автоматически обновляет при отсутствии данных
+    Устаревший курс отдается сразу, обновление запускается в фоне
     """
     try:
-        # Получаем курс с автообновлением
-        rate = CurrencyService.get_rate(base_currency, target_currency)
+        # Получаем курс без ожидания провайдера (устаревший обновляется в фоне)
+        info = CurrencyService.get_rate_info(base_currency, target_currency)
         
-        if rate:
-            # Получаем объект курса для дополнительной информации
-            rate_obj = CurrencyRate.get_latest_rate(base_currency, target_currency)
-            
+        if info:
+            fetched_at = info['fetched_at']
             return Response({
                 'base_currency': base_currency,
                 'target_currency': target_currency,
-                'rate': str(rate),
-                'source': rate_obj.source if rate_obj else 'unknown',
-                'fetched_at': rate_obj.fetched_at.isoformat() if rate_obj else None,
-                'is_fresh': rate_obj.is_fresh() if rate_obj else False,
-                'age_hours': round(rate_obj.age_hours, 2) if rate_obj else None
+                'rate': str(info['rate']),
+                'source': info['source'],
+                'fetched_at': fetched_at.isoformat() if fetched_at else None,
+                'is_fresh': not info['is_stale'],
+                'is_stale': info['is_stale'],
+                'is_fallback': info['is_fallback'],
+                'age_hours': round((timezone.now() - fetched_at).total_seconds() / 3600, 2) if fetched_at else None
             })
         else:
             return Response({
@@ -222,9 +212,9 @@ def get_currency_rate(request, base_currency='UAH', target_currency='USD'):
                 "application/json": {
                     "original_amount": "1000",
                     "from_currency": "UAH",
-                    "converted_amount": "27.35",
+                    "converted_amount": "27.3458",
                     "to_currency": "USD",
-                    "rate": "36.5686",
+                    "rate": "0.0273458",
                     "converted_at": "2024-01-15T10:30:00Z"
                 }
             }
@@ -248,23 +238,18 @@ def convert_currency(request):
                 'error': 'Amount is required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Конвертируем сумму
-        converted_amount = CurrencyService.convert_amount(
-            amount=amount,
-            from_currency=from_currency,
-            to_currency=to_currency
-        )
+        # Один коэффициент и для суммы, и для ответа: amount * rate == converted_amount
+        rate = CurrencyService.conversion_factor(from_currency, to_currency)
         
-        if converted_amount is not None:
-            # Получаем курс для информации
-            rate = CurrencyService.get_rate(from_currency, to_currency)
+        if rate is not None:
+            converted_amount = Decimal(str(amount)) * rate
             
             return Response({
                 'original_amount': str(amount),
                 'from_currency': from_currency,
                 'converted_amount': str(converted_amount),
                 'to_currency': to_currency,
-                'rate': str(rate) if rate else None,
+                'rate': str(rate),
                 'converted_at': timezone.now().isoformat()
             })
         else:
@@ -283,6 +268,139 @@ def convert_currency(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+def _column(value, size, name):
+    """Значение колонки пакета: список длины size или скаляр для всех строк"""
+    if isinstance(value, list):
+        if len(value) != size:
+            raise ValueError(f'{name} must have {size} items')
+        return [str(item).upper() for item in value]
+    return [str(value).upper()] * size
+
+
+@swagger_auto_schema(
+    method='post',
+    tags=[CANONICAL_TAGS['CURRENCY']],
+    operation_summary="Convert many amounts in one request",
+    operation_description=(
+        "Convert thousands of amounts over a single rate snapshot. Accepts either "
+        "`items` (list of {amount, from_currency, to_currency}) or a columnar payload "
+        "(`amounts` list with `from_currency`/`to_currency` as a code or a list). "
+        "Results are returned in input order together with the rate timestamp used."
+    ),
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'items': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                description='Row payload: [{amount, from_currency, to_currency}]'
+            ),
+            'amounts': openapi.Schema(
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Schema(type=openapi.TYPE_NUMBER),
+                description='Columnar payload: amounts'
+            ),
+            'from_currency': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description='Source currency code or list of codes (default: UAH)',
+                default='UAH'
+            ),
+            'to_currency': openapi.Schema(
+                type=openapi.TYPE_STRING,
+                description='Target currency code or list of codes (default: USD)',
+                default='USD'
+            ),
+            'decimal_places': openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description='Rounding of converted amounts (default: 2)',
+                default=2
+            )
+        },
+        example={
+            "amounts": [1000, 250000, 99.99],
+            "from_currency": "UAH",
+            "to_currency": ["USD", "EUR", "USD"]
+        }
+    ),
+    responses={
+        200: openapi.Response(
+            description="Batch conversion result",
+            examples={
+                "application/json": {
+                    "success": True,
+                    "count": 3,
+                    "converted_amounts": ["24.10", "5530.97", "2.41"],
+                    "errors": [],
+                    "rates": {"UAH/USD": "0.02409639", "UAH/EUR": "0.02212389"},
+                    "rates_fetched_at": "2024-01-15T08:00:00Z",
+                    "is_stale": False
+                }
+            }
+        ),
+        400: openapi.Response(description="Invalid payload")
+    }
+)
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def convert_currency_batch(request):
+    """
+    Пакетная конвертация сумм по одному снимку курсов
+    """
+    data = request.data
+    default_from = data.get('from_currency', 'UAH')
+    default_to = data.get('to_currency', 'USD')
+    max_items = getattr(settings, 'CURRENCY_BATCH_MAX_ITEMS', 10000)
+    
+    try:
+        decimal_places = int(data.get('decimal_places', 2))
+        if not 0 <= decimal_places <= 6:
+            raise ValueError('decimal_places must be between 0 and 6')
+        
+        items = data.get('items')
+        if isinstance(items, list):
+            if not all(isinstance(item, dict) for item in items):
+                raise ValueError('items must be objects')
+            amounts = [item.get('amount') for item in items]
+            from_currencies = [str(item.get('from_currency', default_from)).upper() for item in items]
+            to_currencies = [str(item.get('to_currency', default_to)).upper() for item in items]
+        elif isinstance(data.get('amounts'), list):
+            amounts = data['amounts']
+            from_currencies = _column(default_from, len(amounts), 'from_currency')
+            to_currencies = _column(default_to, len(amounts), 'to_currency')
+        else:
+            raise ValueError('Either items or amounts list is required')
+        
+        if len(amounts) > max_items:
+            raise ValueError(f'Too many items: {len(amounts)} (max {max_items})')
+    except (TypeError, ValueError) as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        result = CurrencyService.convert_batch(amounts, from_currencies, to_currencies, decimal_places)
+    except Exception as e:
+        logger.error(f"Error converting currency batch: {str(e)}")
+        return Response({
+            'success': False,
+            'error': 'Currency conversion failed',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    fetched_at = result['rates_fetched_at']
+    return Response({
+        'success': not result['errors'],
+        'count': len(amounts),
+        'converted_amounts': [str(value) if value is not None else None for value in result['converted']],
+        'errors': result['errors'],
+        'rates': {pair: str(rate) for pair, rate in result['rates'].items()},
+        'rates_fetched_at': fetched_at.isoformat() if fetched_at else None,
+        'is_stale': result['is_stale'],
+        'converted_at': timezone.now().isoformat()
+    })
+
+
 @swagger_auto_schema(
     method='post',
     tags=[CANONICAL_TAGS['CURRENCY']],
@@ -5,3 +5,8 @@ class ModerationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.moderation'
     verbose_name = 'Moderation System'
+
+    def ready(self):
+        # Reload cached notification recipients when managers or their settings change
+        from apps.moderation.services.recipient_directory import connect_invalidation_signals
+        connect_invalidation_signals()
@@ -13,13 +13,13 @@ from django.template import Template, Context
 from django.utils import timezone
 
 from ..models import (
-    ManagerNotificationSettings,
     ModerationNotification,
     NotificationTemplate,
     NotificationLog,
     NotificationStatus,
     NotificationMethod
 )
+from .recipient_directory import ManagerRecipient, get_recipient_directory
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -52,6 +52,7 @@ class ModerationNotificationConsumer:
         self.consuming = False
         self.max_retries = 3
         self.retry_delay = 5
+        self.recipient_directory = get_recipient_directory()
 
         logger.info(f"🐰 RabbitMQ Consumer initialized - connecting to {rabbitmq_host}:{rabbitmq_port}")
 
@@ -183,6 +184,9 @@ class ModerationNotificationConsumer:
             if not self.connection or self.connection.is_closed:
                 self._setup_connection()
 
+            # Managers are cached in-process and reloaded on change signals
+            self.recipient_directory.listen()
+
             self.channel.basic_qos(prefetch_count=1)
             self.channel.basic_consume(
                 queue='moderation_notifications',
@@ -249,18 +253,18 @@ class ModerationNotificationConsumer:
             
             # Process notification for each manager via Celery
             success_count = 0
-            for manager_settings in managers:
+            for manager in managers:
                 try:
                     # Queue Celery task for processing
                     from ..tasks import process_moderation_notification_task
                     task = process_moderation_notification_task.delay(
-                        manager_settings_id=manager_settings.id,
+                        manager_settings_id=manager.settings_id,
                         notification_data=data
                     )
-                    logger.info(f"📤 Queued notification processing task {task.id} for manager {manager_settings.manager.email}")
+                    logger.info(f"📤 Queued notification processing task {task.id} for manager {manager.email}")
                     success_count += 1
                 except Exception as e:
-                    logger.error(f"Failed to queue notification for manager {manager_settings.manager.email}: {e}")
+                    logger.error(f"Failed to queue notification for manager {manager.email}: {e}")
 
             if success_count > 0:
                 logger.info(f"✅ Successfully queued notification processing for {success_count} managers")
@@ -273,13 +277,9 @@ class ModerationNotificationConsumer:
             logger.error(f"Error processing notification: {e}")
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
     
-    def _get_active_managers(self, action: str) -> List[ManagerNotificationSettings]:
-        """Get active managers who should receive notifications for this action."""
-        return ManagerNotificationSettings.objects.filter(
-            is_active=True,
-            manager__is_active=True,
-            manager__is_staff=True
-        ).select_related('manager').all()
+    def _get_active_managers(self, action: str) -> List[ManagerRecipient]:
+        """Get active managers who should receive notifications for this action (no query when cached)."""
+        return list(self.recipient_directory.recipients(action))
     
 
 
@@ -0,0 +1,208 @@
+"""
+In-process directory of managers who receive moderation notifications.
+
+The notification consumer used to query ManagerNotificationSettings for
+every message. The directory keeps active managers and their channel
+preferences in memory and reloads them when another process announces a
+change over Redis pub/sub (published by model signals after commit), or at
+the latest after a fallback TTL if a signal was missed or Redis is down.
+The Celery task still re-reads the settings row before sending, so a stale
+entry can delay a preference change but never bypass it.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'moderation:recipient_directory:invalidate'
+
+# User fields that decide whether a manager is a recipient and where mail goes
+USER_FIELDS = frozenset({'is_active', 'is_staff', 'email'})
+
+
+@dataclass(frozen=True)
+class ManagerRecipient:
+    """Snapshot of one ManagerNotificationSettings row and its manager"""
+    settings_id: int
+    manager_id: int
+    email: str
+    email_enabled: bool
+    info_table_enabled: bool
+    notify_for_actions: Tuple[str, ...]
+
+    def should_notify_for_action(self, action: str) -> bool:
+        """Same rule as ManagerNotificationSettings.should_notify_for_action"""
+        return not self.notify_for_actions or action in self.notify_for_actions
+
+
+def load_manager_recipients() -> Tuple[ManagerRecipient, ...]:
+    """Active managers with active notification settings, in one query"""
+    from apps.moderation.models import ManagerNotificationSettings
+
+    rows = ManagerNotificationSettings.objects.filter(
+        is_active=True,
+        manager__is_active=True,
+        manager__is_staff=True,
+    ).select_related('manager').order_by('id')
+    return tuple(
+        ManagerRecipient(
+            settings_id=row.id,
+            manager_id=row.manager_id,
+            email=row.get_notification_email(),
+            email_enabled=row.email_enabled,
+            info_table_enabled=row.info_table_enabled,
+            notify_for_actions=tuple(row.notify_for_actions or ()),
+        )
+        for row in rows
+    )
+
+
+class RecipientDirectory:
+    """
+    Cached manager recipients of this process.
+
+    Args:
+        loader: returns the current recipients (defaults to one DB query)
+        ttl: seconds after which the directory is reloaded even without a signal
+    """
+
+    def __init__(self, loader: Callable[[], Tuple[ManagerRecipient, ...]] = load_manager_recipients,
+                 ttl: Optional[float] = None):
+        self.loader = loader
+        self._ttl = ttl
+        self._recipients: Optional[Tuple[ManagerRecipient, ...]] = None
+        self._loaded_at = 0.0
+        # Bumped by invalidate(); recipients loaded under an older generation are stale
+        self._generation = 0
+        self._loaded_generation = -1
+        self._lock = threading.Lock()
+        self._listener: Optional[threading.Thread] = None
+        self._client = None
+        self.loads = 0
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'MODERATION_RECIPIENT_DIRECTORY_TTL', 300)
+
+    def recipients(self, action: Optional[str] = None) -> Tuple[ManagerRecipient, ...]:
+        """Recipients, filtered by their action preferences if ``action`` is given"""
+        recipients = self._recipients if self._is_fresh() else self._reload()
+        if action is None:
+            return recipients
+        return tuple(recipient for recipient in recipients if recipient.should_notify_for_action(action))
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._recipients is not None
+            and self._loaded_generation == self._generation
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def _reload(self) -> Tuple[ManagerRecipient, ...]:
+        with self._lock:
+            if self._is_fresh():
+                return self._recipients
+            # An invalidation that arrives during the query leaves the result stale
+            generation, loaded_at = self._generation, time.monotonic()
+            recipients = self.loader()
+            self._recipients, self._loaded_generation, self._loaded_at = recipients, generation, loaded_at
+            self.loads += 1
+            logger.info(f"👥 Recipient directory loaded: {len(recipients)} managers")
+        if self._client is not None and self._listener is not None and not self._listener.is_alive():
+            # The subscription was lost: retry at most once per reload
+            self.listen(self._client)
+        return recipients
+
+    def invalidate(self):
+        """Reload on next access"""
+        self._generation += 1
+
+    def listen(self, client=None) -> bool:
+        """
+        Subscribe to invalidation signals in a daemon thread (once per process).
+
+        Returns False if Redis is unavailable; the TTL then bounds staleness.
+        """
+        if self._listener is not None and self._listener.is_alive():
+            return True
+        try:
+            if client is None:
+                from django_redis import get_redis_connection
+                client = get_redis_connection('default')
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+        except Exception as e:
+            logger.warning(f"⚠️ Recipient directory invalidation disabled, TTL only: {e}")
+            return False
+
+        self._listener = threading.Thread(
+            target=self._listen, args=(pubsub,), name='recipient-directory-listener', daemon=True,
+        )
+        self._listener.start()
+        # Only a client with a working subscription is retried on reload
+        self._client = client
+        return True
+
+    def _listen(self, pubsub):
+        try:
+            for message in pubsub.listen():
+                if message.get('type') == 'message':
+                    self.invalidate()
+        except Exception as e:
+            # Resubscribed on the next reload; until then the TTL applies
+            logger.warning(f"⚠️ Recipient directory listener stopped: {e}")
+            self.invalidate()
+
+
+_directory = RecipientDirectory()
+
+
+def get_recipient_directory() -> RecipientDirectory:
+    """Recipient directory of this process"""
+    return _directory
+
+
+def publish_invalidation():
+    """Tell every process to reload its recipient directory"""
+    _directory.invalidate()
+    try:
+        from django_redis import get_redis_connection
+        get_redis_connection('default').publish(INVALIDATION_CHANNEL, '1')
+    except Exception as e:
+        logger.warning(f"⚠️ Could not publish recipient directory invalidation: {e}")
+
+
+def _on_settings_change(sender, **kwargs):
+    transaction.on_commit(publish_invalidation)
+
+
+def _on_user_change(sender, instance, created=False, update_fields=None, **kwargs):
+    # Logins save last_login only; new customers are never recipients
+    if update_fields is not None and not USER_FIELDS.intersection(update_fields):
+        return
+    if created and not instance.is_staff:
+        return
+    transaction.on_commit(publish_invalidation)
+
+
+def connect_invalidation_signals():
+    """Invalidate directories on settings and user changes"""
+    from apps.moderation.models import ManagerNotificationSettings
+
+    post_save.connect(_on_settings_change, sender=ManagerNotificationSettings,
+                      dispatch_uid='recipient_directory_settings_save')
+    post_delete.connect(_on_settings_change, sender=ManagerNotificationSettings,
+                        dispatch_uid='recipient_directory_settings_delete')
+    user_model = get_user_model()
+    post_save.connect(_on_user_change, sender=user_model, dispatch_uid='recipient_directory_user_save')
+    post_delete.connect(_on_settings_change, sender=user_model, dispatch_uid='recipient_directory_user_delete')
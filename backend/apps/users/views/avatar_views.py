@@ -9,11 +9,6 @@ from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from langchain.prompts import PromptTemplate
-import logging
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from langchain.prompts import PromptTemplate
 import logging
 import requests
 import uuid
@@ -29,6 +24,10 @@ from apps.users.models import ProfileModel
 from apps.users.permissions import IsSuperUserOrMe
 from apps.users.serializers import (
     AvatarSerializer, )
+from core.utils.lazy_import import lazy_module
+
+# LangChain is only needed when an avatar is generated
+langchain_prompts = lazy_module('langchain.prompts')
 
 UserModel = get_user_model()
 logger = logging.getLogger(__name__)
@@ -293,7 +292,7 @@ def generate_avatar(request):
                 pass  # Используем данные по умолчанию
 
         # Create LangChain prompt template for avatar generation (English only)
-        avatar_prompt_template = PromptTemplate(
+        avatar_prompt_template = langchain_prompts.PromptTemplate(
             input_variables=[
                 "first_name", "last_name", "age", "gender", "style", "custom_requirements"
             ],
@@ -40,9 +40,9 @@ app.conf.beat_schedule = {
 
     # Currency rates updates
     'update-currency-rates-daily': {
-        'task': 'apps.currency.tasks.update_currency_rates_daily',
-        'schedule': crontab(hour=8, minute=0),  # Daily at 8:00 AM
-        'kwargs': {'source': 'NBU'}
+        'task': 'apps.currency.tasks.update_currency_rates_bulk',
+        'schedule': crontab(hour=8, minute=0),  # Daily at 8:00 AM, all sources concurrently
+        'kwargs': {'sources': ['NBU', 'PRIVATBANK', 'EXCHANGERATE_API']}
     },
 
     'update-currency-rates-backup': {
@@ -80,6 +80,27 @@ app.conf.beat_schedule = {
         'schedule': crontab(hour=9, minute=0),  # Daily at 9:00 AM
     },
 
+    'snapshot-search-trends': {
+        'task': 'apps.ads.tasks.analytics_tasks.snapshot_search_trends',
+        'schedule': crontab(minute='*/10'),  # Every 10 minutes (upserts current buckets)
+    },
+
+    'update-user-behavior-summaries': {
+        'task': 'apps.ads.tasks.analytics_tasks.update_user_behavior_summaries',
+        'schedule': crontab(minute='*/30'),  # Every 30 minutes (incremental)
+    },
+
+    # Transactional outbox: pick up events whose on-commit relay did not run or that wait for a retry
+    'relay-outbox': {
+        'task': 'apps.ads.tasks.outbox_tasks.relay_outbox',
+        'schedule': 10.0,  # Every 10 seconds
+    },
+
+    'cleanup-outbox-daily': {
+        'task': 'apps.ads.tasks.outbox_tasks.cleanup_outbox',
+        'schedule': crontab(hour=3, minute=30),  # Daily at 3:30 AM (retention: OUTBOX_RETENTION_HOURS)
+    },
+
     'cleanup-analytics-cache-daily': {
         'task': 'apps.ads.tasks.analytics_tasks.cleanup_old_analytics_cache',
         'schedule': crontab(hour=1, minute=0),  # Daily at 1:00 AM
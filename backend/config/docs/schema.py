@@ -0,0 +1,214 @@
+"""
+Pre-generated OpenAPI schema.
+
+drf_yasg builds the schema by introspecting every view, which takes seconds
+for this API and used to happen on each request to the schema URLs. The
+``generate_openapi_schema`` command writes the schema as JSON and YAML at
+build or boot time together with a metadata file holding its version (a hash
+of the content). Schema requests are served from those files with an ETag;
+live generation is only used in DEBUG when no file has been written yet.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.test import RequestFactory
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from rest_framework.request import Request
+
+from core.decorators.conditional_get import ConditionalGet
+
+logger = logging.getLogger(__name__)
+
+API_INFO = openapi.Info(
+    title="Car Sales Platform API",
+    default_version="v1",
+    description="""
+    # 🚗 Car Sales Platform API Documentation
+
+    Complete API documentation for the car sales platform with comprehensive endpoints for:
+    - User authentication and management
+    - Car advertisements with advanced filtering
+    - Reference data for cars, locations, and more
+    - Admin tools for moderation and analytics
+
+    ## 📋 API Organization
+
+    The API is organized into logical groups using standardized tags:
+
+    ### 🔐 Authentication & Users
+    - **🔐 Authentication** - Login, registration, logout, token management
+    - **👤 Users** - User profiles, settings, and personal data management
+
+    ### 🏢 Account Management
+    - **📍 Addresses** - Address CRUD operations with geocoding and validation
+    - **📞 Contacts** - Phone numbers, emails, and contact details management
+
+    ### 🚗 Car Advertisements
+    - **🚗 Advertisements** - Car advertisements browsing, search, and management
+    - **📸 Advertisement Images** - Image upload and management for car advertisements
+
+    ### 🏷️ Car Reference Data
+    - **🏷️ Car Marks** - Car manufacturers and brand information
+    - **🚗 Car Models** - Car models and their specifications
+    - **📅 Car Generations** - Car generations and model years
+    - **⚙️ Car Modifications** - Car modifications and technical specifications
+    - **🎨 Colors** - Available car colors and color options
+
+    ### 🌍 Geographic Data
+    - **🌍 Regions** - Geographic regions and administrative divisions
+    - **🏙️ Cities** - Cities and location information
+
+    ### 🚙 Vehicle Information
+    - **🚙 Vehicle Types** - Vehicle categories and types
+
+    ### 🔧 System
+    - **❤️ Health Check** - System health monitoring and status checks
+    - **🔧 API Utilities** - General API utilities and system endpoints
+    """,
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="pvs.versia@gmail.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+FORMATS = {
+    'json': ('openapi.json', 'application/json; charset=utf-8'),
+    'yaml': ('openapi.yaml', 'application/yaml; charset=utf-8'),
+}
+# Values of the ?format= parameter and of the URL suffix that ask for the schema itself
+SPEC_FORMATS = {'openapi': 'json', 'json': 'json', '.json': 'json', 'yaml': 'yaml', '.yaml': 'yaml'}
+META_FILE = 'openapi.meta.json'
+
+
+def schema_dir() -> Path:
+    return Path(getattr(settings, 'OPENAPI_SCHEMA_DIR', Path(settings.BASE_DIR) / 'docs' / 'openapi'))
+
+
+def generate_schema() -> openapi.Swagger:
+    """Introspect every view (slow) as an anonymous GET /api/doc/ would"""
+    request = Request(RequestFactory().get('/api/doc/', {'format': 'openapi'}))
+    request.user = AnonymousUser()
+    generator = OpenAPISchemaGenerator(info=API_INFO, url=settings.SWAGGER_SETTINGS.get('DEFAULT_API_URL'))
+    return generator.get_schema(request=request, public=True)
+
+
+def render_schema(schema: openapi.Swagger) -> Dict[str, bytes]:
+    """Schema encoded the same way the drf_yasg views encode it"""
+    return {
+        'json': OpenAPICodecJson(validators=[]).encode(schema),
+        'yaml': OpenAPICodecYaml(validators=[]).encode(schema),
+    }
+
+
+def schema_version(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()[:16]
+
+
+class StoredSchema(NamedTuple):
+    version: str
+    generated_at: int
+    paths: int
+    content: Dict[str, bytes]
+
+
+def write_schema(rendered: Dict[str, bytes], paths: int, directory: Optional[Path] = None) -> StoredSchema:
+    """Write the schema files; the metadata file goes last, so readers never see a half-written version"""
+    directory = directory or schema_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    stored = StoredSchema(schema_version(rendered['json']), int(time.time()), paths, rendered)
+
+    meta = {'version': stored.version, 'generated_at': stored.generated_at, 'paths': paths}
+    files = [(FORMATS[fmt][0], content) for fmt, content in rendered.items()]
+    files.append((META_FILE, json.dumps(meta, indent=2).encode()))
+    for name, content in files:
+        temporary = directory / f'.{name}.tmp'
+        temporary.write_bytes(content)
+        os.replace(temporary, directory / name)
+    return stored
+
+
+def read_schema(directory: Optional[Path] = None) -> Optional[StoredSchema]:
+    directory = directory or schema_dir()
+    try:
+        meta = json.loads((directory / META_FILE).read_text())
+        content = {fmt: (directory / name).read_bytes() for fmt, (name, _) in FORMATS.items()}
+    except (OSError, ValueError):
+        return None
+    return StoredSchema(meta['version'], meta['generated_at'], meta.get('paths', 0), content)
+
+
+class StoredSchemaLoader:
+    """Process-wide copy of the stored schema, re-read when the metadata file changes"""
+
+    def __init__(self):
+        self._stamp = None
+        self._schema: Optional[StoredSchema] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[StoredSchema]:
+        try:
+            stat = (schema_dir() / META_FILE).stat()
+        except OSError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp:
+                    self._schema = read_schema()
+                    self._stamp = stamp
+        return self._schema
+
+    def reset(self):
+        self._stamp = None
+        self._schema = None
+
+
+_loader = StoredSchemaLoader()
+
+
+def get_stored_schema() -> Optional[StoredSchema]:
+    return _loader.get()
+
+
+def serve_stored_schema(live_view):
+    """
+    Serve schema requests (``?format=openapi``, ``.json``/``.yaml``) from the stored files.
+
+    UI pages are passed to ``live_view`` (drf_yasg renders them without
+    introspecting views). Without stored files the schema is generated live
+    in DEBUG and 503 is returned otherwise.
+    """
+    conditional = ConditionalGet([], max_age=getattr(settings, 'OPENAPI_SCHEMA_MAX_AGE', 300))
+
+    @wraps(live_view)
+    def view(request, *args, **kwargs):
+        fmt = SPEC_FORMATS.get(kwargs.get('format') or request.GET.get('format'))
+        if fmt is None:
+            return live_view(request, *args, **kwargs)
+
+        stored = get_stored_schema()
+        if stored is None:
+            if settings.DEBUG:
+                return live_view(request, *args, **kwargs)
+            logger.error("❌ OpenAPI schema file is missing; run `python manage.py generate_openapi_schema`")
+            return JsonResponse({'error': 'API schema is not available'}, status=503)
+
+        etag = f'"{stored.version}-{fmt}"'
+        if conditional.is_not_modified(request, etag, stored.generated_at):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(stored.content[fmt], content_type=FORMATS[fmt][1])
+        return conditional.apply_headers(response, etag, stored.generated_at)
+
+    return view
@@ -1,10 +1,11 @@
 from django.urls import path, re_path
-from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from config.docs.schema import API_INFO, serve_stored_schema
+
 # Add this decorator to disable X-Frame-Options for Swagger UI views
 from django.views.decorators.clickjacking import xframe_options_exempt
 from functools import wraps
@@ -19,64 +20,16 @@ def xframe_options_exempt_sameorigin(view_func):
 
 # Create the base schema view
 base_schema_view = get_schema_view(
-    openapi.Info(
-        title="Car Sales Platform API",
-        default_version="v1",
-        description="""
-        # 🚗 Car Sales Platform API Documentation
-
-        Complete API documentation for the car sales platform with comprehensive endpoints for:
-        - User authentication and management
-        - Car advertisements with advanced filtering
-        - Reference data for cars, locations, and more
-        - Admin tools for moderation and analytics
-
-        ## 📋 API Organization
-
-        The API is organized into logical groups using standardized tags:
-
-        ### 🔐 Authentication & Users
-        - **🔐 Authentication** - Login, registration, logout, token management
-        - **👤 Users** - User profiles, settings, and personal data management
-
-        ### 🏢 Account Management
-        - **📍 Addresses** - Address CRUD operations with geocoding and validation
-        - **📞 Contacts** - Phone numbers, emails, and contact details management
-
-        ### 🚗 Car Advertisements
-        - **🚗 Advertisements** - Car advertisements browsing, search, and management
-        - **📸 Advertisement Images** - Image upload and management for car advertisements
-
-        ### 🏷️ Car Reference Data
-        - **🏷️ Car Marks** - Car manufacturers and brand information
-        - **🚗 Car Models** - Car models and their specifications
-        - **📅 Car Generations** - Car generations and model years
-        - **⚙️ Car Modifications** - Car modifications and technical specifications
-        - **🎨 Colors** - Available car colors and color options
-
-        ### 🌍 Geographic Data
-        - **🌍 Regions** - Geographic regions and administrative divisions
-        - **🏙️ Cities** - Cities and location information
-
-        ### 🚙 Vehicle Information
-        - **🚙 Vehicle Types** - Vehicle categories and types
-
-        ### 🔧 System
-        - **❤️ Health Check** - System health monitoring and status checks
-        - **🔧 API Utilities** - General API utilities and system endpoints
-        """,
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="pvs.versia@gmail.com"),
-        license=openapi.License(name="BSD License"),
-    ),
+    API_INFO,
     public=True,
     permission_classes=[permissions.AllowAny],
 )
 
 # Create different views with appropriate UI and cache settings
+# Schema requests are served from the file written by generate_openapi_schema
 schema_view = xframe_options_exempt_sameorigin(base_schema_view.with_ui('swagger', cache_timeout=0))
 schema_json = xframe_options_exempt_sameorigin(base_schema_view.without_ui(cache_timeout=0))
-redoc_view = xframe_options_exempt_sameorigin(base_schema_view.with_ui('redoc', cache_timeout=0))
+redoc_view = xframe_options_exempt_sameorigin(serve_stored_schema(base_schema_view.with_ui('redoc', cache_timeout=0)))
 
 # Custom view to handle both Swagger UI and OpenAPI schema requests
 from django.http import JsonResponse
@@ -123,7 +76,7 @@ def swagger_docs_view(request):
         return schema_view(request)
 
 # Apply the same decorators
-swagger_docs_view = xframe_options_exempt_sameorigin(swagger_docs_view)
+swagger_docs_view = xframe_options_exempt_sameorigin(serve_stored_schema(swagger_docs_view))
 
 urlpatterns = [
     # Swagger UI with OpenAPI schema support - handles both UI and ?format=openapi
@@ -135,7 +88,7 @@ urlpatterns = [
     # Direct JSON/YAML schema endpoints
     re_path(
         r'^api/doc(?P<format>\.json|\.yaml)$',
-        schema_json,
+        serve_stored_schema(schema_json),
         name='schema-json',
     ),
     # ReDoc documentation
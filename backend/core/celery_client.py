@@ -80,7 +80,8 @@ class CeleryClient:
             logger.error(f"❌ Failed to queue email task: {e}")
             raise
     
-    def send_bulk_email(self, email_list: List[Dict[str, str]], subject: str, body: str) -> str:
+    def send_bulk_email(self, email_list: List[Dict[str, str]], subject: str, body: str,
+                        campaign_id: Optional[str] = None) -> str:
         """
         Send bulk emails via Celery microservice
         
@@ -88,14 +89,16 @@ class CeleryClient:
             email_list: List of email dictionaries
             subject: Email subject
             body: Email body
+            campaign_id: Campaign id; sending again with the same id resumes instead of resending
             
         Returns:
-            Task ID
+            Task ID (also the campaign id when none is given)
         """
         try:
             result = self.app.send_task(
                 'tasks.email_tasks.send_bulk_email_task',
                 args=[email_list, subject, body],
+                kwargs={'campaign_id': campaign_id} if campaign_id else {},
                 queue='email'
             )
             
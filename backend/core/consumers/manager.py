@@ -233,6 +233,17 @@ consumer_manager = ConsumerManager()
 
 def setup_consumers():
     """Setup and register all consumers."""
+    from apps.ads.services.digest_consumer import StatusDigestConsumer
+
+    # Register status digest consumer (bulk status changes batched per window)
+    consumer_manager.register_consumer(
+        name='status_digests',
+        consumer_class=StatusDigestConsumer,
+        enabled=getattr(settings, 'ENABLE_RABBITMQ_CONSUMERS', True),
+        auto_restart=True,
+        restart_delay=5
+    )
+
     from apps.moderation.services.notification_consumer import ModerationNotificationConsumer
 
     # Register moderation consumer
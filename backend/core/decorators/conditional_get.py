@@ -0,0 +1,144 @@
+"""
+Умовні GET-запити (ETag / Last-Modified / 304) на основі версій у кеші
+
+Версія даних — число (time_ns) у Redis під відомим ключем, яке збільшується
+при кожній зміні даних. Валідатор відповіді будується лише з версій і
+параметрів запиту, тому при збігу If-None-Match відповідь 304 віддається
+до будь-якого запиту до БД: одне читання кешу (cache.get_many).
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+# Версія довідників (марки, моделі, регіони, міста тощо)
+REFERENCE_DATA_VERSION_KEY = 'reference_data_version'
+
+
+def bump_version(key):
+    """Позначити дані під ключем як змінені"""
+    cache.set(key, time.time_ns(), None)
+
+
+def get_versions(keys):
+    """
+    Прочитати версії одним зверненням до кешу
+
+    Відсутні ключі (новий кеш або витіснення) ініціалізуються поточним часом:
+    клієнти один раз перезавантажать дані, але ніколи не отримають застарілі.
+    """
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            now = time.time_ns()
+            versions[key] = now if cache.add(key, now, None) else (cache.get(key) or now)
+    return versions
+
+
+class ConditionalGet:
+    """
+    Обчислення валідаторів і обробка 304 для GET/HEAD
+
+    Args:
+        version_keys: Ключі версій; можуть містити {kwarg} з URL kwargs view
+        max_age: Cache-Control max-age у секундах
+        private: Відповідь залежить від користувача (Vary: Authorization)
+    """
+
+    def __init__(self, version_keys, max_age=0, private=False):
+        self.version_keys = list(version_keys)
+        self.max_age = max_age
+        self.private = private
+
+    def validators(self, request, view_kwargs):
+        keys = [key.format(**view_kwargs) for key in self.version_keys]
+        versions = get_versions(keys)
+
+        parts = [request.path, request.META.get('QUERY_STRING', ''), request.META.get('HTTP_ACCEPT', '')]
+        parts += [f"{key}={versions[key]}" for key in keys]
+        if self.private:
+            # Токен, а не користувач: автентифікація потребувала б запиту до БД
+            parts.append(request.META.get('HTTP_AUTHORIZATION', ''))
+        etag = '"%s"' % hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()[:32]
+
+        last_modified = max(int(version) for version in versions.values()) // 10 ** 9
+        return etag, last_modified
+
+    @staticmethod
+    def is_not_modified(request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Слабке порівняння (RFC 9110): W/ не враховується
+            candidates = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in candidates or etag in candidates
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+    def apply_headers(self, response, etag, last_modified):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        scope = 'private' if self.private else 'public'
+        response['Cache-Control'] = f'{scope}, max-age={self.max_age}, must-revalidate'
+        if self.private:
+            response['Vary'] = 'Authorization'
+        return response
+
+    def handle(self, request, view_kwargs, get_response):
+        """Віддати 304 або відповідь view з валідаторами"""
+        if request.method not in ('GET', 'HEAD'):
+            return get_response()
+
+        etag, last_modified = self.validators(request, view_kwargs)
+        if self.is_not_modified(request, etag, last_modified):
+            return self.apply_headers(HttpResponseNotModified(), etag, last_modified)
+
+        response = get_response()
+        if response.status_code == 200:
+            self.apply_headers(response, etag, last_modified)
+        return response
+
+
+def conditional_get(version_keys, max_age=0, private=False):
+    """
+    Декоратор для функціональних view
+
+    Ставиться між @swagger_auto_schema і @api_view, щоб 304 віддавався
+    ще до ініціалізації DRF (автентифікації, серіалізації, запитів до БД).
+    """
+    conditional = ConditionalGet(version_keys, max_age=max_age, private=private)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            return conditional.handle(request, kwargs, lambda: view_func(request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    Mixin для class-based view: перевірка валідаторів у dispatch до DRF
+
+    Атрибути класу:
+        conditional_version_keys: Ключі версій (можуть містити {pk} тощо)
+        conditional_max_age: Cache-Control max-age
+        conditional_private: Відповідь залежить від користувача
+    """
+
+    conditional_version_keys = ()
+    conditional_max_age = 0
+    conditional_private = False
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.conditional_version_keys:
+            return super().dispatch(request, *args, **kwargs)
+        conditional = ConditionalGet(
+            self.conditional_version_keys,
+            max_age=self.conditional_max_age,
+            private=self.conditional_private,
+        )
+        return conditional.handle(request, kwargs, lambda: super(ConditionalGetMixin, self).dispatch(request, *args, **kwargs))
@@ -0,0 +1,108 @@
+"""
+Django management command to benchmark the profanity matcher against the regex implementation.
+Usage:
+    python manage.py benchmark_profanity_matcher
+    python manage.py benchmark_profanity_matcher --texts 20000 --words 150 --dictionary-size 2000
+"""
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.llm_moderation import LLMPromptModerationService
+from core.services.profanity_matcher import ProfanityMatcher
+
+AD_WORDS = (
+    'продам', 'продаю', 'авто', 'автомобіль', 'машина', 'bmw', 'mercedes', 'audi', 'toyota', 'e-class',
+    'пробег', 'пробіг', 'км', 'двигатель', 'дизель', 'бензин', 'коробка', 'автомат', 'механика',
+    'состояние', 'отличное', 'гараж', 'один', 'владелец', 'торг', 'обмен', 'passenger', 'class',
+    'leather', 'seats', 'new', 'tires', 'диски', 'r17', '2010', '1.8', 'tfsi', 'грн', '$', 'usd',
+    'сервисная', 'книжка', 'розмитнена', 'не', 'бита', 'не', 'крашена', 'звоните', 'пишите',
+)
+EVASIONS = ('сyка', 'p1zda', 'bl9t', 'hu!', 'f0ck', 'g0vno', 'mud4k', '3аебал', 'пiзда', 'sh1t')
+
+# Regex implementation the matcher replaced: one pattern per word and language per call
+LEGACY_EVASION_PATTERNS = (
+    r'\bbl[y4@9]a?t\b', r'\bbl[y4@9]a?d\b', r'\bhu[i1!]', r'\bhuy', r'\bp[i1!]zd[a4@]', r'\bs[u0]ka?\b',
+    r'\bs[u0]chka\b', r'\beb[a4@]t', r'\beb[a4@]l', r'\bmud[a4@]k', r'\bdeb[i1!]l', r'\bk[o0]zel',
+    r'\bn[a4@]hu[i1!]', r'\bg[o0]vn[o0]', r'\bder[i1!]m[o0]', r'\bf[u0]ck', r'\bsh[i1!]t', r'\bb[i1!]tch',
+    r'\b[a4@]ss', r'\b1d10t', r'\btv4r', r'\bp4dla', r'\bn4hui', r'\bp0shel',
+)
+
+
+def legacy_find(word_lists, content):
+    content_lower = content.lower()
+    found = []
+    for examples in word_lists.values():
+        for word in examples:
+            regex = re.compile(rf'\b{re.escape(word)}\b|{re.escape(word)}', re.IGNORECASE)
+            if regex.search(content_lower):
+                found.append(word)
+    for pattern in LEGACY_EVASION_PATTERNS:
+        found.extend(match.group() for match in re.finditer(pattern, content_lower, re.IGNORECASE))
+    return found
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the Aho-Corasick profanity matcher against per-word regexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--texts', type=int, default=5000, help='Number of ad texts (default: 5000)')
+        parser.add_argument('--words', type=int, default=80, help='Words per text (default: 80)')
+        parser.add_argument(
+            '--dictionary-size',
+            type=int,
+            default=0,
+            help='Pad the dictionary with synthetic words up to this size (default: real dictionary only)'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        word_lists = {
+            language: list(words) for language, words in LLMPromptModerationService().profanity_examples.items()
+        }
+        profanity = [word for words in word_lists.values() for word in words]
+
+        total = len(profanity)
+        if options['dictionary_size'] > total:
+            letters = 'абвгдежзиклмнопрстуфхцчшщыэюя'
+            word_lists['synthetic'] = [
+                ''.join(rng.choice(letters) for _ in range(rng.randint(5, 9)))
+                for _ in range(options['dictionary_size'] - total)
+            ]
+
+        corpus = []
+        for _ in range(options['texts']):
+            words = [rng.choice(AD_WORDS) for _ in range(options['words'])]
+            if rng.random() < 0.2:
+                words[rng.randrange(len(words))] = rng.choice(profanity + list(EVASIONS))
+            corpus.append(' '.join(words))
+        size = sum(map(len, corpus))
+        dictionary = sum(map(len, word_lists.values()))
+        self.stdout.write(f'📚 Corpus: {len(corpus)} texts, {size / 1024:.0f} KiB; dictionary: {dictionary} words')
+
+        started = time.perf_counter()
+        matcher = ProfanityMatcher(word_lists)
+        build = time.perf_counter() - started
+
+        started = time.perf_counter()
+        legacy_flagged = [bool(legacy_find(word_lists, text)) for text in corpus]
+        legacy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        flagged = [bool(matcher.find(text)) for text in corpus]
+        compiled = time.perf_counter() - started
+
+        per_text = 1_000_000 / len(corpus)
+        self.stdout.write(f'⏱️ Regex per word:  {legacy:.2f}s ({legacy * per_text:.0f} µs/text)')
+        self.stdout.write(
+            f'⏱️ Aho-Corasick:    {compiled:.2f}s ({compiled * per_text:.0f} µs/text), '
+            f'built in {build * 1000:.0f} ms, {len(matcher.automaton)} states'
+        )
+        self.stdout.write(
+            f'📊 Flagged texts: regex {sum(legacy_flagged)}, matcher {sum(flagged)}, '
+            f'different {sum(a != b for a, b in zip(legacy_flagged, flagged))}'
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ Speedup: {legacy / compiled:.1f}x'))
@@ -0,0 +1,183 @@
+"""
+Django management command to benchmark the compiled topic scorer against per-keyword substring checks.
+Usage:
+    python manage.py benchmark_topic_scorer
+    python manage.py benchmark_topic_scorer --texts 20000 --words 120
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.management.commands.benchmark_profanity_matcher import AD_WORDS
+from core.services.llm_moderation import LLMPromptModerationService
+from core.services.topic_scorer import (
+    CLEARLY_NON_TRANSPORT,
+    CRITICAL_NON_TRANSPORT,
+    PROHIBITED_KEYWORDS,
+    TRANSPORT_KEYWORDS,
+    TRANSPORT_RELATED_PHRASES,
+    TopicScorer,
+    TOPICS,
+    get_topic_scorer,
+)
+
+OFF_TOPIC_WORDS = (
+    'телефон', 'смартфон', 'квартира', 'сукня', 'одяг', 'магазин', 'послуги', 'ремонт', 'renew', 'business',
+    'продукты питания', 'одежда женская', 'косметика', 'оружие', 'Oscar', 'ПРОДАМ', 'Автомобілі', 'Газель',
+)
+
+
+def join_content(title, description, **fields):
+    all_content = f"{title} {description}"
+    for field_value in fields.values():
+        if isinstance(field_value, str):
+            all_content += f" {field_value}"
+        elif isinstance(field_value, dict):
+            for sub_value in field_value.values():
+                if isinstance(sub_value, str):
+                    all_content += f" {sub_value}"
+    return all_content
+
+
+def legacy_topic_scan(all_content):
+    """The scan the scorer replaced: lowercase, then one substring check per keyword and list"""
+    content_lower = all_content.lower()
+    return (
+        [keyword for keyword in TRANSPORT_KEYWORDS if keyword in content_lower],
+        [keyword for keyword in PROHIBITED_KEYWORDS if keyword in content_lower],
+        sum(1 for phrase in CRITICAL_NON_TRANSPORT if phrase in content_lower),
+        sum(1 for phrase in CLEARLY_NON_TRANSPORT if phrase in content_lower),
+        [phrase for phrase in TRANSPORT_RELATED_PHRASES if phrase in content_lower],
+    )
+
+
+def legacy_topic_analysis(title, description, **fields):
+    """simulate_llm_topic_analysis before the compiled scorer"""
+    (
+        transport_indicators,
+        prohibited_items,
+        critical_count,
+        clearly_non_transport_count,
+        extended_transport_indicators,
+    ) = legacy_topic_scan(join_content(title, description, **fields))
+
+    non_transport_probability = 0.1
+    if critical_count > 0:
+        non_transport_probability = 1.0
+    elif clearly_non_transport_count > 0:
+        non_transport_probability += clearly_non_transport_count * 0.3
+    if extended_transport_indicators:
+        transport_strength = len(extended_transport_indicators) * 0.2
+        non_transport_probability = max(0.0, non_transport_probability - transport_strength)
+    non_transport_probability = min(1.0, max(0.0, non_transport_probability))
+
+    if critical_count > 0:
+        is_transport, category, reason, confidence = False, 'prohibited', "Критически запрещенный контент", 1.0
+    elif non_transport_probability > 0.8:
+        is_transport, category = False, 'off_topic'
+        reason = f"Высокая уверенность ({non_transport_probability:.1%}) что контент не связан с торговлей транспортом"
+        confidence = non_transport_probability
+    else:
+        is_transport, category = True, 'transport'
+        if extended_transport_indicators:
+            reason = (
+                f"Связано с транспортом: {', '.join(extended_transport_indicators[:3])}"
+                f"{'...' if len(extended_transport_indicators) > 3 else ''}"
+            )
+            confidence = 0.95
+        else:
+            reason = (
+                f"Потенциально связано с торговлей транспортом "
+                f"(уверенность НЕ-транспорта: {non_transport_probability:.1%})"
+            )
+            confidence = 1.0 - non_transport_probability
+
+    return {
+        'is_transport_related': is_transport,
+        'confidence': confidence,
+        'category': category,
+        'transport_indicators': transport_indicators,
+        'prohibited_items': prohibited_items,
+        'reason': reason,
+    }
+
+
+def build_corpus(texts, words, seed=42):
+    """Ad-like (title, description, fields) triples, a fifth of them off topic"""
+    rng = random.Random(seed)
+    vocabulary = AD_WORDS + tuple(word.title() for word in AD_WORDS[:20])
+    corpus = []
+    for _ in range(texts):
+        description = [rng.choice(vocabulary) for _ in range(words)]
+        if rng.random() < 0.2:
+            for _ in range(rng.randint(1, 3)):
+                description[rng.randrange(len(description))] = rng.choice(OFF_TOPIC_WORDS)
+        title = ' '.join(rng.choice(vocabulary + OFF_TOPIC_WORDS) for _ in range(3))
+        fields = {'mark': rng.choice(('BMW', 'Audi', 'ЗАЗ', '')), 'specs': {'fuel': rng.choice(('дизель', 'газ'))}}
+        corpus.append((title, ' '.join(description), fields))
+    return corpus
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the compiled topic scorer against per-keyword substring checks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--texts', type=int, default=5000, help='Number of ad texts (default: 5000)')
+        parser.add_argument('--words', type=int, default=80, help='Words per description (default: 80)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        corpus = build_corpus(options['texts'], options['words'], options['seed'])
+        size = sum(len(title) + len(description) for title, description, _ in corpus)
+        self.stdout.write(f'📚 Corpus: {len(corpus)} ads, {size / 1024:.0f} KiB')
+
+        started = time.perf_counter()
+        scorer = TopicScorer(TOPICS)
+        build = time.perf_counter() - started
+
+        contents = [join_content(title, description, **fields) for title, description, fields in corpus]
+        # Warm-up on other ads: a long-running worker has the vocabulary cached, not these texts
+        warm_up = build_corpus(1000, options['words'], options['seed'] + 1)
+        for scored in (scorer, get_topic_scorer()):
+            for title, description, fields in warm_up:
+                scored.score(join_content(title, description, **fields))
+
+        started = time.perf_counter()
+        for content in contents:
+            legacy_topic_scan(content)
+        legacy_scan = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for content in contents:
+            scorer.score(content)
+        compiled_scan = time.perf_counter() - started
+
+        service = LLMPromptModerationService()
+        started = time.perf_counter()
+        expected = [legacy_topic_analysis(title, description, **fields) for title, description, fields in corpus]
+        legacy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        results = [
+            service.simulate_llm_topic_analysis(title, description, **fields) for title, description, fields in corpus
+        ]
+        compiled = time.perf_counter() - started
+
+        per_ad = 1_000_000 / len(corpus)
+        self.stdout.write(
+            f'⏱️ Keyword scan:  substring checks {legacy_scan * per_ad:.1f} µs/ad, '
+            f'compiled scorer {compiled_scan * per_ad:.1f} µs/ad ({legacy_scan / compiled_scan:.1f}x), '
+            f'built in {build * 1000:.1f} ms'
+        )
+        self.stdout.write(
+            f'⏱️ Full analysis: substring checks {legacy * per_ad:.1f} µs/ad, '
+            f'compiled scorer {compiled * per_ad:.1f} µs/ad'
+        )
+        categories = {}
+        for result in results:
+            categories[result['category']] = categories.get(result['category'], 0) + 1
+        self.stdout.write(
+            f'📊 Categories: {categories}, different results {sum(a != b for a, b in zip(expected, results))}'
+        )
+        self.stdout.write(self.style.SUCCESS(f'✅ Speedup: {legacy / compiled:.1f}x'))
@@ -0,0 +1,63 @@
+"""
+Django management command to pre-generate the OpenAPI schema served by /api/doc/.
+Usage:
+    python manage.py generate_openapi_schema            # write docs/openapi/openapi.{json,yaml}
+    python manage.py generate_openapi_schema --check    # fail if the stored schema is out of date
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.docs.schema import (
+    generate_schema,
+    read_schema,
+    render_schema,
+    schema_dir,
+    schema_version,
+    write_schema,
+)
+
+
+class Command(BaseCommand):
+    help = 'Generate the OpenAPI schema files served by the schema endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Exit with an error if the stored schema differs from the code, do not write'
+        )
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            default=None,
+            help='Output directory (default: OPENAPI_SCHEMA_DIR or docs/openapi)'
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options['output_dir']) if options['output_dir'] else schema_dir()
+
+        started = time.monotonic()
+        schema = generate_schema()
+        rendered = render_schema(schema)
+        version = schema_version(rendered['json'])
+        elapsed = time.monotonic() - started
+
+        if options['check']:
+            stored = read_schema(directory)
+            if stored is None:
+                raise CommandError(f'No stored OpenAPI schema in {directory}; run generate_openapi_schema')
+            if stored.content != rendered:
+                raise CommandError(
+                    f'Stored OpenAPI schema {stored.version} is out of date (code: {version}); '
+                    f'run generate_openapi_schema'
+                )
+            self.stdout.write(self.style.SUCCESS(f'✅ OpenAPI schema {version} is up to date'))
+            return
+
+        stored = write_schema(rendered, len(schema.get('paths', {})), directory)
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ OpenAPI schema {stored.version} written to {directory}: '
+            f'{stored.paths} paths, generated in {elapsed:.1f}s'
+        ))
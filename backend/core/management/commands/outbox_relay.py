@@ -0,0 +1,58 @@
+"""
+Django management command to publish transactional outbox events to RabbitMQ.
+Usage:
+    python manage.py outbox_relay                  # relay continuously
+    python manage.py outbox_relay --once           # relay ready events and exit
+    python manage.py outbox_relay --stats          # show pending events and lag
+    python manage.py outbox_relay --purge          # delete sent events past retention
+"""
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.outbox import OutboxRelay, lag_is_high, outbox_metrics, purge_sent
+
+
+class Command(BaseCommand):
+    help = 'Publish pending transactional outbox events to RabbitMQ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Relay ready events once and exit')
+        parser.add_argument('--stats', action='store_true', help='Show outbox metrics and exit')
+        parser.add_argument('--purge', action='store_true', help='Delete sent events older than the retention')
+        parser.add_argument('--retention-hours', type=float, help='Retention for --purge (default: OUTBOX_RETENTION_HOURS)')
+        parser.add_argument('--batch-size', type=int, help='Events per transaction (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait when nothing is ready')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(outbox_metrics(), indent=2))
+            return
+
+        if options['purge']:
+            deleted = purge_sent(options['retention_hours'])
+            self.stdout.write(self.style.SUCCESS(f'✅ Deleted {deleted} sent outbox events'))
+            return
+
+        relay = OutboxRelay(batch_size=options['batch_size'])
+        if options['once']:
+            stats = relay.drain()
+            self.stdout.write(self.style.SUCCESS(f"✅ Outbox relay: {stats['sent']} sent, {stats['failed']} failed"))
+            return
+
+        self.stdout.write(f'📤 Outbox relay started (batch size {relay.batch_size})')
+        last_report = 0.0
+        try:
+            while True:
+                stats = relay.drain()
+                if time.monotonic() - last_report > 60:
+                    metrics = outbox_metrics()
+                    report = f"📊 Outbox: {metrics['pending']} pending, {metrics['failing']} failing, lag {metrics['lag_seconds']}s"
+                    self.stdout.write(self.style.WARNING(report) if lag_is_high(metrics) else report)
+                    last_report = time.monotonic()
+                # A full batch means more is ready; otherwise wait for new events or retries
+                if stats['failed'] or stats['sent'] < relay.batch_size:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('👋 Outbox relay stopped')
@@ -0,0 +1,30 @@
+"""
+Django management command to delete stored moderation results of old ruleset versions.
+Usage:
+    python manage.py purge_moderation_cache          # keep only results of the current rulesets
+    python manage.py purge_moderation_cache --all    # drop every stored result
+"""
+from django.core.management.base import BaseCommand
+
+from apps.ads.models import ModerationResultCache
+from apps.ads.services.moderation import ContentModerator
+from core.services.llm_moderation import llm_moderation_service
+
+
+class Command(BaseCommand):
+    help = 'Delete stored moderation results that no longer match the moderation rulesets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Delete all stored results')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            deleted, _ = ModerationResultCache.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'✅ Deleted {deleted} stored moderation results'))
+            return
+
+        stores = [llm_moderation_service.result_store, ContentModerator._get_result_store()]
+        for store in stores:
+            deleted = store.purge_stale()
+            self.stdout.write(f'🧹 {store.scope}: deleted {deleted} results older than {store.version}')
+        self.stdout.write(self.style.SUCCESS('✅ Moderation result cache purged'))
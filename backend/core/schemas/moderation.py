@@ -64,6 +64,34 @@ class ManagerModerationNotification(BaseModel):
         use_enum_values = True
 
 
+class ModerationDigestItem(BaseModel):
+    """Single ad in a status-change digest."""
+    ad_id: int = Field(..., description="ID объявления")
+    title: str = Field(..., description="Заголовок объявления")
+    status: str = Field(..., description="Новый статус объявления")
+    reason: Optional[str] = Field(None, description="Причина изменения")
+
+
+class ModerationDigest(BaseModel):
+    """Status changes for one recipient collected within a window."""
+    recipient_id: int = Field(..., description="ID получателя")
+    recipient_email: str = Field(..., description="Email получателя")
+    subject: str = Field(..., description="Тема письма")
+    template_name: str = Field(default="moderation_status_digest.html", description="Шаблон письма")
+    status_counts: Dict[str, int] = Field(default_factory=dict, description="Количество объявлений по статусам")
+    items: List[ModerationDigestItem] = Field(default_factory=list, description="Объявления")
+    notification_id: Optional[int] = Field(None, description="ID уведомления менеджера (для отметки доставки)")
+    email_enabled: bool = Field(True, description="Получатель принимает письма (иначе только инфо-таблица)")
+
+
+class ModerationDigestBatch(BaseModel):
+    """All digests of one window, published as a single message."""
+    notification_type: str = Field(default="user_moderation_digest", description="Тип уведомления")
+    window_start: datetime = Field(..., description="Начало окна")
+    window_end: datetime = Field(..., description="Конец окна")
+    digests: List[ModerationDigest] = Field(default_factory=list, description="Дайджесты получателей")
+
+
 class ModerationExchangeConfig:
     """Configuration for moderation exchanges and routing keys."""
     
@@ -82,6 +110,10 @@ class ModerationExchangeConfig:
     MANAGER_AD_MAX_ATTEMPTS = "manager.ad.max_attempts"
     MANAGER_AD_FLAGGED = "manager.ad.flagged"
     
+    # Routing keys for status digests (outside "manager.ad.*": not fanned out per manager again)
+    USER_STATUS_DIGEST = "user.digest.status_changed"
+    MANAGER_STATUS_DIGEST = "manager.digest.status_changed"
+    
     @classmethod
     def get_user_routing_key(cls, action: ModerationAction) -> str:
         """Get routing key for user notifications based on action."""
@@ -6,12 +6,17 @@ import os
 import uuid
 import logging
 from typing import List, Dict, Any, Optional
-from PIL import Image, ImageOps
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
 from django.core.files.storage import default_storage
 from django.conf import settings
 from celery import shared_task
 
+from core.utils.lazy_import import lazy_module
+
+# PIL загружается при первой обработке изображения, а не при старте воркера
+Image = lazy_module('PIL.Image')
+ImageOps = lazy_module('PIL.ImageOps')
+
 logger = logging.getLogger(__name__)
 
 
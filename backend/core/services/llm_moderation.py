@@ -2,12 +2,16 @@
 Интеллектуальная LLM-модерация на основе промптов
 Анализирует контент через промптирование вместо жестких правил
 """
-import re
 import json
 import logging
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from enum import Enum
+from functools import cached_property
+
+from core.services.moderation_cache import ModerationResultStore, content_hash, ruleset_version
+from core.services.profanity_matcher import Hit, ProfanityMatcher
+from core.services.topic_scorer import get_topic_scorer
 
 logger = logging.getLogger(__name__)
 
@@ -42,12 +46,30 @@ class ModerationResult:
     language_detected: str
     processing_time_ms: int
 
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-совместимое представление для кеша"""
+        data = asdict(self)
+        data['status'] = self.status.value
+        data['violations'] = [violation.value for violation in self.violations]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ModerationResult':
+        return cls(**{
+            **data,
+            'status': ModerationStatus(data['status']),
+            'violations': [ViolationType(violation) for violation in data['violations']],
+        })
+
 
 class LLMPromptModerationService:
     """
     LLM-модерация на основе промптов
     Использует интеллектуальный анализ вместо жестких паттернов
     """
+
+    # Увеличить при изменении ключевых слов тематики или логики решения
+    RULESET_VERSION = 1
     
     def __init__(self):
         self.profanity_examples = {
@@ -75,9 +97,21 @@ class LLMPromptModerationService:
             'leet_speak': [
                 'bl4t', 'bl9t', 'hu1', 'hu!', 'p1zda', 'suk4', 'g0vno', 'der1mo',
                 'eb4t', 'mud4k', 'k0zel', 'deb1l', '1d10t', 'tv4r', 'p4dla', 'n4hui'
-            ]
+            ],
+            # Замены, которые не покрывает нормализация (0 вместо u)
+            'evasion': ['f0ck', 's0ka', 's0chka', 'bl4d']
         }
 
+    @cached_property
+    def matcher(self) -> ProfanityMatcher:
+        """Словари, скомпилированные в автомат (один раз на процесс)"""
+        return ProfanityMatcher(self.profanity_examples)
+
+    @cached_property
+    def result_store(self) -> ModerationResultStore:
+        """Кеш результатов; словари входят в версию правил"""
+        return ModerationResultStore('prompt', ruleset_version(self.RULESET_VERSION, self.profanity_examples))
+
     def simulate_llm_profanity_analysis(self, content: str) -> Dict[str, Any]:
         """
         Симуляция LLM анализа нецензурной лексики
@@ -86,25 +120,23 @@ class LLMPromptModerationService:
         import time
         start_time = time.time()
         
-        content_lower = content.lower()
         found_words = []
         censored_mapping = {}
         detected_languages = []
         
-        # Симуляция интеллектуального анализа с улучшенным поиском
+        # Один проход автомата по нормализованному тексту
+        hits = self.matcher.find(content)
+        exact = {entry for hit in hits for entry in hit.exact_entries}
         for lang, examples in self.profanity_examples.items():
             for word in examples:
-                # Используем регулярные выражения для точного поиска
-                import re
-                regex = re.compile(rf'\b{re.escape(word)}\b|{re.escape(word)}', re.IGNORECASE)
-                if regex.search(content_lower):
+                if (lang, word) in exact:
                     found_words.append(word)
                     censored_mapping[word] = self._censor_word(word)
                     if lang not in detected_languages:
                         detected_languages.append(lang)
         
-        # Интеллектуальное обнаружение замаскированных слов
-        masked_words = self._detect_masked_profanity(content_lower)
+        # Замаскированные слова (leet, латиница вместо кириллицы и наоборот)
+        masked_words = self._masked_profanity(hits)
         for original, censored in masked_words.items():
             found_words.append(original)
             censored_mapping[original] = censored
@@ -136,111 +168,30 @@ class LLMPromptModerationService:
                     if isinstance(sub_value, str):
                         all_content += f" {sub_value}"
         
-        content_lower = all_content.lower()
-        
-        # Транспортные индикаторы
-        transport_indicators = []
-        transport_keywords = [
-            'автомобіль', 'автомобиль', 'машина', 'авто', 'car', 'vehicle',
-            'мотоцикл', 'motorcycle', 'скутер', 'scooter', 'мопед', 'moped',
-            'вантажівка', 'грузовик', 'truck', 'автобус', 'bus',
-            'bmw', 'mercedes', 'audi', 'toyota', 'honda', 'ford',
-            'двигун', 'engine', 'мотор', 'коробка', 'transmission',
-            'пробіг', 'пробег', 'mileage', 'паливо', 'топливо', 'fuel'
-        ]
-        
-        for keyword in transport_keywords:
-            if keyword in content_lower:
-                transport_indicators.append(keyword)
-        
-        # Запрещенные категории
-        prohibited_items = []
-        prohibited_keywords = [
-            'прокладки', 'тампони', 'pads', 'tampons',  # Гигиена
-            'одяг', 'одежда', 'сукня', 'платье', 'clothes', 'dress',  # Одежда
-            'їжа', 'еда', 'продукти', 'food', 'bread',  # Еда
-            'телефон', 'смартфон', 'phone', 'computer',  # Электроника
-            'квартира', 'будинок', 'apartment', 'house',  # Недвижимость
-            'послуги', 'услуги', 'services', 'ремонт', 'repair'  # Услуги
-        ]
-        
-        for keyword in prohibited_keywords:
-            if keyword in content_lower:
-                prohibited_items.append(keyword)
-        
-        # ИНТЕЛЛЕКТУАЛЬНЫЙ ВЕРОЯТНОСТНЫЙ ПОДХОД LLM МОДЕРАЦИИ
-        # Контент отклоняется только если он НИКАК не может быть связан с торговлей транспортом
-        # в широком смысле (наземный, надводный, воздушный транспорт)
-
-        # МИНИМАЛЬНЫЙ список критически запрещенных категорий
-        critical_non_transport = [
-            # Только самые критические категории
-            'наркотики', 'drugs', 'кокаин', 'героин',
-            'оружие', 'weapon', 'gun', 'пистолет',
-            'проституция', 'prostitution'
-        ]
-
-        # МИНИМАЛЬНЫЙ список явно НЕ-транспортных категорий
-        clearly_non_transport = [
-            # Только очевидно НЕ-транспортные вещи
-            'продукты питания', 'еда готовая',
-            'одежда женская', 'обувь детская',
-            'мебель для дома', 'косметика'
-        ]
-
-        # Подсчет критически НЕ-транспортных индикаторов
-        critical_count = sum(1 for phrase in critical_non_transport
-                           if phrase in content_lower)
-
-        # Подсчет явно НЕ-транспортных индикаторов
-        clearly_non_transport_count = sum(1 for phrase in clearly_non_transport
-                                        if phrase in content_lower)
-
-        # РАСШИРЕННЫЕ транспортные индикаторы (очень широкое определение)
-        extended_transport_indicators = []
-
-        # Проверяем наличие ЛЮБЫХ транспортных связей
-        transport_related_phrases = [
-            # Прямые транспортные термины
-            'автомобіль', 'машина', 'авто', 'car', 'vehicle', 'транспорт',
-            # Марки и модели
-            'bmw', 'mercedes', 'audi', 'toyota', 'honda', 'ford', 'volkswagen',
-            # Характеристики транспорта
-            'двигун', 'engine', 'мотор', 'коробка', 'transmission', 'пробег', 'mileage',
-            # Топливо и энергия
-            'бензин', 'дизель', 'газ', 'petrol', 'diesel', 'electric', 'hybrid',
-            # Типы транспорта
-            'мотоцикл', 'грузовик', 'автобус', 'прицеп', 'trailer', 'boat', 'ship',
-            'самолет', 'airplane', 'вертолет', 'helicopter', 'яхта', 'yacht',
-            # Торговые термины
-            'продам', 'продаю', 'selling', 'купить', 'buy', 'цена', 'price',
-            # Состояние и характеристики
-            'состояние', 'condition', 'новый', 'new', 'подержанный', 'used',
-            # Документы и регистрация
-            'документы', 'documents', 'регистрация', 'registration', 'техпаспорт',
-            # Запчасти и аксессуары (тоже транспорт!)
-            'запчасти', 'parts', 'шины', 'tires', 'диски', 'wheels', 'аккумулятор'
-        ]
-
-        for phrase in transport_related_phrases:
-            if phrase in content_lower:
-                extended_transport_indicators.append(phrase)
+        # Все темы за один проход скомпилированного скорера
+        topics = get_topic_scorer().score(all_content)
+        transport_indicators = list(topics.matches['transport'])
+        prohibited_items = list(topics.matches['prohibited'])
+        extended_transport_indicators = topics.matches['transport_related']
+
+        # Подсчет критически и явно НЕ-транспортных индикаторов
+        critical_count = topics.count('critical')
+        clearly_non_transport_count = topics.count('clearly_non_transport')
 
         # ВЕРОЯТНОСТНЫЙ РАСЧЕТ
         # Начинаем с базовой вероятности 10% что это НЕ транспорт (benefit of doubt)
         non_transport_probability = 0.1
 
-        # Критические категории = 100% НЕ транспорт
+        # Критические категории = 100% НЕ транспорт,
+        # явно НЕ-транспортные увеличивают вероятность (вес темы в TOPICS: +30% за каждую)
         if critical_count > 0:
-            non_transport_probability = 1.0
-        # Явно НЕ-транспортные категории увеличивают вероятность
+            non_transport_probability = min(1.0, topics.scores['critical'])
         elif clearly_non_transport_count > 0:
-            non_transport_probability += clearly_non_transport_count * 0.3  # +30% за каждую
+            non_transport_probability += topics.scores['clearly_non_transport']
 
-        # Транспортные индикаторы СИЛЬНО снижают вероятность НЕ-транспорта
+        # Транспортные индикаторы СИЛЬНО снижают вероятность НЕ-транспорта (вес -20% за каждый)
         if extended_transport_indicators:
-            transport_strength = len(extended_transport_indicators) * 0.2  # -20% за каждый
-            non_transport_probability = max(0.0, non_transport_probability - transport_strength)
+            non_transport_probability = max(0.0, non_transport_probability + topics.scores['transport_related'])
 
         # Ограничиваем в пределах 0-1
         non_transport_probability = min(1.0, max(0.0, non_transport_probability))
@@ -281,57 +232,41 @@ class LLMPromptModerationService:
             return '*' * len(word)
         return word[:reveal_chars] + '*' * (len(word) - reveal_chars)
 
-    def _detect_masked_profanity(self, text: str) -> Dict[str, str]:
-        """Обнаружение замаскированной нецензурщины"""
+    def _masked_profanity(self, hits: List[Hit]) -> Dict[str, str]:
+        """Совпадения, которых нет в словарях в таком написании"""
         masked_words = {}
-        
-        # Расширенные паттерны с цифрами и символами
-        evasion_patterns = [
-            # Транслитерация с заменами
-            (r'\bbl[y4@9]a?t\b', 'blyat'),
-            (r'\bbl[y4@9]a?d\b', 'blyad'),
-            (r'\bhu[i1!]', 'hui'),
-            (r'\bhuy', 'huy'),
-            (r'\bp[i1!]zd[a4@]', 'pizda'),
-            (r'\bs[u0]ka?\b', 'suka'),
-            (r'\bs[u0]chka\b', 'suchka'),
-            (r'\beb[a4@]t', 'ebat'),
-            (r'\beb[a4@]l', 'ebal'),
-            (r'\bmud[a4@]k', 'mudak'),
-            (r'\bdeb[i1!]l', 'debil'),
-            (r'\bk[o0]zel', 'kozel'),
-            (r'\bn[a4@]hu[i1!]', 'nahui'),
-            (r'\bg[o0]vn[o0]', 'govno'),
-            (r'\bder[i1!]m[o0]', 'derimo'),
-
-            # Английские с заменами
-            (r'\bf[u0]ck', 'fuck'),
-            (r'\bsh[i1!]t', 'shit'),
-            (r'\bb[i1!]tch', 'bitch'),
-            (r'\b[a4@]ss', 'ass'),
-
-            # Цифровые замены
-            (r'\b1d10t', 'idiot'),
-            (r'\btv4r', 'tvar'),
-            (r'\bp4dla', 'padla'),
-            (r'\bn4hui', 'nahui'),
-            (r'\bp0shel', 'poshel')
-        ]
-        
-        for pattern, original in evasion_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                found_word = match.group()
-                masked_words[found_word] = self._censor_word(original)
-        
+        for hit in hits:
+            if not hit.exact_entries:
+                found_word = hit.text.lower()
+                masked_words[found_word] = self._censor_word(found_word)
         return masked_words
 
     def moderate_content(self, title: str, description: str, price: Optional[float] = None, **additional_fields) -> ModerationResult:
         """
         Основная функция модерации через LLM промпты
+
+        Повторный текст (с точностью до регистра и пробелов) берется из кеша
+        результатов; цена в анализе не участвует и в ключ не входит.
         """
         import time
         start_time = time.time()
+
+        digest = content_hash(title, description, **additional_fields)
+        cached = self.result_store.get(digest)
+        if cached is not None:
+            result = ModerationResult.from_dict(cached)
+            result.processing_time_ms = int((time.time() - start_time) * 1000)
+            return result
+
+        result = self._moderate_content(title, description, **additional_fields)
+        result.processing_time_ms = int((time.time() - start_time) * 1000)
+        self.result_store.set(digest, result.to_dict())
+        return result
+
+    def _moderate_content(self, title: str, description: str, **additional_fields) -> ModerationResult:
+        """Анализ контента без кеша"""
+        import time
+        start_time = time.time()
         
         # Собираем весь контент
         full_content = f"{title} {description}"
@@ -0,0 +1,151 @@
+"""
+Кеш результатов модерации по хешу контента
+
+Один и тот же текст (повторная отправка, редактирование без изменения текста,
+одинаковые объявления дилера) модерируется один раз. Ключ — SHA-256
+нормализованного контента (регистр, пробелы) и версия набора правил:
+словарей и промптов. Если в результате есть сам текст (цензурированная
+версия), ключ берется по точному тексту (``exact_content_hash``). Горячие
+записи лежат в Redis, долговременная копия — в таблице
+``ads_moderation_result_cache``, из которой Redis заполняется после сброса.
+
+Версия правил складывается из ``MODERATION_RULESET_VERSION`` (общий сброс),
+версии правил сервиса и отпечатка его словарей/промптов, поэтому изменение
+словаря инвалидирует старые результаты без ручных действий.
+"""
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = 'moderation_result'
+DEFAULT_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def normalize_content(value: Any) -> str:
+    """Текст без различий в регистре и пробелах; словари — с сортировкой ключей"""
+    if isinstance(value, str):
+        return ' '.join(value.lower().split())
+    if isinstance(value, dict):
+        return json.dumps(
+            {str(key): normalize_content(item) for key, item in value.items()},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+    if isinstance(value, (list, tuple)):
+        return json.dumps([normalize_content(item) for item in value], ensure_ascii=False)
+    return '' if value is None else str(value)
+
+
+def content_hash(*parts: Any, **fields: Any) -> str:
+    """SHA-256 нормализованных частей контента и именованных полей"""
+    normalized = [normalize_content(part) for part in parts]
+    normalized.extend(f'{name}={normalize_content(fields[name])}' for name in sorted(fields))
+    return hashlib.sha256('\x1f'.join(normalized).encode('utf-8')).hexdigest()
+
+
+def exact_content_hash(*parts: Any) -> str:
+    """SHA-256 частей контента без нормализации — для результатов, которые содержат сам текст"""
+    return hashlib.sha256('\x1f'.join('' if part is None else str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def ruleset_version(version: Any, *rules: Any) -> str:
+    """Версия правил сервиса и отпечаток его словарей/промптов"""
+    fingerprint = hashlib.sha256(
+        json.dumps(rules, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:12]
+    return f'{version}-{fingerprint}'
+
+
+class ModerationResultStore:
+    """
+    Результаты одного сервиса модерации (Redis + БД)
+
+    Args:
+        scope: имя сервиса, разделяет ключи разных модераторов
+        ruleset: версия правил сервиса из ``ruleset_version``
+    """
+
+    def __init__(self, scope: str, ruleset: str):
+        self.scope = scope
+        self.ruleset = ruleset
+
+    @property
+    def version(self) -> str:
+        """Полная версия; ``MODERATION_RULESET_VERSION`` сбрасывает все сервисы сразу"""
+        return f"{getattr(settings, 'MODERATION_RULESET_VERSION', 1)}.{self.ruleset}"
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, 'MODERATION_CACHE_ENABLED', True)
+
+    @property
+    def timeout(self) -> int:
+        return getattr(settings, 'MODERATION_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+    def cache_key(self, digest: str) -> str:
+        return f'{CACHE_PREFIX}:{self.scope}:{self.version}:{digest}'
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Сохраненный результат или None; из БД запись возвращается в Redis"""
+        if not self.enabled:
+            return None
+
+        key = self.cache_key(digest)
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+        from apps.ads.models import ModerationResultCache
+
+        try:
+            with transaction.atomic():
+                entries = ModerationResultCache.objects.filter(
+                    scope=self.scope, content_hash=digest, ruleset_version=self.version
+                )
+                result = entries.values_list('result', flat=True).first()
+                if result is None:
+                    return None
+                entries.update(hits=F('hits') + 1, last_hit_at=timezone.now())
+        except DatabaseError as e:
+            logger.warning(f"⚠️ Moderation cache table unavailable: {e}")
+            return None
+
+        cache.set(key, result, self.timeout)
+        return result
+
+    def set(self, digest: str, result: Dict) -> None:
+        if not self.enabled:
+            return
+
+        from apps.ads.models import ModerationResultCache
+
+        cache.set(self.cache_key(digest), result, self.timeout)
+        try:
+            # Savepoint: ошибка таблицы кеша не должна ломать транзакцию запроса
+            with transaction.atomic():
+                ModerationResultCache.objects.update_or_create(
+                    scope=self.scope,
+                    content_hash=digest,
+                    ruleset_version=self.version,
+                    defaults={'result': result},
+                )
+        except DatabaseError as e:
+            logger.warning(f"⚠️ Failed to persist moderation result {digest[:12]}: {e}")
+
+    def purge_stale(self) -> int:
+        """Удаляет из БД результаты прошлых версий правил этого сервиса"""
+        from apps.ads.models import ModerationResultCache
+
+        deleted, _ = ModerationResultCache.objects.filter(scope=self.scope).exclude(
+            ruleset_version=self.version
+        ).delete()
+        return deleted
@@ -0,0 +1,252 @@
+"""
+Transactional outbox для событий в RabbitMQ
+
+Раньше статусы объявлений, уведомления модерации и письма аккаунтов
+публиковались прямо из представлений и задач: при откате транзакции после
+публикации уходило фантомное событие, а при недоступном брокере до коммита
+событие терялось. Теперь ``enqueue`` пишет сообщение в таблицу
+``outbox_events`` в той же транзакции, что и изменение данных: откат удаляет
+и событие, коммит делает его долговечным независимо от брокера.
+
+Relay (Celery-задача ``relay_outbox`` после коммита и по расписанию, или
+процесс ``manage.py outbox_relay``) захватывает неотправленные строки пачками
+через ``SELECT ... FOR UPDATE SKIP LOCKED`` и сдвиг ``available_at`` на срок
+захвата, поэтому несколько relay работают параллельно без двойной отправки,
+а блокировки не держатся во время публикации. Пачка публикуется через пул с
+publisher confirms, подтвержденные строки помечаются ``sent_at``. Доставка —
+at least once: если процесс упадет между ack брокера и отметкой, событие
+уйдет повторно после срока захвата.
+
+* Повторы: каждая строка, которую брокер не подтвердил, откладывается с
+  экспоненциальной задержкой (``available_at``); отклоненная строка не
+  задерживает остальные. Пока издатель в паузе после недоступности брокера,
+  строки не захватываются и попытки не считаются.
+* Хранение: отправленные строки удаляются через
+  ``OUTBOX_RETENTION_HOURS``; неотправленные не удаляются никогда.
+* Метрики: ``outbox_metrics()`` — число ожидающих и проблемных событий и
+  задержка (возраст самого старого неотправленного события).
+"""
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_BATCHES = 50
+DEFAULT_RETENTION_HOURS = 72
+DEFAULT_RETRY_DELAY = 5
+DEFAULT_MAX_RETRY_DELAY = 300
+DEFAULT_CLAIM_SECONDS = 60
+DEFAULT_LAG_WARNING_SECONDS = 60
+PURGE_CHUNK_SIZE = 5000
+
+# Не чаще одного запуска relay в секунду на все процессы: остальное подберет он же
+KICK_KEY = 'outbox:relay:kick'
+KICK_DEBOUNCE = 1
+
+
+def enqueue(
+    event_type: str,
+    exchange: str,
+    routing_key: str,
+    body,
+    priority: Optional[int] = None,
+    exchange_type: Optional[str] = None,
+    headers: Optional[dict] = None,
+    mandatory: bool = False,
+):
+    """
+    Записать событие в outbox в текущей транзакции
+
+    Сообщение уйдет в RabbitMQ только после коммита; при откате его не будет.
+    После коммита запускается relay, поэтому задержка обычно — время одной
+    задачи Celery.
+    """
+    from apps.ads.models import OutboxEvent
+
+    event = OutboxEvent.objects.create(
+        event_type=event_type,
+        exchange=exchange,
+        exchange_type=exchange_type or '',
+        routing_key=routing_key,
+        payload=body.decode('utf-8') if isinstance(body, bytes) else body,
+        headers=headers,
+        priority=priority,
+        mandatory=mandatory,
+    )
+    transaction.on_commit(kick_relay)
+    return event
+
+
+def kick_relay() -> None:
+    """Запустить relay в Celery; если не вышло, события отправит relay по расписанию"""
+    try:
+        if not cache.add(KICK_KEY, 1, timeout=KICK_DEBOUNCE):
+            return
+        from apps.ads.tasks.outbox_tasks import relay_outbox
+
+        relay_outbox.delay()
+    except Exception as e:
+        logger.warning(f"⚠️ Outbox relay not started, scheduled relay will send the events: {e}")
+
+
+def retry_delay(attempts: int) -> float:
+    """Экспоненциальная задержка повтора после ``attempts`` неудачных попыток"""
+    base = getattr(settings, 'OUTBOX_RETRY_DELAY', DEFAULT_RETRY_DELAY)
+    ceiling = getattr(settings, 'OUTBOX_MAX_RETRY_DELAY', DEFAULT_MAX_RETRY_DELAY)
+    return min(ceiling, base * 2 ** max(0, attempts - 1))
+
+
+class OutboxRelay:
+    """
+    Публикация неотправленных событий outbox
+
+    Args:
+        publisher: издатель RabbitMQ (по умолчанию пул текущего процесса)
+        batch_size: строк за одну транзакцию
+    """
+
+    def __init__(self, publisher=None, batch_size: Optional[int] = None):
+        self._publisher = publisher
+        self.batch_size = batch_size or getattr(settings, 'OUTBOX_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    @property
+    def publisher(self):
+        if self._publisher is None:
+            from core.services.rabbitmq_publisher import get_publisher
+
+            return get_publisher()
+        return self._publisher
+
+    @property
+    def claim_seconds(self) -> float:
+        return getattr(settings, 'OUTBOX_CLAIM_SECONDS', DEFAULT_CLAIM_SECONDS)
+
+    def relay_batch(self) -> Tuple[int, int]:
+        """
+        Отправить одну пачку; возвращает (отправлено, не подтверждено)
+
+        Строки захватываются короткой транзакцией: ``available_at`` сдвигается
+        на ``OUTBOX_CLAIM_SECONDS``, и другие relay их не берут. Публикация
+        (с повторами подключения и паузами) идет уже без блокировок строк;
+        если процесс упадет до отметки, строки вернутся после срока захвата.
+        """
+        from apps.ads.models import OutboxEvent
+
+        publisher = self.publisher
+        if publisher.in_backoff:
+            # Брокер недавно был недоступен: попытки не было, строки не трогаем
+            return 0, 0
+
+        with transaction.atomic():
+            now = timezone.now()
+            rows: List[OutboxEvent] = list(
+                OutboxEvent.objects.select_for_update(skip_locked=True)
+                .filter(sent_at__isnull=True, available_at__lte=now)
+                .order_by('id')[:self.batch_size]
+            )
+            if not rows:
+                return 0, 0
+            OutboxEvent.objects.filter(id__in=[row.id for row in rows]).update(
+                available_at=now + timedelta(seconds=self.claim_seconds)
+            )
+
+        messages = [
+            publisher.message(
+                row.exchange, row.routing_key, row.payload, row.priority,
+                row.exchange_type or None, row.headers, row.mandatory,
+            )
+            for row in rows
+        ]
+        # Без спула: неподтвержденное сообщение остается в outbox, а не в памяти процесса
+        results = publisher.publish_each(messages, spool=False)
+        sent = [row for row, confirmed in zip(rows, results) if confirmed]
+        failed = [row for row, confirmed in zip(rows, results) if not confirmed]
+
+        now = timezone.now()
+        with transaction.atomic():
+            if sent:
+                OutboxEvent.objects.filter(id__in=[row.id for row in sent]).update(sent_at=now)
+            for row in failed:
+                row.attempts += 1
+                row.last_error = 'Publish was not confirmed by RabbitMQ'
+                row.available_at = now + timedelta(seconds=retry_delay(row.attempts))
+                row.save(update_fields=['attempts', 'last_error', 'available_at'])
+
+        for row in failed:
+            logger.warning(
+                f"⚠️ Outbox event {row.id} ({row.event_type}) not confirmed, "
+                f"attempt {row.attempts}, retry after {retry_delay(row.attempts):.0f}s"
+            )
+        return len(sent), len(failed)
+
+    def drain(self, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """
+        Отправлять пачки, пока есть готовые события
+
+        Останавливается на первой ошибке (брокер, скорее всего, недоступен) и
+        после ``max_batches`` пачек, чтобы задача не занимала worker надолго.
+        """
+        max_batches = max_batches or getattr(settings, 'OUTBOX_MAX_BATCHES', DEFAULT_MAX_BATCHES)
+        stats = {'sent': 0, 'failed': 0, 'batches': 0}
+        for _ in range(max_batches):
+            sent, failed = self.relay_batch()
+            if sent or failed:
+                stats['batches'] += 1
+            stats['sent'] += sent
+            stats['failed'] += failed
+            if failed or sent < self.batch_size:
+                break
+        if stats['sent'] or stats['failed']:
+            logger.info(f"📤 Outbox relay: {stats['sent']} sent, {stats['failed']} failed")
+        return stats
+
+
+def purge_sent(retention_hours: Optional[float] = None) -> int:
+    """Удалить отправленные события старше срока хранения; возвращает число удаленных"""
+    from apps.ads.models import OutboxEvent
+
+    if retention_hours is None:
+        retention_hours = getattr(settings, 'OUTBOX_RETENTION_HOURS', DEFAULT_RETENTION_HOURS)
+    cutoff = timezone.now() - timedelta(hours=retention_hours)
+    deleted = 0
+    # Частями, чтобы не держать длинную блокировку на большой таблице
+    while True:
+        ids = list(
+            OutboxEvent.objects.filter(sent_at__lt=cutoff).order_by('id').values_list('id', flat=True)[:PURGE_CHUNK_SIZE]
+        )
+        if not ids:
+            break
+        deleted += OutboxEvent.objects.filter(id__in=ids).delete()[0]
+    if deleted:
+        logger.info(f"🧹 Outbox: deleted {deleted} sent events older than {retention_hours}h")
+    return deleted
+
+
+def outbox_metrics() -> Dict:
+    """
+    Состояние outbox
+
+    ``lag_seconds`` — возраст самого старого неотправленного события: сколько
+    подписчики отстают от базы. ``failing`` — события с неудачными попытками.
+    """
+    from apps.ads.models import OutboxEvent
+
+    pending = OutboxEvent.objects.filter(sent_at__isnull=True)
+    oldest = pending.order_by('id').values_list('created_at', flat=True).first()
+    return {
+        'pending': pending.count(),
+        'failing': pending.filter(attempts__gt=0).count(),
+        'oldest_pending_at': oldest.isoformat() if oldest else None,
+        'lag_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else 0.0,
+    }
+
+
+def lag_is_high(metrics: Dict) -> bool:
+    return metrics['lag_seconds'] > getattr(settings, 'OUTBOX_LAG_WARNING_SECONDS', DEFAULT_LAG_WARNING_SECONDS)
@@ -9,6 +9,7 @@ from pika.spec import Basic
 from config.extra_config.logger_config import logger
 from core.enums.pika import ExchangeType, QueueType
 from core.schemas.email import SendEmailParams
+from core.services.outbox import enqueue
 
 if TYPE_CHECKING:
     from pika.connection import ConnectionParameters
@@ -20,6 +21,14 @@ def ConnectionParameters(host: str = "localhost", port: int = 5672, **kwargs):
 
 
 class ConnectionFactory:
+    """
+    Consumer-side connection to a single queue.
+
+    The connection is opened lazily on first use. Publishing goes through the
+    transactional outbox (``core.services.outbox``) and never opens a
+    connection of its own.
+    """
+
     def __init__(
         self,
         parameters: "ConnectionParameters",
@@ -29,27 +38,31 @@ class ConnectionFactory:
         exchange_type: ExchangeType = ExchangeType.DIRECT,
         callback: Callable | None = None,
     ):
-        self.__connection: BlockingConnection = BlockingConnection(parameters)
+        self.__parameters = parameters
+        self.__connection: BlockingConnection | None = None
+        self.__channel: BlockingChannel | None = None
         self.__queue_name: str = queue_name
         self.__queue_type: QueueType = queue_type
         self.__exchange_name: str = exchange_name
         self.__exchange_type: ExchangeType = exchange_type
-        self.__channel = self.__connection.channel()
-        self.__channel.basic_qos(prefetch_count=1)
-        self.__channel.queue_declare(queue=self.__queue_name)
         self.__callback = callback
 
     def get_connection(self) -> BlockingConnection:
+        if self.__connection is None or self.__connection.is_closed:
+            self.__connection = BlockingConnection(self.__parameters)
+            self.__channel = self.__connection.channel()
+            self.__channel.basic_qos(prefetch_count=1)
+            self.__channel.queue_declare(queue=self.__queue_name)
         return self.__connection
 
     def publish(self, params: SendEmailParams) -> None:
-        with self.get_connection() as connection:
-            self.__channel.basic_publish(
-                exchange=self.__exchange_name,
-                routing_key=self.__queue_name,
-                body=params.model_dump_json().encode("utf-8"),
-            )
-            logger.info(" [x] Sent email request")
+        enqueue(
+            event_type="email.send",
+            exchange=self.__exchange_name,
+            routing_key=self.__queue_name,
+            body=params.model_dump_json(),
+        )
+        logger.info(" [x] Queued email request")
 
     def consume(self) -> None:
         try:
@@ -78,7 +91,8 @@ class ConnectionFactory:
         ch.basic_ack(delivery_tag=method.delivery_tag)
 
     def close(self) -> None:
-        self.__connection.close()
+        if self.__connection is not None and self.__connection.is_open:
+            self.__connection.close()
 
     def __exit__(self) -> None:
         self.close()
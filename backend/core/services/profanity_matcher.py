@@ -0,0 +1,205 @@
+"""
+Многошаблонный поиск нецензурной лексики (Aho-Corasick)
+
+Словари всех языков компилируются один раз на процесс в автомат
+Aho-Corasick, и текст проходит за один линейный проход независимо от размера
+словаря. Перед поиском текст нормализуется по словам: в словах с кириллицей
+латинские двойники и цифры заменяются кириллицей ("сyка", "3аебал"), в
+латинских словах — leet-замены ("p1zda", "bl9t", "f@ck"). Позиции совпадений
+переводятся обратно в исходный текст.
+
+Короткие слова (меньше ``SHORT_WORD_LENGTH`` символов) ищутся только целиком,
+чтобы "ass" не находился в "class"; длинные — как корни внутри слов
+("пиздец", "заебал").
+"""
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+SHORT_WORD_LENGTH = 4
+
+CYRILLIC = re.compile(r'[а-яёіїєґ]')
+LETTER = re.compile(r'[^\W\d_]')
+# Слово вместе с символами, которыми маскируют буквы
+TOKEN = re.compile(r'[^\W_]+(?:[@$!]+[^\W_]*)*|[@$][^\W_]+')
+
+LATIN_LETTER = re.compile(r'[a-z]')
+
+# Общие для обоих алфавитов замены (не считаются маскировкой)
+COMMON = {'ё': 'е', 'ї': 'і'}
+COMMON_TABLE = str.maketrans(COMMON)
+# Латинские двойники и цифры внутри кириллических слов
+TO_CYRILLIC = {
+    'a': 'а', 'b': 'в', 'c': 'с', 'e': 'е', 'h': 'н', 'k': 'к', 'm': 'м', 'o': 'о',
+    'p': 'р', 't': 'т', 'x': 'х', 'y': 'у', 'i': 'і',
+    '0': 'о', '3': 'з', '4': 'ч', '6': 'б', '9': 'я', '@': 'а', '$': 'с',
+}
+# Leet-замены внутри латинских слов
+TO_LATIN = {
+    '4': 'a', '@': 'a', '0': 'o', '1': 'i', '!': 'i', '3': 'e', '5': 's', '$': 's',
+    '7': 't', '9': 'ya',
+}
+CYRILLIC_TABLE = str.maketrans({**TO_CYRILLIC, **COMMON})
+LATIN_TABLE = str.maketrans({**TO_LATIN, **COMMON})
+
+
+def _unmask(match) -> str:
+    return match.group().translate(_table(match.group()))
+
+
+def _table(word: str) -> dict:
+    if not LETTER.search(word):
+        return COMMON_TABLE
+    return CYRILLIC_TABLE if CYRILLIC.search(word) else LATIN_TABLE
+
+
+def normalize(text: str) -> Tuple[str, Sequence[int]]:
+    """
+    Нормализованный текст и позиция исходного символа для каждого символа
+
+    Числа без букв ("2010", "1.6") не меняются. Если длина текста не
+    изменилась (почти всегда), позиции совпадают и список не строится.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        # Слова из букв одного алфавита (почти все) меняются только общими заменами
+        chunks = lowered.split(' ')
+        for index, chunk in enumerate(chunks):
+            if not (chunk.isalpha() and (chunk.isascii() or not LATIN_LETTER.search(chunk))):
+                chunks[index] = TOKEN.sub(_unmask, chunk)
+        normalized = ' '.join(chunks)
+        if len(normalized) == len(text):
+            for char, replacement in COMMON.items():
+                normalized = normalized.replace(char, replacement)
+            return normalized, range(len(text))
+
+    # Замены на несколько символов ("9" -> "ya"): позиции по символам
+    chars: List[str] = []
+    origin: List[int] = []
+    position = 0
+    for token in TOKEN.finditer(text):
+        for index in range(position, token.start()):
+            chars.append(text[index].lower().translate(COMMON_TABLE))
+            origin.append(index)
+        table = _table(token.group().lower())
+        for index in range(token.start(), token.end()):
+            replacement = text[index].lower().translate(table)
+            chars.append(replacement)
+            origin.extend([index] * len(replacement))
+        position = token.end()
+
+    for index in range(position, len(text)):
+        chars.append(text[index].lower().translate(COMMON_TABLE))
+        origin.append(index)
+    return ''.join(chars), origin
+
+
+def normalize_word(word: str) -> str:
+    return normalize(word)[0]
+
+
+class AhoCorasick:
+    """
+    Автомат Aho-Corasick над строками
+
+    Переходы хранятся словарями (алфавит — весь Unicode), выходы каждого
+    состояния уже включают выходы по суффиксным ссылкам.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[str, ...]] = [()]
+
+        for key in keys:
+            if not key:
+                continue
+            state = 0
+            for char in key:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                state = next_state
+            if key not in self.out[state]:
+                self.out[state] += (key,)
+
+        # delta[state]: переходы автомата, отличающиеся от переходов из корня
+        self.delta: List[Dict[str, int]] = [{} for _ in self.goto]
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.delta[state] = {**self.delta[self.fail[state]], **self.goto[state]}
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.out[next_state] += self.out[self.fail[next_state]]
+
+    def __len__(self):
+        return len(self.goto)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, key) всех вхождений, включая перекрывающиеся"""
+        delta, root, out = self.delta, self.goto[0], self.out
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char) or root.get(char, 0)
+            if out[state]:
+                for key in out[state]:
+                    yield index + 1 - len(key), index + 1, key
+
+
+class Hit(NamedTuple):
+    key: str
+    text: str
+    start: int
+    end: int
+    entries: Tuple[Tuple[str, str], ...]
+
+    @property
+    def exact_entries(self) -> Tuple[Tuple[str, str], ...]:
+        """(язык, слово) словарных слов, написанных в тексте без маскировки"""
+        text = self.text.lower().translate(COMMON_TABLE)
+        return tuple(entry for entry in self.entries if entry[1].lower().translate(COMMON_TABLE) == text)
+
+
+class ProfanityMatcher:
+    """
+    Скомпилированные словари нецензурной лексики
+
+    Args:
+        word_lists: язык -> список слов (в любой записи, в том числе leet)
+    """
+
+    def __init__(self, word_lists: Dict[str, Iterable[str]]):
+        self.entries: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+        for language, words in word_lists.items():
+            for word in words:
+                key = normalize_word(word)
+                if key:
+                    self.entries[key] = self.entries.get(key, ()) + ((language, word),)
+        self.automaton = AhoCorasick(self.entries)
+
+    @staticmethod
+    def _is_boundary(text: str, index: int) -> bool:
+        return index < 0 or index >= len(text) or not text[index].isalnum()
+
+    def find(self, text: str) -> List[Hit]:
+        """Все совпадения в тексте за один проход, в порядке появления"""
+        normalized, origin = normalize(text)
+        hits = []
+        for start, end, key in self.automaton.finditer(normalized):
+            original_start, original_end = origin[start], origin[end - 1] + 1
+            if len(key) < SHORT_WORD_LENGTH and not (
+                self._is_boundary(text, original_start - 1) and self._is_boundary(text, original_end)
+            ):
+                continue
+            hits.append(Hit(key, text[original_start:original_end], original_start, original_end, self.entries[key]))
+        return hits
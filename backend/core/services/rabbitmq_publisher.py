@@ -0,0 +1,401 @@
+"""
+Долгоживущий издатель RabbitMQ с пулом каналов и подтверждениями
+
+Раньше каждая публикация открывала новое ``BlockingConnection`` (TCP + AMQP
+рукопожатие на сообщение). ``RabbitMQPublisher`` держит на процесс пул
+слотов: у каждого слота свое соединение и канал в режиме publisher confirms
+(``BlockingConnection`` не потокобезопасен, поэтому слот не делится между
+потоками). Слот берется из пула на время публикации и возвращается обратно.
+
+* Подтверждения: публикация успешна только после ack брокера; nack и
+  возвращенные (mandatory) сообщения считаются ошибкой только этого
+  сообщения: соединение остается в пуле, в спул они не попадают.
+* Переподключение: при обрыве слот закрывается, публикация повторяется на
+  новом соединении; если брокер недоступен, следующие попытки подключения
+  откладываются на ``reconnect_backoff`` секунд.
+* Спул: если брокер недоступен, сообщения (при ``spool=True``) складываются в
+  ограниченную локальную очередь и отправляются первыми при следующей
+  успешной публикации; при переполнении вытесняются самые старые.
+* Микро-батчинг: ``publish_many`` и ``batch()`` отправляют пачку через один
+  слот за одну выдачу из пула.
+* Fork: ``get_publisher()`` создает издателя заново в дочернем процессе
+  (Celery prefork, gunicorn); унаследованные сокеты родителя не трогаются.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from queue import Empty, LifoQueue
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set
+from urllib.parse import urlparse
+
+import pika
+from pika import BasicProperties
+from pika.exceptions import AMQPError, NackError, UnroutableError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_SPOOL_SIZE = 10000
+DEFAULT_RETRIES = 2
+DEFAULT_RECONNECT_BACKOFF = 5.0
+
+
+def rabbitmq_connection_params() -> pika.ConnectionParameters:
+    """Параметры подключения: Service Discovery, затем переменные окружения"""
+    try:
+        from core.services.service_registry import get_service_url
+
+        rabbitmq_url = get_service_url('rabbitmq')
+        if rabbitmq_url and '://' in rabbitmq_url:
+            parsed = urlparse(rabbitmq_url)
+            vhost = (parsed.path.lstrip('/') or '/') if parsed.path else '/'
+            logger.info(f"[DISCOVERY] RabbitMQ: host={parsed.hostname}, port={parsed.port or 5672}")
+            return pika.ConnectionParameters(
+                host=parsed.hostname or 'localhost',
+                port=parsed.port or 5672,
+                virtual_host=f'/{vhost}' if vhost != '/' else '/',
+                credentials=pika.PlainCredentials(parsed.username or 'guest', parsed.password or 'guest'),
+            )
+        logger.warning(f"[WARNING] Service Discovery: Unexpected RabbitMQ URL format: {rabbitmq_url}")
+    except Exception as e:
+        logger.warning(f"[WARNING] Service Discovery failed: {e}")
+
+    host = os.getenv('RABBITMQ_HOST', 'localhost')
+    logger.info(f"[FALLBACK] Using RabbitMQ host from env: {host}")
+    return pika.ConnectionParameters(
+        host=host,
+        port=int(os.getenv('RABBITMQ_PORT', 5672)),
+        virtual_host=os.getenv('RABBITMQ_VHOST', '/'),
+        credentials=pika.PlainCredentials(
+            os.getenv('RABBITMQ_USER', 'guest'),
+            os.getenv('RABBITMQ_PASSWORD', 'guest'),
+        ),
+    )
+
+
+@dataclass
+class OutgoingMessage:
+    """Сообщение для публикации (хранится в спуле до отправки)"""
+    exchange: str
+    routing_key: str
+    body: bytes
+    properties: BasicProperties
+    exchange_type: Optional[str] = None
+    mandatory: bool = False
+
+
+@dataclass
+class _Slot:
+    connection: object
+    channel: object
+    declared: Set[str] = field(default_factory=set)
+
+
+class RabbitMQPublisher:
+    """
+    Пул соединений с каналами в режиме подтверждений
+
+    Args:
+        parameters: параметры подключения или функция, которая их возвращает
+        pool_size: максимум одновременно открытых слотов (соединение + канал)
+        spool_size: емкость локального спула на время недоступности брокера
+        retries: повторы на новом соединении после обрыва
+        reconnect_backoff: после неудачи столько секунд не подключаться, сразу в спул
+        connection_factory: фабрика соединений (``pika.BlockingConnection``)
+    """
+
+    def __init__(
+        self,
+        parameters=None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        spool_size: int = DEFAULT_SPOOL_SIZE,
+        retries: int = DEFAULT_RETRIES,
+        reconnect_backoff: float = DEFAULT_RECONNECT_BACKOFF,
+        connection_factory: Callable = pika.BlockingConnection,
+    ):
+        self.parameters = parameters or rabbitmq_connection_params
+        self.pool_size = pool_size
+        self.retries = retries
+        self.reconnect_backoff = reconnect_backoff
+        self._retry_at = 0.0
+        self.connection_factory = connection_factory
+        self.pid = os.getpid()
+
+        self._idle: LifoQueue = LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._spool: Deque[OutgoingMessage] = deque(maxlen=spool_size)
+        self._spool_lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            'connections': 0, 'published': 0, 'failed': 0, 'rejected': 0,
+            'spooled': 0, 'dropped': 0, 'drained': 0,
+        }
+
+    # Публикация
+
+    def publish(
+        self,
+        exchange: str,
+        routing_key: str,
+        body,
+        priority: Optional[int] = None,
+        exchange_type: Optional[str] = None,
+        headers: Optional[dict] = None,
+        mandatory: bool = False,
+        spool: bool = True,
+    ) -> bool:
+        """
+        Опубликовать сообщение и дождаться подтверждения брокера
+
+        ``exchange_type`` объявляет durable exchange (один раз на соединение).
+        Возвращает True, если брокер подтвердил сообщение или оно отложено в
+        спул (``spool=True``); False — если сообщение не доставлено. Задачам с
+        собственными повторами (Celery retry) нужен ``spool=False``, иначе
+        сообщение уйдет дважды.
+        """
+        message = self.message(exchange, routing_key, body, priority, exchange_type, headers, mandatory)
+        return self.publish_many([message], spool=spool) == 1
+
+    def publish_many(self, messages: Iterable[OutgoingMessage], spool: bool = True) -> int:
+        """Опубликовать пачку через один слот; возвращает число принятых сообщений"""
+        return sum(self.publish_each(messages, spool=spool))
+
+    def publish_each(self, messages: Iterable[OutgoingMessage], spool: bool = True) -> List[bool]:
+        """
+        Опубликовать пачку через один слот; результат по каждому сообщению
+
+        Сообщение, отклоненное брокером (nack или возврат mandatory), — False:
+        соединение при этом исправно, поэтому оно не закрывается, остальные
+        сообщения пачки отправляются дальше, а отклоненное не попадает в спул
+        (повторная отправка была бы отклонена снова).
+        """
+        pending = list(messages)
+        results: List[bool] = []
+        if not pending:
+            return results
+        # Пока брокер недоступен, не ждем таймаутов подключения на каждом сообщении
+        attempts = self.retries + 1 if not self.in_backoff else 0
+        for attempt in range(attempts):
+            try:
+                with self.slot() as slot:
+                    self._drain(slot)
+                    while pending:
+                        results.append(self._send_checked(slot, pending[0]))
+                        pending.pop(0)
+                self._retry_at = 0.0
+                return results
+            except (AMQPError, OSError) as e:
+                logger.warning(
+                    f"⚠️ RabbitMQ publish failed (attempt {attempt + 1}/{self.retries + 1}): {e!r}"
+                )
+                if attempt < self.retries:
+                    time.sleep(0.2 * (attempt + 1))
+
+        if attempts:
+            self._retry_at = time.monotonic() + self.reconnect_backoff
+        self.stats['failed'] += len(pending)
+        if spool:
+            self._to_spool(pending)
+            return results + [True] * len(pending)
+        logger.error(f"❌ Failed to publish {len(pending)} messages to RabbitMQ")
+        return results + [False] * len(pending)
+
+    @property
+    def in_backoff(self) -> bool:
+        """Брокер недавно был недоступен: публикации сразу идут в спул или отклоняются"""
+        return time.monotonic() < self._retry_at
+
+    @contextmanager
+    def batch(self, spool: bool = True) -> Iterator[List[OutgoingMessage]]:
+        """
+        Накопить сообщения и отправить их одной пачкой при выходе из блока
+
+        Usage:
+            with publisher.batch() as batch:
+                batch.append(publisher.message('user_notifications', key, body))
+        """
+        messages: List[OutgoingMessage] = []
+        yield messages
+        self.publish_many(messages, spool=spool)
+
+    @staticmethod
+    def message(
+        exchange: str,
+        routing_key: str,
+        body,
+        priority: Optional[int] = None,
+        exchange_type: Optional[str] = None,
+        headers: Optional[dict] = None,
+        mandatory: bool = False,
+    ) -> OutgoingMessage:
+        return OutgoingMessage(
+            exchange=exchange,
+            routing_key=routing_key,
+            body=body.encode('utf-8') if isinstance(body, str) else body,
+            properties=BasicProperties(
+                content_type='application/json',
+                delivery_mode=2,  # persistent
+                priority=min(max(1, priority), 10) if priority is not None else None,
+                headers=headers,
+            ),
+            exchange_type=exchange_type,
+            mandatory=mandatory,
+        )
+
+    def _send_checked(self, slot: _Slot, message: OutgoingMessage) -> bool:
+        """Отправить сообщение; False, если брокер его отклонил (ошибки соединения пробрасываются)"""
+        try:
+            self._send(slot, message)
+        except (NackError, UnroutableError) as e:
+            self.stats['rejected'] += 1
+            logger.error(
+                f"❌ RabbitMQ rejected message to {message.exchange or '(default)'}:{message.routing_key}: {e!r}"
+            )
+            return False
+        self.stats['published'] += 1
+        return True
+
+    def _send(self, slot: _Slot, message: OutgoingMessage) -> None:
+        if message.exchange_type and message.exchange not in slot.declared:
+            slot.channel.exchange_declare(exchange=message.exchange, exchange_type=message.exchange_type, durable=True)
+            slot.declared.add(message.exchange)
+        # В режиме confirms вызов ждет ack; nack/возврат -> исключение
+        slot.channel.basic_publish(
+            exchange=message.exchange,
+            routing_key=message.routing_key,
+            body=message.body,
+            properties=message.properties,
+            mandatory=message.mandatory,
+        )
+
+    # Спул
+
+    def _to_spool(self, messages: List[OutgoingMessage]) -> None:
+        with self._spool_lock:
+            overflow = max(0, len(self._spool) + len(messages) - self._spool.maxlen)
+            self._spool.extend(messages)
+        self.stats['spooled'] += len(messages)
+        self.stats['dropped'] += overflow
+        logger.warning(
+            f"📦 Spooled {len(messages)} messages while RabbitMQ is unavailable "
+            f"({len(self._spool)} pending, {overflow} oldest dropped)"
+        )
+
+    def _drain(self, slot: _Slot) -> None:
+        """Отправить отложенные сообщения по порядку (до первой ошибки соединения)"""
+        while self._spool:
+            with self._spool_lock:
+                if not self._spool:
+                    return
+                message = self._spool.popleft()
+            try:
+                # Отклоненное брокером сообщение выбрасывается, а не блокирует спул
+                if self._send_checked(slot, message):
+                    self.stats['drained'] += 1
+            except Exception:
+                with self._spool_lock:
+                    self._spool.appendleft(message)
+                raise
+
+    @property
+    def spooled(self) -> int:
+        return len(self._spool)
+
+    def flush_spool(self) -> int:
+        """Попытаться отправить спул без новых сообщений; возвращает остаток"""
+        if self._spool:
+            try:
+                with self.slot() as slot:
+                    self._drain(slot)
+            except (AMQPError, OSError) as e:
+                logger.warning(f"⚠️ RabbitMQ spool flush failed: {e!r}")
+        return len(self._spool)
+
+    # Пул
+
+    @contextmanager
+    def slot(self) -> Iterator[_Slot]:
+        """Слот из пула; при ошибке соединение закрывается и не возвращается"""
+        self._slots.acquire()
+        try:
+            try:
+                slot = self._idle.get_nowait()
+            except Empty:
+                slot = self._connect()
+            try:
+                yield slot
+            except BaseException:
+                self._discard(slot)
+                raise
+            self._idle.put(slot)
+        finally:
+            self._slots.release()
+
+    def _connect(self) -> _Slot:
+        parameters = self.parameters() if callable(self.parameters) else self.parameters
+        connection = self.connection_factory(parameters)
+        channel = connection.channel()
+        channel.confirm_delivery()
+        self.stats['connections'] += 1
+        logger.info(f"🔌 RabbitMQ publisher connected (pid {self.pid}, {self.stats['connections']} connections)")
+        return _Slot(connection, channel)
+
+    @staticmethod
+    def _discard(slot: _Slot) -> None:
+        try:
+            if slot.connection.is_open:
+                slot.connection.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except Empty:
+                return
+
+
+_publisher: Optional[RabbitMQPublisher] = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher() -> RabbitMQPublisher:
+    """Издатель текущего процесса (после fork создается новый)"""
+    global _publisher
+    publisher = _publisher
+    if publisher is None or publisher.pid != os.getpid():
+        with _publisher_lock:
+            if _publisher is None or _publisher.pid != os.getpid():
+                from django.conf import settings
+
+                _publisher = RabbitMQPublisher(
+                    pool_size=getattr(settings, 'RABBITMQ_PUBLISHER_POOL_SIZE', DEFAULT_POOL_SIZE),
+                    spool_size=getattr(settings, 'RABBITMQ_PUBLISHER_SPOOL_SIZE', DEFAULT_SPOOL_SIZE),
+                )
+            publisher = _publisher
+    return publisher
+
+
+def _forget_after_fork() -> None:
+    # Сокеты родителя остаются родителю: ребенок просто откроет свои
+    global _publisher, _publisher_lock
+    _publisher = None
+    _publisher_lock = threading.Lock()
+
+
+def _close_at_exit() -> None:
+    if _publisher is not None and _publisher.pid == os.getpid():
+        remaining = _publisher.flush_spool()
+        if remaining:
+            logger.error(f"❌ {remaining} spooled RabbitMQ messages lost at exit")
+        _publisher.close()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_after_fork)
+atexit.register(_close_at_exit)
@@ -1,17 +1,11 @@
 import logging
-import os
-from urllib.parse import urlparse as _urlparse
-import pika
 from typing import Dict, Any, Optional, Literal
-from pika import ConnectionParameters, BasicProperties
-from pika.exceptions import AMQPConnectionError, AMQPChannelError
 from django.conf import settings
 from django.template.loader import render_to_string
 
 from config.extra_config.logger_config import logger
 from core.schemas.email import SendEmailParams, MyTemplateData
-from core.services.pika_helper import ConnectionFactory
-from core.services.service_registry import get_service_url
+from core.services.outbox import enqueue
 
 class EmailService:
     """
@@ -20,59 +14,8 @@ class EmailService:
 
     def __init__(self, queue_name: str = "email_queue"):
         self.queue_name = queue_name
-        self.connection_params = self._get_rabbitmq_connection_params()
         self.logger = logging.getLogger(__name__)
 
-    def _get_rabbitmq_connection_params(self) -> ConnectionParameters:
-        """Get RabbitMQ connection parameters using Service Discovery."""
-        try:
-            # Получаем URL RabbitMQ через Service Discovery
-            rabbitmq_url = get_service_url('rabbitmq')
-
-            if rabbitmq_url and '://' in rabbitmq_url:
-                _p = _urlparse(rabbitmq_url)
-                host = _p.hostname or 'localhost'
-                port = _p.port or 5672
-                vhost = (_p.path.lstrip('/') or '/') if _p.path else '/'
-                user = _p.username or 'guest'
-                password = _p.password or 'guest'
-                logger.info(f"[DISCOVERY] RabbitMQ: host={host}, port={port}")
-                return ConnectionParameters(
-                    host=host,
-                    port=port,
-                    virtual_host=f'/{vhost}' if vhost != '/' else '/',
-                    credentials=pika.PlainCredentials(user, password)
-                )
-            else:
-                logger.warning(f"[WARNING] Service Discovery: Unexpected RabbitMQ URL format: {rabbitmq_url}")
-                # Fallback к переменным окружения
-                host = os.getenv('RABBITMQ_HOST', 'localhost')
-                logger.info(f"[FALLBACK] Fallback: Using RabbitMQ host from env: {host}")
-                return ConnectionParameters(
-                    host=host,
-                    port=int(os.getenv('RABBITMQ_PORT', 5672)),
-                    virtual_host=os.getenv('RABBITMQ_VHOST', '/'),
-                    credentials=pika.PlainCredentials(
-                        os.getenv('RABBITMQ_USER', 'guest'),
-                        os.getenv('RABBITMQ_PASSWORD', 'guest')
-                    )
-                )
-
-        except Exception as e:
-            logger.warning(f"[WARNING] Service Discovery failed: {e}")
-            # Final fallback
-            host = os.getenv('RABBITMQ_HOST', 'localhost')
-            logger.info(f"[FALLBACK] Final fallback: Using RabbitMQ host: {host}")
-            return ConnectionParameters(
-                host=host,
-                port=int(os.getenv('RABBITMQ_PORT', 5672)),
-                virtual_host=os.getenv('RABBITMQ_VHOST', '/'),
-                credentials=pika.PlainCredentials(
-                    os.getenv('RABBITMQ_USER', 'guest'),
-                    os.getenv('RABBITMQ_PASSWORD', 'guest')
-                )
-            )
-    
     def send_email(
         self,
         to_email: str,
@@ -197,50 +140,24 @@ class EmailService:
         return text
     
     def _publish_to_queue(self, email_data: SendEmailParams, priority: int = 3) -> bool:
-        """Publish email data to RabbitMQ queue."""
-        max_retries = 3
-        retry_delay = 2  # seconds
-        
-        for attempt in range(max_retries):
-            try:
-                factory = ConnectionFactory(
-                    parameters=self.connection_params,
-                    queue_name=self.queue_name
-                )
-                
-                # Publish with delivery mode 2 (persistent) and priority
-                factory.channel.basic_publish(
-                    exchange='',
-                    routing_key=self.queue_name,
-                    body=email_data.model_dump_json().encode('utf-8'),
-                    properties=BasicProperties(
-                        delivery_mode=2,  # Make message persistent
-                        priority=min(max(1, priority), 10),  # Ensure priority is between 1-10
-                        content_type='application/json'
-                    )
-                )
-                
-                self.logger.info(f"Email to {email_data.to_email} published to queue")
-                return True
-                
-            except (AMQPConnectionError, AMQPChannelError) as e:
-                if attempt == max_retries - 1:
-                    self.logger.error(
-                        f"Failed to publish email after {max_retries} attempts: {str(e)}"
-                    )
-                    return False
-                
-                self.logger.warning(
-                    f"RabbitMQ connection error (attempt {attempt + 1}/{max_retries}): {str(e)}"
-                )
-                import time
-                time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                
-            except Exception as e:
-                self.logger.error(f"Unexpected error publishing email: {str(e)}")
-                return False
-        
-        return False
+        """
+        Queue email data for the RabbitMQ queue through the transactional outbox.
+
+        The message is written in the caller's transaction (e.g. together with
+        the new user) and published with broker confirms by the outbox relay
+        after commit. Unroutable messages (queue not declared yet) stay in the
+        outbox and are retried instead of being dropped.
+        """
+        enqueue(
+            event_type='email.send',
+            exchange='',
+            routing_key=self.queue_name,
+            body=email_data.model_dump_json(),
+            priority=priority,
+            mandatory=True,
+        )
+        self.logger.info(f"Email to {email_data.to_email} queued for publishing")
+        return True
 
 # Default instance for convenience
 email_service = EmailService()
@@ -0,0 +1,174 @@
+"""
+Скомпилированный скоринг тематики объявления
+
+Ключевые слова всех тем собираются в одну таблицу, которая строится один раз
+на процесс. Текст приводится к нижнему регистру и делится по пробелам один
+раз; для каждого уникального фрагмента берется готовая битовая маска
+найденных ключевых слов (маски фрагментов кэшируются — словарь объявлений
+ограничен). Маски объединяются, и по одной маске получаются совпадения и
+взвешенные баллы всех тем.
+
+Семантика прежняя — поиск подстроки ("авто" находится в "автомобіль",
+"газ" — в "магазин"): ключевое слово без пробелов всегда целиком лежит в
+одном фрагменте, а фразы с пробелами проверяются по всему тексту. Подстроки
+уже покрывают словоформы ("пробег" — "пробега", "авто" — "автомобілі"),
+поэтому отдельный стемминг не нужен и решения модерации не меняются.
+"""
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+# Транспортные индикаторы (для отчета)
+TRANSPORT_KEYWORDS = (
+    'автомобіль', 'автомобиль', 'машина', 'авто', 'car', 'vehicle',
+    'мотоцикл', 'motorcycle', 'скутер', 'scooter', 'мопед', 'moped',
+    'вантажівка', 'грузовик', 'truck', 'автобус', 'bus',
+    'bmw', 'mercedes', 'audi', 'toyota', 'honda', 'ford',
+    'двигун', 'engine', 'мотор', 'коробка', 'transmission',
+    'пробіг', 'пробег', 'mileage', 'паливо', 'топливо', 'fuel',
+)
+
+# Запрещенные категории (для отчета)
+PROHIBITED_KEYWORDS = (
+    'прокладки', 'тампони', 'pads', 'tampons',  # Гигиена
+    'одяг', 'одежда', 'сукня', 'платье', 'clothes', 'dress',  # Одежда
+    'їжа', 'еда', 'продукти', 'food', 'bread',  # Еда
+    'телефон', 'смартфон', 'phone', 'computer',  # Электроника
+    'квартира', 'будинок', 'apartment', 'house',  # Недвижимость
+    'послуги', 'услуги', 'services', 'ремонт', 'repair',  # Услуги
+)
+
+# МИНИМАЛЬНЫЙ список критически запрещенных категорий
+CRITICAL_NON_TRANSPORT = (
+    'наркотики', 'drugs', 'кокаин', 'героин',
+    'оружие', 'weapon', 'gun', 'пистолет',
+    'проституция', 'prostitution',
+)
+
+# МИНИМАЛЬНЫЙ список явно НЕ-транспортных категорий
+CLEARLY_NON_TRANSPORT = (
+    'продукты питания', 'еда готовая',
+    'одежда женская', 'обувь детская',
+    'мебель для дома', 'косметика',
+)
+
+# РАСШИРЕННЫЕ транспортные индикаторы (очень широкое определение)
+TRANSPORT_RELATED_PHRASES = (
+    # Прямые транспортные термины
+    'автомобіль', 'машина', 'авто', 'car', 'vehicle', 'транспорт',
+    # Марки и модели
+    'bmw', 'mercedes', 'audi', 'toyota', 'honda', 'ford', 'volkswagen',
+    # Характеристики транспорта
+    'двигун', 'engine', 'мотор', 'коробка', 'transmission', 'пробег', 'mileage',
+    # Топливо и энергия
+    'бензин', 'дизель', 'газ', 'petrol', 'diesel', 'electric', 'hybrid',
+    # Типы транспорта
+    'мотоцикл', 'грузовик', 'автобус', 'прицеп', 'trailer', 'boat', 'ship',
+    'самолет', 'airplane', 'вертолет', 'helicopter', 'яхта', 'yacht',
+    # Торговые термины
+    'продам', 'продаю', 'selling', 'купить', 'buy', 'цена', 'price',
+    # Состояние и характеристики
+    'состояние', 'condition', 'новый', 'new', 'подержанный', 'used',
+    # Документы и регистрация
+    'документы', 'documents', 'регистрация', 'registration', 'техпаспорт',
+    # Запчасти и аксессуары (тоже транспорт!)
+    'запчасти', 'parts', 'шины', 'tires', 'диски', 'wheels', 'аккумулятор',
+)
+
+# Тема -> (ключевые слова, вес одного совпадения)
+TOPICS: Dict[str, Tuple[Sequence[str], float]] = {
+    'transport': (TRANSPORT_KEYWORDS, 0.0),
+    'prohibited': (PROHIBITED_KEYWORDS, 0.0),
+    'critical': (CRITICAL_NON_TRANSPORT, 1.0),
+    'clearly_non_transport': (CLEARLY_NON_TRANSPORT, 0.3),
+    'transport_related': (TRANSPORT_RELATED_PHRASES, -0.2),
+}
+
+FRAGMENT_CACHE_SIZE = 50000
+
+
+def _has_space(key: str) -> bool:
+    return any(char.isspace() for char in key)
+
+
+class TopicScores(NamedTuple):
+    matches: Dict[str, Tuple[str, ...]]
+    scores: Dict[str, float]
+
+    def count(self, topic: str) -> int:
+        return len(self.matches[topic])
+
+
+class TopicScorer:
+    """
+    Все ключевые слова всех тем в одной скомпилированной таблице
+
+    Каждая пара (тема, слово) получает свой бит; биты темы идут подряд в
+    порядке ее списка и начинаются с границы байта. Совпадения извлекаются
+    из маски по байтам готовыми таблицами (байт -> слова темы в исходном
+    порядке), без цикла по отдельным битам.
+
+    Args:
+        topics: тема -> (ключевые слова, вес одного совпадения)
+    """
+
+    def __init__(self, topics: Dict[str, Tuple[Iterable[str], float]]):
+        self.weights = {topic: weight for topic, (_, weight) in topics.items()}
+        # (тема, таблица байт -> слова) для каждого байта маски
+        self.chunks: List[Tuple[str, Tuple[Tuple[str, ...], ...]]] = []
+        key_masks: Dict[str, int] = {}
+        for topic, (keywords, _) in topics.items():
+            keywords = tuple(keywords)
+            for offset in range(0, len(keywords), 8):
+                chunk = keywords[offset:offset + 8]
+                shift = len(self.chunks) * 8
+                for index, keyword in enumerate(chunk):
+                    key_masks[keyword] = key_masks.get(keyword, 0) | 1 << (shift + index)
+                table = tuple(
+                    tuple(keyword for index, keyword in enumerate(chunk) if byte >> index & 1) for byte in range(256)
+                )
+                self.chunks.append((topic, table))
+        self.size = len(self.chunks)
+
+        # Слова без пробелов ищутся внутри фрагментов, фразы — по всему тексту
+        self.words = tuple((key, mask) for key, mask in key_masks.items() if not _has_space(key))
+        self.phrases = tuple((key, mask) for key, mask in key_masks.items() if _has_space(key))
+        self.fragments: Dict[str, int] = {}
+
+    def fragment_mask(self, fragment: str) -> int:
+        mask = 0
+        for key, key_mask in self.words:
+            if key in fragment:
+                mask |= key_mask
+        return mask
+
+    def mask(self, text: str) -> int:
+        """Маска всех найденных пар (тема, слово) за один проход по фрагментам"""
+        lowered = text.lower()
+        known, mask = self.fragments, 0
+        for fragment in lowered.split():
+            fragment_mask = known.get(fragment)
+            if fragment_mask is None:
+                fragment_mask = self.fragment_mask(fragment)
+                # Кэш только растет: записи не удаляются, поэтому чтение без блокировок безопасно
+                if len(known) < FRAGMENT_CACHE_SIZE:
+                    known[fragment] = fragment_mask
+            mask |= fragment_mask
+        for phrase, phrase_mask in self.phrases:
+            if phrase in lowered:
+                mask |= phrase_mask
+        return mask
+
+    def score(self, text: str) -> TopicScores:
+        """Совпадения по темам (в порядке ключевых слов) и взвешенные баллы"""
+        matches: Dict[str, Tuple[str, ...]] = {topic: () for topic in self.weights}
+        for (topic, table), byte in zip(self.chunks, self.mask(text).to_bytes(self.size, 'little')):
+            if byte:
+                matches[topic] += table[byte]
+        scores = {topic: len(found) * self.weights[topic] for topic, found in matches.items()}
+        return TopicScores(matches, scores)
+
+
+@lru_cache(maxsize=None)
+def get_topic_scorer() -> TopicScorer:
+    """Скорер строится один раз на процесс"""
+    return TopicScorer(TOPICS)
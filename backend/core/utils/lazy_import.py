@@ -0,0 +1,75 @@
+"""
+Lazy imports of heavy libraries.
+
+pandas, matplotlib, seaborn, PIL, g4f and langchain add seconds of import
+time and tens of megabytes to every web worker and Celery process, while only
+a few code paths (charts, image processing, LLM calls) use them. Modules on
+the boot path bind such libraries with ``lazy_module`` so the import happens
+on first attribute access instead of at URL-config load time.
+
+    pd = lazy_module('pandas')
+    plt = lazy_module('matplotlib.pyplot', on_load=lambda _: matplotlib.use('Agg'))
+"""
+import importlib
+import importlib.util
+import threading
+from typing import Callable, Optional
+
+_lock = threading.RLock()
+
+
+class LazyModule:
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Args:
+        name: Dotted module name
+        on_load: Called once with the module right after the import
+            (backend selection, global styles)
+    """
+
+    __slots__ = ('_name', '_on_load', '_module')
+
+    def __init__(self, name: str, on_load: Optional[Callable] = None):
+        self._name = name
+        self._on_load = on_load
+        self._module = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with _lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    if self._on_load is not None:
+                        self._on_load(module)
+                    self._module = module
+                module = self._module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name: str, on_load: Optional[Callable] = None) -> LazyModule:
+    """Proxy for ``name`` imported on first use"""
+    return LazyModule(name, on_load)
+
+
+def is_available(name: str) -> bool:
+    """Whether a top-level package is installed, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
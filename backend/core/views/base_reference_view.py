@@ -7,25 +7,32 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import generics
 from rest_framework.filters import OrderingFilter, SearchFilter
 
+from core.decorators.conditional_get import REFERENCE_DATA_VERSION_KEY, ConditionalGetMixin
 from core.pagination import StandardResultsSetPagination
 from core.permissions import ReadOnlyOrStaffWrite
 
 
-class BaseReferenceListCreateView(generics.ListCreateAPIView):
+class BaseReferenceListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     Base generic view for reference data (List + Create).
     Provides common functionality for reference data endpoints.
+    GET responses carry ETags derived from the reference data version.
     """
 
+    conditional_version_keys = (REFERENCE_DATA_VERSION_KEY,)
+
     permission_classes: list = [ReadOnlyOrStaffWrite]
     pagination_class = StandardResultsSetPagination
     filter_backends: list = [DjangoFilterBackend, SearchFilter, OrderingFilter]
 
 
-class BaseReferenceRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class BaseReferenceRetrieveUpdateDestroyView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Base generic view for reference data (Retrieve + Update + Destroy).
     Provides common functionality for reference data detail endpoints.
+    GET responses carry ETags derived from the reference data version.
     """
 
+    conditional_version_keys = (REFERENCE_DATA_VERSION_KEY,)
+
     permission_classes: list = [ReadOnlyOrStaffWrite]
@@ -0,0 +1 @@
+# Shared utilities for Celery microservice tasks
@@ -0,0 +1,217 @@
+# Bulk email campaign state kept in Redis
+#
+# A campaign is the "table" of one bulk send: its metadata and counters, the
+# recipient chunks, which chunks are done, which recipients were sent (the
+# idempotency key per campaign + recipient) and which failed. Every worker
+# reads and updates the same state, so chunks can run in parallel, be retried
+# on their own and be resumed after a crash without sending twice.
+
+import json
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+
+KEY_PREFIX = 'bulk_email:campaign'
+CAMPAIGN_TTL = 7 * 24 * 3600
+CLAIM_TTL = 300
+
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_COMPLETED_WITH_FAILURES = 'completed_with_failures'
+
+
+def chunked(items: List[Dict], size: int) -> List[List[Dict]]:
+    return [items[offset:offset + size] for offset in range(0, len(items), size)]
+
+
+class CampaignStore:
+    """
+    Campaign progress and idempotency keys
+
+    Args:
+        client: Redis client with ``decode_responses=True``
+        ttl: Seconds campaign keys are kept after the last change
+    """
+
+    def __init__(self, client: redis.Redis, ttl: int = CAMPAIGN_TTL):
+        self.client = client
+        self.ttl = ttl
+
+    # =========================================================================
+    # KEYS
+    # =========================================================================
+
+    @staticmethod
+    def key(campaign_id: str, *parts) -> str:
+        return ':'.join((KEY_PREFIX, str(campaign_id)) + tuple(str(part) for part in parts))
+
+    def _keys(self, campaign_id: str, chunks: int) -> List[str]:
+        return [
+            self.key(campaign_id, 'meta'),
+            self.key(campaign_id, 'done'),
+            self.key(campaign_id, 'sent'),
+            self.key(campaign_id, 'failed'),
+        ] + [self.key(campaign_id, 'chunk', index) for index in range(chunks)]
+
+    def _touch(self, pipe, campaign_id: str, chunks: int):
+        for key in self._keys(campaign_id, chunks):
+            pipe.expire(key, self.ttl)
+
+    # =========================================================================
+    # CAMPAIGN
+    # =========================================================================
+
+    def create(self, campaign_id: str, recipients: List[Dict], subject: str, body: str,
+               chunk_size: int) -> Tuple[bool, int]:
+        """
+        Store a campaign split into chunks
+
+        Returns (created, chunks). An existing campaign is left as it is, so
+        re-running the bulk task with the same id resumes instead of resending.
+        """
+        meta_key = self.key(campaign_id, 'meta')
+        if not self.client.hsetnx(meta_key, 'created_at', time.time()):
+            chunks = self.client.hget(meta_key, 'chunks')
+            if chunks is not None:
+                return False, int(chunks)
+            # Creation was interrupted before the chunks were recorded: write them again
+
+        chunks = chunked(recipients, chunk_size)
+        pipe = self.client.pipeline()
+        for index, chunk in enumerate(chunks):
+            pipe.set(self.key(campaign_id, 'chunk', index), json.dumps(chunk))
+        # 'chunks' goes last: it marks the campaign as complete
+        pipe.hset(meta_key, mapping={
+            'subject': subject,
+            'body': body,
+            'total': len(recipients),
+            'sent': 0,
+            'completed_chunks': 0,
+            'status': STATUS_RUNNING,
+            'chunks': len(chunks),
+        })
+        self._touch(pipe, campaign_id, len(chunks))
+        pipe.execute()
+        return True, len(chunks)
+
+    def meta(self, campaign_id: str) -> Dict[str, str]:
+        meta = self.client.hgetall(self.key(campaign_id, 'meta'))
+        if not meta or 'chunks' not in meta:
+            raise KeyError(f'Campaign {campaign_id} not found')
+        return meta
+
+    def progress(self, campaign_id: str) -> Dict:
+        meta = self.meta(campaign_id)
+        return {
+            'campaign_id': campaign_id,
+            'status': meta['status'],
+            'total': int(meta['total']),
+            'sent': int(meta['sent']),
+            'failed': self.client.hlen(self.key(campaign_id, 'failed')),
+            'chunks': int(meta['chunks']),
+            'completed_chunks': int(meta['completed_chunks']),
+        }
+
+    # =========================================================================
+    # CHUNKS
+    # =========================================================================
+
+    def load_chunk(self, campaign_id: str, index: int) -> List[Dict]:
+        data = self.client.get(self.key(campaign_id, 'chunk', index))
+        if data is None:
+            raise KeyError(f'Chunk {index} of campaign {campaign_id} not found')
+        return json.loads(data)
+
+    def pending_chunks(self, campaign_id: str) -> List[int]:
+        """Chunks not completed yet, in order (the resume point)"""
+        chunks = int(self.meta(campaign_id)['chunks'])
+        done = {int(index) for index in self.client.smembers(self.key(campaign_id, 'done'))}
+        return [index for index in range(chunks) if index not in done]
+
+    def is_chunk_done(self, campaign_id: str, index: int) -> bool:
+        return bool(self.client.sismember(self.key(campaign_id, 'done'), index))
+
+    def complete_chunk(self, campaign_id: str, index: int) -> str:
+        """Mark a chunk done; returns the campaign status"""
+        meta_key = self.key(campaign_id, 'meta')
+        done_key = self.key(campaign_id, 'done')
+        if self.client.sadd(done_key, index):
+            self.client.hincrby(meta_key, 'completed_chunks', 1)
+            self.client.expire(done_key, self.ttl)
+        meta = self.meta(campaign_id)
+        if int(meta['completed_chunks']) < int(meta['chunks']):
+            return meta['status']
+
+        failed = self.client.hlen(self.key(campaign_id, 'failed'))
+        status = STATUS_COMPLETED_WITH_FAILURES if failed else STATUS_COMPLETED
+        pipe = self.client.pipeline()
+        pipe.hset(meta_key, mapping={'status': status, 'finished_at': time.time()})
+        self._touch(pipe, campaign_id, int(meta['chunks']))
+        pipe.execute()
+        return status
+
+    def add_chunks(self, campaign_id: str, recipients: List[Dict], chunk_size: int) -> List[int]:
+        """Append chunks (selective retry); returns their indexes"""
+        chunks = chunked(recipients, chunk_size)
+        if not chunks:
+            return []
+        meta_key = self.key(campaign_id, 'meta')
+        end = self.client.hincrby(meta_key, 'chunks', len(chunks))
+        indexes = list(range(end - len(chunks), end))
+        pipe = self.client.pipeline()
+        for index, chunk in zip(indexes, chunks):
+            pipe.set(self.key(campaign_id, 'chunk', index), json.dumps(chunk), ex=self.ttl)
+        pipe.hset(meta_key, 'status', STATUS_RUNNING)
+        pipe.execute()
+        return indexes
+
+    # =========================================================================
+    # RECIPIENTS
+    # =========================================================================
+
+    def claim(self, campaign_id: str, email: str) -> bool:
+        """Reserve a recipient for this worker; False if another one is sending to it"""
+        return bool(self.client.set(self.key(campaign_id, 'claim', email), 1, nx=True, ex=CLAIM_TTL))
+
+    def release(self, campaign_id: str, email: str):
+        self.client.delete(self.key(campaign_id, 'claim', email))
+
+    def is_sent(self, campaign_id: str, email: str) -> bool:
+        return bool(self.client.sismember(self.key(campaign_id, 'sent'), email))
+
+    def mark_sent(self, campaign_id: str, email: str):
+        pipe = self.client.pipeline()
+        pipe.sadd(self.key(campaign_id, 'sent'), email)
+        pipe.expire(self.key(campaign_id, 'sent'), self.ttl)
+        pipe.hdel(self.key(campaign_id, 'failed'), email)
+        pipe.delete(self.key(campaign_id, 'claim', email))
+        added = pipe.execute()[0]
+        if added:
+            self.client.hincrby(self.key(campaign_id, 'meta'), 'sent', 1)
+
+    def mark_failed(self, campaign_id: str, recipient: Dict, error: str):
+        email = recipient['email']
+        pipe = self.client.pipeline()
+        pipe.hset(self.key(campaign_id, 'failed'), email, json.dumps({**recipient, 'error': error}))
+        pipe.expire(self.key(campaign_id, 'failed'), self.ttl)
+        pipe.delete(self.key(campaign_id, 'claim', email))
+        pipe.execute()
+
+    def failed_recipients(self, campaign_id: str, emails: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Failed recipients (all or the given ones) for a selective retry
+
+        They stay in the failed list until a retry sends them (``mark_sent``
+        removes them), so an interrupted retry loses nobody.
+        """
+        failed = self.client.hgetall(self.key(campaign_id, 'failed'))
+        if emails is not None:
+            wanted = set(emails)
+            failed = {email: data for email, data in failed.items() if email in wanted}
+        recipients = []
+        for data in failed.values():
+            recipient = json.loads(data)
+            recipient.pop('error', None)
+            recipients.append(recipient)
+        return recipients
@@ -0,0 +1,66 @@
+# Token-bucket rate limiting shared by all workers through Redis
+
+import time
+from typing import Callable, Optional
+
+import redis
+
+# Refill and take one token atomically; returns seconds to wait (0 = token taken).
+# Redis time is used so that workers with skewed clocks share one bucket.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucket:
+    """
+    Token bucket stored in Redis, so the limit holds across all workers
+
+    Args:
+        client: Redis client
+        key: Bucket name (one bucket per rate-limited resource)
+        rate: Tokens per second; 0 disables limiting
+        capacity: Burst size (defaults to one second of tokens)
+    """
+
+    def __init__(self, client: redis.Redis, key: str, rate: float, capacity: Optional[float] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.sleep = sleep
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def try_acquire(self) -> float:
+        """Take a token if available; returns 0 or the seconds until one is"""
+        if self.rate <= 0:
+            return 0.0
+        return float(self._script(keys=[self.key], args=[self.rate, self.capacity]))
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Block until a token is taken; False if ``timeout`` seconds pass first"""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return True
+            if timeout is not None and waited + wait > timeout:
+                return False
+            self.sleep(wait)
+            waited += wait
@@ -0,0 +1,19 @@
+# Redis connection shared by tasks of one worker process
+
+import os
+from functools import lru_cache
+
+import redis
+
+
+@lru_cache(maxsize=None)
+def get_redis() -> redis.Redis:
+    """Redis client for coordination state (campaigns, rate limits)"""
+    return redis.Redis(
+        host=os.getenv('REDIS_HOST', 'localhost'),
+        port=int(os.getenv('REDIS_PORT', '6379')),
+        db=int(os.getenv('REDIS_DB', '0')),
+        decode_responses=True,
+        socket_connect_timeout=5,
+        socket_timeout=5,
+    )
@@ -11,6 +11,55 @@ from celery import current_app
 from loguru import logger
 import httpx
 
+from core.campaigns import CampaignStore
+from core.rate_limit import RedisTokenBucket
+from core.redis_client import get_redis
+
+# Recipients per chunk task and the send rate shared by all workers
+BULK_EMAIL_CHUNK_SIZE = int(os.getenv('BULK_EMAIL_CHUNK_SIZE', '100'))
+BULK_EMAIL_RATE_PER_SECOND = float(os.getenv('BULK_EMAIL_RATE_PER_SECOND', '10'))
+BULK_EMAIL_RATE_KEY = 'bulk_email:rate:smtp'
+# Chunks wait for the shared rate limit, so they need more than the default 1-minute soft limit
+BULK_EMAIL_CHUNK_TIME_LIMIT = int(os.getenv('BULK_EMAIL_CHUNK_TIME_LIMIT', '600'))
+
+# =============================================================================
+# SMTP HELPERS
+# =============================================================================
+
+def _build_message(to_email: str, subject: str, body: str, html_body: Optional[str] = None) -> MIMEMultipart:
+    """Plain text message with an optional HTML alternative"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = os.getenv('FROM_EMAIL', 'noreply@example.com')
+    msg['To'] = to_email
+    msg.attach(MIMEText(body, 'plain'))
+    if html_body:
+        msg.attach(MIMEText(html_body, 'html'))
+    return msg
+
+
+def _smtp_connection() -> smtplib.SMTP:
+    """Connected (and logged in, if credentials are set) SMTP client"""
+    smtp_user = os.getenv('SMTP_USER', '')
+    smtp_password = os.getenv('SMTP_PASSWORD', '')
+    server = smtplib.SMTP(os.getenv('SMTP_HOST', 'localhost'), int(os.getenv('SMTP_PORT', '587')))
+    if smtp_user and smtp_password:
+        server.starttls()
+        server.login(smtp_user, smtp_password)
+    return server
+
+
+def _is_recipient_error(exc: Exception) -> bool:
+    """
+    The server permanently refused this recipient (5xx to RCPT TO)
+    
+    Temporary replies (4xx), sender and DATA errors and broken connections are
+    not about the recipient: they retry the whole chunk instead.
+    """
+    if not isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return False
+    return all(code >= 500 for code, _ in exc.recipients.values())
+
 # =============================================================================
 # EMAIL TASKS
 # =============================================================================
@@ -29,34 +78,11 @@ def send_email_task(self, to_email: str, subject: str, body: str, html_body: Opt
     try:
         logger.info(f"📧 Sending email to {to_email}: {subject}")
         
-        # Email configuration from environment
-        smtp_host = os.getenv('SMTP_HOST', 'localhost')
-        smtp_port = int(os.getenv('SMTP_PORT', '587'))
-        smtp_user = os.getenv('SMTP_USER', '')
-        smtp_password = os.getenv('SMTP_PASSWORD', '')
-        from_email = os.getenv('FROM_EMAIL', 'noreply@example.com')
-        
         # Create message
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = subject
-        msg['From'] = from_email
-        msg['To'] = to_email
-        
-        # Add plain text part
-        text_part = MIMEText(body, 'plain')
-        msg.attach(text_part)
-        
-        # Add HTML part if provided
-        if html_body:
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
+        msg = _build_message(to_email, subject, body, html_body)
         
         # Send email
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            if smtp_user and smtp_password:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-            
+        with _smtp_connection() as server:
             server.send_message(msg)
         
         logger.success(f"✅ Email sent successfully to {to_email}")
@@ -76,39 +102,191 @@ def send_email_task(self, to_email: str, subject: str, body: str, html_body: Opt
 
 
 @current_app.task(bind=True, queue='email')
-def send_bulk_email_task(self, email_list: List[Dict[str, str]], subject: str, body: str):
+def send_bulk_email_task(self, email_list: List[Dict[str, str]], subject: str, body: str,
+                         campaign_id: Optional[str] = None, chunk_size: Optional[int] = None):
     """
     Send bulk emails task
     
+    Stores the campaign, splits recipients into chunks and queues one task
+    per chunk. Running it again with the same ``campaign_id`` does not resend:
+    only chunks that are not completed yet are queued.
+    
     Args:
         email_list: List of email dictionaries with 'email' and optional 'name'
         subject: Email subject
-        body: Email body
+        body: Email body ('{{name}}' is replaced per recipient)
+        campaign_id: Campaign id (defaults to this task's id)
+        chunk_size: Recipients per chunk task
     """
+    campaign_id = campaign_id or self.request.id
     try:
-        logger.info(f"📧 Sending bulk email to {len(email_list)} recipients")
-        
-        results = []
-        for email_data in email_list:
-            email = email_data.get('email')
-            name = email_data.get('name', '')
-            
-            # Personalize body if name is provided
-            personalized_body = body.replace('{{name}}', name) if name else body
-            
-            # Send individual email
-            result = send_email_task.delay(email, subject, personalized_body)
-            results.append({
-                'email': email,
-                'task_id': result.id
-            })
+        store = CampaignStore(get_redis())
+        created, chunks = store.create(campaign_id, email_list, subject, body, chunk_size or BULK_EMAIL_CHUNK_SIZE)
+        pending = _queue_chunks(campaign_id, store.pending_chunks(campaign_id))
         
-        logger.success(f"✅ Bulk email tasks queued for {len(email_list)} recipients")
-        return {"status": "success", "queued": len(email_list), "tasks": results}
+        logger.success(
+            f"✅ Bulk campaign {campaign_id} {'created' if created else 'resumed'}: "
+            f"{len(email_list)} recipients, {len(pending)}/{chunks} chunks queued"
+        )
+        return {"status": "queued", "campaign_id": campaign_id, "chunks": chunks, "queued_chunks": pending}
         
     except Exception as exc:
         logger.error(f"❌ Failed to queue bulk emails: {exc}")
-        return {"status": "failed", "error": str(exc)}
+        return {"status": "failed", "campaign_id": campaign_id, "error": str(exc)}
+
+
+@current_app.task(bind=True, queue='email', max_retries=5, acks_late=True,
+                  soft_time_limit=BULK_EMAIL_CHUNK_TIME_LIMIT, time_limit=BULK_EMAIL_CHUNK_TIME_LIMIT + 60)
+def send_bulk_email_chunk_task(self, campaign_id: str, chunk_index: int):
+    """
+    Send one chunk of a bulk campaign over a single SMTP connection
+    
+    Recipients already sent (or being sent by another worker) are skipped,
+    so a retried or redelivered chunk never sends twice. Permanently refused
+    recipients are recorded as failed and the chunk goes on; a broken
+    connection, a temporary (4xx) reply or a sender error retries the chunk.
+    
+    Args:
+        campaign_id: Campaign id
+        chunk_index: Chunk number within the campaign
+    """
+    store = CampaignStore(get_redis())
+    if store.is_chunk_done(campaign_id, chunk_index):
+        return {"status": "skipped", "campaign_id": campaign_id, "chunk": chunk_index}
+    
+    try:
+        meta = store.meta(campaign_id)
+        recipients = store.load_chunk(campaign_id, chunk_index)
+    except KeyError as exc:
+        # The campaign expired (CAMPAIGN_TTL) or never existed: nothing to send
+        logger.error(f"❌ Chunk {chunk_index} of campaign {campaign_id} not found: {exc}")
+        return {"status": "not_found", "campaign_id": campaign_id, "chunk": chunk_index, "error": str(exc)}
+    limiter = RedisTokenBucket(get_redis(), BULK_EMAIL_RATE_KEY, BULK_EMAIL_RATE_PER_SECOND)
+    counts = {"sent": 0, "failed": 0, "skipped": 0}
+    # Recipients claimed by another worker that have not been sent yet
+    contended = []
+    reason = "claimed by another worker, never sent"
+    
+    try:
+        with _smtp_connection() as server:
+            for recipient in recipients:
+                email = recipient.get('email')
+                if not email:
+                    logger.warning(f"⚠️ Recipient without email in campaign {campaign_id}: {recipient}")
+                    counts["failed"] += 1
+                    continue
+                if store.is_sent(campaign_id, email):
+                    counts["skipped"] += 1
+                    continue
+                
+                name = recipient.get('name', '')
+                personalized_body = meta['body'].replace('{{name}}', name) if name else meta['body']
+                message = _build_message(email, meta['subject'], personalized_body)
+                limiter.acquire()
+                
+                # Claim, then check again: between the two no other worker can send
+                if not store.claim(campaign_id, email):
+                    contended.append(recipient)
+                    continue
+                if store.is_sent(campaign_id, email):
+                    store.release(campaign_id, email)
+                    counts["skipped"] += 1
+                    continue
+                try:
+                    server.send_message(message)
+                except Exception as exc:
+                    if not _is_recipient_error(exc):
+                        store.release(campaign_id, email)
+                        raise
+                    store.mark_failed(campaign_id, recipient, str(exc))
+                    counts["failed"] += 1
+                    continue
+                store.mark_sent(campaign_id, email)
+                counts["sent"] += 1
+        
+        if contended and self.request.retries < self.max_retries:
+            raise RuntimeError(f"{len(contended)} recipients are being sent by another worker")
+                
+    except Exception as exc:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"🔄 Chunk {chunk_index} of campaign {campaign_id} interrupted, retrying: {exc}")
+            raise self.retry(countdown=30 * (2 ** self.request.retries))
+        # Give up on this chunk: whoever is left becomes failed and can be retried selectively
+        contended, reason = recipients, str(exc)
+        logger.error(f"💀 Chunk {chunk_index} of campaign {campaign_id} failed permanently: {exc}")
+    
+    for recipient in contended:
+        email = recipient.get('email')
+        if email and not store.is_sent(campaign_id, email):
+            store.mark_failed(campaign_id, recipient, reason)
+    
+    status = store.complete_chunk(campaign_id, chunk_index)
+    logger.info(
+        f"📦 Campaign {campaign_id} chunk {chunk_index}: {counts['sent']} sent, "
+        f"{counts['failed']} failed, {counts['skipped']} skipped (campaign {status})"
+    )
+    return {"status": status, "campaign_id": campaign_id, "chunk": chunk_index, **counts}
+
+
+@current_app.task(bind=True, queue='email')
+def resume_bulk_email_task(self, campaign_id: str):
+    """
+    Queue the chunks of a campaign that are not completed yet
+    
+    Args:
+        campaign_id: Campaign id
+    """
+    try:
+        store = CampaignStore(get_redis())
+        pending = _queue_chunks(campaign_id, store.pending_chunks(campaign_id))
+        logger.info(f"▶️ Campaign {campaign_id} resumed: {len(pending)} chunks queued")
+        return {"status": "queued", "campaign_id": campaign_id, "queued_chunks": pending}
+    except Exception as exc:
+        logger.error(f"❌ Failed to resume campaign {campaign_id}: {exc}")
+        return {"status": "failed", "campaign_id": campaign_id, "error": str(exc)}
+
+
+@current_app.task(bind=True, queue='email')
+def retry_failed_bulk_recipients_task(self, campaign_id: str, emails: Optional[List[str]] = None,
+                                      chunk_size: Optional[int] = None):
+    """
+    Send again to failed recipients of a campaign (all or the given emails)
+    
+    Args:
+        campaign_id: Campaign id
+        emails: Only these recipients (default: every failed one)
+        chunk_size: Recipients per chunk task
+    """
+    try:
+        store = CampaignStore(get_redis())
+        recipients = store.failed_recipients(campaign_id, emails)
+        chunks = store.add_chunks(campaign_id, recipients, chunk_size or BULK_EMAIL_CHUNK_SIZE)
+        _queue_chunks(campaign_id, chunks)
+        logger.info(f"🔁 Campaign {campaign_id}: retrying {len(recipients)} failed recipients in {len(chunks)} chunks")
+        return {"status": "queued", "campaign_id": campaign_id, "recipients": len(recipients), "queued_chunks": chunks}
+    except Exception as exc:
+        logger.error(f"❌ Failed to retry campaign {campaign_id}: {exc}")
+        return {"status": "failed", "campaign_id": campaign_id, "error": str(exc)}
+
+
+@current_app.task(queue='email')
+def get_bulk_email_progress_task(campaign_id: str):
+    """
+    Progress of a bulk campaign: status, sent/failed counts and completed chunks
+    
+    Args:
+        campaign_id: Campaign id
+    """
+    try:
+        return CampaignStore(get_redis()).progress(campaign_id)
+    except KeyError as exc:
+        return {"status": "not_found", "campaign_id": campaign_id, "error": str(exc)}
+
+
+def _queue_chunks(campaign_id: str, chunk_indexes: List[int]) -> List[int]:
+    for chunk_index in chunk_indexes:
+        send_bulk_email_chunk_task.apply_async(args=[campaign_id, chunk_index], queue='email')
+    return list(chunk_indexes)
 
 
 @current_app.task(bind=True, queue='email')
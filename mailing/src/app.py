@@ -12,8 +12,9 @@ import uvicorn
 from config import settings
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
-from services.mail_services import send_email_direct
-from services.rabbitmq import ConnectionFactory
+from services.mail_services import TemplateRenderError, send_email, smtp_pool
+from services.rabbitmq import WorkerPoolConsumer
+from services.smtp_sessions import is_permanent_error
 
 # Setup logging
 logging.basicConfig(level=getattr(logging, settings.log_level))
@@ -43,18 +44,30 @@ async def start_consumer():
 
             def consume():
                 # ConnectionFactory will automatically try fallback hosts
-                consumer = ConnectionFactory(
+                consumer = WorkerPoolConsumer(
                     parameters=connection_params,
                     queue_name=settings.email_queue_name,
-                    callback=send_email_direct,
+                    callback=send_email,
+                    workers=settings.email_workers,
+                    prefetch_per_worker=settings.email_prefetch_per_worker,
+                    reject_errors=(TemplateRenderError, TypeError),
+                    is_permanent=is_permanent_error,
+                    max_deliveries=settings.email_max_deliveries,
                 )
 
                 # Log the actual connected host
                 actual_host = consumer.parameters.host
-                logger.info(f"✅ Consumer connected to RabbitMQ at: {actual_host}")
+                logger.info(
+                    f"✅ Consumer connected to RabbitMQ at: {actual_host} "
+                    f"({settings.email_workers} workers)"
+                )
 
                 # This will block forever (until connection is lost)
-                consumer.consume()
+                try:
+                    consumer.consume()
+                finally:
+                    consumer.close()
+                    smtp_pool.close()
 
             # Run in thread to avoid blocking event loop
             await asyncio.to_thread(consume)
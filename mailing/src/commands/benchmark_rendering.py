@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark email rendering with and without the render cache.
+
+The uncached path is what send_email_direct did per email: get the template
+from a plain Environment, render it, read the logo from disk and build the
+MIME image part. The cached path renders a batch through RenderCache and
+attaches copies of the prebuilt logo part.
+
+Usage:
+    python src/commands/benchmark_rendering.py
+    python src/commands/benchmark_rendering.py --emails 10000 --logo-kb 40
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from jinja2 import Environment, FileSystemLoader  # noqa: E402
+from services.render_cache import RenderCache  # noqa: E402
+from templates.email_enum import EmailTemplateEnum  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+TEMPLATES_PATH = os.path.join(os.path.dirname(__file__), '..', 'templates')
+TEMPLATE = EmailTemplateEnum.EMAIL_TEMPLATE_BASE.value
+
+
+def recipients(count: int):
+    return [
+        (f"user{index}@example.com", {
+            "title": "Ваше оголошення опубліковано",
+            "recipient_name": f"Користувач {index}",
+            "message": f"Оголошення <b>#{index}</b> пройшло модерацію.",
+        })
+        for index in range(count)
+    ]
+
+
+def assemble(to_email: str, html_content: str, logo: MIMEImage) -> MIMEMultipart:
+    msg = MIMEMultipart("related")
+    msg["Subject"] = "Benchmark"
+    msg["From"] = "noreply@example.com"
+    msg["To"] = to_email
+    msg_alternative = MIMEMultipart("alternative")
+    msg.attach(msg_alternative)
+    msg_alternative.attach(MIMEText(html_content, "html"))
+    msg.attach(logo)
+    return msg
+
+
+def build_uncached(batch, logo_path: str):
+    env = Environment(loader=FileSystemLoader(searchpath=TEMPLATES_PATH), autoescape=True)
+    messages = []
+    for to_email, template_data in batch:
+        html_content = env.get_template(TEMPLATE).render(template_data)
+        with open(logo_path, "rb") as logo_file:
+            logo = MIMEImage(logo_file.read(), _subtype="jpeg")
+        logo.add_header("Content-ID", "<logo>")
+        logo.add_header("Content-Disposition", "inline", filename="logo.jpg")
+        messages.append(assemble(to_email, html_content, logo))
+    return messages
+
+
+def build_cached(cache: RenderCache, batch, logo_path: str):
+    bodies = cache.render_many(TEMPLATE, (template_data for _, template_data in batch),
+                               {"company_name": "AutoRia Clone"})
+    return [
+        assemble(to_email, html_content, cache.inline_image(logo_path, "logo", "logo.jpg"))
+        for (to_email, _), html_content in zip(batch, bodies)
+    ]
+
+
+def timed(name: str, build, *args):
+    started = time.perf_counter()
+    messages = build(*args)
+    built = time.perf_counter() - started
+    for message in messages:
+        message.as_string()
+    total = time.perf_counter() - started
+    per_email = 1_000_000 / len(messages)
+    logger.warning(
+        f"⏱️ {name}: build {built * per_email:.0f} µs/email, with serialization {total * per_email:.0f} µs/email"
+    )
+    return built
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark email rendering with and without the render cache')
+    parser.add_argument('--emails', type=int, default=2000, help='Recipients in the batch')
+    parser.add_argument('--logo-kb', type=int, default=40, help='Size of the generated logo file')
+    args = parser.parse_args()
+
+    batch = recipients(args.emails)
+    with tempfile.TemporaryDirectory() as media_path:
+        logo_path = os.path.join(media_path, "logo.jpg")
+        with open(logo_path, "wb") as logo_file:
+            logo_file.write(os.urandom(args.logo_kb * 1024))
+
+        cache = RenderCache(TEMPLATES_PATH, os.path.join(media_path, "bytecode"))
+        build_cached(cache, batch[:1], logo_path)
+
+        uncached = timed("Environment + disk read per email", build_uncached, batch, logo_path)
+        cached = timed("Render cache, batch", build_cached, cache, batch, logo_path)
+    logger.warning(f"✅ Build speedup: {uncached / cached:.1f}x")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark email sending against a local debugging SMTP server.
+
+Compares the old path (one connection per email, one email at a time) with
+worker threads that reuse persistent SMTP sessions. The local server accepts
+and discards mail; --handshake-ms and --message-ms simulate the latency of
+TLS + login and of a message submission on a real provider.
+
+Usage:
+    python src/commands/benchmark_smtp.py
+    python src/commands/benchmark_smtp.py --emails 500 --workers 8 --rate 100
+"""
+import argparse
+import logging
+import os
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.smtp_sessions import RateLimiter, SMTPSession, SMTPSessionPool  # noqa: E402
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MESSAGE = MIMEText("<p>Ваше оголошення опубліковано</p>\n" * 40, "html").as_string()
+
+
+class DebuggingSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialogue: accepts every message and counts it."""
+
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        time.sleep(server.handshake_delay)
+        with server.lock:
+            server.connections += 1
+        self.reply("220 localhost debugging SMTP server")
+        for raw in self.rfile:
+            command = raw.decode(errors="replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                for line in self.rfile:
+                    if line in (b".\r\n", b".\n"):
+                        break
+                time.sleep(server.message_delay)
+                with server.lock:
+                    server.messages += 1
+                self.reply("250 OK: queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                # MAIL, RCPT, NOOP, RSET
+                self.reply("250 OK")
+
+
+class DebuggingSMTPServer(socketserver.ThreadingTCPServer):
+    """Local SMTP sink running in a background thread."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, handshake_delay: float = 0.0, message_delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), DebuggingSMTPHandler)
+        self.handshake_delay = handshake_delay
+        self.message_delay = message_delay
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+def send_per_connection(port: int, emails: int):
+    """The old path: new SMTP connection for every email, sequentially."""
+    for _ in range(emails):
+        session = SMTPSession("127.0.0.1", port, use_tls=False)
+        session.send("noreply@example.com", ["user@example.com"], MESSAGE)
+        session.close()
+
+
+def send_with_pool(port: int, emails: int, workers: int, rate: float):
+    """Worker threads with persistent sessions and a shared rate limit."""
+    pool = SMTPSessionPool(lambda: SMTPSession("127.0.0.1", port, use_tls=False))
+    limiter = RateLimiter(rate)
+
+    def send(_):
+        limiter.acquire()
+        pool.session().send("noreply@example.com", ["user@example.com"], MESSAGE)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(send, range(emails)))
+    pool.close()
+
+
+def run(name: str, server: DebuggingSMTPServer, send, *args):
+    connections, messages = server.connections, server.messages
+    started = time.perf_counter()
+    send(server.port, *args)
+    elapsed = time.perf_counter() - started
+    sent = server.messages - messages
+    logger.warning(
+        f"⏱️ {name}: {sent} emails in {elapsed:.2f}s ({sent / elapsed:.0f}/s), "
+        f"{server.connections - connections} SMTP connections"
+    )
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark SMTP sending against a local debugging server')
+    parser.add_argument('--emails', type=int, default=200, help='Emails per run')
+    parser.add_argument('--workers', type=int, default=4, help='Worker threads with persistent sessions')
+    parser.add_argument('--rate', type=float, default=0, help='Emails per second limit, 0 = unlimited')
+    parser.add_argument('--handshake-ms', type=float, default=50, help='Simulated connect/TLS/login latency')
+    parser.add_argument('--message-ms', type=float, default=5, help='Simulated per-message latency')
+    args = parser.parse_args()
+
+    with DebuggingSMTPServer(args.handshake_ms / 1000, args.message_ms / 1000) as smtp_server:
+        logger.warning(f"📮 Debugging SMTP server on 127.0.0.1:{smtp_server.port}")
+        baseline = run("Connection per email", smtp_server, send_per_connection, args.emails)
+        pooled = run(
+            f"{args.workers} workers, persistent sessions", smtp_server, send_with_pool,
+            args.emails, args.workers, args.rate,
+        )
+    logger.warning(f"✅ Speedup: {baseline / pooled:.1f}x")
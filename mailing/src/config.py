@@ -61,6 +61,8 @@ class Settings(BaseSettings):
     gmail_use_tls: bool = True
     gmail_user: str = Field(default="")
     gmail_password: str = Field(default="")
+    smtp_keepalive_seconds: float = 30.0  # NOOP check for sessions idle longer than this
+    email_rate_limit: float = 10.0  # emails per second across all workers, 0 = unlimited
 
     # Paths
     templates_path: str = "./src/templates"
@@ -69,6 +71,9 @@ class Settings(BaseSettings):
 
     # Queue
     email_queue_name: str = "email_queue"
+    email_workers: int = 4
+    email_prefetch_per_worker: int = 2
+    email_max_deliveries: int = 3  # attempts per message on transient SMTP errors
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
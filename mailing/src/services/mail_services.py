@@ -4,21 +4,126 @@ Simplified email service with Celery integration.
 
 import logging
 import os
-import smtplib
-from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import Iterable, Iterator, Optional, Tuple
 
 from config import settings
-from jinja2 import Environment, FileSystemLoader
+from services.render_cache import RenderCache
+from services.smtp_sessions import RateLimiter, SMTPSession, SMTPSessionPool
+from templates.email_enum import EmailTemplateEnum
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Template environment
-env = Environment(
-    loader=FileSystemLoader(searchpath=settings.templates_path), autoescape=True
+# Compiled templates and inline assets, shared by all workers of the process
+render_cache = RenderCache(settings.templates_path)
+LOGO_PATH = os.path.join(settings.media_path, "indonesian_halal_logo_2022.jpg")
+
+
+# One SMTP session per worker thread, one send-rate budget for the process
+smtp_pool = SMTPSessionPool(
+    lambda: SMTPSession(
+        host=settings.gmail_host,
+        port=settings.gmail_port,
+        user=settings.gmail_user,
+        password=settings.gmail_password,
+        use_tls=settings.gmail_use_tls,
+        keepalive=settings.smtp_keepalive_seconds,
+    )
 )
+rate_limiter = RateLimiter(settings.email_rate_limit)
+
+
+class TemplateRenderError(Exception):
+    """Email could not be rendered; retrying the message will not help."""
+
+
+def _assemble_message(from_email: str, to_email: str, subject: str, html_content: str) -> MIMEMultipart:
+    """Wrap rendered HTML into the message with the prebuilt logo part."""
+    msg = MIMEMultipart("related")
+    msg["Subject"] = subject
+    msg["From"] = from_email
+    msg["To"] = to_email
+
+    # Add HTML content
+    msg_alternative = MIMEMultipart("alternative")
+    msg.attach(msg_alternative)
+    msg_alternative.attach(MIMEText(html_content, "html"))
+
+    # Attach logo if exists
+    try:
+        logo = render_cache.inline_image(LOGO_PATH, "logo", "logo.jpg")
+    except Exception as e:
+        logger.warning(f"Failed to attach logo: {e}")
+        logo = None
+    if logo is not None:
+        msg.attach(logo)
+    else:
+        logger.debug(f"Logo not attached: {LOGO_PATH}")
+
+    return msg
+
+
+def build_message(
+    from_email: str, to_email: str, subject: str, template_data: dict
+) -> MIMEMultipart:
+    """
+    Render the template and build the MIME message.
+
+    Raises:
+        TemplateRenderError: If template rendering fails
+    """
+    try:
+        html_content = render_cache.render(EmailTemplateEnum.EMAIL_TEMPLATE_BASE.value, template_data)
+        logger.info(f"Template rendered for email to {to_email}")
+    except Exception as e:
+        raise TemplateRenderError(f"Template rendering failed: {e}") from e
+
+    return _assemble_message(from_email, to_email, subject, html_content)
+
+
+def build_messages(
+    from_email: str,
+    subject: str,
+    recipients: Iterable[Tuple[str, dict]],
+    common_data: Optional[dict] = None,
+) -> Iterator[Tuple[str, MIMEMultipart]]:
+    """
+    Build messages for a bulk send: the template is resolved once and only
+    per-recipient variables are substituted for each (to_email, template_data).
+
+    Raises:
+        TemplateRenderError: If template rendering fails
+    """
+    recipients = list(recipients)
+    try:
+        bodies = list(render_cache.render_many(
+            EmailTemplateEnum.EMAIL_TEMPLATE_BASE.value,
+            (template_data for _, template_data in recipients),
+            common_data,
+        ))
+    except Exception as e:
+        raise TemplateRenderError(f"Template rendering failed: {e}") from e
+
+    for (to_email, _), html_content in zip(recipients, bodies):
+        yield to_email, _assemble_message(from_email, to_email, subject, html_content)
+
+
+def send_email(
+    from_email: str, to_email: str, subject: str, template_data: dict
+) -> None:
+    """
+    Send HTML email over this thread's persistent SMTP session.
+
+    Raises:
+        TemplateRenderError: If template rendering fails
+        smtplib.SMTPException, OSError: If the message was not sent
+    """
+    msg = build_message(from_email, to_email, subject, template_data)
+    rate_limiter.acquire()
+    smtp_pool.session().send(from_email, [to_email], msg.as_string())
+    logger.info(f"Email sent successfully to {to_email}")
 
 
 def send_email_direct(
@@ -37,59 +142,14 @@ def send_email_direct(
         Success or error message
     """
     try:
-        # Render template
-        template = env.get_template("email_template.html")
-        html_content = template.render(template_data)
-        logger.info(f"Template rendered for email to {to_email}")
+        send_email(from_email, to_email, subject, template_data)
+        return "Email sent successfully."
 
-    except Exception as e:
-        error_msg = f"Template rendering failed: {e}"
+    except TemplateRenderError as e:
+        error_msg = str(e)
         logger.error(error_msg)
         return error_msg
 
-    # Create email message
-    msg = MIMEMultipart("related")
-    msg["Subject"] = subject
-    msg["From"] = from_email
-    msg["To"] = to_email
-
-    # Add HTML content
-    msg_alternative = MIMEMultipart("alternative")
-    msg.attach(msg_alternative)
-    msg_alternative.attach(MIMEText(html_content, "html"))
-
-    # Attach logo if exists
-    image_path = os.path.join(settings.media_path, "indonesian_halal_logo_2022.jpg")
-    if os.path.exists(image_path):
-        try:
-            with open(image_path, "rb") as logo_file:
-                img_data = logo_file.read()
-            image_mime = MIMEImage(img_data, _subtype="jpeg")
-            image_mime.add_header("Content-ID", "<logo>")
-            image_mime.add_header("Content-Disposition", "inline", filename="logo.jpg")
-            msg.attach(image_mime)
-            logger.debug("Logo attached to email")
-        except Exception as e:
-            logger.warning(f"Failed to attach logo: {e}")
-    else:
-        logger.debug(f"Logo not found: {image_path}")
-
-    # Send email via SMTP
-    try:
-        with smtplib.SMTP(
-            settings.gmail_host, settings.gmail_port, timeout=10
-        ) as server:
-            server.ehlo()
-            if settings.gmail_use_tls:
-                server.starttls()
-                server.ehlo()
-
-            server.login(settings.gmail_user, settings.gmail_password)
-            server.sendmail(from_email, [to_email], msg.as_string())
-
-        logger.info(f"Email sent successfully to {to_email}")
-        return "Email sent successfully."
-
     except Exception as e:
         error_message = f"SMTP error: {str(e)}"
         logger.error(error_message)
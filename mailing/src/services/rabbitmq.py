@@ -5,8 +5,11 @@ Simplified RabbitMQ connection helper.
 import json
 import logging
 import os
+import sys
 import time
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, Tuple, Type
 
 import pika
 from pika.adapters.blocking_connection import BlockingChannel
@@ -22,6 +25,7 @@ class ConnectionFactory:
         parameters: pika.ConnectionParameters,
         queue_name: str,
         callback: Callable = None,
+        prefetch_count: int = 1,
     ):
         """
         Initialize connection factory.
@@ -30,10 +34,12 @@ class ConnectionFactory:
             parameters: RabbitMQ connection parameters
             queue_name: Queue name to work with
             callback: Callback function for message processing
+            prefetch_count: Unacknowledged messages the broker may deliver at once
         """
         self.parameters = parameters
         self.queue_name = queue_name
         self.callback = callback
+        self.prefetch_count = prefetch_count
         self.connection = None
         self.channel = None
         self.original_host = parameters.host
@@ -107,7 +113,7 @@ class ConnectionFactory:
                 self.channel.queue_declare(queue=self.queue_name, durable=True)
 
                 # Set QoS
-                self.channel.basic_qos(prefetch_count=1)
+                self.channel.basic_qos(prefetch_count=self.prefetch_count)
 
                 logger.info(
                     f"✅ Connected to RabbitMQ at {host}, queue: {self.queue_name}"
@@ -146,8 +152,8 @@ class ConnectionFactory:
             logger.info(f"📋 Queue '{self.queue_name}' declared (durable=True)")
 
             # Set QoS
-            self.channel.basic_qos(prefetch_count=1)
-            logger.info("⚙️ QoS configured (prefetch_count=1)")
+            self.channel.basic_qos(prefetch_count=self.prefetch_count)
+            logger.info(f"⚙️ QoS configured (prefetch_count={self.prefetch_count})")
 
             logger.info(f"✅ Connected to RabbitMQ at {self.parameters.host}, queue: {self.queue_name}")
 
@@ -280,3 +286,123 @@ class ConnectionFactory:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
         self.close()
+
+
+class WorkerPoolConsumer(ConnectionFactory):
+    """
+    Consumer that processes messages on a pool of worker threads.
+
+    The broker delivers up to ``workers * prefetch_per_worker`` messages at
+    once; the consuming thread hands them to the pool and keeps reading.
+    pika channels are not thread-safe, so workers never touch the channel:
+    acks are scheduled back onto the connection thread with
+    ``add_callback_threadsafe`` and sent only after the callback returned.
+    If the connection drops, unacknowledged messages are redelivered by the
+    broker, so a message may be processed more than once.
+
+    Failed messages are requeued only while a retry can help: errors listed
+    in ``reject_errors`` or matched by ``is_permanent`` are dropped at once,
+    and transient errors are dropped after ``max_deliveries`` attempts
+    (counted by ``x-delivery-count`` on quorum queues; on classic queues only
+    the redelivered flag is known, so a redelivered message is not requeued
+    again).
+    """
+
+    def __init__(
+        self,
+        parameters: pika.ConnectionParameters,
+        queue_name: str,
+        callback: Callable = None,
+        workers: int = 4,
+        prefetch_per_worker: int = 2,
+        reject_errors: Tuple[Type[Exception], ...] = (TypeError,),
+        is_permanent: Optional[Callable[[Exception], bool]] = None,
+        max_deliveries: int = 3,
+    ):
+        """
+        Initialize worker pool consumer.
+
+        Args:
+            workers: Number of worker threads
+            prefetch_per_worker: Messages buffered per worker
+            reject_errors: Exceptions that drop the message instead of requeueing it
+            is_permanent: Returns True for other errors that must not be retried
+            max_deliveries: Attempts per message before a transient error drops it
+        """
+        self.workers = workers
+        self.reject_errors = reject_errors
+        self.is_permanent = is_permanent or (lambda error: False)
+        self.max_deliveries = max(1, max_deliveries)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mail-worker")
+        super().__init__(parameters, queue_name, callback, prefetch_count=workers * prefetch_per_worker)
+
+    def get_callback(self, channel: BlockingChannel, method, properties, body: bytes):
+        """Parse the message and hand it to a worker."""
+        try:
+            message_data = json.loads(body.decode("utf-8"))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            logger.error(f"Failed to parse message JSON: {e}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+
+        self.executor.submit(self._process, channel, method.delivery_tag, message_data,
+                             self.delivery_count(method, properties))
+
+    @staticmethod
+    def delivery_count(method, properties) -> int:
+        """Deliveries of this message so far, including the current one."""
+        headers = getattr(properties, "headers", None) or {}
+        if "x-delivery-count" in headers:
+            # Quorum queues count previous deliveries
+            return int(headers["x-delivery-count"]) + 1
+        # Classic queues: only whether it was delivered before; treat that as the last attempt
+        return 1 if not method.redelivered else sys.maxsize
+
+    def _process(self, channel: BlockingChannel, delivery_tag: int, message_data: dict, deliveries: int = 1):
+        """Run the callback on a worker thread and settle the message."""
+        try:
+            self.callback(**message_data)
+        except self.reject_errors as e:
+            logger.error(f"❌ Message rejected: {e}")
+            self._settle(channel, delivery_tag, ack=False, requeue=False)
+        except Exception as e:
+            if self.is_permanent(e):
+                logger.error(f"❌ Message rejected, permanent error: {e}")
+                self._settle(channel, delivery_tag, ack=False, requeue=False)
+            elif deliveries >= self.max_deliveries:
+                logger.error(f"❌ Message dropped after {min(deliveries, self.max_deliveries)} attempts: {e}")
+                self._settle(channel, delivery_tag, ack=False, requeue=False)
+            else:
+                logger.error(f"Error processing message (attempt {deliveries}/{self.max_deliveries}): {e}")
+                self._settle(channel, delivery_tag, ack=False, requeue=True)
+        else:
+            self._settle(channel, delivery_tag, ack=True)
+
+    def _settle(self, channel: BlockingChannel, delivery_tag: int, ack: bool, requeue: bool = False):
+        """Schedule ack/nack on the connection thread."""
+        try:
+            self.connection.add_callback_threadsafe(
+                partial(self._settle_on_channel, channel, delivery_tag, ack, requeue)
+            )
+        except Exception as e:
+            # Connection is gone; the broker will redeliver the message
+            logger.warning(f"⚠️ Could not settle message {delivery_tag}: {e}")
+
+    def _settle_on_channel(self, channel: BlockingChannel, delivery_tag: int, ack: bool, requeue: bool):
+        if channel is not self.channel or channel.is_closed:
+            logger.warning(f"⚠️ Channel was replaced, message {delivery_tag} will be redelivered")
+            return
+        if ack:
+            channel.basic_ack(delivery_tag=delivery_tag)
+        else:
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
+
+    def close(self):
+        """Let workers finish, send their pending acks, then close the connection."""
+        self.executor.shutdown(wait=True)
+        try:
+            if self.connection and not self.connection.is_closed:
+                self.connection.process_data_events(time_limit=0)
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to flush pending acks: {e}")
+        super().close()
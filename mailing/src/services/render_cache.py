@@ -0,0 +1,112 @@
+"""
+Process-level cache for email rendering.
+
+One Jinja ``Environment`` per process with a filesystem bytecode cache, so a
+restarted worker skips template compilation too. Compiled templates are kept
+by (name, mtime): an edited template is picked up on the next render without
+Jinja's per-render up-to-date check. Inline images are read and encoded into
+MIME parts once per (path, mtime); messages attach a copy of the prebuilt
+part, so per email only variable substitution and serialization remain.
+"""
+
+import copy
+import logging
+import os
+import tempfile
+import threading
+from email.mime.image import MIMEImage
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, TemplateNotFound
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """Compiled templates and prebuilt inline assets for one templates directory."""
+
+    def __init__(self, templates_path: str, bytecode_cache_path: Optional[str] = None):
+        """
+        Args:
+            templates_path: Directory with email templates
+            bytecode_cache_path: Directory for compiled template bytecode
+        """
+        self.templates_path = templates_path
+        bytecode_cache_path = bytecode_cache_path or os.path.join(tempfile.gettempdir(), "mailing-jinja-cache")
+        os.makedirs(bytecode_cache_path, exist_ok=True)
+        self.env = Environment(
+            loader=FileSystemLoader(searchpath=templates_path),
+            autoescape=True,
+            bytecode_cache=FileSystemBytecodeCache(bytecode_cache_path),
+            # Freshness is tracked here by mtime, not by Jinja on every get_template
+            auto_reload=False,
+        )
+        self._templates: Dict[str, Tuple[float, Template]] = {}
+        self._assets: Dict[Tuple[str, str], Tuple[float, MIMEImage]] = {}
+        self._lock = threading.Lock()
+
+    def get_template(self, name: str) -> Template:
+        """Compiled template, recompiled only when the file's mtime changes."""
+        mtime = self._mtime(name)
+        cached = self._templates.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            # Drop Jinja's own copy so the edited file is really reloaded
+            self.env.cache.clear()
+            template = self.env.get_template(name)
+            self._templates[name] = (mtime, template)
+        logger.info(f"📄 Template compiled: {name}")
+        return template
+
+    def _mtime(self, name: str) -> float:
+        for searchpath in self.env.loader.searchpath:
+            try:
+                return os.stat(os.path.join(searchpath, name)).st_mtime
+            except FileNotFoundError:
+                continue
+        raise TemplateNotFound(name)
+
+    def render(self, name: str, context: dict) -> str:
+        return self.get_template(name).render(context)
+
+    def render_many(self, name: str, contexts: Iterable[dict], common: Optional[dict] = None) -> Iterator[str]:
+        """
+        Render one template for many recipients.
+
+        The template is looked up once and ``common`` is merged into every
+        context, so each item only pays for variable substitution.
+        """
+        template = self.get_template(name)
+        common = common or {}
+        for context in contexts:
+            yield template.render({**common, **context})
+
+    def inline_image(self, path: str, content_id: str, filename: str, subtype: str = "jpeg") -> Optional[MIMEImage]:
+        """
+        Inline image part for ``path``, or None if the file does not exist.
+
+        The file is read and base64-encoded once; every call returns a copy
+        of the prebuilt part, so messages never share a mutable MIME object.
+        """
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+        key = (path, content_id)
+        cached = self._assets.get(key)
+        if not cached or cached[0] != mtime:
+            with open(path, "rb") as asset_file:
+                part = MIMEImage(asset_file.read(), _subtype=subtype)
+            part.add_header("Content-ID", f"<{content_id}>")
+            part.add_header("Content-Disposition", "inline", filename=filename)
+            cached = self._assets[key] = (mtime, part)
+            logger.info(f"🖼️ Inline asset cached: {path}")
+        return copy.deepcopy(cached[1])
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._assets.clear()
+            self.env.cache.clear()
+
@@ -0,0 +1,184 @@
+"""
+Persistent SMTP sessions and send-rate limiting.
+
+Each worker thread keeps its own SMTP connection (smtplib.SMTP is not
+thread-safe), so TLS handshake and login happen once per worker instead of
+once per email. Idle sessions are probed with NOOP before reuse, and a send
+that fails on a dropped connection is retried once on a fresh one.
+"""
+
+import logging
+import smtplib
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_connection_error(error: Exception) -> bool:
+    """True if the connection is gone, False if the server rejected the message."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # SMTPException subclasses OSError, but its other subclasses are server replies
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """True if resending the same message cannot succeed (refused recipient, 5xx reply)."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by all workers."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None, clock: Callable = time.monotonic,
+                 sleep: Callable = time.sleep):
+        """
+        Args:
+            rate: Emails per second; 0 disables limiting
+            burst: Bucket capacity (defaults to one second of sends)
+        """
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a send is allowed."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+class SMTPSession:
+    """One reusable SMTP connection with keepalive and reconnect."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        keepalive: float = 30.0,
+        timeout: float = 10.0,
+        smtp_class: Callable = smtplib.SMTP,
+    ):
+        """
+        Args:
+            keepalive: Idle seconds after which the session is checked with NOOP
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.smtp_class = smtp_class
+        self.server = None
+        self.last_used = 0.0
+        self.connections = 0
+
+    def connect(self):
+        """Open the connection, upgrade to TLS and log in."""
+        self.close()
+        server = self.smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+            raise
+        self.server = server
+        self.connections += 1
+        self.last_used = time.monotonic()
+        logger.info(f"📡 SMTP session opened to {self.host}:{self.port}")
+
+    def is_alive(self) -> bool:
+        """Check an idle connection with NOOP; recently used ones are trusted."""
+        if self.server is None:
+            return False
+        if time.monotonic() - self.last_used < self.keepalive:
+            return True
+        try:
+            return self.server.noop()[0] == 250
+        except OSError:
+            return False
+
+    def send(self, from_email: str, to_emails: list, message: str):
+        """Send a message, reconnecting once if the connection was dropped."""
+        for attempt in range(2):
+            if not self.is_alive():
+                self.connect()
+            try:
+                self.server.sendmail(from_email, to_emails, message)
+                self.last_used = time.monotonic()
+                return
+            except OSError as e:
+                if not is_connection_error(e):
+                    raise
+                logger.warning(f"⚠️ SMTP connection lost, reconnecting: {e}")
+                self.close()
+                if attempt:
+                    raise
+
+    def close(self):
+        """Quit the session, ignoring errors from a dead connection."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except Exception:
+            try:
+                self.server.close()
+            except Exception:
+                pass
+        self.server = None
+
+
+class SMTPSessionPool:
+    """Hands every thread its own SMTPSession."""
+
+    def __init__(self, session_factory: Callable[[], SMTPSession]):
+        self.session_factory = session_factory
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def session(self) -> SMTPSession:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self.session_factory()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()